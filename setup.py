@@ -55,6 +55,9 @@ uncertainpy_require = [
 
 efel_features = ["efel"]
 network_features = ["elephant", "neo", "quantities"]
+sparse = ["scikit-learn"]
+compression = ["hdf5plugin"]
+distributed = ["dask", "distributed", "mpi4py"]
 
 all_uncertainpy_requires = uncertainpy_require + efel_features + network_features
 
@@ -64,11 +67,15 @@ tests_require = all_uncertainpy_requires + test_dependencies
 docs_dependencies = ["sphinx", "sphinx_rtd_theme"]
 docs_require = all_uncertainpy_requires + docs_dependencies
 
-all_requires = docs_require + test_dependencies + docs_dependencies
+all_requires = docs_require + test_dependencies + docs_dependencies \
+               + sparse + compression + distributed
 
 extras_require = {
     "efel_features": efel_features,
     "network_features": network_features,
+    "sparse": sparse,
+    "compression": compression,
+    "distributed": distributed,
     "all": all_uncertainpy_requires,
     "docs": docs_require,
     "all_extras": all_requires,
@@ -89,6 +96,9 @@ Custom options:
   --docs              Install with dependencies required to build the docs
   --network_features  Install with dependencies required by NetworkFeatures
   --efel_features     Install with dependencies required by EfelFeatures
+  --sparse            Install with dependencies required by least-angle regression
+  --compression       Install with dependencies required by Blosc compression
+  --distributed       Install with dependencies required by the mpi and dask executors
     """
 
 if "--help" in sys.argv or "-h" in sys.argv:
@@ -119,6 +129,21 @@ if "--efel_features" in sys.argv:
     sys.argv.remove("--efel_features")
 
 
+if "--sparse" in sys.argv:
+    uncertainpy_require = uncertainpy_require + sparse
+    sys.argv.remove("--sparse")
+
+
+if "--compression" in sys.argv:
+    uncertainpy_require = uncertainpy_require + compression
+    sys.argv.remove("--compression")
+
+
+if "--distributed" in sys.argv:
+    uncertainpy_require = uncertainpy_require + distributed
+    sys.argv.remove("--distributed")
+
+
 # Get version
 exec(open(os.path.join("src", "uncertainpy", "_version.py")).read())
 
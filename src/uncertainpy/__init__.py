@@ -22,7 +22,7 @@ be used for many other types of models and features within other fields.
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-from .data import Data, DataFeature
+from .data import Data, DataFeature, LazyDataset
 from .distribution import uniform, normal
 from .parameters import Parameter, Parameters
 from .uncertainty import UncertaintyQuantification
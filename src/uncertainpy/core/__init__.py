@@ -6,16 +6,31 @@ calculate features of the model, both in parallel (``RunModel`` and
 ``Parallel``), as well as the class for performing the uncertainty calculations
 (``UncertaintyCalculations``. It also contains the base classes that are
 responsible for setting and updating parameters, models and features across
-classes (``Base`` and ``ParameterBase``).
+classes (``Base`` and ``ParameterBase``), the on-disk cache of model
+evaluations (``EvaluationCache``), checkpoints of completed model
+evaluations (``Checkpoint``), memory-mapped storage of model evaluations
+(``MemmapEvaluations``) and the streaming statistics used by the
+quasi-Monte Carlo method (``MonteCarloStatistics``).
 """
 
 from .base import Base, ParameterBase
 from .run_model import RunModel
 from .uncertainty_calculations import UncertaintyCalculations
 from .parallel import Parallel
+from .evaluation_cache import EvaluationCache
+from .checkpoint import Checkpoint
+from .memmap_evaluations import MemmapEvaluations
+from .streaming import RunningStatistics, P2Quantile, SobolAccumulator, MonteCarloStatistics
 
 __all__ = ["Parallel",
            "Base",
            "ParameterBase",
            "RunModel",
-           "UncertaintyCalculations"]
\ No newline at end of file
+           "UncertaintyCalculations",
+           "EvaluationCache",
+           "Checkpoint",
+           "MemmapEvaluations",
+           "RunningStatistics",
+           "P2Quantile",
+           "SobolAccumulator",
+           "MonteCarloStatistics"]
\ No newline at end of file
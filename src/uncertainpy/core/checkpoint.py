@@ -0,0 +1,475 @@
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import shutil
+import hashlib
+
+from timeit import default_timer as timer
+
+import numpy as np
+
+from ..utils.logger import setup_module_logger, get_logger
+
+
+class Checkpoint(object):
+    """
+    Store the results of model evaluations incrementally in a HDF5 or Exdir
+    file, so an interrupted uncertainty quantification can be resumed
+    without evaluating the model again for the completed nodes.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the checkpoint file.
+    backend : {"auto", "hdf5", "exdir"}, optional
+        The fileformat used to store the checkpoint. "auto" assumes the
+        filename ends with either ".h5" for HDF5 files or ".exdir" for Exdir
+        files, and defaults to HDF5 files for unknown file extensions.
+        Default is "auto".
+    flush_interval : float, optional
+        The minimum time (in seconds) between each time the results are
+        flushed to disk. Default is 1.
+    logger_level : {"info", "debug", "warning", "error", "critical", None}, optional
+        Set the threshold for the logging level. Logging messages less severe
+        than this level is ignored. If None, no logging to file is performed.
+        Default logger level is "info".
+
+    Attributes
+    ----------
+    filename : str
+        Name of the checkpoint file.
+    backend : {"auto", "hdf5", "exdir"}
+        The fileformat used to store the checkpoint.
+    flush_interval : float
+        The minimum time (in seconds) between each time the results are
+        flushed to disk.
+
+    Raises
+    ------
+    ValueError
+        If unsupported backend is chosen.
+
+    Notes
+    -----
+    The results from each call to ``RunModel.evaluate_nodes`` are stored in a
+    separate group, identified by the nodes and the uncertain parameters.
+    The model is not part of the identification, so a checkpoint must
+    only be resumed with the same model and features.
+
+    The group contains a ``done`` dataset that marks the completed nodes, and
+    a group for the model and each feature in ``results``. The values and
+    time of the model/feature are each stored in a group with the
+    ``"checkpoint"`` layout: a flat ``values`` dataset, an ``offsets`` dataset
+    with the start of each evaluation in ``values``, and a ``shapes`` dataset
+    with the shape of each evaluation padded with -1, and a ``sizes`` dataset
+    with the space reserved in ``values`` for each node. Contrary to the ragged
+    layout used by ``Data.save``, ``offsets`` has one entry for each node
+    instead of the start and end of all evaluations, since the nodes can be
+    written in any order. An ``offsets`` of -1 marks a node without results
+    for the model/feature. The datasets are resized as the results are
+    written. A node that is written again, for example a failed evaluation
+    that is evaluated again when resuming, reuses the space reserved for the
+    node if the new evaluation fits. Otherwise the new evaluation is appended,
+    and the space of the previous evaluation is not used again.
+    Each model/feature group also has a ``failed`` dataset with the error
+    message of failed evaluations (empty for the other evaluations). Failed
+    evaluations are not loaded, so they are evaluated again when the
+    uncertainty quantification is resumed. Each group also has an
+    ``interpolated`` dataset that marks the evaluations that had an
+    interpolation, which is created again when the results are loaded.
+    Results with values or time that can not be converted to arrays of
+    floats are not stored.
+
+    See Also
+    --------
+    uncertainpy.core.RunModel
+    """
+    def __init__(self,
+                 filename,
+                 backend="auto",
+                 flush_interval=1,
+                 logger_level="info"):
+
+        if backend not in ["auto", "hdf5", "exdir"]:
+            raise ValueError("backend {} not supported. Supported backends are: auto, hdf5, and exdir".format(backend))
+
+        self.filename = filename
+        self.backend = backend
+        self.flush_interval = flush_interval
+
+        self._file = None
+        self._group = None
+        self._hdf5 = None
+        self._last_flush = None
+
+        setup_module_logger(class_instance=self, level=logger_level)
+
+
+    def _backend(self):
+        """
+        Import the h5py or Exdir module used as backend.
+        """
+        if self.backend == "auto":
+            if self.filename.endswith(".exdir"):
+                current_backend = "exdir"
+            else:
+                current_backend = "hdf5"
+        else:
+            current_backend = self.backend
+
+        if current_backend == "hdf5":
+            try:
+                import h5py as backend
+            except ImportError:
+                raise ImportError("The HDF5 backend requires: h5py")
+
+        elif current_backend == "exdir":
+            try:
+                import exdir.core as backend
+            except ImportError:
+                raise ImportError("The Exdir backend requires: exdir")
+
+        return backend
+
+
+    def _create_dataset(self, group, name, data, fillvalue=None):
+        """
+        Create a dataset that can be resized with ``_resize``.
+        """
+        data = np.asarray(data)
+
+        if self._hdf5:
+            group.create_dataset(name,
+                                 data=data,
+                                 maxshape=(None,)*data.ndim,
+                                 chunks=True,
+                                 fillvalue=fillvalue)
+        else:
+            group.create_dataset(name, data=data)
+
+
+    def _resize(self, dataset, shape, fillvalue):
+        """
+        Resize a dataset, filling the new entries with `fillvalue`.
+        """
+        if self._hdf5:
+            dataset.resize(shape)
+        else:
+            # Exdir datasets can not be resized, so they are replaced
+            old = dataset[()]
+            data = np.full(shape, fillvalue, dtype=old.dtype)
+            data[tuple(slice(0, size) for size in old.shape)] = old
+            dataset.data = data
+
+
+    def _create_ragged(self, group, nr_nodes):
+        """
+        Create an empty group with the checkpoint layout.
+        """
+        group.attrs["layout"] = "checkpoint"
+        self._create_dataset(group, "values", np.array([], dtype=np.float64))
+        self._create_dataset(group, "offsets", -np.ones(nr_nodes, dtype=np.int64), fillvalue=-1)
+        self._create_dataset(group, "shapes", -np.ones((nr_nodes, 1), dtype=np.int64), fillvalue=-1)
+        self._create_dataset(group, "sizes", np.zeros(nr_nodes, dtype=np.int64), fillvalue=0)
+
+
+    def _write_ragged(self, group, index, value):
+        """
+        Write a single evaluation to a group with the checkpoint layout.
+        The evaluation replaces the previous evaluation of the node if it
+        fits, otherwise it is appended.
+        """
+        values = group["values"]
+        shapes = group["shapes"]
+
+        offset = group["offsets"][index]
+
+        if offset < 0 or value.size > group["sizes"][index]:
+            offset = values.shape[0]
+            self._resize(values, (offset + value.size,), np.nan)
+            group["sizes"][index] = value.size
+
+        if value.size > 0:
+            values[offset:offset + value.size] = value.ravel()
+
+        if value.ndim > shapes.shape[1]:
+            self._resize(shapes, (shapes.shape[0], value.ndim), -1)
+
+        shape = -np.ones(shapes.shape[1], dtype=np.int64)
+        shape[:value.ndim] = value.shape
+        shapes[index] = shape
+
+        group["offsets"][index] = offset
+
+
+    def _read_ragged(self, group):
+        """
+        Read all evaluations from a group with the checkpoint layout, with
+        None for nodes without an evaluation.
+        """
+        flat_values = group["values"][()]
+        offsets = group["offsets"][()]
+        shapes = group["shapes"][()]
+
+        values = []
+        for offset, shape in zip(offsets, shapes):
+            if offset < 0:
+                values.append(None)
+                continue
+
+            shape = tuple(int(size) for size in shape if size >= 0)
+            value = flat_values[offset:offset + int(np.prod(shape))].reshape(shape)
+
+            values.append(value[()] if value.ndim == 0 else value)
+
+        return values
+
+
+    def group_name(self, nodes, uncertain_parameters):
+        """
+        The name of the group the results for `nodes` are stored in.
+
+        Parameters
+        ----------
+        nodes : array
+            The values for the uncertain parameters
+            to evaluate the model and features for.
+        uncertain_parameters : list
+            A list of the names of all uncertain parameters.
+
+        Returns
+        -------
+        name : str
+            The name of the group.
+        """
+        hasher = hashlib.sha1()
+        hasher.update(np.ascontiguousarray(nodes, dtype=np.float64).tobytes())
+        hasher.update(str(np.shape(nodes)).encode("utf-8"))
+        hasher.update(",".join(uncertain_parameters).encode("utf-8"))
+
+        return "evaluations_" + hasher.hexdigest()
+
+
+    def load(self, nodes, uncertain_parameters):
+        """
+        Load the stored results for `nodes`.
+
+        Parameters
+        ----------
+        nodes : array
+            The values for the uncertain parameters
+            to evaluate the model and features for.
+        uncertain_parameters : list
+            A list of the names of all uncertain parameters.
+
+        Returns
+        -------
+        results : dict
+            A dictionary with the index of each completed node as key, and
+            the result of the model evaluation as value. Model/features that
+            had an interpolation have ``"interpolated"`` set to True instead,
+            see ``RunModel.restore_interpolations``. Nodes where the model
+            or a feature failed are not included.
+        """
+        if not os.path.exists(self.filename):
+            return {}
+
+        logger = get_logger(self)
+        backend = self._backend()
+
+        results = {}
+        try:
+            f = backend.File(self.filename, "r")
+        except (IOError, OSError) as error:
+            logger.warning("Unable to read checkpoint {}: {}".format(self.filename, error))
+            return results
+
+        try:
+            name = self.group_name(nodes, uncertain_parameters)
+
+            if name in f and "done" in f[name]:
+                done = np.flatnonzero(f[name]["done"][()])
+
+                for index in done:
+                    results[int(index)] = {}
+
+                for feature in f[name]["results"]:
+                    group = f[name]["results"][feature]
+
+                    values = self._read_ragged(group["values"])
+                    time = self._read_ragged(group["time"])
+                    failed = group["failed"][()]
+                    interpolated = group["interpolated"][()]
+
+                    for index in done:
+                        if values[index] is None:
+                            continue
+
+                        result = {"values": values[index],
+                                  "time": time[index]}
+
+                        message = failed[index]
+                        if isinstance(message, bytes):
+                            message = message.decode("utf8")
+
+                        if message:
+                            result["failed"] = str(message)
+
+                        if interpolated[index]:
+                            result["interpolated"] = True
+
+                        results[int(index)][feature] = result
+        finally:
+            f.close()
+
+        # Failed evaluations are evaluated again, since the failure might have
+        # been transient
+        for index in list(results):
+            if any("failed" in result for result in results[index].values()):
+                del results[index]
+
+        return results
+
+
+    def open(self, nodes, uncertain_parameters):
+        """
+        Open the checkpoint file for storing results for `nodes`.
+
+        Parameters
+        ----------
+        nodes : array
+            The values for the uncertain parameters
+            to evaluate the model and features for.
+        uncertain_parameters : list
+            A list of the names of all uncertain parameters.
+        """
+        self.close()
+
+        folder = os.path.dirname(self.filename)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+
+        backend = self._backend()
+        self._hdf5 = backend.__name__ == "h5py"
+
+        self._file = backend.File(self.filename, "a")
+
+        name = self.group_name(nodes, uncertain_parameters)
+
+        if name not in self._file:
+            group = self._file.create_group(name)
+            group.attrs["uncertain_parameters"] = [str(parameter) for parameter in uncertain_parameters]
+            group.create_dataset("nodes", data=nodes)
+            group.create_dataset("done", data=np.zeros(len(nodes.T), dtype=bool))
+            group.create_group("results")
+
+        self._group = self._file[name]
+        self._last_flush = timer()
+
+
+    def write(self, index, result):
+        """
+        Store the result of a single model evaluation.
+
+        Parameters
+        ----------
+        index : int
+            The index of the node the model was evaluated for.
+        result : dict
+            The result of the model evaluation.
+
+        Raises
+        ------
+        RuntimeError
+            If the checkpoint has not been opened.
+        """
+        if self._group is None:
+            raise RuntimeError("The checkpoint must be opened before results are written")
+
+        logger = get_logger(self)
+
+        arrays = {}
+        try:
+            for feature in result:
+                arrays[feature] = {"values": np.asarray(result[feature]["values"], dtype=np.float64),
+                                   "time": np.asarray(result[feature]["time"], dtype=np.float64)}
+        except (TypeError, ValueError):
+            logger.warning("Unable to store the result of node {} in the checkpoint. ".format(index) +
+                           "The values and time must be convertible to arrays of floats.")
+            return
+
+        nr_nodes = self._group["done"].shape[0]
+
+        for feature in result:
+            if feature not in self._group["results"]:
+                group = self._group["results"].create_group(feature)
+
+                self._create_ragged(group.create_group("values"), nr_nodes)
+                self._create_ragged(group.create_group("time"), nr_nodes)
+
+                if self._hdf5:
+                    import h5py
+                    group.create_dataset("failed", shape=(nr_nodes,), dtype=h5py.string_dtype())
+                else:
+                    group.create_dataset("failed", data=np.full(nr_nodes, "", dtype="U1"))
+
+                group.create_dataset("interpolated", data=np.zeros(nr_nodes, dtype=bool))
+
+            group = self._group["results"][feature]
+
+            self._write_ragged(group["values"], index, arrays[feature]["values"])
+            self._write_ragged(group["time"], index, arrays[feature]["time"])
+
+            failed = result[feature].get("failed", "")
+            if self._hdf5:
+                group["failed"][index] = failed
+            elif len(failed) > group["failed"].dtype.itemsize//4:
+                # Exdir datasets can not be resized, so the dataset is
+                # replaced with one with longer strings
+                messages = group["failed"][()].astype("U{}".format(len(failed)))
+                messages[index] = failed
+                group["failed"].data = messages
+            else:
+                group["failed"][index] = failed
+
+            group["interpolated"][index] = "interpolation" in result[feature]
+
+        self._group["done"][index] = True
+
+        if timer() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+
+    def flush(self):
+        """
+        Flush the stored results to disk.
+        """
+        if self._file is not None and hasattr(self._file, "flush"):
+            self._file.flush()
+
+        self._last_flush = timer()
+
+
+    def close(self):
+        """
+        Flush the stored results to disk and close the checkpoint file.
+        """
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+
+        self._file = None
+        self._group = None
+        self._hdf5 = None
+
+
+    def remove(self):
+        """
+        Close and delete the checkpoint file.
+        """
+        self.close()
+
+        if os.path.isdir(self.filename):
+            shutil.rmtree(self.filename)
+        elif os.path.isfile(self.filename):
+            os.remove(self.filename)
@@ -0,0 +1,520 @@
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import inspect
+import hashlib
+import pickle
+import tempfile
+import types
+
+import six
+import numpy as np
+
+from ..utils.logger import setup_module_logger, get_logger
+
+
+class EvaluationCache(object):
+    """
+    An on-disk cache of model and feature evaluations.
+
+    Each evaluation is stored in a separate file, named after a hash of the
+    model, the features and the parameter values of the evaluation
+    (content addressed). The cache can be shared between different
+    uncertainty quantifications, for example when the same model is
+    analysed with a different polynomial order.
+
+    Parameters
+    ----------
+    folder : str, optional
+        The folder where the evaluations are stored.
+        Default is ".uncertainpy_cache".
+    max_size : {None, int}, optional
+        The maximum total size (in bytes) of the stored evaluations. If the
+        cache grows larger, the least recently used evaluations are removed.
+        If None, the size of the cache is not limited. Default is None.
+    max_entries : {None, int}, optional
+        The maximum number of stored evaluations. If the cache grows larger,
+        the least recently used evaluations are removed. If None, the number of
+        evaluations is not limited. Default is None.
+    logger_level : {"info", "debug", "warning", "error", "critical", None}, optional
+        Set the threshold for the logging level. Logging messages less severe
+        than this level is ignored. If None, no logging to file is performed.
+        Default logger level is "info".
+
+    Attributes
+    ----------
+    folder : str
+        The folder where the evaluations are stored.
+    max_size : {None, int}
+        The maximum total size (in bytes) of the stored evaluations.
+    max_entries : {None, int}
+        The maximum number of stored evaluations.
+
+    Notes
+    -----
+    The model and features are identified by their class, their source code
+    and their attributes, see ``fingerprint``. If an attribute can not be
+    identified, the cache is not used. The global variables and functions a
+    function refers to are part of the identity, but functions and classes
+    imported from other modules are only identified by their name.
+    Changes to imported functions, such as a new version of a library, and
+    to files the model reads from, such as NEURON ``.hoc`` files, are not
+    detected, and the cache must then be cleared with ``clear``.
+
+    See Also
+    --------
+    uncertainpy.core.RunModel
+    """
+    extension = ".pickle"
+
+    def __init__(self,
+                 folder=".uncertainpy_cache",
+                 max_size=None,
+                 max_entries=None,
+                 logger_level="info"):
+
+        self.folder = folder
+        self.max_size = max_size
+        self.max_entries = max_entries
+
+        setup_module_logger(class_instance=self, level=logger_level)
+
+
+    def identity(self, model, features):
+        """
+        Create a hash that identifies a model and its features.
+
+        Parameters
+        ----------
+        model : Model
+            The model to identify.
+        features : Features
+            The features of the model.
+
+        Returns
+        -------
+        identity : {str, None}
+            The hexadecimal hash of the model and features. None if the model
+            or features have attributes that can not be identified, in which
+            case the cache should not be used.
+        """
+        hasher = hashlib.sha1()
+
+        for obj in [model, features]:
+            try:
+                hasher.update(fingerprint(obj).encode("utf-8"))
+            except ValueError as error:
+                logger = get_logger(self)
+                logger.warning("{} The cache is not used.".format(error))
+                return None
+
+        return hasher.hexdigest()
+
+
+    def key(self, identity, model_parameters):
+        """
+        Create the key of a single model evaluation.
+
+        Parameters
+        ----------
+        identity : str
+            The identity of the model and features, as created by ``identity``.
+        model_parameters : dict
+            The model parameters of the evaluation, on the form
+            ``{"parameter 1": value 1, "parameter 2": value 2, ...}``.
+
+        Returns
+        -------
+        key : str
+            The hexadecimal hash of the model evaluation.
+        """
+        hasher = hashlib.sha1()
+        hasher.update(identity.encode("utf-8"))
+
+        for name in sorted(model_parameters):
+            value = model_parameters[name]
+            if isinstance(value, (float, np.floating)):
+                value = float(value).hex()
+            else:
+                value = repr(value)
+
+            hasher.update("{}={};".format(name, value).encode("utf-8"))
+
+        return hasher.hexdigest()
+
+
+    def path(self, key):
+        """
+        The path of the file where the evaluation with `key` is stored.
+
+        Parameters
+        ----------
+        key : str
+            The key of the model evaluation.
+
+        Returns
+        -------
+        path : str
+            The path of the file.
+        """
+        return os.path.join(self.folder, key + self.extension)
+
+
+    def get(self, key):
+        """
+        Get a stored model evaluation.
+
+        Parameters
+        ----------
+        key : str
+            The key of the model evaluation.
+
+        Returns
+        -------
+        result : {dict, None}
+            The stored result, or None if the evaluation is not stored.
+        """
+        path = self.path(key)
+
+        if not os.path.isfile(path):
+            return None
+
+        try:
+            with open(path, "rb") as f:
+                result = pickle.load(f)
+        except Exception as error:
+            logger = get_logger(self)
+            logger.warning("Unable to read cached evaluation {}: {}".format(path, error))
+            return None
+
+        # Mark the evaluation as recently used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        return result
+
+
+    def set(self, key, result):
+        """
+        Store a model evaluation.
+
+        Parameters
+        ----------
+        key : str
+            The key of the model evaluation.
+        result : dict
+            The result of the model evaluation.
+        """
+        if not os.path.isdir(self.folder):
+            os.makedirs(self.folder)
+
+        # Write to a temporary file first so no partially written evaluations
+        # are read by others sharing the cache
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            # Replaces an evaluation stored by another process with the same key
+            os.replace(tmp_path, self.path(key))
+        except Exception:
+            if os.path.isfile(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+    def __contains__(self, key):
+        return os.path.isfile(self.path(key))
+
+
+    def __len__(self):
+        return len(self._entries())
+
+
+    def _entries(self):
+        """
+        List the stored evaluations as (path, last used, size), with the
+        least recently used first.
+        """
+        if not os.path.isdir(self.folder):
+            return []
+
+        entries = []
+        for filename in os.listdir(self.folder):
+            if not filename.endswith(self.extension):
+                continue
+
+            path = os.path.join(self.folder, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            entries.append((path, stat.st_mtime, stat.st_size))
+
+        entries.sort(key=lambda entry: entry[1])
+
+        return entries
+
+
+    def size(self):
+        """
+        The total size of the stored evaluations.
+
+        Returns
+        -------
+        size : int
+            The total size (in bytes) of the stored evaluations.
+        """
+        return sum(entry[2] for entry in self._entries())
+
+
+    def evict(self):
+        """
+        Remove the least recently used evaluations until the cache is within
+        `max_size` and `max_entries`.
+        """
+        if self.max_size is None and self.max_entries is None:
+            return
+
+        entries = self._entries()
+        size = sum(entry[2] for entry in entries)
+
+        for path, last_used, entry_size in entries:
+            if (self.max_size is None or size <= self.max_size) and \
+                (self.max_entries is None or len(entries) <= self.max_entries):
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+            size -= entry_size
+            entries = entries[1:]
+
+
+    def clear(self):
+        """
+        Remove all stored evaluations.
+        """
+        for path, last_used, size in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+
+def fingerprint(obj):
+    """
+    Create a string that identifies an object by its class, source code and
+    attributes.
+
+    Functions are identified by their source code, default arguments, the
+    variables they have captured and the global variables they refer to, and
+    arrays by their content. Other objects are identified by their pickled
+    content. Functions and classes defined in the same module as the function
+    that refers to them are identified by their source code, while functions,
+    classes and modules imported from other modules are identified by their
+    name. The labels, and the attributes
+    listed in ``_runtime_attributes`` of the class of the object, which are
+    set while running the model or calculating the features, are ignored.
+
+    Parameters
+    ----------
+    obj : object
+        The object to create a fingerprint of.
+
+    Returns
+    -------
+    fingerprint : str
+        A string that identifies the object.
+
+    Raises
+    ------
+    ValueError
+        If an attribute of the object can not be identified.
+    """
+    if obj is None:
+        return "None"
+
+    cls = obj.__class__
+    parts = ["{}.{}".format(cls.__module__, cls.__name__), _source(cls)]
+
+    described = set()
+
+    # The global variables the methods of the class refer to
+    for name, method in sorted(vars(cls).items()):
+        if not inspect.isfunction(method):
+            continue
+
+        value = _describe_globals(method, described)
+        if value is None:
+            raise ValueError("Unable to identify the global variables used by "
+                             "{}.{} for the cache.".format(cls.__name__, name))
+
+        if value:
+            parts.append(value)
+
+    ignored = ["labels", "_labels"] + list(getattr(obj, "_runtime_attributes", []))
+
+    for name in sorted(vars(obj)):
+        if name in ignored:
+            continue
+
+        value = _describe(getattr(obj, name))
+        if value is None:
+            raise ValueError("Unable to identify the attribute {} of {} ".format(name, cls.__name__) +
+                             "for the cache.")
+
+        parts.append("{}={}".format(name, value))
+
+    return "\n".join(parts)
+
+
+def _source(obj):
+    """
+    The source code of a function or class, or its name if the source is
+    not available.
+    """
+    try:
+        return inspect.getsource(obj)
+    except (TypeError, OSError, IOError):
+        return getattr(obj, "__qualname__", getattr(obj, "__name__", repr(type(obj))))
+
+
+def _describe(value, described=None):
+    """
+    Describe an attribute value as a string, None if the value can not be
+    described. `described` are the ids of the functions that are being
+    described, so recursive functions are only described once.
+    """
+    if described is None:
+        described = set()
+
+    if value is None or isinstance(value, (bool, six.integer_types, float, six.string_types,
+                                           np.integer, np.floating, np.bool_)):
+        return repr(value)
+
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            return None
+
+        digest = hashlib.sha1(np.ascontiguousarray(value).tobytes()).hexdigest()
+        return "array({}, {}, {})".format(value.dtype.str, value.shape, digest)
+
+    if isinstance(value, (list, tuple)):
+        items = [_describe(item, described) for item in value]
+        if None in items:
+            return None
+        return "[" + ", ".join(items) + "]"
+
+    if isinstance(value, dict):
+        items = []
+        for key in sorted(value, key=repr):
+            item = _describe(value[key], described)
+            if item is None:
+                return None
+            items.append("{!r}: {}".format(key, item))
+
+        return "{" + ", ".join(items) + "}"
+
+    if callable(value) and not isinstance(value, type):
+        function = getattr(value, "__func__", value)
+
+        if id(function) in described:
+            return _source(function)
+        described.add(id(function))
+
+        parts = [_source(function)]
+
+        # The default arguments and the variables captured by a closure
+        for name in ["__defaults__", "__kwdefaults__"]:
+            defaults = getattr(function, name, None)
+            if defaults is not None:
+                item = _describe(defaults, described)
+                if item is None:
+                    return None
+                parts.append(item)
+
+        for cell in getattr(function, "__closure__", None) or []:
+            try:
+                contents = cell.cell_contents
+            except ValueError:
+                # An empty cell
+                contents = None
+
+            item = _describe(contents, described)
+            if item is None:
+                return None
+            parts.append(item)
+
+        item = _describe_globals(function, described)
+        if item is None:
+            return None
+        if item:
+            parts.append(item)
+
+        return "\n".join(parts)
+
+    try:
+        pickled = pickle.dumps(value, protocol=2)
+    except Exception:
+        return None
+
+    cls = value.__class__
+    return "{}.{}({})".format(cls.__module__, cls.__name__, hashlib.sha1(pickled).hexdigest())
+
+
+def _describe_globals(function, described):
+    """
+    Describe the global variables `function` refers to as a string, None if
+    one of them can not be described. Functions and classes from other
+    modules, and modules, are described by their name.
+    """
+    code = getattr(function, "__code__", None)
+    global_variables = getattr(function, "__globals__", None)
+
+    if code is None or global_variables is None:
+        return ""
+
+    module = getattr(function, "__module__", None)
+
+    parts = []
+    for name in sorted(_global_names(code)):
+        if name not in global_variables:
+            continue
+
+        value = global_variables[name]
+
+        if isinstance(value, types.ModuleType):
+            item = "module {}".format(value.__name__)
+        elif (inspect.isfunction(value) or inspect.isclass(value)) and value.__module__ != module:
+            item = "{}.{}".format(value.__module__, getattr(value, "__qualname__", value.__name__))
+        elif inspect.isclass(value):
+            item = _source(value)
+        else:
+            item = _describe(value, described)
+
+        if item is None:
+            return None
+
+        parts.append("{}={}".format(name, item))
+
+    return "\n".join(parts)
+
+
+def _global_names(code):
+    """
+    The names used by `code` and the functions defined inside it.
+    """
+    names = set(code.co_names)
+
+    for constant in code.co_consts:
+        if isinstance(constant, types.CodeType):
+            names.update(_global_names(constant))
+
+    return names
@@ -0,0 +1,239 @@
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+
+import numpy as np
+
+from ..utils.utility import contains_nan
+
+
+class MemmapEvaluations(object):
+    """
+    Store the evaluations of a model or feature one evaluation at the time in
+    a preallocated memory-mapped numpy file, with shape
+    ``(nr_evaluations, ...)``.
+
+    The file is allocated when the first evaluation without numpy.nan
+    arrives. If an evaluation that does not contain numpy.nan has a
+    different shape than the first evaluation, the evaluations are irregular
+    and are instead returned as a list.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the numpy (``.npy``) file the evaluations are stored in.
+    nr_evaluations : int
+        The total number of evaluations.
+    shared : bool, optional
+        If other processes write evaluations directly to the file, see
+        ``append_written``. The file is then kept until ``remove`` is called,
+        also if the evaluations turn out to be irregular. Default is False.
+
+    Attributes
+    ----------
+    filename : str
+        Name of the numpy (``.npy``) file the evaluations are stored in.
+    nr_evaluations : int
+        The total number of evaluations.
+    regular : bool
+        If all evaluations (that do not contain numpy.nan) have the same
+        shape.
+    shared : bool
+        If other processes write evaluations directly to the file.
+
+    Notes
+    -----
+    Evaluations that contain numpy.nan and do not have the same shape as the
+    other evaluations, for example a single numpy.nan for a failed
+    evaluation, are stored as a row of numpy.nan.
+    """
+    def __init__(self, filename, nr_evaluations, shared=False):
+        self.filename = filename
+        self.nr_evaluations = nr_evaluations
+        self.regular = True
+        self.shared = shared
+
+        self._memmap = None
+        self._index = 0
+        self._pending = {}
+        self._nan_rows = {}
+        self._values = None
+
+
+    def append(self, values):
+        """
+        Store the next evaluation.
+
+        Parameters
+        ----------
+        values : {float, array_like}
+            The evaluation.
+
+        Raises
+        ------
+        ValueError
+            If more than `nr_evaluations` evaluations are stored.
+        """
+        if self._index >= self.nr_evaluations:
+            raise ValueError("Only {} evaluations can be stored".format(self.nr_evaluations))
+
+        index = self._index
+        self._index += 1
+
+        if not self.regular:
+            self._values.append(values)
+            return
+
+        nan = contains_nan(values)
+
+        if self._memmap is None:
+            if nan:
+                self._pending[index] = values
+                return
+
+            try:
+                values = np.asarray(values, dtype=float)
+            except (ValueError, TypeError):
+                self._irregular(index, values)
+                return
+
+            self.allocate(values.shape)
+
+            pending = self._pending
+            self._pending = {}
+            for pending_index, pending_values in pending.items():
+                self._write(pending_index, pending_values)
+
+        if not self._write(index, values):
+            self._irregular(index, values)
+
+
+    def append_written(self):
+        """
+        Register that the next evaluation has been written directly to the
+        file by another process.
+
+        Raises
+        ------
+        ValueError
+            If more than `nr_evaluations` evaluations are stored.
+        RuntimeError
+            If the file has not been allocated.
+        """
+        if self._index >= self.nr_evaluations:
+            raise ValueError("Only {} evaluations can be stored".format(self.nr_evaluations))
+
+        if self._memmap is None:
+            raise RuntimeError("The file must be allocated before evaluations are written to it")
+
+        index = self._index
+        self._index += 1
+
+        if not self.regular:
+            self._values.append(np.array(self._memmap[index]))
+
+
+    def allocate(self, shape):
+        """
+        Allocate the memory-mapped file, so it can be written to before the
+        first evaluation is appended.
+
+        Parameters
+        ----------
+        shape : tuple
+            The shape of a single evaluation.
+        """
+        folder = os.path.dirname(self.filename)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+
+        self._memmap = np.lib.format.open_memmap(self.filename,
+                                                 mode="w+",
+                                                 dtype=float,
+                                                 shape=(self.nr_evaluations,) + shape)
+
+
+    def _write(self, index, values):
+        """
+        Write an evaluation to the memory-mapped file. Returns False if the
+        evaluation does not fit.
+        """
+        shape = self._memmap.shape[1:]
+
+        if np.shape(values) == shape:
+            try:
+                self._memmap[index] = values
+                return True
+            except (ValueError, TypeError):
+                return False
+
+        if contains_nan(values):
+            self._memmap[index] = np.nan
+            self._nan_rows[index] = values
+            return True
+
+        return False
+
+
+    def _irregular(self, index, values):
+        """
+        Switch to storing the evaluations in a list.
+        """
+        self._values = self._to_list(index)
+        self._values.append(values)
+
+        self.regular = False
+
+        if not self.shared:
+            self.remove()
+
+
+    def _to_list(self, nr_evaluations):
+        """
+        Get the first `nr_evaluations` stored evaluations as a list.
+        """
+        evaluations = []
+        for i in range(nr_evaluations):
+            if i in self._pending:
+                evaluations.append(self._pending[i])
+            elif i in self._nan_rows:
+                evaluations.append(self._nan_rows[i])
+            elif self._memmap is None:
+                evaluations.append(np.nan)
+            else:
+                evaluations.append(np.array(self._memmap[i]))
+
+        return evaluations
+
+
+    @property
+    def evaluations(self):
+        """
+        The stored evaluations.
+
+        Returns
+        -------
+        evaluations : {numpy.memmap, list}
+            The memory-mapped evaluations if the evaluations are regular.
+            A list of the evaluations if the evaluations are irregular, or if
+            all evaluations contain numpy.nan.
+        """
+        if not self.regular:
+            return self._values
+
+        if self._memmap is None:
+            return self._to_list(self._index)
+
+        self._memmap.flush()
+
+        return self._memmap
+
+
+    def remove(self):
+        """
+        Close and delete the memory-mapped file.
+        """
+        self._memmap = None
+
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
@@ -11,6 +11,11 @@ from .base import Base
 from ..utils.utility import none_to_nan, contains_nan, is_regular
 from ..utils.logger import get_logger
 
+# The memory-mapped files store_result has opened in this process, with the
+# filename as key
+_memmaps = {}
+
+
 class Parallel(Base):
     """
     Calculates the model and features of the model for one set of
@@ -31,11 +36,41 @@ class Parallel(Base):
         Set the threshold for the logging level. Logging messages less severe
         than this level is ignored. If None, no logging to file is performed
         Default logger level is "info".
+    interpolation_grid : {None, dict}, optional
+        The common time grid of the interpolated model/features, with the
+        name of the model/feature as key. Irregular 1D results of these
+        are evaluated on the grid in ``create_interpolations``, instead of
+        returning the interpolation. If None, no common time grid is used.
+        Default is None.
+    memmap_files : {None, dict}, optional
+        The memory-mapped numpy (``.npy``) files ``run_node`` and
+        ``process_node`` write the results to, with the name of the
+        model/feature as key, and a tuple with the filename and the expected
+        time values as value. If None, no results are written to files.
+        Default is None.
+    retries : int, optional
+        The number of times a model evaluation, with the postprocessing and
+        feature calculations, is tried again if it raises an exception.
+        Default is 0.
+    tolerant : bool, optional
+        If True, a model evaluation that still raises an exception after
+        `retries` new tries gives a result where the model and all features
+        are numpy.nan, see ``nan_result``, instead of raising the exception.
+        Default is False.
 
     Attributes
     ----------
     model : uncertainpy.Parallel.model
     features : uncertainpy.Parallel.features
+    interpolation_grid : dict
+        The common time grid of the interpolated model/features.
+    memmap_files : dict
+        The memory-mapped numpy files the results are written to.
+    retries : int
+        The number of times a failed model evaluation is tried again.
+    tolerant : bool
+        If failed model evaluations give numpy.nan instead of raising the
+        exception.
 
     See Also
     --------
@@ -43,17 +78,44 @@ class Parallel(Base):
     uncertainpy.models.Model
     uncertainpy.models.Model.run : Requirements for the model run function.
     """
+    def __init__(self,
+                 model=None,
+                 features=None,
+                 logger_level="info",
+                 interpolation_grid=None,
+                 memmap_files=None,
+                 retries=0,
+                 tolerant=False):
+
+        super(Parallel, self).__init__(model=model,
+                                       features=features,
+                                       logger_level=logger_level)
+
+        if interpolation_grid is None:
+            interpolation_grid = {}
+
+        if memmap_files is None:
+            memmap_files = {}
+
+        self.interpolation_grid = interpolation_grid
+        self.memmap_files = memmap_files
+        self.retries = retries
+        self.tolerant = tolerant
+
 
     def create_interpolations(self, result):
         """
         Create an interpolation.
 
         Model or feature `result` s that have a varying number of time steps,
-        are interpolated. Interpolation is only performed for one
+        are interpolated. Interpolation is performed for one and two
         dimensional `result`. Zero dimensional `result` does not need to be
-        interpolated, and support for interpolating two dimensional and above
-        `result` have currently not been implemented.
-        Adds a `"interpolation"` key-value pair to `result`.
+        interpolated, and support for interpolating three dimensional and
+        above `result` have currently not been implemented.
+        Adds a `"interpolation"` key-value pair to `result`, unless the
+        model/feature has a common time grid in ``interpolation_grid``. Then the
+        interpolation is instead evaluated on the grid, and the time and
+        values of the model/feature are replaced by the resampled ones.
 
         Parameters
         ----------
@@ -110,7 +172,13 @@ class Parallel(Base):
         If either model or feature results are irregular, the results must be
         interpolated for Chaospy to be able to create the polynomial
         approximation. For 1D results this is done with scipy:
-        ``InterpolatedUnivariateSpline(time, U, k=3)``.
+        ``InterpolatedUnivariateSpline(time, U, k=3)``. For 2D results, where
+        each row is interpolated along the time axis, this is done with
+        scipy: ``make_interp_spline(time, U, k=3, axis=1)``.
+
+        See also
+        --------
+        uncertainpy.core.Parallel.interpolate_on_grid
         """
         logger = get_logger(self)
 
@@ -136,12 +204,59 @@ class Parallel(Base):
                 elif np.ndim(result[feature]["values"]) == 1:
                     result[feature]["interpolation"] = self.interpolation_1d(result, feature)
 
+                    if feature in self.interpolation_grid:
+                        self.interpolate_on_grid(result, feature)
+
+
+
+                elif np.ndim(result[feature]["values"]) == 2:
+                    result[feature]["interpolation"] = self.interpolation_2d(result, feature)
 
+                    if feature in self.interpolation_grid:
+                        self.interpolate_on_grid(result, feature)
 
-                elif np.ndim(result[feature]["values"]) >= 2:
-                    # TODO implement interpolation of >= 2d data, part 1
+                elif np.ndim(result[feature]["values"]) >= 3:
+                    # TODO implement interpolation of >= 3d data, part 1
                     raise NotImplementedError("{feature}: ".format(feature=feature)
-                                            + " no support for >= 2D interpolation")
+                                            + " no support for >= 3D interpolation")
+
+        return result
+
+
+    def interpolate_on_grid(self, result, feature):
+        """
+        Evaluate the interpolation of one model/feature on its common time
+        grid in ``interpolation_grid``.
+
+        Parameters
+        ----------
+        result : dict
+            The model and feature results, where the model/feature has an
+            ``"interpolation"`` created by ``create_interpolations``.
+        feature: str
+            Name of a feature or the model.
+
+        Returns
+        -------
+        result : dict
+            The model and feature results, where the ``"time"`` of the
+            model/feature is the common time grid and the ``"values"`` are the
+            interpolation evaluated on the grid. The ``"interpolation"`` is
+            removed. If the interpolation is None, the values are numpy.nan.
+        """
+        logger = get_logger(self)
+
+        time = self.interpolation_grid[feature]
+        interpolation = result[feature].pop("interpolation")
+
+        if interpolation is None:
+            values = np.full(np.shape(result[feature]["values"])[:-1] + (len(time),), np.nan)
+            logger.error("{}: Unknown error while creating the interpolation".format(feature))
+        else:
+            values = interpolation(time)
+
+        result[feature]["time"] = time
+        result[feature]["values"] = values
 
         return result
 
@@ -279,14 +394,21 @@ class Parallel(Base):
         `time` and `values` are sent to features.preprocess and the preprocessed results
         is used to calculate each feature.
 
+        If the model evaluation, postprocessing or feature calculations raise
+        an exception, they are tried again up to `retries` times. If `tolerant`
+        is True, a result where the model and all features are numpy.nan is
+        returned when all tries fail, instead of raising the exception.
+
         See also
         --------
         uncertainpy.utils.utility.none_to_nan : Method for converting from None to NaN
         uncertainpy.features.Features.preprocess : preprocessing model results before features are calculated
         uncertainpy.models.Model.postprocess : posteprocessing of model results
         """
-        # logger = get_logger(self)
+        return self.tolerate(self._run, model_parameters)
 
+
+    def _run(self, model_parameters, report=True):
         # Try-except to catch exceptions and print stack trace
         try:
 
@@ -295,6 +417,46 @@ class Parallel(Base):
 
             model_result = self.model.evaluate(**model_parameters)
 
+        except Exception as error:
+            self._report_exception("Caught exception when running model: {} in parallel:".format(self.model.name), report)
+            raise
+
+        return self._process_model_result(model_result, report=report)
+
+
+    def process_model_result(self, model_result):
+        """
+        Postprocess the result of a single model evaluation,
+        calculate features from it and return the results.
+
+        Is the part of ``run`` that is performed after the model is evaluated.
+        Used directly for vectorized models, where the model is evaluated
+        for a batch of parameters at once.
+
+        Parameters
+        ----------
+        model_result : tuple
+            The result of a single model evaluation, on the form
+            ``(time, values, info_1, info_2, ...)``.
+
+        Returns
+        -------
+        result : dictionary
+            The model and feature results. The model and each feature each has
+            a dictionary with the time values, ``"time"``,  and model/feature results, ``"values"``.
+            If an interpolation has been created, those features/model also has
+            ``"interpolation"`` added. See ``run`` for an example.
+
+        See also
+        --------
+        uncertainpy.core.Parallel.run
+        """
+        return self.tolerate(self._process_model_result, model_result)
+
+
+    def _process_model_result(self, model_result, report=True):
+        # Try-except to catch exceptions and print stack trace
+        try:
             results = {}
 
             if self.model.ignore:
@@ -315,12 +477,7 @@ class Parallel(Base):
 
 
         except Exception as error:
-            print("")
-            print("Caught exception when running/postprocessing model: {} in parallel:".format(self.model.name))
-            print("===================================================================")
-            traceback.print_exc()
-            print("===================================================================")
-            print("")
+            self._report_exception("Caught exception when running/postprocessing model: {} in parallel:".format(self.model.name), report)
             raise
 
         try:
@@ -343,11 +500,330 @@ class Parallel(Base):
             return results
 
         except Exception as error:
+            self._report_exception("Caught exception when calculating/postprocessing features of model: {} in parallel:".format(self.model.name), report)
+            raise
+
+
+    def tolerate(self, function, argument):
+        """
+        Apply `function` to `argument`, and try again up to `retries` times
+        if it raises an exception.
+
+        Parameters
+        ----------
+        function : callable
+            The function that evaluates the model and calculates the
+            features, called as ``function(argument, report)``, where
+            `report` is True when an exception raised by the function is
+            raised again by ``tolerate``, and should be reported in full.
+        argument
+            The argument of `function`.
+
+        Returns
+        -------
+        result : dict
+            The result of `function`. If `tolerant` is True and all tries
+            raise an exception, the result of ``nan_result`` with a summary of
+            the last exception.
+
+        Raises
+        ------
+        Exception
+            The exception of the last try, if `tolerant` is False.
+        """
+        logger = get_logger(self)
+
+        for attempt in range(self.retries + 1):
+            # Only the exception that is raised again is printed with the
+            # traceback, the tries that are retried or tolerated are logged
+            report = attempt == self.retries and not self.tolerant
+
+            try:
+                return function(argument, report)
+
+            except Exception as error:
+                failed = traceback.format_exception_only(type(error), error)[-1].strip()
+
+                if attempt < self.retries:
+                    logger.warning("{}: try {} of {} failed with {}. Trying again.".format(
+                        self.model.name, attempt + 1, self.retries + 1, failed))
+
+                elif self.tolerant:
+                    logger.warning("{}: failed with {}. The model and all features "
+                                   "are set to numpy.nan.".format(self.model.name, failed))
+
+                    return self.nan_result(failed=failed)
+
+                else:
+                    raise
+
+
+    def _report_exception(self, message, report):
+        """
+        Report the exception that is currently handled, either by printing
+        the traceback or by logging it as debug information.
+        """
+        if report:
             print("")
-            print("Caught exception when calculating/postprocessing features of model: {} in parallel:".format(self.model.name))
+            print(message)
             print("===================================================================")
             traceback.print_exc()
             print("===================================================================")
             print("")
-            raise
+        else:
+            logger = get_logger(self)
+            logger.debug("{}\n{}".format(message, traceback.format_exc()))
+
+
+    def nan_result(self, failed=None):
+        """
+        Create the result of a model evaluation that failed or did not
+        finish, where the values and time of the model and all features are
+        numpy.nan.
+
+        Parameters
+        ----------
+        failed : {None, str}, optional
+            A summary of why the model evaluation failed, which is added as
+            ``"failed"`` to the result of the model. Default is None.
+
+        Returns
+        -------
+        result : dict
+            The model and feature results, see ``run``. The interpolated
+            model/features have the ``"interpolation"`` None, or values of
+            numpy.nan on their common time grid if they have one in
+            `interpolation_grid`.
+        """
+        result = {self.model.name: {"values": np.nan,
+                                    "time": np.nan}}
+
+        if failed is not None:
+            result[self.model.name]["failed"] = failed
+
+        for feature in self.features.features_to_run:
+            result[feature] = {"values": np.nan,
+                               "time": np.nan}
+
+        for feature in result:
+            if feature in self.features.interpolate or \
+                (feature == self.model.name and self.model.interpolate and not self.model.ignore):
+
+                if feature in self.interpolation_grid:
+                    time = self.interpolation_grid[feature]
 
+                    result[feature]["time"] = time
+                    result[feature]["values"] = np.full(len(time), np.nan)
+                else:
+                    result[feature]["interpolation"] = None
+
+        return result
+
+
+    def run_node(self, node):
+        """
+        Run a model and calculate features from the model output for a
+        single node, and write the results to the memory-mapped files in
+        `memmap_files`.
+
+        Parameters
+        ----------
+        node : tuple
+            The index of the node and the model parameters, on the form
+            ``(index, model_parameters)``.
+
+        Returns
+        -------
+        result : dictionary
+            The model and feature results, see ``run``. The model/features
+            that have been written to the memory-mapped files have
+            ``"stored": True`` added, see ``store_result``.
+
+        See also
+        --------
+        uncertainpy.core.Parallel.run
+        uncertainpy.core.Parallel.store_result
+        """
+        index, model_parameters = node
+
+        return self.store_result(index, self.run(model_parameters))
+
+
+    def process_node(self, node):
+        """
+        Postprocess the result of a single model evaluation and calculate
+        features from it, for a single node of a vectorized model, and write
+        the results to the memory-mapped files in `memmap_files`.
+
+        Parameters
+        ----------
+        node : tuple
+            The index of the node and the result of the model evaluation, on
+            the form ``(index, model_result)``.
+
+        Returns
+        -------
+        result : dictionary
+            The model and feature results, see ``run``. The model/features
+            that have been written to the memory-mapped files have
+            ``"stored": True`` added, see ``store_result``.
+
+        See also
+        --------
+        uncertainpy.core.Parallel.process_model_result
+        uncertainpy.core.Parallel.store_result
+        """
+        index, model_result = node
+
+        return self.store_result(index, self.process_model_result(model_result))
+
+
+    def store_result(self, index, result):
+        """
+        Write the values of the model/features in `result` to row `index` of
+        the memory-mapped files in `memmap_files`, so only the remaining
+        results have to be sent back to the main process.
+
+        Parameters
+        ----------
+        index : int
+            The index of the node, which is the row the values are written to.
+        result : dict
+            The model and feature results, see ``run``.
+
+        Returns
+        -------
+        result : dict
+            The model and feature results. The model/features that have been
+            written to a file have their ``"values"`` replaced by None, and
+            ``"stored": True`` added. If the time values are equal to the
+            expected time values, the ``"time"`` is also replaced by None.
+
+        Notes
+        -----
+        Values that do not have the same shape as a row of the file, and
+        interpolated values, are not written, and are returned as usual.
+        The files are opened the first time they are written to in each
+        worker, and kept open until the results are written to other files.
+        """
+        filenames = [filename for filename, time in self.memmap_files.values()]
+
+        # Close the files from earlier runs
+        for filename in list(_memmaps.keys()):
+            if filename not in filenames:
+                _memmaps.pop(filename, None)
+
+        for feature in self.memmap_files:
+            if feature not in result or "interpolation" in result[feature]:
+                continue
+
+            filename, time = self.memmap_files[feature]
+
+            # Each file is only opened once in each worker
+            if filename not in _memmaps:
+                _memmaps[filename] = np.lib.format.open_memmap(filename, mode="r+")
+
+            evaluations = _memmaps[filename]
+            values = result[feature]["values"]
+
+            if np.shape(values) != evaluations.shape[1:]:
+                continue
+
+            try:
+                evaluations[index] = values
+            except (ValueError, TypeError):
+                continue
+
+            result[feature]["values"] = None
+            result[feature]["stored"] = True
+
+            if np.array_equal(result[feature]["time"], time):
+                result[feature]["time"] = None
+
+        return result
+
+
+    def close_memmaps(self):
+        """
+        Close the memory-mapped files in `memmap_files` that ``store_result``
+        has opened in this process.
+        """
+        for filename, time in self.memmap_files.values():
+            _memmaps.pop(filename, None)
+
+
+    def interpolation_2d(self, result, feature):
+        """
+        Create an interpolation for a 2D result, where each row of the
+        result is interpolated along the time axis.
+
+        Parameters
+        ----------
+        result : dict
+            The model and feature results. The model and each feature each has
+            a dictionary with the time values, ``"time"``,  and model/feature
+            results, ``"values"``.
+            An example:
+
+            .. code-block:: Python
+
+                result = {model.name: {"values": array([1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+                                       "time": array([0, 1, 2, 3, 4, 5, 6, 7, 8, 9])},
+                          "feature2d_adaptive": {"values": array([[0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
+                                                                  [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]]),
+                                                 "time": array([0, 1, 2, 3, 4, 5, 6, 7, 8, 9])}}
+
+        Returns
+        -------
+        interpolation : {scipy.interpolate.BSpline, None}
+            The result of the interpolation. Evaluating the interpolation at
+            `time` gives an array with one row for each row in the result.
+            If either the time or values contain None or numpy.nan, None is
+            returned.
+
+        Raises
+        ------
+        ValueError
+            If the values of the feature are not 2D.
+        ValueError
+            If the time of the feature is not 1D.
+
+        Notes
+        -----
+        The interpolation is performed for all rows at once using scipy:
+        ``make_interp_spline(time, values, k=3, axis=1)``, which for each row
+        gives the same interpolation as
+        ``InterpolatedUnivariateSpline(time, values[i], k=3)``.
+        """
+        logger = get_logger(self)
+
+        interpolation = None
+        if np.ndim(result[feature]["values"]) != 2:
+            raise ValueError("Cannot create 2D interpolation as the values of {} are not 2D".format(feature))
+
+        if np.ndim(result[feature]["time"]) != 1:
+            raise ValueError("Cannot create 2D interpolation as the time of {} is not 1D".format(feature))
+
+
+        if contains_nan(result[feature]["values"]):
+            msg = "{}: values contains np.nan or None values, unable to create 2D interpolation.".format(feature)
+            logger.warning(msg)
+
+        elif contains_nan(result[feature]["time"]):
+            msg =  "{}: time contains np.nan or None values, unable to create 2D interpolation.".format(feature)
+            logger.warning(msg)
+
+        else:
+            try:
+                interpolation = scpi.make_interp_spline(result[feature]["time"],
+                                                        result[feature]["values"],
+                                                        k=3,
+                                                        axis=1)
+            except Exception as error:
+                msg = "{}: unable to interpolate using scipy.interpolate.make_interp_spline(time, values, k=3, axis=1)".format(feature)
+                if not error.args:
+                    error.args = ("",)
+                error.args = error.args + (msg,)
+                raise
+
+        return interpolation
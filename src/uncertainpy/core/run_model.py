@@ -1,7 +1,16 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import os
+import copy
+import tempfile
+import threading
+import weakref
 import warnings
+import itertools
+import collections
 import six
+from six.moves import queue
+from timeit import default_timer as timer
 
 try:
     from itertools import imap
@@ -23,8 +32,55 @@ from ..utils.utility import lengths, contains_nan
 from ..utils.logger import get_logger
 from .base import ParameterBase
 from .parallel import Parallel
+from .evaluation_cache import EvaluationCache
+from .checkpoint import Checkpoint
+from .memmap_evaluations import MemmapEvaluations
 
 
+# Queue the worker processes report the model evaluations they start to
+_started = None
+
+
+def _initialize_worker(model, started=None):
+    """
+    Set up the model in a new worker process, and tear it down again when the
+    worker process exits.
+    """
+    from multiprocess.util import Finalize
+
+    global _started
+    _started = started
+
+    model.start_worker()
+    Finalize(None, model.stop_worker, exitpriority=10)
+
+
+def _shutdown_pool(pool, client=None):
+    """
+    Shut down a pool of worker processes, or an executor, and the dask client
+    it belongs to. Used to close the pool of a RunModel that is closed,
+    garbage collected, or still open when the interpreter exits.
+    """
+    if hasattr(pool, "shutdown"):
+        pool.shutdown(wait=True)
+    else:
+        pool.close()
+        pool.join()
+
+    if client is not None:
+        client.close()
+
+
+def _run_task(function, task, argument):
+    """
+    Apply `function` to `argument` in a worker process, after reporting to
+    the main process that `task` has started.
+    """
+    if _started is not None:
+        _started.put(task)
+
+    return function(argument)
+
 
 class RunModel(ParameterBase):
     """
@@ -62,7 +118,67 @@ class RunModel(ParameterBase):
         If "max", the maximum number of CPUs on the computer
         (multiprocess.cpu_count()) is used.
         Default is "max".
-
+    cache : {None, str, EvaluationCache}, optional
+        Cache of model evaluations that is consulted before the model is
+        evaluated. If None, no cache is used. If a string, the evaluations are
+        cached on disk in the folder with that name.
+        Default is None.
+    checkpoint : {None, str, Checkpoint}, optional
+        Checkpoint file the completed model evaluations are stored in while
+        the model is evaluated, and that completed evaluations are loaded from.
+        If None, no checkpoint is used. If a string, the checkpoint is stored
+        in a file with that name. Default is None.
+    memmap_folder : {None, str}, optional
+        Folder to store the regular model and feature evaluations in, as
+        memory-mapped numpy (``.npy``) files with shape
+        ``(nr_nodes, ...)``. If None, the evaluations are kept in memory.
+        Default is None.
+    interpolation_grid : {None, "pilot", array_like, dict}, optional
+        The common time grid the interpolated model/features are evaluated
+        on. If None, the time values of the evaluation with the greatest
+        number of time steps are used, found after all evaluations are
+        finished. If "pilot", the time values of the evaluation of the first
+        node are used. If array_like, the array is used as the time grid of
+        all interpolated model/features. If dict, the value is used as the
+        time grid of the model/feature with the name of the key.
+        Default is None.
+    worker_memmap : bool, optional
+        If True, and `memmap_folder` is given, the worker processes write the
+        regular model and feature evaluations directly to the memory-mapped
+        files, and only send the remaining results back. Not used together
+        with a cache or checkpoint, or with executors other than the default
+        pool and "threads", where the workers may run on other machines.
+        Default is False.
+    executor : {None, "threads", "mpi", "dask", concurrent.futures.Executor}, optional
+        The executor that evaluates the model and features in parallel. If
+        None, a pool of `CPUs` worker processes from multiprocess is used. If
+        "threads", a pool of `CPUs` threads is used, for models that release
+        the GIL. If "mpi", a ``mpi4py.futures.MPIPoolExecutor`` with `CPUs`
+        workers is used. If "dask", a local dask-distributed cluster with
+        `CPUs` worker processes is used. Any other object with a
+        ``map(function, iterable, chunksize=1)`` method, such as a
+        ``concurrent.futures.Executor``, is used as it is. Default is None.
+    timeout : {None, float}, optional
+        The maximum time in seconds a single model evaluation, with the
+        feature calculations, can take. Evaluations that take longer are
+        stopped, and the model and all features are set to numpy.nan for that
+        node. Only used with the pool of worker processes from multiprocess.
+        If None, there is no timeout. Default is None.
+    speculative : bool, optional
+        If True, model evaluations that take much longer than the previous
+        evaluations are started again on idle worker processes, and the
+        first result to finish is used. Only used with the pool of worker
+        processes from multiprocess. Default is False.
+    retries : int, optional
+        The number of times a model evaluation, with the postprocessing and
+        feature calculations, is tried again if it raises an exception.
+        Default is 0.
+    tolerant : bool, optional
+        If True, a model evaluation that still raises an exception after
+        `retries` new tries is stored as numpy.nan for the model and all
+        features, and a summary of the exception is stored in
+        ``data.failed``, instead of the exception being raised.
+        Default is False.
 
     Attributes
     ----------
@@ -72,8 +188,107 @@ class RunModel(ParameterBase):
         The uncertain parameters.
     features : uncertainpy.Features or subclass of uncertainpy.Features
         The features of the model to perform uncertainty quantification on.
-    CPUs : int
+    CPUs : {int, None}
         The number of CPUs used when calculating the model and features.
+    pool : {multiprocess.Pool, concurrent.futures.Executor, None}
+        The pool of worker processes, or the executor, used to calculate the
+        model and features.
+    executor : {None, "threads", "mpi", "dask", concurrent.futures.Executor}
+        The executor that evaluates the model and features in parallel.
+    cache : {None, EvaluationCache}
+        Cache of model evaluations.
+    checkpoint : {None, Checkpoint}
+        Checkpoint file for the completed model evaluations.
+    memmap_folder : {None, str}
+        Folder to store the regular model and feature evaluations in, as
+        memory-mapped numpy files.
+    interpolation_grid : {None, "pilot", array_like, dict}
+        The common time grid the interpolated model/features are evaluated
+        on.
+    worker_memmap : bool
+        If the worker processes write the evaluations directly to the
+        memory-mapped files.
+    timeout : {None, float}
+        The maximum time in seconds a single model evaluation can take.
+    speculative : bool
+        If slow model evaluations are started again on idle worker processes.
+    retries : int
+        The number of times a failed model evaluation is tried again.
+    tolerant : bool
+        If failed model evaluations are stored as numpy.nan instead of
+        raising the exception.
+
+    Notes
+    -----
+    The pool of worker processes is created the first time the model is
+    evaluated in parallel, and is reused for every later evaluation, for
+    example across several uncertainty quantifications. The pool is closed
+    when the number of CPUs is changed, or when ``close`` is called.
+
+    With "threads", each thread evaluates a copy of the model and features,
+    since they can store state between the model evaluation and the feature
+    calculations. The threads only run in parallel while the model releases
+    the GIL, for example in compiled code, NumPy or a simulator run as a
+    subprocess, but no worker processes are started, and modules are only
+    imported once.
+
+    An executor given as an object is never shut down by ``RunModel``. It
+    must be able to pickle the model and features. The executors from
+    ``concurrent.futures`` and mpi4py use the standard pickle module, which
+    does not support for example lambda functions, while the multiprocess
+    pool and dask use dill and cloudpickle. With an executor, `CPUs` should
+    be the number of workers of the executor, which is used to choose the
+    chunksize. If `CPUs` is None, the model evaluations are sent to the
+    executor one at the time.
+
+    The model evaluations are sent to the workers in chunks. The size of the
+    chunks is chosen from the measured runtime of the previous model
+    evaluations, so that cheap models are sent in large chunks while
+    expensive models are sent one at the time.
+
+    If `memmap_folder` is given, each evaluation of the models and features
+    that are not interpolated, or are evaluated on a common time grid, is
+    written to a preallocated memory-mapped file
+    as soon as it is finished, and ``data["model/feature"].evaluations`` is a
+    ``numpy.memmap`` of the file. This allows the evaluations to be larger
+    than the available memory. Each call to ``run`` stores the evaluations
+    in a new subfolder of `memmap_folder`, which is not deleted.
+
+    With `worker_memmap`, the first node is evaluated before the rest to
+    allocate the memory-mapped files, and the worker processes then write
+    each evaluation with the same shape directly to its row in the files.
+    This avoids sending the evaluations between the processes, which for
+    large evaluations can take longer than the model evaluation itself.
+    Since the cache and checkpoint store the complete results, the
+    evaluations are sent back as usual when either is used.
+
+    If `interpolation_grid` is given, the irregular results of the
+    interpolated model/features are evaluated on the common time grid by the
+    workers, so only the resampled arrays are sent back. Otherwise, the
+    interpolations themselves are sent back and evaluated after all model
+    evaluations are finished. With "pilot", the first node is evaluated
+    before the rest to find the time grid.
+    Evaluations in the cache or checkpoint that were resampled on another
+    time grid are evaluated again.
+
+    With a `timeout` or `speculative`, the model evaluations are sent to the
+    worker processes one at the time, and never more evaluations than there
+    are worker processes, so the time each evaluation has been running is
+    known. An evaluation that exceeds the timeout is stopped by restarting
+    the pool of worker processes, and the other unfinished evaluations are
+    started again in the new pool. With `speculative`, an evaluation that
+    has been running for more than twice the median time of the finished
+    evaluations is also started on a worker process that would otherwise be
+    idle, which is only the case at the end of the evaluations. The
+    evaluations are assumed to be deterministic, so it does not matter
+    which copy finishes first. The worker processes stopped this way do not
+    call ``Model.teardown_worker``.
+
+    The model evaluations are retried in the worker processes. Failed
+    evaluations in `tolerant` mode and evaluations that exceed the timeout
+    are listed in ``data.failed``, and are not stored in the cache, so they
+    are evaluated again the next time. They are stored in the checkpoint,
+    but are also evaluated again when a run is resumed from the checkpoint.
 
     See Also
     --------
@@ -82,24 +297,53 @@ class RunModel(ParameterBase):
     uncertainpy.Parameters
     uncertainpy.models.Model
     uncertainpy.models.Model.run : Requirements for the model run function.
+    uncertainpy.core.EvaluationCache
+    uncertainpy.core.Checkpoint
+    uncertainpy.core.MemmapEvaluations
     """
+    # Minimum time (in seconds) a chunk of model evaluations should take,
+    # used to choose the chunksize when evaluating in parallel.
+    _chunk_time = 0.2
+
+    # Number of times longer than the median evaluation time an evaluation
+    # must run before it is started again with speculative evaluations
+    _speculative_factor = 2
+
+    # Time (in seconds) between each check of the running evaluations when
+    # there is a timeout or speculative evaluations
+    _poll_time = 0.01
 
     def __init__(self,
                  model,
                  parameters,
                  features=None,
                  logger_level="info",
-                 CPUs="max"):
-
-        if CPUs == "max":
-            import multiprocess
-
-            CPUs = multiprocess.cpu_count()
-
+                 CPUs="max",
+                 cache=None,
+                 checkpoint=None,
+                 memmap_folder=None,
+                 interpolation_grid=None,
+                 worker_memmap=False,
+                 executor=None,
+                 timeout=None,
+                 speculative=False,
+                 retries=0,
+                 tolerant=False):
+
+        self._pool = None
+        self._client = None
+        self._started = None
+        self._finalizer = None
+        self._CPUs = None
+        self._executor = None
+        self._evaluation_time = None
+        self._identity = None
 
         self._parallel = Parallel(model=model,
                                   features=features,
-                                  logger_level=logger_level)
+                                  logger_level=logger_level,
+                                  retries=retries,
+                                  tolerant=tolerant)
 
         super(RunModel, self).__init__(model=model,
                                        parameters=parameters,
@@ -107,6 +351,14 @@ class RunModel(ParameterBase):
                                        logger_level=logger_level)
 
         self.CPUs = CPUs
+        self.executor = executor
+        self.cache = cache
+        self.checkpoint = checkpoint
+        self.memmap_folder = memmap_folder
+        self.interpolation_grid = interpolation_grid
+        self.worker_memmap = worker_memmap
+        self.timeout = timeout
+        self.speculative = speculative
 
 
     @ParameterBase.features.setter
@@ -114,13 +366,724 @@ class RunModel(ParameterBase):
         ParameterBase.features.fset(self, new_features)
 
         self._parallel.features = self.features
+        self._evaluation_time = None
+        self._identity = None
 
 
     @ParameterBase.model.setter
     def model(self, new_model):
+        # The worker processes are started with the old model
+        self.close()
+
         ParameterBase.model.fset(self, new_model)
 
-        self._parallel.model = self.model
+        self._parallel.model = self.model
+        self._evaluation_time = None
+        self._identity = None
+
+
+    @property
+    def CPUs(self):
+        """
+        The number of CPUs to use when calculating the model and features.
+
+        Parameters
+        ----------
+        new_CPUs : {int, None, "max"}
+            The number of CPUs to use when calculating the model and features.
+            If None, no multiprocessing is used.
+            If "max", the maximum number of CPUs on the computer
+            (multiprocess.cpu_count()) is used.
+
+        Returns
+        -------
+        CPUs : {int, None}
+            The number of CPUs to use when calculating the model and features.
+
+        Notes
+        -----
+        Changing the number of CPUs, the executor or the model closes the
+        current pool of worker processes.
+        """
+        return self._CPUs
+
+
+    @CPUs.setter
+    def CPUs(self, new_CPUs):
+        if new_CPUs == "max":
+            import multiprocess
+
+            new_CPUs = multiprocess.cpu_count()
+
+        if new_CPUs != self._CPUs:
+            self.close()
+
+        self._CPUs = new_CPUs
+
+
+    @property
+    def cache(self):
+        """
+        Cache of model evaluations, consulted before the model is evaluated.
+
+        Parameters
+        ----------
+        new_cache : {None, str, EvaluationCache}
+            If None, no cache is used. If a string, the evaluations are cached
+            on disk in the folder with that name.
+
+        Returns
+        -------
+        cache : {None, EvaluationCache}
+            The cache of model evaluations.
+        """
+        return self._cache
+
+
+    @cache.setter
+    def cache(self, new_cache):
+        if isinstance(new_cache, six.string_types):
+            new_cache = EvaluationCache(folder=new_cache)
+
+        self._cache = new_cache
+        self._identity = None
+
+
+    @property
+    def executor(self):
+        """
+        The executor that evaluates the model and features in parallel.
+
+        Parameters
+        ----------
+        new_executor : {None, "threads", "mpi", "dask", concurrent.futures.Executor}
+            If None, a pool of `CPUs` worker processes from multiprocess is
+            used. If "threads", a pool of `CPUs` threads is used. If "mpi", a
+            ``mpi4py.futures.MPIPoolExecutor`` with `CPUs` workers is used. If
+            "dask", a local dask-distributed cluster with `CPUs` worker
+            processes is used. Any other object with a ``map`` method, such as
+            a ``concurrent.futures.Executor``, is used as it is.
+
+        Returns
+        -------
+        executor : {None, "threads", "mpi", "dask", concurrent.futures.Executor}
+            The executor that evaluates the model and features in parallel.
+
+        Raises
+        ------
+        ValueError
+            If the executor is an unsupported string, or an object without a
+            ``map`` method.
+
+        Notes
+        -----
+        Changing the executor closes the current pool of worker processes.
+        """
+        return self._executor
+
+
+    @executor.setter
+    def executor(self, new_executor):
+        if isinstance(new_executor, six.string_types):
+            if new_executor not in ["threads", "mpi", "dask"]:
+                raise ValueError("executor {} not supported. ".format(new_executor) +
+                                 "Supported executors are: None, threads, mpi, dask, " +
+                                 "or an object with a map method")
+
+        elif new_executor is not None and not hasattr(new_executor, "map"):
+            raise ValueError("executor must have a map method")
+
+        if new_executor is not self._executor:
+            self.close()
+
+        self._executor = new_executor
+
+
+    @property
+    def checkpoint(self):
+        """
+        Checkpoint file the completed model evaluations are stored in while
+        the model is evaluated, and that completed evaluations are loaded
+        from before the model is evaluated.
+
+        Parameters
+        ----------
+        new_checkpoint : {None, str, Checkpoint}
+            If None, no checkpoint is used. If a string, the checkpoint is
+            stored in a file with that name.
+
+        Returns
+        -------
+        checkpoint : {None, Checkpoint}
+            The checkpoint file.
+        """
+        return self._checkpoint
+
+
+    @checkpoint.setter
+    def checkpoint(self, new_checkpoint):
+        if isinstance(new_checkpoint, six.string_types):
+            new_checkpoint = Checkpoint(filename=new_checkpoint)
+
+        self._checkpoint = new_checkpoint
+
+
+    @property
+    def retries(self):
+        """
+        The number of times a model evaluation, with the postprocessing and
+        feature calculations, is tried again if it raises an exception.
+
+        Parameters
+        ----------
+        new_retries : int
+            The number of new tries.
+
+        Returns
+        -------
+        retries : int
+            The number of new tries.
+
+        Raises
+        ------
+        ValueError
+            If `new_retries` is negative.
+        """
+        return self._parallel.retries
+
+
+    @retries.setter
+    def retries(self, new_retries):
+        if new_retries < 0:
+            raise ValueError("retries must be 0 or larger")
+
+        self._parallel.retries = int(new_retries)
+
+
+    @property
+    def tolerant(self):
+        """
+        If a model evaluation that fails after all tries is stored as
+        numpy.nan for the model and all features, instead of raising the
+        exception.
+
+        Parameters
+        ----------
+        new_tolerant : bool
+            If failed model evaluations are tolerated.
+
+        Returns
+        -------
+        tolerant : bool
+            If failed model evaluations are tolerated.
+        """
+        return self._parallel.tolerant
+
+
+    @tolerant.setter
+    def tolerant(self, new_tolerant):
+        self._parallel.tolerant = new_tolerant
+
+
+    @property
+    def interpolation_grid(self):
+        """
+        The common time grid the interpolated model/features are evaluated
+        on.
+
+        Parameters
+        ----------
+        new_interpolation_grid : {None, "pilot", array_like, dict}
+            If None, the time values of the evaluation with the greatest
+            number of time steps are used. If "pilot", the time values of the
+            evaluation of the first node are used. If array_like, the array
+            is used as the time grid of all interpolated model/features. If
+            dict, the value is used as the time grid of the model/feature with
+            the name of the key.
+
+        Returns
+        -------
+        interpolation_grid : {None, "pilot", array, dict}
+            The common time grid.
+
+        Raises
+        ------
+        ValueError
+            If the time grid is a string other than "pilot", or is not 1D.
+        """
+        return self._interpolation_grid
+
+
+    @interpolation_grid.setter
+    def interpolation_grid(self, new_interpolation_grid):
+        if isinstance(new_interpolation_grid, six.string_types):
+            if new_interpolation_grid != "pilot":
+                raise ValueError("interpolation_grid {} not supported. ".format(new_interpolation_grid) +
+                                 "Use None, \"pilot\", an array or a dictionary of arrays")
+
+        elif isinstance(new_interpolation_grid, dict):
+            new_interpolation_grid = dict(new_interpolation_grid)
+
+            for feature in new_interpolation_grid:
+                new_interpolation_grid[feature] = np.asarray(new_interpolation_grid[feature], dtype=float)
+
+                if new_interpolation_grid[feature].ndim != 1:
+                    raise ValueError("The interpolation_grid of {} must be 1D".format(feature))
+
+        elif new_interpolation_grid is not None:
+            new_interpolation_grid = np.asarray(new_interpolation_grid, dtype=float)
+
+            if new_interpolation_grid.ndim != 1:
+                raise ValueError("interpolation_grid must be 1D")
+
+        self._interpolation_grid = new_interpolation_grid
+
+
+    @property
+    def pool(self):
+        """
+        The pool of worker processes, or the executor, used to calculate the
+        model and features.
+
+        The pool is created the first time it is requested and then reused,
+        so the worker processes are only started once.
+        ``Model.setup_worker`` is called once in each worker when the pool
+        starts, and ``Model.teardown_worker`` when the worker exits.
+
+        Returns
+        -------
+        pool : {multiprocess.Pool, concurrent.futures.Executor, None}
+            The pool of worker processes, or the executor. None if no
+            multiprocessing is used.
+
+        Raises
+        ------
+        ImportError
+            If the executor is "threads" and futures is not installed
+            (Python 2).
+        ImportError
+            If the executor is "mpi" and mpi4py is not installed.
+        ImportError
+            If the executor is "dask" and distributed is not installed.
+        """
+        if self.executor is not None and not isinstance(self.executor, six.string_types):
+            return self.executor
+
+        if self._pool is None and self.CPUs:
+            if self.executor == "threads":
+                try:
+                    from concurrent.futures import ThreadPoolExecutor
+                except ImportError:
+                    raise ImportError("The threads executor requires: futures")
+
+                self._pool = ThreadPoolExecutor(max_workers=self.CPUs,
+                                                initializer=self.model.start_worker)
+
+            elif self.executor == "mpi":
+                try:
+                    from mpi4py.futures import MPIPoolExecutor
+                except ImportError:
+                    raise ImportError("The mpi executor requires: mpi4py")
+
+                self._pool = MPIPoolExecutor(max_workers=self.CPUs,
+                                             initializer=_initialize_worker,
+                                             initargs=(self.model,))
+
+            elif self.executor == "dask":
+                try:
+                    from distributed import Client
+                except ImportError:
+                    raise ImportError("The dask executor requires: distributed")
+
+                self._client = Client(n_workers=self.CPUs, threads_per_worker=1)
+                self._pool = self._client.get_executor()
+
+            else:
+                import multiprocess as mp
+
+                self._started = mp.Queue()
+                self._pool = mp.Pool(processes=self.CPUs,
+                                     initializer=_initialize_worker,
+                                     initargs=(self.model, self._started))
+
+            # Make sure the pool is shut down if it is never closed
+            self._finalizer = weakref.finalize(self, _shutdown_pool, self._pool, self._client)
+
+        return self._pool
+
+
+    def close(self):
+        """
+        Close the pool of worker processes, if it exists.
+
+        A new pool is created the next time the model is evaluated in parallel.
+        An executor given as an object is not shut down.
+        A pool that is not closed is shut down when the RunModel is garbage
+        collected, or at the latest when the interpreter exits.
+        The setups of the model in this process, from serial runs or the
+        "threads" executor, are torn down with ``Model.teardown_worker``.
+        """
+        if self._finalizer is not None:
+            self._finalizer()
+
+            self._finalizer = None
+
+        self._pool = None
+        self._client = None
+        self._started = None
+
+        if self.model is not None:
+            self.model.stop_worker()
+
+
+    def terminate(self):
+        """
+        Stop the pool of worker processes immediately, without waiting for
+        the running model evaluations to finish.
+
+        A new pool is created the next time the model is evaluated in
+        parallel. ``Model.teardown_worker`` is not called in the stopped
+        worker processes. An executor is closed as in ``close``.
+        """
+        if self._pool is not None and hasattr(self._pool, "terminate"):
+            self._finalizer.detach()
+            self._finalizer = None
+
+            self._pool.terminate()
+            self._pool.join()
+
+            self._pool = None
+            self._started = None
+
+        self.close()
+
+
+    def chunksize(self, nr_evaluations):
+        """
+        Find the number of model evaluations to send to a worker at the time.
+
+        Parameters
+        ----------
+        nr_evaluations : int
+            The total number of model evaluations to perform.
+
+        Returns
+        -------
+        chunksize : int
+            The number of model evaluations to send to a worker at the time.
+
+        Notes
+        -----
+        The chunksize is chosen so each chunk takes at least 0.2 seconds,
+        based on the runtime measured in the previous evaluations, while every
+        worker still gets at least four chunks to balance the load.
+        If no runtime has been measured yet, the chunksize is 1.
+        """
+        if not self.CPUs or self._evaluation_time is None:
+            return 1
+
+        if self._evaluation_time > 0:
+            chunksize = int(np.ceil(self._chunk_time/self._evaluation_time))
+        else:
+            chunksize = nr_evaluations
+
+        max_chunksize = int(np.ceil(nr_evaluations/(4.*self.CPUs)))
+
+        return max(1, min(chunksize, max_chunksize))
+
+
+    def _imap(self, function, arguments):
+        """
+        Apply `function` to each element in `arguments`, in parallel if
+        there is a pool of worker processes or an executor, and yield the
+        results in order.
+
+        If the runtime of a model evaluation is unknown, a first batch with
+        one evaluation per worker is used to measure it.
+        """
+        logger = get_logger(self)
+
+        pool = self.pool
+
+        scheduled = self.timeout is not None or self.speculative
+        if scheduled and (pool is None or self.executor is not None):
+            logger.warning("timeout and speculative are only used with the pool "
+                           "of worker processes from multiprocess")
+
+        if pool is None:
+            for result in imap(function, arguments):
+                yield result
+
+            return
+
+        if scheduled and self.executor is None:
+            for result in self._imap_scheduled(function, arguments):
+                yield result
+
+            return
+
+        if self.executor == "threads":
+            function = self._thread_local(function)
+
+        nr_pilot = 0
+        if self._evaluation_time is None and self.CPUs:
+            nr_pilot = min(self.CPUs, len(arguments))
+
+        for start, end in [(0, nr_pilot), (nr_pilot, len(arguments))]:
+            nr_evaluations = end - start
+            if nr_evaluations == 0:
+                continue
+
+            chunksize = self.chunksize(nr_evaluations)
+
+            start_time = timer()
+            if self.executor is None:
+                evaluated = pool.imap(function, arguments[start:end], chunksize)
+            else:
+                evaluated = pool.map(function, arguments[start:end], chunksize=chunksize)
+
+            for result in evaluated:
+                yield result
+
+            if self.CPUs:
+                elapsed_time = timer() - start_time
+                self._evaluation_time = elapsed_time*min(self.CPUs, nr_evaluations)/nr_evaluations
+
+
+    def _imap_scheduled(self, function, arguments):
+        """
+        Apply `function` to each element in `arguments` in the pool of worker
+        processes, one element at the time, and yield the results in order.
+
+        Evaluations that run for longer than `timeout` give a result where
+        the model and all features are numpy.nan, see
+        ``Parallel.nan_result``, and the pool is restarted to stop them.
+        With `speculative`, slow evaluations are also started on idle
+        worker processes.
+        """
+        logger = get_logger(self)
+
+        tasks = itertools.count()
+        waiting = collections.deque(range(len(arguments)))
+
+        # Task: [index of the argument, AsyncResult, start time]
+        running = {}
+        results = {}
+        runtimes = []
+        nr_timed_out = 0
+        next_index = 0
+
+        def start(index):
+            task = next(tasks)
+            result = self.pool.apply_async(_run_task, (function, task, arguments[index]))
+            running[task] = [index, result, None]
+
+        while next_index < len(arguments):
+            while waiting and len(running) < self.CPUs:
+                start(waiting.popleft())
+
+            if self.speculative and not waiting and runtimes:
+                threshold = self._speculative_factor*np.median(runtimes)
+                now = timer()
+
+                for task in sorted(running, key=lambda task: running[task][2] or now):
+                    if len(running) >= self.CPUs:
+                        break
+
+                    index, result, start_time = running[task]
+                    copies = [other for other in running if running[other][0] == index]
+
+                    if start_time is not None and len(copies) == 1 \
+                            and now - start_time > threshold:
+                        start(index)
+
+            first = min(running, key=lambda task: running[task][0])
+            running[first][1].wait(self._poll_time)
+
+            while True:
+                try:
+                    task = self._started.get_nowait()
+                except queue.Empty:
+                    break
+
+                if task in running:
+                    running[task][2] = timer()
+
+            now = timer()
+            timed_out = []
+            for task in list(running):
+                index, result, start_time = running[task]
+
+                if result.ready():
+                    del running[task]
+
+                    if index not in results:
+                        results[index] = result.get()
+
+                        if start_time is not None:
+                            runtimes.append(now - start_time)
+
+                elif self.timeout is not None and start_time is not None \
+                        and now - start_time > self.timeout:
+                    timed_out.append(task)
+
+            if timed_out:
+                for task in timed_out:
+                    index = running.pop(task)[0]
+                    copies = [other for other in running if running[other][0] == index
+                                                             and other not in timed_out]
+
+                    if index not in results and not copies:
+                        failed = "TimeoutError: The model evaluation did not finish " \
+                                 "within {} seconds".format(self.timeout)
+
+                        results[index] = self._parallel.nan_result(failed=failed)
+                        nr_timed_out += 1
+
+                # Stopping the pool also stops the other running evaluations,
+                # which are started again in the new pool
+                unfinished = set([running[task][0] for task in running]) - set(results)
+                waiting.extendleft(sorted(unfinished, reverse=True))
+                running.clear()
+
+                self.terminate()
+
+            # Finish up before the last results are yielded, since the
+            # generator is not necessarily resumed after the last result
+            if next_index + len(results) == len(arguments):
+                # Stop the speculative copies that are still running
+                if running:
+                    self.terminate()
+
+                if nr_timed_out:
+                    logger.warning("{} model evaluations did not finish within the timeout of {} seconds. "
+                                   "The model and all features are set to numpy.nan for these "
+                                   "evaluations.".format(nr_timed_out, self.timeout))
+
+            while next_index in results:
+                yield results.pop(next_index)
+                next_index += 1
+
+
+    def _thread_local(self, function):
+        """
+        Wrap the method `function` of Parallel, so each thread calls the
+        method of its own copy of Parallel.
+
+        The model and features can store state between the model evaluation
+        and the feature calculations, for example the spikes found in
+        ``SpikingFeatures.preprocess``, so they can not be shared between
+        threads.
+        """
+        parallel = function.__self__
+        name = function.__name__
+        local = threading.local()
+
+        def thread_function(argument):
+            if not hasattr(local, "parallel"):
+                local.parallel = copy.deepcopy(parallel)
+
+            return getattr(local.parallel, name)(argument)
+
+        return thread_function
+
+
+    def interpolated_features(self):
+        """
+        The names of the model/features that are interpolated.
+
+        Returns
+        -------
+        interpolated : list
+            The names of the model/features that are interpolated.
+        """
+        interpolated = list(self.features.interpolate)
+
+        if self.model.interpolate and not self.model.ignore:
+            interpolated.append(self.model.name)
+
+        return interpolated
+
+
+    def create_interpolation_grid(self, result=None):
+        """
+        Create the common time grid of each interpolated model/feature from
+        ``interpolation_grid``.
+
+        Parameters
+        ----------
+        result : {None, dict}, optional
+            The result of the evaluation of the first node, used to create
+            the time grid if ``interpolation_grid`` is "pilot".
+            Default is None.
+
+        Returns
+        -------
+        grid : dict
+            The time grid of each model/feature that has a common time grid,
+            with the name of the model/feature as key. Empty if
+            ``interpolation_grid`` is None.
+        """
+        logger = get_logger(self)
+
+        if self.interpolation_grid is None:
+            return {}
+
+        if isinstance(self.interpolation_grid, dict):
+            return dict(self.interpolation_grid)
+
+        grid = {}
+        for feature in self.interpolated_features():
+            if isinstance(self.interpolation_grid, six.string_types):
+                if result is None or feature not in result or np.ndim(result[feature]["values"]) not in [1, 2]:
+                    continue
+
+                time = result[feature]["time"]
+
+                if np.ndim(time) != 1 or contains_nan(time):
+                    logger.warning("{}: the pilot evaluation has no valid time values, ".format(feature) +
+                                   "unable to use it as the interpolation grid.")
+                    continue
+
+                grid[feature] = np.asarray(time, dtype=float)
+
+            else:
+                grid[feature] = self.interpolation_grid
+
+        return grid
+
+
+    def matches_interpolation_grid(self, result, grid):
+        """
+        Check if a result found in the cache or checkpoint can be used with
+        the common time grid.
+
+        Parameters
+        ----------
+        result : dict
+            The model and feature results of a single model evaluation.
+        grid : dict
+            The time grid of each model/feature that has a common time grid,
+            as created by ``create_interpolation_grid``.
+
+        Returns
+        -------
+        bool
+            False if an interpolated model/feature in `result` has
+            been evaluated on another time grid, True otherwise.
+        """
+        for feature in self.interpolated_features():
+            if feature not in result or "interpolation" in result[feature]:
+                continue
+
+            if feature in grid:
+                if not np.array_equal(result[feature]["time"], grid[feature]):
+                    return False
+
+            elif np.ndim(result[feature]["values"]) in [1, 2]:
+                return False
+
+        return True
 
 
     def apply_interpolation(self, results, feature):
@@ -174,18 +1137,27 @@ class RunModel(ParameterBase):
         """
         logger = get_logger(self)
 
+        # Failed evaluations have no time values
         time_lengths = []
         for result in results:
-            time_lengths.append(len(result[feature]["time"]))
+            if self.failed(result):
+                time_lengths.append(0)
+            else:
+                time_lengths.append(len(result[feature]["time"]))
 
         index_max_len = np.argmax(time_lengths)
         time = results[index_max_len][feature]["time"]
 
         interpolated_results = []
-        for result in results:
+        failed = []
+        for i, result in enumerate(results):
             interpolation = result[feature]["interpolation"]
 
-            if interpolation is None:
+            if self.failed(result):
+                interpolated_results.append(np.nan)
+                failed.append(i)
+
+            elif interpolation is None:
                 interpolated_results.append(np.nan)
                 logger.error("{}: Unknown error while creating the interpolation".format(feature))
 
@@ -196,13 +1168,18 @@ class RunModel(ParameterBase):
             else:
                 interpolated_results.append(interpolation(time))
 
-        return time, interpolated_results
-
+        # Failed evaluations get numpy.nan with the same shape as the
+        # successful evaluations, so the evaluations stay regular
+        if failed and len(failed) < len(results):
+            shape = np.shape(interpolated_results[self.first_successful(results)])
 
+            for i in failed:
+                interpolated_results[i] = np.full(shape, np.nan)
 
+        return time, interpolated_results
 
 
-    def results_to_data(self, results):
+    def results_to_data(self, results, evaluations=None):
         """
         Store `results` in a Data object.
 
@@ -236,6 +1213,12 @@ class RunModel(ParameterBase):
 
                 results = [result 1, result 2, ..., result N]
 
+        evaluations : {None, dict}, optional
+            A dictionary with the already stored evaluations of the model
+            and features, with the name of the model/feature as key.
+            These are used instead of the ``values`` in `results`.
+            Default is None.
+
         Returns
         -------
         data : Data object
@@ -249,6 +1232,7 @@ class RunModel(ParameterBase):
         2. ``data["model/features"].time``
         3. ``data["model/features"].labels``
         4. ``data.model_name``
+        5. ``data.failed``
 
         See Also
         --------
@@ -270,12 +1254,33 @@ class RunModel(ParameterBase):
         data.model_name = self.model.name
         data.model_ignore = self.model.ignore
 
+        for i, result in enumerate(results):
+            if self.failed(result):
+                data.failed.append("Node {}: {}".format(i, result[self.model.name]["failed"]))
+
+        # The shape and time of the results are found from a model evaluation
+        # that did not fail
+        reference = results[self.first_successful(results)]
+
+        if data.failed:
+            logger.warning("{} of {} model evaluations failed, and the model and all features "
+                           "are set to numpy.nan for these evaluations. "
+                           "See data.failed.".format(len(data.failed), len(results)))
+
+        def values(result, feature):
+            # Failed evaluations get numpy.nan with the same shape as the
+            # successful evaluations, so the evaluations stay regular
+            if self.failed(result):
+                return np.full(np.shape(reference[feature]["values"]), np.nan)
+
+            return result[feature]["values"]
+
         def add_results(results, data, feature):
             data[feature].time = []
             data[feature].evaluations = []
 
             for result in results:
-                data[feature].evaluations.append(result[feature]["values"])
+                data[feature].evaluations.append(values(result, feature))
                 data[feature].time.append(result[feature]["time"])
 
         # results = self.regularize_nan_results(results)
@@ -301,33 +1306,42 @@ class RunModel(ParameterBase):
         # Store all results in data, interpolate as needed
         # TODO: save raw result instead of interpolated result?
         for feature in data:
+            if evaluations is not None and feature in evaluations:
+                data[feature].time = reference[feature]["time"]
+                data[feature].evaluations = evaluations[feature]
+
             # Interpolate the data if it is irregular, and ignore the model if required
-            if feature in self.features.interpolate or \
+            elif feature in self.features.interpolate or \
                     (feature == self.model.name and self.model.interpolate and not self.model.ignore):
-                # TODO implement interpolation of >= 2d data, part2
-                if np.ndim(results[0][feature]["values"]) >= 2:
+                # TODO implement interpolation of >= 3d data, part2
+                if np.ndim(reference[feature]["values"]) >= 3:
                     # raise NotImplementedError("Feature: {feature},".format(feature=feature)
-                    #                           + " no support for >= 2D interpolation")
+                    #                           + " no support for >= 3D interpolation")
                     logger.error("{feature}:".format(feature=feature)
-                                 + " no support for >= 2D interpolation implemented")
+                                 + " no support for >= 3D interpolation implemented")
 
                     add_results(results, data, feature)
 
 
-                elif np.ndim(results[0][feature]["values"]) == 1:
-                    data[feature].time, data[feature].evaluations = self.apply_interpolation(results, feature)
+                elif np.ndim(reference[feature]["values"]) in [1, 2]:
+                    if "interpolation" in reference[feature]:
+                        data[feature].time, data[feature].evaluations = self.apply_interpolation(results, feature)
+                    else:
+                        # Already evaluated on the common time grid
+                        add_results(results, data, feature)
+                        data[feature].time = reference[feature]["time"]
 
                 # Interpolating a 0D result makes no sense, so if a 0D feature
                 # is supposed to be interpolated store it as normal
-                elif np.ndim(results[0][feature]["values"]) == 0:
+                elif np.ndim(reference[feature]["values"]) == 0:
                     logger.warning("{feature}: ".format(feature=feature) +
                                    "returns a 0D result. No interpolation is performed.")
 
-                    data[feature].time = results[0][feature]["time"]
+                    data[feature].time = reference[feature]["time"]
 
                     data[feature].evaluations = []
                     for result in results:
-                        data[feature].evaluations.append(result[feature]["values"])
+                        data[feature].evaluations.append(values(result, feature))
 
 
             elif feature == self.model.name and self.model.ignore:
@@ -358,17 +1372,15 @@ class RunModel(ParameterBase):
 
                 else:
                     # Store data from results in a Data object
-                    data[feature].time = results[0][feature]["time"]
+                    data[feature].time = reference[feature]["time"]
 
                     data[feature].evaluations = []
                     for result in results:
-                        data[feature].evaluations.append(result[feature]["values"])
+                        data[feature].evaluations.append(values(result, feature))
 
         return data
 
 
-
-
     def evaluate_nodes(self, nodes, uncertain_parameters):
         """
         Evaluate the the model and calculate the features
@@ -412,48 +1424,384 @@ class RunModel(ParameterBase):
         ------
         ImportError
             If xvfbwrapper is not installed.
+
+        Notes
+        -----
+        Evaluations found in the checkpoint or the cache are not evaluated again.
+        If the model is vectorized, the model is evaluated for all nodes in
+        a single call, and only the postprocessing and feature calculations
+        are performed for each node. The `retries` and `tolerant` then apply to
+        the batch as a whole, so if the call fails all nodes in the batch
+        fail.
+        """
+        return list(self.imap_nodes(nodes, uncertain_parameters))
+
+
+    def failed(self, result):
+        """
+        Check if a result is from a model evaluation that failed or did not
+        finish, see ``Parallel.nan_result``.
+
+        Parameters
+        ----------
+        result : dict
+            The model and feature results, see ``evaluate_nodes``.
+
+        Returns
+        -------
+        failed : bool
+            True if the model evaluation failed.
+        """
+        return "failed" in result.get(self.model.name, {})
+
+
+    def first_successful(self, results):
+        """
+        Find the first result from a model evaluation that did not fail.
+
+        Parameters
+        ----------
+        results : {list, dict}
+            The model and feature results, see ``evaluate_nodes``, either as
+            a list or as a dictionary with the index of the node as key.
+
+        Returns
+        -------
+        index : {int, None}
+            The index (or key) of the first result that did not fail. If all
+            results failed, the first index. None if there are no results.
+        """
+        if isinstance(results, dict):
+            indices = sorted(results)
+        else:
+            indices = range(len(results))
+
+        for i in indices:
+            if not self.failed(results[i]):
+                return i
+
+        if len(indices) == 0:
+            return None
+
+        return indices[0]
+
+
+    def imap_nodes(self, nodes, uncertain_parameters, setup=None):
+        """
+        Evaluate the the model and calculate the features
+        for the nodes (values) for the uncertain parameters, and yield the
+        result for each node as soon as it is available.
+
+        Lets the results be processed while the model is evaluated, without
+        keeping all results in memory.
+
+        Parameters
+        ----------
+        nodes : array
+            The values for the uncertain parameters
+            to evaluate the model and features for.
+        uncertain_parameters : list
+            A list of the names of all uncertain parameters.
+        setup : {None, callable}, optional
+            Function that is called with the result of the first node that
+            did not fail before the remaining nodes are evaluated. If given,
+            the nodes are evaluated one at the time until one does not fail.
+            Default is None.
+
+        Yields
+        ------
+        result : dict
+            The result dictionary for each set of model evaluations, in the
+            same order as the nodes. See ``evaluate_nodes`` for the format.
+
+        Raises
+        ------
+        ImportError
+            If xvfbwrapper is not installed.
+
+        See Also
+        --------
+        uncertainpy.core.RunModel.evaluate_nodes
         """
+        logger = get_logger(self)
+
+        nr_nodes = len(nodes.T)
+        model_parameters = self.create_model_parameters(nodes, uncertain_parameters)
+
+        found = {}
+        keys = None
+
+        if self.checkpoint is not None:
+            found = self.checkpoint.load(nodes, uncertain_parameters)
+
+            for result in found.values():
+                self.restore_interpolations(result)
+
+            logger.info("Found {} of {} model evaluations in the checkpoint".format(
+                len(found), nr_nodes))
+
+        if self.cache is not None:
+            # The identity is found before the model and features are run the
+            # first time, since running them can change their attributes
+            # An empty identity marks a model or features that can not be
+            # identified, and are not cached
+            if self._identity is None:
+                self._identity = self.cache.identity(self.model, self.features) or ""
+
+        if self.cache is not None and self._identity:
+            keys = [self.cache.key(self._identity, parameters) for parameters in model_parameters]
+
+            nr_cached = 0
+            for i, key in enumerate(keys):
+                if i not in found:
+                    result = self.cache.get(key)
+
+                    if result is not None:
+                        found[i] = result
+                        nr_cached += 1
+
+            logger.info("Found {} of {} model evaluations in the cache".format(
+                nr_cached, nr_nodes))
+
+        # The first node that did not fail is used as the pilot
+        pilot_index = self.first_successful(found)
+
+        # With a pilot run the time grid is unknown until the pilot node
+        # has been evaluated
+        grid = None
+        if not isinstance(self.interpolation_grid, six.string_types) or pilot_index is not None:
+            grid = self.create_interpolation_grid(found.get(pilot_index))
+            found = self.filter_interpolation_grid(found, grid)
+
+            self._parallel.interpolation_grid = grid
+
+        to_evaluate = [i for i in range(nr_nodes) if i not in found]
+
+        if not to_evaluate:
+            for i in range(nr_nodes):
+                yield self.interpolate_on_grid(found.pop(i))
+
+            return
+
+        if setup is not None and pilot_index is not None:
+            setup(self.interpolate_on_grid(found[pilot_index]))
+
         if self.model.suppress_graphics:
             if not prerequisites:
                 raise ImportError("Running with suppress_graphics require: xvfbwrapper")
 
+            # The workers must be started after the virtual display, and can
+            # not outlive it
+            self.close()
+
             vdisplay = Xvfb()
             vdisplay.start()
 
-        results = []
+        if self.checkpoint is not None:
+            self.checkpoint.open(nodes, uncertain_parameters)
 
-        model_parameters = self.create_model_parameters(nodes, uncertain_parameters)
+        progress = None
+        try:
+            pilots = []
+            if grid is None or (setup is not None and pilot_index is None):
+                if grid is None:
+                    self._parallel.interpolation_grid = {}
 
-        if self.CPUs:
-            import multiprocess as mp
+                # Evaluate the nodes one at the time until one does not fail
+                pilot = None
+                for i in range(nr_nodes):
+                    if i in found:
+                        continue
 
-            pool = mp.Pool(processes=self.CPUs)
+                    pilot = next(self._evaluate(nodes, [i], model_parameters, uncertain_parameters))
 
-            # pool.map(self._parallel.run, model_parameters)
-            # chunksize = int(np.ceil(len(model_parameters)/self.CPUs))
-            chunksize = 1
-            for result in tqdm(pool.imap(self._parallel.run, model_parameters, chunksize),
-                               desc="Running model",
-                               total=len(nodes.T)):
+                    found[i] = pilot
+                    pilots.append(i)
 
-                results.append(result)
+                    if not self.failed(pilot):
+                        break
+
+                if grid is None:
+                    grid = self.create_interpolation_grid(pilot)
+                    found = self.filter_interpolation_grid(found, grid)
+
+                    self._parallel.interpolation_grid = grid
+
+                to_evaluate = [i for i in range(nr_nodes) if i not in found]
+
+                if setup is not None and pilot is not None:
+                    setup(self.interpolate_on_grid(pilot))
+
+            evaluated = self._evaluate(nodes, to_evaluate, model_parameters, uncertain_parameters)
+            progress = tqdm(desc="Running model", total=len(to_evaluate))
+
+            for i in range(nr_nodes):
+                if i in found and i not in pilots:
+                    yield self.interpolate_on_grid(found.pop(i))
+                    continue
+
+                if i in found:
+                    result = self.interpolate_on_grid(found.pop(i))
+                else:
+                    result = next(evaluated)
+                    progress.update()
+
+                # Failed evaluations are evaluated again the next time
+                if keys is not None and not self.failed(result):
+                    self.cache.set(keys[i], result)
+
+                if self.checkpoint is not None:
+                    self.checkpoint.write(i, result)
+
+                yield result
+
+        finally:
+            if progress is not None:
+                progress.close()
+
+            if self.model.suppress_graphics:
+                self.close()
+                vdisplay.stop()
+
+            if self.checkpoint is not None:
+                self.checkpoint.close()
 
-            pool.close()
+            if self.cache is not None:
+                self.cache.evict()
+
+
+    def _evaluate(self, nodes, indices, model_parameters, uncertain_parameters):
+        """
+        Evaluate the model and calculate the features for the nodes with
+        `indices`, and yield the result for each node in order.
+        """
+        if not indices:
+            return
+
+        if self.model.vectorized:
+            vectorized_parameters = self.create_vectorized_parameters(nodes[..., indices],
+                                                                      uncertain_parameters)
+
+            def evaluate_batch(parameters, report):
+                model_result = self.model.evaluate(**parameters)
+                return self.split_vectorized_result(model_result, len(indices))
+
+            # The batch is evaluated with the same retries as a single node,
+            # and if tolerant all nodes of the batch fail together
+            model_results = self._parallel.tolerate(evaluate_batch, vectorized_parameters)
+
+            if isinstance(model_results, dict):
+                failed = model_results[self.model.name]["failed"]
+
+                for i in indices:
+                    yield self._parallel.nan_result(failed=failed)
+
+                return
+
+            function = self._parallel.process_model_result
+            arguments = model_results
 
         else:
-            for result in tqdm(imap(self._parallel.run, model_parameters),
-                               desc="Running model",
-                               total=len(nodes.T)):
+            function = self._parallel.run
+            arguments = [model_parameters[i] for i in indices]
 
-                results.append(result)
+        # Let the workers write the results directly to the memory-mapped files
+        if self._parallel.memmap_files:
+            if self.model.vectorized:
+                function = self._parallel.process_node
+            else:
+                function = self._parallel.run_node
 
+            arguments = list(zip(indices, arguments))
 
+        for result in self._imap(function, arguments):
+            yield result
 
-        if self.model.suppress_graphics:
-            vdisplay.stop()
 
-        return results
+    def filter_interpolation_grid(self, found, grid):
+        """
+        Remove the results found in the cache or checkpoint that have been
+        evaluated on another time grid, so they are evaluated again.
 
+        Parameters
+        ----------
+        found : dict
+            The found results, with the index of the node as key.
+        grid : dict
+            The time grid of each model/feature that has a common time grid,
+            as created by ``create_interpolation_grid``.
+
+        Returns
+        -------
+        found : dict
+            The found results that can be used with `grid`.
+        """
+        logger = get_logger(self)
+
+        filtered = {}
+        for i in found:
+            if self.matches_interpolation_grid(found[i], grid):
+                filtered[i] = found[i]
+
+        if len(filtered) < len(found):
+            logger.info("{} found model evaluations have another interpolation grid, ".format(len(found) - len(filtered)) +
+                        "and are evaluated again")
+
+        return filtered
+
+
+    def restore_interpolations(self, result):
+        """
+        Create the interpolations again for a result loaded from the
+        checkpoint, where the model/features that had an interpolation are
+        marked with ``"interpolated"``.
+
+        Parameters
+        ----------
+        result : dict
+            The model and feature results of a single model evaluation.
+
+        Returns
+        -------
+        result : dict
+            The model and feature results, where each marked model/feature
+            has the ``"interpolation"`` added.
+        """
+        for feature in result:
+            if not result[feature].pop("interpolated", False):
+                continue
+
+            if self.failed(result) or np.ndim(result[feature]["values"]) not in [1, 2]:
+                result[feature]["interpolation"] = None
+            elif np.ndim(result[feature]["values"]) == 1:
+                result[feature]["interpolation"] = self._parallel.interpolation_1d(result, feature)
+            else:
+                result[feature]["interpolation"] = self._parallel.interpolation_2d(result, feature)
+
+        return result
+
+
+    def interpolate_on_grid(self, result):
+        """
+        Evaluate the interpolations in `result` on the common time grid, for
+        results found in the cache or checkpoint, or from the pilot run.
+
+        Parameters
+        ----------
+        result : dict
+            The model and feature results of a single model evaluation.
+
+        Returns
+        -------
+        result : dict
+            The model and feature results, where each model/feature with a
+            common time grid has been evaluated on the grid.
+        """
+        for feature in result:
+            if feature in self._parallel.interpolation_grid and "interpolation" in result[feature]:
+                self._parallel.interpolate_on_grid(result, feature)
+
+        return result
 
 
     def create_model_parameters(self, nodes, uncertain_parameters):
@@ -503,6 +1851,103 @@ class RunModel(ParameterBase):
         return model_parameters
 
 
+    def create_vectorized_parameters(self, nodes, uncertain_parameters):
+        """
+        Combine nodes (values) with the uncertain parameter names to create
+        a dictionary with the model parameters for a batch of model evaluations,
+        as required by a vectorized model.
+
+        Parameters
+        ----------
+        nodes : array
+            A series of different set of parameters. The model and each feature is
+            evaluated for each set of parameters in the series.
+        uncertain_parameters : list
+            A list of names of the uncertain parameters.
+
+        Returns
+        -------
+        model_parameters : dict
+            A dictionary where each parameter has an array with one value for
+            each model evaluation. Parameters that are not uncertain have their
+            fixed value repeated.
+            An example:
+
+            .. code-block:: Python
+
+                model_parameters = {"parameter 1": array([value 1, value 2, ...]),
+                                    "parameter 2": array([value 1, value 2, ...]),
+                                    ...}
+        """
+        nodes = np.atleast_2d(nodes)
+        nr_nodes = nodes.shape[1]
+
+        model_parameters = {}
+        for j, parameter in enumerate(uncertain_parameters):
+            model_parameters[parameter] = nodes[j]
+
+        for parameter in self.parameters:
+            if parameter.name not in model_parameters:
+                model_parameters[parameter.name] = np.full(nr_nodes, parameter.value)
+
+        return model_parameters
+
+
+    def split_vectorized_result(self, model_result, nr_nodes):
+        """
+        Split the stacked result of a vectorized model into the results of
+        each model evaluation.
+
+        Parameters
+        ----------
+        model_result : tuple
+            The result from a vectorized model, on the form
+            ``(time, values, info_1, info_2, ...)``, where `values` has one
+            element for each model evaluation.
+        nr_nodes : int
+            The number of model evaluations.
+
+        Returns
+        -------
+        model_results : list
+            A list with the result of each model evaluation, on the form
+            ``[(time_1, values_1, info_1, ...), (time_2, values_2, info_1, ...), ...]``.
+            `time` is shared between all evaluations, unless it is a list
+            with one array for each evaluation, or an array with one row for
+            each evaluation. The info objects are shared between all evaluations.
+
+        Raises
+        ------
+        ValueError
+            If the model does not return one result for each model evaluation.
+        """
+        time, values = model_result[:2]
+        info = tuple(model_result[2:])
+
+        # The values of irregular results is a ragged list, which can not be
+        # converted to an array
+        if not isinstance(values, (list, tuple, np.ndarray)) \
+                or (isinstance(values, np.ndarray) and values.ndim == 0) \
+                or len(values) != nr_nodes:
+            raise ValueError("{}: a vectorized model must return values for each of "
+                             "the {} model evaluations".format(self.model.name, nr_nodes))
+
+        split_time = False
+        if isinstance(time, (list, tuple)):
+            split_time = len(time) == nr_nodes and np.ndim(time[0]) > 0
+
+        elif isinstance(time, np.ndarray) and time.ndim >= 2:
+            split_time = len(time) == nr_nodes
+
+        model_results = []
+        for i in range(nr_nodes):
+            time_node = time[i] if split_time else time
+
+            model_results.append((time_node, values[i]) + info)
+
+        return model_results
+
+
     def is_regular(self, results, feature):
         """
         Test if `feature` in `results` is regular or not, meaning it has a
@@ -615,13 +2060,145 @@ class RunModel(ParameterBase):
         if isinstance(uncertain_parameters, six.string_types):
             uncertain_parameters = [uncertain_parameters]
 
-        results = self.evaluate_nodes(nodes, uncertain_parameters)
+        if self.memmap_folder is None:
+            results = self.evaluate_nodes(nodes, uncertain_parameters)
+
+            data = self.results_to_data(results)
+        else:
+            results, evaluations = self.evaluate_nodes_memmap(nodes, uncertain_parameters)
+
+            data = self.results_to_data(results, evaluations=evaluations)
 
-        data = self.results_to_data(results)
         data.uncertain_parameters = uncertain_parameters
 
         return data
 
+
+    def evaluate_nodes_memmap(self, nodes, uncertain_parameters):
+        """
+        Evaluate the the model and calculate the features
+        for the nodes (values) for the uncertain parameters, and store the
+        evaluations of the model and features that are not interpolated, or
+        are evaluated on a common time grid, in memory-mapped files in a new
+        subfolder of `memmap_folder`.
+
+        Parameters
+        ----------
+        nodes : array
+            The values for the uncertain parameters
+            to evaluate the model and features for.
+        uncertain_parameters : list
+            A list of the names of all uncertain parameters.
+
+        Returns
+        -------
+        results : list
+            A list where each element is a result dictionary for each set
+            of model evaluations, see ``evaluate_nodes``. The ``values`` of the
+            model and features in `evaluations` are removed.
+        evaluations : dict
+            A dictionary with the memory-mapped evaluations, with the name of
+            the model/feature as key. Only contains the model and features with
+            regular evaluations.
+
+        Notes
+        -----
+        If `worker_memmap` is True, and no cache or checkpoint is used, the
+        memory-mapped files are allocated from the evaluation of the first
+        node, and the worker processes write the following evaluations
+        directly to the files. This is only done with the default pool of
+        worker processes or the "threads" executor.
+
+        See Also
+        --------
+        uncertainpy.core.MemmapEvaluations
+        """
+        if not os.path.isdir(self.memmap_folder):
+            os.makedirs(self.memmap_folder)
+
+        folder = tempfile.mkdtemp(prefix="evaluations_", dir=self.memmap_folder)
+
+        nr_nodes = len(nodes.T)
+
+        def stored(result, feature):
+            return "interpolation" not in result[feature] and \
+                not (feature == self.model.name and self.model.ignore)
+
+        def create_storage(feature, shared=False):
+            filename = os.path.join(folder, "{}.npy".format(feature))
+            storage[feature] = MemmapEvaluations(filename, nr_nodes, shared=shared)
+
+        def setup(pilot):
+            memmap_files = {}
+            for feature in pilot:
+                values = pilot[feature]["values"]
+
+                if not stored(pilot, feature) or contains_nan(values):
+                    continue
+
+                try:
+                    shape = np.asarray(values, dtype=float).shape
+                except (ValueError, TypeError):
+                    continue
+
+                create_storage(feature, shared=True)
+                storage[feature].allocate(shape)
+
+                memmap_files[feature] = (storage[feature].filename, pilot[feature]["time"])
+
+            self._parallel.memmap_files = memmap_files
+
+        if not self.worker_memmap or self.cache is not None or self.checkpoint is not None:
+            setup = None
+
+        # The workers of other executors may not have access to the files
+        elif self.executor is not None and self.executor != "threads":
+            logger = get_logger(self)
+            logger.warning("worker_memmap is only used with the default pool of worker " +
+                           "processes or the threads executor. The evaluations are sent " +
+                           "back to the main process.")
+
+            setup = None
+
+        results = []
+        storage = {}
+        try:
+            for result in self.imap_nodes(nodes, uncertain_parameters, setup=setup):
+                for feature in result:
+                    if not stored(result, feature):
+                        continue
+
+                    if feature not in storage:
+                        create_storage(feature)
+
+                    if result[feature].pop("stored", False):
+                        storage[feature].append_written()
+
+                        if result[feature]["time"] is None:
+                            result[feature]["time"] = self._parallel.memmap_files[feature][1]
+                    else:
+                        storage[feature].append(result[feature]["values"])
+
+                    result[feature]["values"] = None
+
+                results.append(result)
+        finally:
+            self._parallel.close_memmaps()
+            self._parallel.memmap_files = {}
+
+        evaluations = {}
+        for feature in storage:
+            if storage[feature].regular:
+                evaluations[feature] = storage[feature].evaluations
+            else:
+                # Irregular evaluations are handled as usual by results_to_data
+                for result, values in zip(results, storage[feature].evaluations):
+                    result[feature]["values"] = values
+
+                storage[feature].remove()
+
+        return results, evaluations
+
     # Currently not needed
     def regularize_nan_results(self, results):
         """
@@ -0,0 +1,448 @@
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+
+from ..utils.utility import contains_nan
+
+
+class RunningStatistics(object):
+    """
+    Calculate the mean and variance of a series of evaluations one evaluation
+    at the time, using Welford's algorithm.
+
+    The mean and variance is calculated element wise, so each evaluation can
+    be a number or an array, as long as all evaluations have the same shape.
+
+    Attributes
+    ----------
+    count : int
+        The number of evaluations added.
+    mean : {None, float, array}
+        The mean of the evaluations. None if no evaluations have been added.
+
+    Notes
+    -----
+    Welford's algorithm is numerically stable, and does not require the
+    evaluations to be stored.
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = None
+        self._sum_squares = None
+
+
+    def update(self, values):
+        """
+        Add an evaluation.
+
+        Parameters
+        ----------
+        values : {float, array_like}
+            The evaluation.
+
+        Raises
+        ------
+        ValueError
+            If the evaluation does not have the same shape as the previous
+            evaluations.
+        """
+        values = np.array(values, dtype=float)
+
+        if self.mean is None:
+            self.count = 1
+            self.mean = values
+            self._sum_squares = np.zeros_like(values)
+            return
+
+        if values.shape != self.mean.shape:
+            raise ValueError("Evaluation with shape {} differs from ".format(values.shape) +
+                             "the previous evaluations with shape {}".format(self.mean.shape))
+
+        self.count += 1
+
+        delta = values - self.mean
+        self.mean = self.mean + delta/self.count
+        self._sum_squares = self._sum_squares + delta*(values - self.mean)
+
+
+    @property
+    def variance(self):
+        """
+        The (population) variance of the evaluations, as calculated by
+        ``numpy.var``.
+
+        Returns
+        -------
+        variance : {None, float, array}
+            The variance of the evaluations. None if no evaluations have been
+            added.
+        """
+        if self.count == 0:
+            return None
+
+        return self._sum_squares/self.count
+
+
+
+class P2Quantile(object):
+    """
+    Estimate a quantile of a series of evaluations one evaluation at the time,
+    using the P-squared algorithm ([1]_).
+
+    The quantile is estimated element wise, so each evaluation can
+    be a number or an array, as long as all evaluations have the same shape.
+
+    Parameters
+    ----------
+    quantile : float
+        The quantile to estimate, between 0 and 1.
+
+    Attributes
+    ----------
+    quantile : float
+        The quantile to estimate.
+    count : int
+        The number of evaluations added.
+
+    Notes
+    -----
+    The P-squared algorithm keeps track of five markers for each element,
+    and does not require the evaluations to be stored. The quantile is
+    calculated exactly (as by ``numpy.percentile``) until five evaluations
+    have been added.
+
+    References
+    ----------
+    .. [1] Jain, R. and I. Chlamtac (1985). "The P2 algorithm for dynamic
+        calculation of quantiles and histograms without storing observations."
+        Communications of the ACM, 28(10):1076-1085,
+        doi:10.1145/4372.4378.
+    """
+    def __init__(self, quantile):
+        if not 0 <= quantile <= 1:
+            raise ValueError("quantile must be between 0 and 1, not {}".format(quantile))
+
+        self.quantile = quantile
+        self.count = 0
+
+        self._initial = []
+        self._heights = None
+        self._positions = None
+        self._desired = np.array([1, 1 + 2*quantile, 1 + 4*quantile, 3 + 2*quantile, 5])
+        self._increments = np.array([0, quantile/2., quantile, (1 + quantile)/2., 1])
+
+
+    def update(self, values):
+        """
+        Add an evaluation.
+
+        Parameters
+        ----------
+        values : {float, array_like}
+            The evaluation.
+
+        Raises
+        ------
+        ValueError
+            If the evaluation does not have the same shape as the previous
+            evaluations.
+        """
+        values = np.array(values, dtype=float)
+
+        if self.count > 0:
+            shape = self._initial[0].shape if self._heights is None else self._heights.shape[1:]
+
+            if values.shape != shape:
+                raise ValueError("Evaluation with shape {} differs from ".format(values.shape) +
+                                 "the previous evaluations with shape {}".format(shape))
+
+        self.count += 1
+
+        if self._heights is None:
+            self._initial.append(values)
+
+            if len(self._initial) == 5:
+                self._heights = np.sort(np.array(self._initial), axis=0)
+                self._positions = np.ones_like(self._heights)*np.arange(1, 6).reshape((5,) + (1,)*values.ndim)
+                self._initial = []
+
+            return
+
+        q = self._heights
+        n = self._positions
+
+        q[0] = np.where(values < q[0], values, q[0])
+        q[4] = np.where(values > q[4], values, q[4])
+
+        # Index of the cell the evaluation falls in
+        k = np.sum(values >= q[1:4], axis=0)
+
+        markers = np.arange(1, 5).reshape((4,) + (1,)*values.ndim)
+        n[1:] += markers > k
+
+        self._desired = self._desired + self._increments
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for i in range(1, 4):
+                d = self._desired[i] - n[i]
+
+                move = ((d >= 1) & (n[i + 1] - n[i] > 1)) | ((d <= -1) & (n[i - 1] - n[i] < -1))
+
+                if not np.any(move):
+                    continue
+
+                d = np.sign(d)
+
+                parabolic = q[i] + d/(n[i + 1] - n[i - 1])*(
+                    (n[i] - n[i - 1] + d)*(q[i + 1] - q[i])/(n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d)*(q[i] - q[i - 1])/(n[i] - n[i - 1]))
+
+                q_neighbour = np.where(d > 0, q[i + 1], q[i - 1])
+                n_neighbour = np.where(d > 0, n[i + 1], n[i - 1])
+                linear = q[i] + d*(q_neighbour - q[i])/(n_neighbour - n[i])
+
+                use_parabolic = (q[i - 1] < parabolic) & (parabolic < q[i + 1])
+                new_height = np.where(use_parabolic, parabolic, linear)
+
+                q[i] = np.where(move, new_height, q[i])
+                n[i] = np.where(move, n[i] + d, n[i])
+
+
+    @property
+    def value(self):
+        """
+        The estimated quantile.
+
+        Returns
+        -------
+        value : {None, float, array}
+            The estimated quantile of the evaluations. None if no evaluations
+            have been added.
+        """
+        if self.count == 0:
+            return None
+
+        if self._heights is None:
+            return np.percentile(np.array(self._initial), 100*self.quantile, axis=0)
+
+        return self._heights[2].copy()
+
+
+
+class SobolAccumulator(object):
+    """
+    Calculate the first and total order Sobol indices from model evaluations
+    for Saltelli's sampling scheme, one sample block at the time.
+
+    Each sample block consists of the evaluations for a row of the A matrix,
+    the corresponding row of each AB matrix and the row of the B matrix,
+    in the order created by ``SALib.sample.saltelli.sample``
+    with ``calc_second_order=False``.
+
+    Parameters
+    ----------
+    nr_uncertain_parameters : int
+        Number of uncertain parameters.
+
+    Attributes
+    ----------
+    nr_uncertain_parameters : int
+        Number of uncertain parameters.
+    count : int
+        The number of sample blocks added.
+
+    Notes
+    -----
+    Uses the same estimators as ``SALib.analyze.sobol``:
+    ``mean(B*(AB - A))/var([A, B])`` for the first order and
+    ``0.5*mean((A - AB)**2)/var([A, B])`` for the total order Sobol indices.
+    """
+    def __init__(self, nr_uncertain_parameters):
+        self.nr_uncertain_parameters = nr_uncertain_parameters
+        self.count = 0
+
+        self._statistics = RunningStatistics()
+        self._first = None
+        self._total = None
+        self._min = np.inf
+        self._max = -np.inf
+
+
+    def update(self, A, AB, B):
+        """
+        Add a sample block.
+
+        Parameters
+        ----------
+        A : {float, array_like}
+            The evaluation for the row of the A matrix.
+        AB : list
+            The evaluations for the row of the AB matrix of each uncertain
+            parameter.
+        B : {float, array_like}
+            The evaluation for the row of the B matrix.
+        """
+        A = np.array(A, dtype=float)
+        B = np.array(B, dtype=float)
+        AB = np.array(AB, dtype=float)
+
+        self._statistics.update(A)
+        self._statistics.update(B)
+
+        first = B*(AB - A)
+        total = (A - AB)**2
+
+        if self._first is None:
+            self._first = first
+            self._total = total
+        else:
+            self._first = self._first + first
+            self._total = self._total + total
+
+        self._min = min(self._min, np.min(A), np.min(B))
+        self._max = max(self._max, np.max(A), np.max(B))
+
+        self.count += 1
+
+
+    def sobol(self):
+        """
+        Calculate the Sobol indices from the added sample blocks.
+
+        Returns
+        -------
+        sobol_first : list
+            The first order Sobol indices for each uncertain parameter.
+        sobol_total : list
+            The total order Sobol indices for each uncertain parameter.
+        """
+        if self.count == 0:
+            return None, None
+
+        sobol_first = [0]*self.nr_uncertain_parameters
+        sobol_total = [0]*self.nr_uncertain_parameters
+
+        variance = self._statistics.variance
+
+        for i in range(self.nr_uncertain_parameters):
+            if self._max - self._min == 0:
+                sobol_first[i] = np.zeros(np.shape(self._first[i]))
+                sobol_total[i] = np.zeros(np.shape(self._total[i]))
+            else:
+                sobol_first[i] = self._first[i]/self.count/variance
+                sobol_total[i] = 0.5*self._total[i]/self.count/variance
+
+        return sobol_first, sobol_total
+
+
+
+class MonteCarloStatistics(object):
+    """
+    Calculate the statistical metrics of the quasi-Monte Carlo method for a
+    model or feature, as the evaluations arrive, in the order they are
+    created by Saltelli's sampling scheme.
+
+    The mean, variance and percentiles are calculated from the evaluations
+    of the A and B matrices, while the Sobol indices are calculated from all
+    evaluations.
+
+    Parameters
+    ----------
+    nr_uncertain_parameters : int
+        Number of uncertain parameters.
+
+    Attributes
+    ----------
+    nr_uncertain_parameters : int
+        Number of uncertain parameters.
+    nr_evaluations : int
+        The number of evaluations added.
+    nr_incomplete : int
+        The number of evaluations of the A and B matrices that contain
+        numpy.nan.
+    nr_incomplete_blocks : int
+        The number of sample blocks with at least one evaluation that contain
+        numpy.nan or None. These are not used to calculate the Sobol indices.
+    statistics : RunningStatistics
+        The mean and variance of the evaluations.
+    percentile_5 : P2Quantile
+        The estimated 5th percentile of the evaluations.
+    percentile_95 : P2Quantile
+        The estimated 95th percentile of the evaluations.
+    sobol : {SobolAccumulator, None}
+        The Sobol indices of the evaluations, None if there is only one
+        uncertain parameter.
+    """
+    def __init__(self, nr_uncertain_parameters):
+        self.nr_uncertain_parameters = nr_uncertain_parameters
+
+        self.nr_evaluations = 0
+        self.nr_incomplete = 0
+        self.nr_incomplete_blocks = 0
+
+        self.statistics = RunningStatistics()
+        self.percentile_5 = P2Quantile(0.05)
+        self.percentile_95 = P2Quantile(0.95)
+
+        if nr_uncertain_parameters > 1:
+            self.sobol = SobolAccumulator(nr_uncertain_parameters)
+        else:
+            self.sobol = None
+
+        self._shape = None
+        self._block = []
+        self._block_complete = True
+
+
+    def update(self, values):
+        """
+        Add the next evaluation.
+
+        Parameters
+        ----------
+        values : {float, array_like}
+            The evaluation.
+
+        Raises
+        ------
+        ValueError
+            If the evaluation does not have the same shape as the previous
+            evaluations.
+        """
+        step = self.nr_uncertain_parameters + 2
+        position = self.nr_evaluations % step
+
+        complete = not contains_nan(values)
+
+        if complete:
+            if self._shape is None:
+                self._shape = np.shape(values)
+            elif np.shape(values) != self._shape:
+                raise ValueError("Evaluation with shape {} differs from ".format(np.shape(values)) +
+                                 "the previous evaluations with shape {}".format(self._shape))
+
+        self.nr_evaluations += 1
+
+        if not complete:
+            self._block_complete = False
+
+        # Only A and B are used to calculate the mean, variance and percentiles
+        if position in [0, step - 1]:
+            if complete:
+                self.statistics.update(values)
+                self.percentile_5.update(values)
+                self.percentile_95.update(values)
+            else:
+                self.nr_incomplete += 1
+
+        if self.sobol is not None:
+            self._block.append(values)
+
+            if position == step - 1:
+                if self._block_complete:
+                    self.sobol.update(self._block[0], self._block[1:-1], self._block[-1])
+                else:
+                    self.nr_incomplete_blocks += 1
+
+                self._block = []
+                self._block_complete = True
@@ -1,15 +1,20 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import six
+import itertools
 import numpy as np
 from tqdm import tqdm
 import chaospy as cp
+import numpoly
 import types
+import scipy.stats
+from scipy.special import comb
 from SALib.sample import saltelli
-from SALib.analyze.sobol import first_order, total_order
 
 from .run_model import RunModel
 from .base import ParameterBase
+from .streaming import MonteCarloStatistics
+from ..data import Data
 from ..utils.utility import contains_nan
 from ..utils.logger import get_logger
 
@@ -69,6 +74,61 @@ class UncertaintyCalculations(ParameterBase):
         Set the threshold for the logging level. Logging messages less severe
         than this level is ignored. If None, no logging to file is performed.
         Default logger level is "info".
+    cache : {None, str, EvaluationCache}, optional
+        Cache of model evaluations that is consulted before the model is
+        evaluated, so evaluations are reused between uncertainty
+        quantifications. If None, no cache is used. If a string, the
+        evaluations are cached on disk in the folder with that name.
+        Default is None.
+    memmap_folder : {None, str}, optional
+        Folder to store the regular model and feature evaluations in, as
+        memory-mapped numpy files, so the evaluations can be larger than the
+        available memory. If None, the evaluations are kept in memory.
+        Default is None.
+    interpolation_grid : {None, "pilot", array_like, dict}, optional
+        The common time grid the interpolated model/features are evaluated
+        on, so the worker processes return the resampled results instead of
+        the interpolations. If None, the time values of the evaluation with
+        the greatest number of time steps are used. If "pilot", the time
+        values of the evaluation of the first node are used. If array_like,
+        the array is used for all interpolated model/features. If dict, the
+        value is used for the model/feature with the name of the key.
+        Default is None.
+    worker_memmap : bool, optional
+        If True, and `memmap_folder` is given, the worker processes write the
+        regular model and feature evaluations directly to the memory-mapped
+        files, instead of sending them back to the main process.
+        Default is False.
+    executor : {None, "threads", "mpi", "dask", concurrent.futures.Executor}, optional
+        The executor that evaluates the model and features in parallel. If
+        None, a pool of `CPUs` worker processes from multiprocess is used. If
+        "threads", a pool of `CPUs` threads is used, for models that release
+        the GIL. If "mpi", a ``mpi4py.futures.MPIPoolExecutor`` is used, and if
+        "dask", a local dask-distributed cluster is used, both with `CPUs`
+        workers. Any other object with a ``map`` method, such as a
+        ``concurrent.futures.Executor``, is used as it is. Default is None.
+    timeout : {None, float}, optional
+        The maximum time in seconds a single model evaluation can take.
+        Evaluations that take longer are stopped, and the model and all
+        features are set to numpy.nan for that node. Only used with the pool
+        of worker processes from multiprocess. If None, there is no timeout.
+        Default is None.
+    speculative : bool, optional
+        If True, model evaluations that take much longer than the previous
+        evaluations are started again on idle worker processes, and the
+        first result is used. Only used with the pool of worker processes
+        from multiprocess. Default is False.
+    retries : int, optional
+        The number of times a model evaluation, with the postprocessing and
+        feature calculations, is tried again if it raises an exception.
+        Default is 0.
+    tolerant : bool, optional
+        If True, a model evaluation that still raises an exception after
+        `retries` new tries is stored as numpy.nan for the model and all
+        features, and a summary of the exception is stored in
+        ``data.failed``, instead of the exception being raised. The
+        uncertainty quantification is then performed on the remaining
+        evaluations if `allow_incomplete` is True. Default is False.
 
     Attributes
     ----------
@@ -97,14 +157,32 @@ class UncertaintyCalculations(ParameterBase):
                  create_PCE_custom=None,
                  custom_uncertainty_quantification=None,
                  CPUs="max",
-                 logger_level="info"):
+                 logger_level="info",
+                 cache=None,
+                 memmap_folder=None,
+                 interpolation_grid=None,
+                 worker_memmap=False,
+                 executor=None,
+                 timeout=None,
+                 speculative=False,
+                 retries=0,
+                 tolerant=False):
 
 
         self.runmodel = RunModel(model=model,
                                  parameters=parameters,
                                  features=features,
                                  logger_level=logger_level,
-                                 CPUs=CPUs)
+                                 CPUs=CPUs,
+                                 cache=cache,
+                                 memmap_folder=memmap_folder,
+                                 interpolation_grid=interpolation_grid,
+                                 worker_memmap=worker_memmap,
+                                 executor=executor,
+                                 timeout=timeout,
+                                 speculative=speculative,
+                                 retries=retries,
+                                 tolerant=tolerant)
 
 
         if create_PCE_custom is not None:
@@ -265,11 +343,26 @@ class UncertaintyCalculations(ParameterBase):
 
         Returns
         -------
-        masked_evaluations : list
+        masked_evaluations : {list, array}
             The evaluations that have results (not numpy.nan or None).
         mask : boolean array
             The mask itself, used to create the masked arrays.
+
+        Notes
+        -----
+        If `evaluations` is a numpy array of floats, for example a
+        numpy.memmap, the mask is calculated without iterating over the
+        evaluations, and `masked_evaluations` is a view of `evaluations` when
+        all evaluations have results.
         """
+        if isinstance(evaluations, np.ndarray) and evaluations.dtype.kind == "f" and evaluations.ndim > 0:
+            mask = ~np.any(np.isnan(evaluations.reshape(len(evaluations), -1)), axis=1)
+
+            if np.all(mask):
+                return evaluations, mask
+
+            return evaluations[mask], mask
+
         masked_evaluations = []
         mask = np.ones(len(evaluations), dtype=bool)
 
@@ -298,7 +391,7 @@ class UncertaintyCalculations(ParameterBase):
 
         Returns
         -------
-        masked_evaluations : list
+        masked_evaluations : {list, array}
             The evaluations that have results (not numpy.nan or None).
         mask : boolean array
             The mask itself, used to create the masked arrays.
@@ -395,11 +488,597 @@ class UncertaintyCalculations(ParameterBase):
 
 
 
+    def adaptive_sparse_grid(self,
+                             distribution,
+                             uncertain_parameters,
+                             tolerance=1e-3,
+                             max_evaluations=None,
+                             transformation=None):
+        """
+        Create a dimension-adaptive Smolyak sparse grid with Leja quadrature,
+        and evaluate the model and calculate the features for the nodes of the
+        grid.
+
+        Parameters
+        ----------
+        distribution : chaospy.Dist
+            The multivariate distribution the quadrature is created for.
+            Must have independent marginal distributions.
+        uncertain_parameters : list
+            A list of the names of all uncertain parameters.
+        tolerance : float, optional
+            The refinement stops when the estimated relative error of the
+            mean and second moment of the model and features is below
+            `tolerance`. Default is 1e-3.
+        max_evaluations : {int, None}, optional
+            The maximum number of model evaluations. If None, there is no
+            maximum. Default is None.
+        transformation : {None, callable}, optional
+            Function that transforms the nodes of the quadrature to the
+            values of the uncertain parameters the model is evaluated for.
+            If None, the nodes are used directly. Default is None.
+
+        Returns
+        -------
+        nodes : array
+            The nodes of the quadrature, with shape
+            ``(nr_uncertain_parameters, nr_nodes)``.
+        weights : array
+            The weights of the quadrature.
+        data : Data
+            A data object containing the values from the model evaluation
+            and feature calculations for each node.
+        combination : list
+            The sparse grid as a linear combination of tensor product
+            quadratures. A list of ``(coefficient, index, rows, weights)``
+            tuples, where `index` is the level in each dimension, `rows` the
+            indices of the nodes of the tensor product quadrature and
+            `weights` its weights.
+
+        Notes
+        -----
+        The sparse grid is built with the dimension-adaptive algorithm of
+        Gerstner and Griebel [1]_. The quadrature is a sum of tensor products
+        of the differences between nested one dimensional Leja quadratures,
+        one for each multi-index in a set of levels. Level ``l`` uses the
+        Leja quadrature of order ``2*l``.
+
+        The algorithm starts with the lowest level in every dimension, and
+        always refines it and the first level in each dimension, so the
+        interactions between each pair of parameters are included even if
+        the model is zero at the centre or along each axis. It then
+        repeatedly refines the multi-index with the largest contribution
+        to the mean and second moment of the model and features, by adding
+        the next level in each dimension, as long as every lower level has
+        already been refined. Dimensions that do not affect the model are
+        therefore not refined further. The refinement stops when the sum of the
+        contributions of the multi-indices that have not been refined is
+        below `tolerance`, relative to the mean and second moment, or when
+        the next refinement would exceed `max_evaluations`. The nested Leja
+        nodes mean that each refinement reuses all previously evaluated
+        nodes.
+
+        The contributions are calculated from the model and features with
+        the same shape for every node, and the evaluations that contain
+        numpy.nan are ignored.
+
+        References
+        ----------
+        .. [1] Gerstner, T. and M. Griebel (2003). "Dimension-adaptive
+            tensor-product quadrature." Computing, 71(1):65-87,
+            doi:10.1007/s00607-003-0015-5.
+        """
+        logger = get_logger(self)
+
+        nr_dimensions = len(uncertain_parameters)
+
+        # The unique one dimensional Leja nodes, so nested nodes from
+        # different levels are identical
+        abscissas_1d = [[] for dimension in range(nr_dimensions)]
+        rules = {}
+
+        def rule(dimension, level):
+            if (dimension, level) not in rules:
+                abscissas, weights = cp.generate_quadrature(2*level,
+                                                            distribution[dimension],
+                                                            rule="J")
+
+                unique = abscissas_1d[dimension]
+                for i, abscissa in enumerate(abscissas[0]):
+                    for value in unique:
+                        if abs(value - abscissa) <= 1e-10*max(1, abs(abscissa)):
+                            abscissas[0][i] = value
+                            break
+                    else:
+                        unique.append(abscissa)
+
+                rules[(dimension, level)] = (abscissas[0], np.asarray(weights, dtype=float))
+
+            return rules[(dimension, level)]
+
+
+        def difference(dimension, level):
+            abscissas, weights = rule(dimension, level)
+            weights = weights.copy()
+
+            if level > 0:
+                for abscissa, weight in zip(*rule(dimension, level - 1)):
+                    weights[abscissas == abscissa] -= weight
+
+            return abscissas, weights
+
+
+        def tensor(index):
+            differences = [difference(dimension, level) for dimension, level in enumerate(index)]
+
+            nodes = np.array(list(itertools.product(*[abscissas for abscissas, weights in differences])))
+            weights = np.prod(list(itertools.product(*[weights for abscissas, weights in differences])), axis=1)
+
+            return [tuple(node) for node in nodes], weights
+
+
+        node_index = {}
+        results = []
+
+        def new_nodes(indices):
+            new = []
+            added = set()
+            for index in indices:
+                for node in tensor(index)[0]:
+                    if node not in node_index and node not in added:
+                        new.append(node)
+                        added.add(node)
+
+            return new
+
+
+        def evaluate(nodes):
+            for node in nodes:
+                node_index[node] = len(node_index)
+
+            nodes = np.array(nodes).T
+            if transformation is not None:
+                nodes = transformation(nodes)
+
+            results.extend(self.runmodel.evaluate_nodes(nodes, uncertain_parameters))
+
+
+        def regular_evaluations():
+            evaluations = {}
+            for feature in results[0]:
+                if feature == self.model.name and self.model.ignore:
+                    continue
+
+                values = []
+                for result in results:
+                    if "interpolation" in result[feature]:
+                        interpolation = result[feature]["interpolation"]
+
+                        if interpolation is None:
+                            values.append(np.nan)
+                        else:
+                            values.append(interpolation(results[0][feature]["time"]))
+                    else:
+                        values.append(result[feature]["values"])
+
+                shapes = set(np.shape(value) for value in values if not contains_nan(value))
+                if len(shapes) != 1:
+                    continue
+
+                shape = shapes.pop()
+                try:
+                    evaluations[feature] = np.array([value if np.shape(value) == shape
+                                                     else np.full(shape, np.nan)
+                                                     for value in values], dtype=float)
+                except (ValueError, TypeError):
+                    continue
+
+            return evaluations
+
+
+        def norm(values):
+            values = np.asarray(values, dtype=float)
+            values = values[np.isfinite(values)]
+
+            if values.size == 0:
+                return 0
+
+            return np.sqrt(np.mean(values**2))
+
+
+        contributions = {}
+
+        def add_contributions(indices):
+            evaluations = regular_evaluations()
+
+            for index in indices:
+                nodes, weights = tensor(index)
+                rows = [node_index[node] for node in nodes]
+
+                contributions[index] = {}
+                for feature in evaluations:
+                    values = evaluations[feature][rows]
+
+                    contributions[index][feature] = (np.tensordot(weights, values, axes=1),
+                                                     np.tensordot(weights, values**2, axes=1))
+
+
+        def estimates():
+            # The mean and second moment estimated by the current quadrature
+            totals = {}
+            for index in contributions:
+                for feature in contributions[index]:
+                    if feature in totals:
+                        totals[feature] = (totals[feature][0] + contributions[index][feature][0],
+                                           totals[feature][1] + contributions[index][feature][1])
+                    else:
+                        totals[feature] = contributions[index][feature]
+
+            return totals
+
+
+        def error_indicator(index, totals):
+            indicator = 0
+            for feature in contributions[index]:
+                mean, moment = totals[feature]
+
+                contribution = norm(contributions[index][feature][0]) + norm(contributions[index][feature][1])
+                scale = norm(mean) + norm(moment)
+
+                # The absolute contribution is used when the mean and second
+                # moment are zero, so the refinement does not stop because
+                # the model is zero at the nodes evaluated so far
+                if scale > 0:
+                    contribution /= scale
+
+                indicator = max(indicator, contribution)
+
+            return indicator
+
+
+        start = (0,)*nr_dimensions
+
+        evaluate(new_nodes([start]))
+        add_contributions([start])
+
+        # The start index and the first level in each dimension are always
+        # refined, since the error can not be estimated before each parameter,
+        # and each pair of parameters, has been varied
+        old = set()
+        active = {start: np.inf}
+
+        while active:
+            error = sum(active.values())
+            if error <= tolerance:
+                break
+
+            index = max(active, key=active.get)
+            del active[index]
+            old.add(index)
+
+            forward = []
+            for dimension in range(nr_dimensions):
+                neighbour = index[:dimension] + (index[dimension] + 1,) + index[dimension + 1:]
+
+                admissible = True
+                for backward_dimension in range(nr_dimensions):
+                    if neighbour[backward_dimension] > 0:
+                        backward = neighbour[:backward_dimension] + (neighbour[backward_dimension] - 1,) \
+                            + neighbour[backward_dimension + 1:]
+
+                        if backward not in old:
+                            admissible = False
+                            break
+
+                if admissible:
+                    forward.append(neighbour)
+
+            nodes = new_nodes(forward)
+            if max_evaluations is not None and len(node_index) + len(nodes) > max_evaluations:
+                logger.warning("The adaptive sparse grid reached the maximum number of model " +
+                               "evaluations ({}) before the tolerance. ".format(max_evaluations) +
+                               "The estimated error is {:.3g}".format(error))
+                break
+
+            if nodes:
+                evaluate(nodes)
+
+            add_contributions(forward)
+
+            totals = estimates()
+            for neighbour in forward:
+                if sum(neighbour) <= 1:
+                    active[neighbour] = np.inf
+                else:
+                    active[neighbour] = error_indicator(neighbour, totals)
+
+        weights = np.zeros(len(node_index))
+        for index in contributions:
+            nodes, index_weights = tensor(index)
+
+            for node, weight in zip(nodes, index_weights):
+                weights[node_index[node]] += weight
+
+        # The sparse grid written as a linear combination of full tensor
+        # product quadratures (the combination technique)
+        combination = []
+        for index in sorted(contributions):
+            coefficient = 0
+            for shift in itertools.product([0, 1], repeat=nr_dimensions):
+                if tuple(level + step for level, step in zip(index, shift)) in contributions:
+                    coefficient += (-1)**sum(shift)
+
+            if coefficient == 0:
+                continue
+
+            rules_1d = [rule(dimension, level) for dimension, level in enumerate(index)]
+
+            rows = [node_index[node] for node in
+                    itertools.product(*[abscissas for abscissas, index_weights in rules_1d])]
+            index_weights = np.prod(list(itertools.product(*[index_weights for abscissas, index_weights in rules_1d])),
+                                    axis=1)
+
+            combination.append((coefficient, index, np.array(rows), index_weights))
+
+        nodes = np.zeros((nr_dimensions, len(node_index)))
+        for node, i in node_index.items():
+            nodes[:, i] = node
+
+        data = self.runmodel.results_to_data(results)
+        data.uncertain_parameters = uncertain_parameters
+
+        return nodes, weights, data, combination
+
+
+    def sparse_grid_projection(self, polynomials, nodes, evaluations, mask, combination):
+        """
+        Calculate the pseudo-spectral projection of the evaluations on a
+        sparse grid created by ``adaptive_sparse_grid``.
+
+        Parameters
+        ----------
+        polynomials : chaospy.Poly
+            The orthogonal polynomials to project on.
+        nodes : array
+            The nodes of the sparse grid, with shape
+            ``(nr_uncertain_parameters, nr_nodes)``.
+        evaluations : array_like
+            The evaluations for each node.
+        mask : boolean array
+            Which evaluations have results.
+        combination : list
+            The sparse grid as a combination of tensor product quadratures,
+            as returned by ``adaptive_sparse_grid``.
+
+        Returns
+        -------
+        U_hat : chaospy.Poly
+            The polynomial approximation.
+
+        Notes
+        -----
+        The projection is the same linear combination of projections on the
+        tensor product quadratures as the sparse grid [1]_. Each tensor
+        product quadrature only projects on the polynomials with a degree in
+        each dimension that is at most the level of the quadrature in that
+        dimension, since these are the polynomials it integrates exactly.
+        This avoids the large aliasing errors of projecting on all
+        polynomials when the sparse grid is strongly anisotropic.
+
+        References
+        ----------
+        .. [1] Conrad, P. R. and Y. M. Marzouk (2013). "Adaptive Smolyak
+            pseudospectral approximations." SIAM Journal on Scientific
+            Computing, 35(6):A2643-A2670, doi:10.1137/120890715.
+        """
+        exponents, coefficients, _ = self.PCE_coefficients(polynomials, len(nodes))
+
+        degrees = []
+        for i in range(len(polynomials)):
+            degrees.append(np.max(exponents[coefficients[:, i] != 0], axis=0))
+
+        # Evaluate all polynomials once. A subset of the polynomials only
+        # keeps the dimensions it uses, so it can not be evaluated at the
+        # nodes directly.
+        polynomial_evaluations = polynomials(*nodes)
+
+        U_hat_coefficients = 0
+        for coefficient, index, rows, weights in combination:
+            keep = [i for i, degree in enumerate(degrees) if np.all(degree <= index)]
+
+            rows_mask = mask[rows]
+            if not np.any(rows_mask):
+                continue
+
+            rows = rows[rows_mask]
+            weights = weights[rows_mask]
+            tensor_evaluations = np.array([evaluations[row] for row in rows])
+
+            # Same projection as chaospy.fit_quadrature
+            values = polynomial_evaluations[keep][:, rows]
+            norms = np.sum(values**2*weights, axis=-1)
+
+            projection = (values*weights).dot(tensor_evaluations.reshape(len(rows), -1))/norms[:, np.newaxis]
+
+            tensor_coefficients = np.zeros((len(polynomials), projection.shape[1]))
+            tensor_coefficients[keep] = projection
+
+            U_hat_coefficients = U_hat_coefficients + coefficient*tensor_coefficients
+
+        shape = tensor_evaluations.shape[1:]
+        U_hat_coefficients = U_hat_coefficients.reshape((len(polynomials),) + shape)
+
+        U_hat = numpoly.sum(polynomials*U_hat_coefficients.T, -1).T
+
+        return U_hat
+
+
+    def sparse_regression(self, polynomials, nodes, evaluations, method="omp"):
+        """
+        Fit a polynomial approximation with only the most significant of the
+        polynomials, selected with sparse regression and leave-one-out
+        cross-validation.
+
+        Parameters
+        ----------
+        polynomials : chaospy.Poly
+            The orthogonal polynomials to select from. The first polynomial
+            must be the constant polynomial.
+        nodes : array
+            The nodes the evaluations are for, with shape
+            ``(nr_uncertain_parameters, nr_nodes)``.
+        evaluations : array_like
+            The evaluations for each node.
+        method : {"omp", "lars"}, optional
+            The method used to select the order the polynomials are added in.
+            "omp" is orthogonal matching pursuit and "lars" is least-angle
+            regression. Default is "omp".
+
+        Returns
+        -------
+        U_hat : chaospy.Poly
+            The polynomial approximation.
+        nr_terms : int
+            The number of polynomials in the approximation.
+
+        Raises
+        ------
+        ValueError
+            If `method` is not one of "omp" or "lars".
+        ImportError
+            If "lars" is used and scikit-learn is not installed.
+
+        Notes
+        -----
+        The polynomials are added one at the time, starting with the constant
+        polynomial. Orthogonal matching pursuit adds the polynomial that is
+        most correlated with the residual of the current least squares fit,
+        summed over all values of the evaluations, so a model or feature with
+        an array as output uses the same polynomials for each value.
+        Least-angle regression uses the order the polynomials enter the
+        least-angle regression path of any of the values, as calculated by
+        ``sklearn.linear_model.lars_path``.
+
+        For each number of polynomials, the coefficients are found with
+        ordinary least squares, and the polynomials with the smallest
+        corrected leave-one-out error are used ([1]_). The leave-one-out error
+        is calculated from the residuals of the least squares fit, without
+        refitting, and is corrected for the overfitting that comes with
+        adding more polynomials. The selection stops when the leave-one-out error has not
+        improved for 20 polynomials, or when as many polynomials as
+        evaluations minus one have been added.
+
+        References
+        ----------
+        .. [1] Blatman, G. and B. Sudret (2011). "Adaptive sparse polynomial
+            chaos expansion based on least angle regression." Journal of
+            Computational Physics, 230(6):2345-2367,
+            doi:10.1016/j.jcp.2010.12.021.
+        """
+        if method not in ["omp", "lars"]:
+            raise ValueError("method must be one of: omp or lars, not {}".format(method))
+
+        nodes = np.atleast_2d(nodes)
+
+        values = np.asarray(evaluations, dtype=float)
+        values = values.reshape(len(values), -1)
+
+        basis = np.asarray(polynomials(*nodes), dtype=float).reshape(len(polynomials), -1).T
+
+        nr_evaluations, nr_polynomials = basis.shape
+        max_terms = max(1, min(nr_polynomials, nr_evaluations - 1))
+
+        variance = np.sum(np.var(values, axis=0))
+
+        def loo_error(selected):
+            Q, R = np.linalg.qr(basis[:, selected])
+            residuals = values - Q.dot(Q.T.dot(values))
+            leverage = np.sum(Q**2, axis=1)
+
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                error = np.mean(np.sum((residuals/(1 - leverage)[:, None])**2, axis=1))
+
+                # Correction for overfitting
+                error *= nr_evaluations/(nr_evaluations - len(selected)) \
+                    *(1 + np.sum(np.linalg.inv(R)**2))
+
+            if not np.isfinite(error):
+                return np.inf
+
+            if variance > 0:
+                error /= variance
+
+            return error
+
+
+        if method == "lars":
+            try:
+                from sklearn.linear_model import lars_path
+            except ImportError:
+                raise ImportError("Least-angle regression requires: scikit-learn")
+
+            # The polynomials in the order they enter the path of any value
+            centered = values - np.mean(values, axis=0)
+            order = {}
+            for i in range(centered.shape[1]):
+                alphas, active, coefs = lars_path(basis[:, 1:], centered[:, i],
+                                                  max_iter=max_terms - 1,
+                                                  method="lar")
+
+                for step, j in enumerate(active):
+                    order[j + 1] = min(order.get(j + 1, np.inf), step)
+
+            candidates = [0] + sorted(order, key=order.get)
+
+
+        patience = 20
+
+        selected = [0]
+        best = (loo_error(selected), 1)
+
+        norms = np.linalg.norm(basis, axis=0)
+        norms[norms == 0] = 1
+
+        while len(selected) < max_terms:
+            if method == "omp":
+                Q, R = np.linalg.qr(basis[:, selected])
+                residuals = values - Q.dot(Q.T.dot(values))
+
+                correlation = np.sum((basis.T.dot(residuals)/norms[:, None])**2, axis=1)
+                correlation[selected] = -1
+
+                if np.max(correlation) <= 0:
+                    break
+
+                selected.append(int(np.argmax(correlation)))
+
+            else:
+                if len(selected) >= len(candidates):
+                    break
+
+                selected.append(candidates[len(selected)])
+
+            error = loo_error(selected)
+            if error < best[0]:
+                best = (error, len(selected))
+
+            if len(selected) - best[1] >= patience:
+                break
+
+        selected = selected[:best[1]]
+
+        U_hat = cp.fit_regression(polynomials[selected], nodes, evaluations)
+
+        return U_hat, len(selected)
+
+
     def create_PCE_spectral(self,
                             uncertain_parameters=None,
                             polynomial_order=4,
                             quadrature_order=None,
-                            allow_incomplete=True):
+                            allow_incomplete=True,
+                            adaptive=False,
+                            tolerance=1e-3):
         """
         Create the polynomial approximation `U_hat` using pseudo-spectral
         projection.
@@ -421,6 +1100,15 @@ class UncertaintyCalculations(ParameterBase):
             If the polynomial approximation should be performed for features or
             models with incomplete evaluations.
             Default is True.
+        adaptive : bool, optional
+            If a dimension-adaptive sparse grid should be used instead of the
+            sparse grid of order `quadrature_order`. The adaptive sparse grid
+            uses at most ``comb(quadrature_order + d, d)`` nodes, the number
+            of polynomials of total order `quadrature_order` in the ``d``
+            uncertain parameters. Default is False.
+        tolerance : float, optional
+            The relative tolerance of the adaptive sparse grid.
+            Default is 1e-3.
 
         Returns
         -------
@@ -473,10 +1161,16 @@ class UncertaintyCalculations(ParameterBase):
         required. For each of the nodes we evaluate the model and calculate the
         features, and the polynomial approximation is created from these results.
 
+        With `adaptive`, the sparse grid is refined where the contributions to
+        the mean and second moment of the model and features are largest,
+        until the estimated relative error is below `tolerance`. See
+        ``adaptive_sparse_grid``.
+
         See also
         --------
         uncertainpy.Data
         uncertainpy.Parameters
+        uncertainpy.core.UncertaintyCalculations.adaptive_sparse_grid
         """
         uncertain_parameters = self.convert_uncertain_parameters(uncertain_parameters)
 
@@ -488,16 +1182,30 @@ class UncertaintyCalculations(ParameterBase):
             quadrature_order = polynomial_order + 2
 
 
-        nodes, weights = cp.generate_quadrature(quadrature_order,
-                                                distribution,
-                                                rule="J",
-                                                sparse=True)
+        if adaptive:
+            # The number of polynomials of total order quadrature_order
+            max_evaluations = comb(quadrature_order + len(uncertain_parameters),
+                                   len(uncertain_parameters),
+                                   exact=True)
 
-        # Running the model
-        data = self.runmodel.run(nodes, uncertain_parameters)
+            nodes, weights, data, combination = \
+                self.adaptive_sparse_grid(distribution,
+                                          uncertain_parameters,
+                                          tolerance=tolerance,
+                                          max_evaluations=max_evaluations)
 
+            data.method = "polynomial chaos expansion with the adaptive pseudo-spectral method. polynomial_order={}, tolerance={}, nr_nodes={}".format(polynomial_order, tolerance, len(weights))
 
-        data.method = "polynomial chaos expansion with the pseudo-spectral method. polynomial_order={}, quadrature_order={}".format(polynomial_order, quadrature_order)
+        else:
+            nodes, weights = cp.generate_quadrature(quadrature_order,
+                                                    distribution,
+                                                    rule="J",
+                                                    sparse=True)
+
+            # Running the model
+            data = self.runmodel.run(nodes, uncertain_parameters)
+
+            data.method = "polynomial chaos expansion with the pseudo-spectral method. polynomial_order={}, quadrature_order={}".format(polynomial_order, quadrature_order)
 
         logger = get_logger(self)
 
@@ -514,8 +1222,15 @@ class UncertaintyCalculations(ParameterBase):
 
 
             if (np.all(mask) or allow_incomplete) and sum(mask) > 0:
-                U_hat[feature] = cp.fit_quadrature(P, masked_nodes,
-                                                   masked_weights, masked_evaluations)
+                if adaptive:
+                    U_hat[feature] = self.sparse_grid_projection(P,
+                                                                 nodes,
+                                                                 data[feature].evaluations,
+                                                                 mask,
+                                                                 combination)
+                else:
+                    U_hat[feature] = cp.fit_quadrature(P, masked_nodes,
+                                                       masked_weights, masked_evaluations)
             elif not allow_incomplete:
                 logger.warning("{}: not all parameter combinations give results.".format(feature) +
                                " No uncertainty quantification is performed since allow_incomplete=False")
@@ -533,7 +1248,9 @@ class UncertaintyCalculations(ParameterBase):
                                uncertain_parameters=None,
                                polynomial_order=4,
                                nr_collocation_nodes=None,
-                               allow_incomplete=True):
+                               allow_incomplete=True,
+                               sparse=None,
+                               truncation=1):
         """
         Create the polynomial approximation `U_hat` using pseudo-spectral
         projection.
@@ -549,12 +1266,26 @@ class UncertaintyCalculations(ParameterBase):
             Default is 4.
         nr_collocation_nodes : {int, None}, optional
             The number of collocation nodes to choose. If None,
-            `nr_collocation_nodes` = 2* number of expansion factors + 2.
-            Default is None.
+            `nr_collocation_nodes` = 2* number of expansion factors + 2,
+            or ``10*(nr_uncertain_parameters + 1)`` if that is lower and
+            `sparse` is used. Default is None.
         allow_incomplete : bool, optional
             If the polynomial approximation should be performed for features or
             models with incomplete evaluations.
             Default is True.
+        sparse : {None, "omp", "lars"}, optional
+            Select only the most significant polynomials with sparse
+            regression, using orthogonal matching pursuit ("omp") or
+            least-angle regression ("lars"), and leave-one-out
+            cross-validation. If None, all polynomials are used.
+            Default is None.
+        truncation : float, optional
+            The norm of the hyperbolic truncation of the polynomials, between
+            0 and 1. Polynomials with ``sum(degree**truncation)**(1/truncation)``
+            above `polynomial_order` are not used, so lower values remove
+            more of the polynomials with interactions between the uncertain
+            parameters. 1 uses all polynomials up to `polynomial_order`.
+            Default is 1.
 
         Returns
         -------
@@ -572,6 +1303,8 @@ class UncertaintyCalculations(ParameterBase):
         ValueError
             If a common multivariate distribution is given in
             Parameters.distribution and not all uncertain parameters are used.
+        ValueError
+            If `sparse` is not one of None, "omp" or "lars".
 
         Notes
         -----
@@ -608,27 +1341,44 @@ class UncertaintyCalculations(ParameterBase):
         and solve the resulting set of linear equations with Tikhonov
         regularization.
 
+        The number of polynomials, and therefore the number of collocation
+        nodes required, grows rapidly with the number of uncertain parameters.
+        With `sparse`, only the polynomials that are significant for each
+        model and feature are used, which means far fewer collocation nodes
+        are required. See ``sparse_regression``. The hyperbolic `truncation`
+        further reduces the number of polynomials to select from.
+
         See also
         --------
         uncertainpy.Data
         uncertainpy.Parameters
+        uncertainpy.core.UncertaintyCalculations.sparse_regression
         """
 
         uncertain_parameters = self.convert_uncertain_parameters(uncertain_parameters)
 
         distribution = self.create_distribution(uncertain_parameters=uncertain_parameters)
 
-        P = cp.orth_ttr(polynomial_order, distribution)
+        if sparse not in [None, "omp", "lars"]:
+            raise ValueError("sparse must be one of: None, omp or lars, not {}".format(sparse))
+
+        P = cp.orth_ttr(polynomial_order, distribution, cross_truncation=truncation)
         if nr_collocation_nodes is None:
             nr_collocation_nodes = 2*len(P) + 2
 
+            if sparse is not None:
+                nr_collocation_nodes = min(nr_collocation_nodes, 10*(len(uncertain_parameters) + 1))
+
         nodes = distribution.sample(nr_collocation_nodes, "M")
 
 
         # Running the model
         data = self.runmodel.run(nodes, uncertain_parameters)
 
-        data.method = "polynomial chaos expansion with point collocation. polynomial_order={}, nr_collocation_nodes={}".format(polynomial_order, nr_collocation_nodes)
+        if sparse is None:
+            data.method = "polynomial chaos expansion with point collocation. polynomial_order={}, nr_collocation_nodes={}".format(polynomial_order, nr_collocation_nodes)
+        else:
+            data.method = "polynomial chaos expansion with sparse point collocation. polynomial_order={}, nr_collocation_nodes={}, sparse={}, truncation={}".format(polynomial_order, nr_collocation_nodes, sparse, truncation)
 
         logger = get_logger(self)
 
@@ -643,8 +1393,16 @@ class UncertaintyCalculations(ParameterBase):
             masked_evaluations, mask, masked_nodes = self.create_masked_nodes(data, feature, nodes)
 
             if (np.all(mask) or allow_incomplete) and sum(mask) > 0:
-                U_hat[feature] = cp.fit_regression(P, masked_nodes,
-                                                   masked_evaluations)
+                if sparse is None:
+                    U_hat[feature] = cp.fit_regression(P, masked_nodes,
+                                                       masked_evaluations)
+                else:
+                    U_hat[feature], nr_terms = self.sparse_regression(P,
+                                                                      masked_nodes,
+                                                                      masked_evaluations,
+                                                                      method=sparse)
+
+                    logger.info("{}: {}/{} polynomials selected.".format(feature, nr_terms, len(P)))
             elif not allow_incomplete:
                 logger.warning("{}: not all parameter combinations give results.".format(feature) +
                                " No uncertainty quantification is performed since allow_incomplete=False")
@@ -663,7 +1421,9 @@ class UncertaintyCalculations(ParameterBase):
                                        uncertain_parameters=None,
                                        polynomial_order=4,
                                        quadrature_order=None,
-                                       allow_incomplete=True):
+                                       allow_incomplete=True,
+                                       adaptive=False,
+                                       tolerance=1e-3):
         """
         Create the polynomial approximation `U_hat` using pseudo-spectral
         projection and the Rosenblatt transformation. Works for dependend
@@ -686,6 +1446,15 @@ class UncertaintyCalculations(ParameterBase):
             If the polynomial approximation should be performed for features or
             models with incomplete evaluations.
             Default is True.
+        adaptive : bool, optional
+            If a dimension-adaptive sparse grid should be used instead of the
+            sparse grid of order `quadrature_order`. The adaptive sparse grid
+            uses at most ``comb(quadrature_order + d, d)`` nodes, the number
+            of polynomials of total order `quadrature_order` in the ``d``
+            uncertain parameters. Default is False.
+        tolerance : float, optional
+            The relative tolerance of the adaptive sparse grid.
+            Default is 1e-3.
 
         Returns
         -------
@@ -767,19 +1536,38 @@ class UncertaintyCalculations(ParameterBase):
         if quadrature_order is None:
             quadrature_order = polynomial_order + 2
 
-        nodes_R, weights_R = cp.generate_quadrature(quadrature_order,
-                                                    dist_R,
-                                                    rule="J",
-                                                    sparse=True)
+        def transformation(nodes_R):
+            return distribution.inv(dist_R.fwd(nodes_R))
 
+        if adaptive:
+            # The number of polynomials of total order quadrature_order
+            max_evaluations = comb(quadrature_order + len(uncertain_parameters),
+                                   len(uncertain_parameters),
+                                   exact=True)
 
-        nodes = distribution.inv(dist_R.fwd(nodes_R))
-        # weights = weights_R*distribution.pdf(nodes)/dist_R.pdf(nodes_R)
+            nodes_R, weights_R, data, combination = \
+                self.adaptive_sparse_grid(dist_R,
+                                          uncertain_parameters,
+                                          tolerance=tolerance,
+                                          max_evaluations=max_evaluations,
+                                          transformation=transformation)
 
-        # Running the model
-        data = self.runmodel.run(nodes, uncertain_parameters)
+            data.method = "polynomial chaos expansion with the adaptive pseudo-spectral method and the Rosenblatt transformation. polynomial_order={}, tolerance={}, nr_nodes={}".format(polynomial_order, tolerance, len(weights_R))
 
-        data.method = "polynomial chaos expansion with the pseudo-spectral method and the Rosenblatt transformation. polynomial_order={}, quadrature_order={}".format(polynomial_order, quadrature_order)
+        else:
+            nodes_R, weights_R = cp.generate_quadrature(quadrature_order,
+                                                        dist_R,
+                                                        rule="J",
+                                                        sparse=True)
+
+
+            nodes = transformation(nodes_R)
+            # weights = weights_R*distribution.pdf(nodes)/dist_R.pdf(nodes_R)
+
+            # Running the model
+            data = self.runmodel.run(nodes, uncertain_parameters)
+
+            data.method = "polynomial chaos expansion with the pseudo-spectral method and the Rosenblatt transformation. polynomial_order={}, quadrature_order={}".format(polynomial_order, quadrature_order)
 
         logger = get_logger(self)
 
@@ -806,10 +1594,17 @@ class UncertaintyCalculations(ParameterBase):
                                                  weights_R)
 
             if (np.all(mask) or allow_incomplete) and sum(mask) > 0:
-                U_hat[feature] = cp.fit_quadrature(P,
-                                                   masked_nodes,
-                                                   masked_weights,
-                                                   masked_evaluations)
+                if adaptive:
+                    U_hat[feature] = self.sparse_grid_projection(P,
+                                                                 nodes_R,
+                                                                 data[feature].evaluations,
+                                                                 mask,
+                                                                 combination)
+                else:
+                    U_hat[feature] = cp.fit_quadrature(P,
+                                                       masked_nodes,
+                                                       masked_weights,
+                                                       masked_evaluations)
             elif not allow_incomplete:
                 logger.warning("{}: not all parameter combinations give results.".format(feature) +
                                " No uncertainty quantification is performed since allow_incomplete=False")
@@ -828,7 +1623,9 @@ class UncertaintyCalculations(ParameterBase):
                                           uncertain_parameters=None,
                                           polynomial_order=4,
                                           nr_collocation_nodes=None,
-                                          allow_incomplete=True):
+                                          allow_incomplete=True,
+                                          sparse=None,
+                                          truncation=1):
         """
         Create the polynomial approximation `U_hat` using pseudo-spectral
         projection and the Rosenblatt transformation. Works for dependend
@@ -845,12 +1642,26 @@ class UncertaintyCalculations(ParameterBase):
             Default is 4.
         nr_collocation_nodes : {int, None}, optional
             The number of collocation nodes to choose. If None,
-            `nr_collocation_nodes` = 2* number of expansion factors + 2.
-            Default is None.
+            `nr_collocation_nodes` = 2* number of expansion factors + 2,
+            or ``10*(nr_uncertain_parameters + 1)`` if that is lower and
+            `sparse` is used. Default is None.
         allow_incomplete : bool, optional
             If the polynomial approximation should be performed for features or
             models with incomplete evaluations.
             Default is True.
+        sparse : {None, "omp", "lars"}, optional
+            Select only the most significant polynomials with sparse
+            regression, using orthogonal matching pursuit ("omp") or
+            least-angle regression ("lars"), and leave-one-out
+            cross-validation. If None, all polynomials are used.
+            Default is None.
+        truncation : float, optional
+            The norm of the hyperbolic truncation of the polynomials, between
+            0 and 1. Polynomials with ``sum(degree**truncation)**(1/truncation)``
+            above `polynomial_order` are not used, so lower values remove
+            more of the polynomials with interactions between the uncertain
+            parameters. 1 uses all polynomials up to `polynomial_order`.
+            Default is 1.
 
         Returns
         -------
@@ -868,6 +1679,8 @@ class UncertaintyCalculations(ParameterBase):
         ValueError
             If a common multivariate distribution is given in
             Parameters.distribution and not all uncertain parameters are used.
+        ValueError
+            If `sparse` is not one of None, "omp" or "lars".
 
         Notes
         -----
@@ -906,10 +1719,14 @@ class UncertaintyCalculations(ParameterBase):
         feature in parallel. We solve the resulting set of linear equations
         with Tikhonov regularization.
 
+        With `sparse`, only the polynomials that are significant for each
+        model and feature are used, see ``sparse_regression``.
+
         See also
         --------
         uncertainpy.Data
         uncertainpy.Parameters
+        uncertainpy.core.UncertaintyCalculations.sparse_regression
         """
         uncertain_parameters = self.convert_uncertain_parameters(uncertain_parameters)
 
@@ -924,18 +1741,27 @@ class UncertaintyCalculations(ParameterBase):
 
         dist_R = cp.J(*dist_R)
 
-        P = cp.orth_ttr(polynomial_order, dist_R)
+        if sparse not in [None, "omp", "lars"]:
+            raise ValueError("sparse must be one of: None, omp or lars, not {}".format(sparse))
+
+        P = cp.orth_ttr(polynomial_order, dist_R, cross_truncation=truncation)
 
         if nr_collocation_nodes is None:
             nr_collocation_nodes = 2*len(P) + 2
 
+            if sparse is not None:
+                nr_collocation_nodes = min(nr_collocation_nodes, 10*(len(uncertain_parameters) + 1))
+
         nodes_R = dist_R.sample(nr_collocation_nodes, "M")
         nodes = distribution.inv(dist_R.fwd(nodes_R))
 
         # Running the model
         data = self.runmodel.run(nodes, uncertain_parameters)
 
-        data.method = "polynomial chaos expansion with point collocation and the Rosenblatt transformation. polynomial_order={}, nr_collocation_nodes={}".format(polynomial_order, nr_collocation_nodes)
+        if sparse is None:
+            data.method = "polynomial chaos expansion with point collocation and the Rosenblatt transformation. polynomial_order={}, nr_collocation_nodes={}".format(polynomial_order, nr_collocation_nodes)
+        else:
+            data.method = "polynomial chaos expansion with sparse point collocation and the Rosenblatt transformation. polynomial_order={}, nr_collocation_nodes={}, sparse={}, truncation={}".format(polynomial_order, nr_collocation_nodes, sparse, truncation)
 
         logger = get_logger(self)
 
@@ -950,9 +1776,17 @@ class UncertaintyCalculations(ParameterBase):
             masked_evaluations, mask, masked_nodes = self.create_masked_nodes(data, feature, nodes_R)
 
             if (np.all(mask) or allow_incomplete) and sum(mask) > 0:
-                U_hat[feature] = cp.fit_regression(P,
-                                                   masked_nodes,
-                                                   masked_evaluations)
+                if sparse is None:
+                    U_hat[feature] = cp.fit_regression(P,
+                                                       masked_nodes,
+                                                       masked_evaluations)
+                else:
+                    U_hat[feature], nr_terms = self.sparse_regression(P,
+                                                                      masked_nodes,
+                                                                      masked_evaluations,
+                                                                      method=sparse)
+
+                    logger.info("{}: {}/{} polynomials selected.".format(feature, nr_terms, len(P)))
             elif not allow_incomplete:
                 logger.warning("{}: not all parameter combinations give results.".format(feature) +
                                " No uncertainty quantification is performed since allow_incomplete=False")
@@ -1014,42 +1848,246 @@ class UncertaintyCalculations(ParameterBase):
             14. ``data["model/features"].sobol_first_average``, if more than 1 parameter
             15. ``data["model/features"].sobol_total_average``, if more than 1 parameter
 
+        For independent uncertain parameters the mean, variance and Sobol
+        indices are calculated directly from the coefficients of the
+        polynomial approximation (see ``PCE_statistics``). The percentiles are
+        calculated from the same samples for the model and all features.
+
         See also
         --------
         uncertainpy.Data
+        uncertainpy.core.UncertaintyCalculations.PCE_statistics
         """
 
-        if len(data.uncertain_parameters) == 1:
+        sensitivity = len(data.uncertain_parameters) > 1
+
+        if not sensitivity:
             logger = get_logger(self)
             logger.info("Only 1 uncertain parameter. Sensitivities are not calculated")
 
-        U_mc = {}
+        dependent = self.dependent(distribution)
+
+        # The same samples, and the same evaluated polynomial terms,
+        # are used for all features
+        samples = np.reshape(distribution.sample(nr_samples, "M"), (len(distribution), -1))
+        terms = {}
+
         for feature in tqdm(data,
                             desc="Calculating statistics from PCE",
                             total=len(data)):
             if feature in U_hat:
-                data[feature].mean = cp.E(U_hat[feature], distribution)
-                data[feature].variance = cp.Var(U_hat[feature], distribution)
+                if dependent:
+                    data[feature].mean = cp.E(U_hat[feature], distribution)
+                    data[feature].variance = cp.Var(U_hat[feature], distribution)
 
-                samples = distribution.sample(nr_samples, "M")
+                    if sensitivity:
+                        data[feature].sobol_first = cp.Sens_m(U_hat[feature], distribution)
+                        data[feature].sobol_total = cp.Sens_t(U_hat[feature], distribution)
+                else:
+                    mean, variance, sobol_first, sobol_total = \
+                        self.PCE_statistics(U_hat[feature], distribution, sensitivity=sensitivity)
 
-                if len(data.uncertain_parameters) > 1:
-                    U_mc[feature] = U_hat[feature](*samples)
+                    data[feature].mean = mean
+                    data[feature].variance = variance
 
-                    data[feature].sobol_first = cp.Sens_m(U_hat[feature], distribution)
-                    data[feature].sobol_total = cp.Sens_t(U_hat[feature], distribution)
-                    data = self.average_sensitivity(data, sensitivity="sobol_first")
-                    data = self.average_sensitivity(data, sensitivity="sobol_total")
+                    if sensitivity:
+                        data[feature].sobol_first = sobol_first
+                        data[feature].sobol_total = sobol_total
 
-                else:
-                    U_mc[feature] = U_hat[feature](samples)
+                exponents, coefficients, shape = self.PCE_coefficients(U_hat[feature], len(distribution))
+
+                key = exponents.tobytes() + str(exponents.shape).encode("utf-8")
+                if key not in terms:
+                    terms[key] = self.PCE_terms(exponents, samples)
+
+                U_mc = coefficients.T.dot(terms[key])
 
-                data[feature].percentile_5 = np.percentile(U_mc[feature], 5, -1)
-                data[feature].percentile_95 = np.percentile(U_mc[feature], 95, -1)
+                percentiles = np.percentile(U_mc, [5, 95], axis=-1)
+                data[feature].percentile_5 = percentiles[0].reshape(shape)
+                data[feature].percentile_95 = percentiles[1].reshape(shape)
+
+        if sensitivity:
+            data = self.average_sensitivity(data, sensitivity="sobol_first")
+            data = self.average_sensitivity(data, sensitivity="sobol_total")
 
         return data
 
 
+    def PCE_terms(self, exponents, samples):
+        """
+        Evaluate the terms of a polynomial approximation for samples of the
+        uncertain parameters.
+
+        Parameters
+        ----------
+        exponents : array
+            The exponents of each term, with shape
+            ``(nr_terms, nr_uncertain_parameters)``.
+        samples : array
+            The samples of the uncertain parameters, with shape
+            ``(nr_uncertain_parameters, nr_samples)``.
+
+        Returns
+        -------
+        terms : array
+            The value of each term for each sample, with shape
+            ``(nr_terms, nr_samples)``.
+
+        Notes
+        -----
+        The powers of the samples are calculated once for each uncertain
+        parameter, and the terms are multiplied together one uncertain
+        parameter at the time, so no array larger than the terms is created.
+        """
+        terms = np.ones((len(exponents), samples.shape[1]))
+
+        for exponent, sample in zip(exponents.T, samples):
+            # sample**k for each k up to the largest exponent
+            powers = sample**np.arange(np.max(exponent) + 1)[:, np.newaxis]
+
+            terms *= powers[exponent]
+
+        return terms
+
+
+    def PCE_coefficients(self, U_hat, nr_uncertain_parameters):
+        """
+        Get the exponents and coefficients of the terms of a polynomial
+        approximation.
+
+        Parameters
+        ----------
+        U_hat : numpoly.ndpoly
+            The polynomial approximation.
+        nr_uncertain_parameters : int
+            Number of uncertain parameters.
+
+        Returns
+        -------
+        exponents : array
+            The exponents of each term, with shape
+            ``(nr_terms, nr_uncertain_parameters)``.
+        coefficients : array
+            The coefficients of each term, with shape
+            ``(nr_terms, nr_outputs)``.
+        shape : tuple
+            The shape of the polynomial approximation.
+        """
+        U_hat = numpoly.set_dimensions(numpoly.aspolynomial(U_hat), nr_uncertain_parameters)
+
+        # The names are sorted as strings when dimensions are added,
+        # so q10 comes before q2. Sort the exponents by the dimension instead.
+        order = sorted(range(len(U_hat.names)), key=lambda i: (len(U_hat.names[i]), U_hat.names[i]))
+
+        exponents = np.asarray(U_hat.exponents, dtype=int)[:, order]
+        coefficients = np.array(U_hat.coefficients, dtype=float).reshape(len(exponents), -1)
+
+        return exponents, coefficients, U_hat.shape
+
+
+    def PCE_statistics(self, U_hat, distribution, sensitivity=True):
+        r"""
+        Calculate the mean, variance and Sobol indices of a polynomial
+        approximation directly from the coefficients of the polynomial, for
+        independent uncertain parameters.
+
+        Parameters
+        ----------
+        U_hat : numpoly.ndpoly
+            The polynomial approximation.
+        distribution : chaospy.Dist
+            The independent multivariate distribution for the uncertain
+            parameters.
+        sensitivity : bool, optional
+            If the first and total order Sobol indices should be calculated.
+            Default is True.
+
+        Returns
+        -------
+        mean : array
+            The mean of the polynomial approximation.
+        variance : array
+            The variance of the polynomial approximation.
+        sobol_first : {array, None}
+            The first order Sobol indices for each uncertain parameter. None
+            if `sensitivity` is False.
+        sobol_total : {array, None}
+            The total order Sobol indices for each uncertain parameter. None
+            if `sensitivity` is False.
+
+        Notes
+        -----
+        The polynomial is written as a sum of terms
+        :math:`c_k \prod_j x_j^{a_{kj}}`. Since the uncertain parameters are
+        independent, the expectation of the product of two terms is the
+        product of the raw moments :math:`E[x_j^{a_{kj} + a_{lj}}]` of each
+        uncertain parameter. The variance of the polynomial, and of the
+        conditional expectations used in the first and total order Sobol
+        indices, are quadratic forms of the coefficients with the
+        covariance matrix of the terms, so all outputs are calculated at once.
+        This gives the same results as ``chaospy.E``, ``chaospy.Var``,
+        ``chaospy.Sens_m`` and ``chaospy.Sens_t``.
+        """
+        nr_uncertain_parameters = len(distribution)
+        exponents, coefficients, shape = self.PCE_coefficients(U_hat, nr_uncertain_parameters)
+
+        # Raw moments E[x_j^a] of each uncertain parameter
+        moments = []
+        for j in range(nr_uncertain_parameters):
+            max_exponent = 2*np.max(exponents[:, j])
+
+            moment_exponents = np.zeros((nr_uncertain_parameters, max_exponent + 1), dtype=int)
+            moment_exponents[j] = np.arange(max_exponent + 1)
+
+            moments.append(np.asarray(distribution.mom(moment_exponents), dtype=float).ravel())
+
+        # Expectation of each term (for each uncertain parameter),
+        # and of the product of each pair of terms
+        first = np.array([moments[j][exponents[:, j]]
+                          for j in range(nr_uncertain_parameters)])
+        second = np.array([moments[j][exponents[:, j, np.newaxis] + exponents[np.newaxis, :, j]]
+                           for j in range(nr_uncertain_parameters)])
+
+        def quadratic_form(covariance, coefficients):
+            return np.sum(covariance.dot(coefficients)*coefficients, axis=0)
+
+        term_mean = np.prod(first, axis=0)
+        term_covariance = np.prod(second, axis=0) - np.outer(term_mean, term_mean)
+
+        mean = term_mean.dot(coefficients)
+        variance = quadratic_form(term_covariance, coefficients)
+
+        if not sensitivity:
+            return mean.reshape(shape), variance.reshape(shape), None, None
+
+        sobol_first = np.zeros((nr_uncertain_parameters,) + variance.shape)
+        sobol_total = np.zeros((nr_uncertain_parameters,) + variance.shape)
+
+        valid = variance != 0
+
+        for i in range(nr_uncertain_parameters):
+            others = [j for j in range(nr_uncertain_parameters) if j != i]
+
+            # Var(E[U | x_i]), the other uncertain parameters are integrated out
+            conditional = coefficients*np.prod(first[others], axis=0)[:, np.newaxis]
+            covariance = second[i] - np.outer(first[i], first[i])
+            variance_first = quadratic_form(covariance, conditional)
+
+            # Var(E[U | all except x_i]), x_i is integrated out
+            conditional = coefficients*first[i][:, np.newaxis]
+            other_mean = np.prod(first[others], axis=0)
+            covariance = np.prod(second[others], axis=0) - np.outer(other_mean, other_mean)
+            variance_total = quadratic_form(covariance, conditional)
+
+            sobol_first[i, valid] = variance_first[valid]/variance[valid]
+            sobol_total[i, valid] = (variance[valid] - variance_total[valid])/variance[valid]
+
+        sobol_shape = (nr_uncertain_parameters,) + shape
+
+        return (mean.reshape(shape), variance.reshape(shape),
+                sobol_first.reshape(sobol_shape), sobol_total.reshape(sobol_shape))
+
+
 
     @property
     def create_PCE_custom(self, uncertain_parameters=None, **kwargs):
@@ -1194,6 +2232,10 @@ class UncertaintyCalculations(ParameterBase):
                          nr_pc_mc_samples=10**4,
                          allow_incomplete=True,
                          seed=None,
+                         adaptive=False,
+                         tolerance=1e-3,
+                         sparse=None,
+                         truncation=1,
                          **custom_kwargs):
         """
         Perform an uncertainty quantification and sensitivity analysis
@@ -1237,6 +2279,24 @@ class UncertaintyCalculations(ParameterBase):
             Default is True.
         seed : int, optional
             Set a random seed. If None, no seed is set. Default is None.
+        adaptive : bool, optional
+            If a dimension-adaptive sparse grid should be used, if
+            pseudo-spectral projection is used. The adaptive sparse grid uses
+            at most ``comb(quadrature_order + d, d)`` nodes, the number of
+            polynomials of total order `quadrature_order` in the ``d``
+            uncertain parameters. Default is False.
+        tolerance : float, optional
+            The relative tolerance of the adaptive sparse grid.
+            Default is 1e-3.
+        sparse : {None, "omp", "lars"}, optional
+            Select only the most significant polynomials with sparse
+            regression, if point collocation is used. "omp" is orthogonal
+            matching pursuit and "lars" is least-angle regression. If None,
+            all polynomials are used. Default is None.
+        truncation : float, optional
+            The norm of the hyperbolic truncation of the polynomials, if point
+            collocation is used. 1 uses all polynomials up to
+            `polynomial_order`. Default is 1.
 
         Returns
         -------
@@ -1345,13 +2405,17 @@ class UncertaintyCalculations(ParameterBase):
                     self.create_PCE_collocation_rosenblatt(uncertain_parameters=uncertain_parameters,
                                                            polynomial_order=polynomial_order,
                                                            nr_collocation_nodes=nr_collocation_nodes,
-                                                           allow_incomplete=allow_incomplete)
+                                                           allow_incomplete=allow_incomplete,
+                                                           sparse=sparse,
+                                                           truncation=truncation)
             else:
                 U_hat, distribution, data = \
                     self.create_PCE_collocation(uncertain_parameters=uncertain_parameters,
                                                 polynomial_order=polynomial_order,
                                                 nr_collocation_nodes=nr_collocation_nodes,
-                                                allow_incomplete=allow_incomplete)
+                                                allow_incomplete=allow_incomplete,
+                                                sparse=sparse,
+                                                truncation=truncation)
 
         elif method == "spectral":
             if rosenblatt:
@@ -1359,13 +2423,17 @@ class UncertaintyCalculations(ParameterBase):
                     self.create_PCE_spectral_rosenblatt(uncertain_parameters=uncertain_parameters,
                                                         polynomial_order=polynomial_order,
                                                         quadrature_order=quadrature_order,
-                                                        allow_incomplete=allow_incomplete)
+                                                        allow_incomplete=allow_incomplete,
+                                                        adaptive=adaptive,
+                                                        tolerance=tolerance)
             else:
                 U_hat, distribution, data = \
                     self.create_PCE_spectral(uncertain_parameters=uncertain_parameters,
                                              polynomial_order=polynomial_order,
                                              quadrature_order=quadrature_order,
-                                             allow_incomplete=allow_incomplete)
+                                             allow_incomplete=allow_incomplete,
+                                             adaptive=adaptive,
+                                             tolerance=tolerance)
 
         elif method == "custom":
             U_hat, distribution, data = \
@@ -1391,7 +2459,10 @@ class UncertaintyCalculations(ParameterBase):
                     uncertain_parameters=None,
                     nr_samples=10**4,
                     seed=None,
-                    allow_incomplete=True):
+                    allow_incomplete=True,
+                    streaming=False,
+                    keep_evaluations=True,
+                    nr_bootstrap=0):
         """
         Perform an uncertainty quantification using the quasi-Monte Carlo method.
 
@@ -1411,6 +2482,18 @@ class UncertaintyCalculations(ParameterBase):
             If the uncertainty quantification should be performed for features
             or models with incomplete evaluations.
             Default is True.
+        streaming : bool, optional
+            If the statistical metrics should be updated as each model
+            evaluation arrives, instead of after all model evaluations are
+            performed. See ``monte_carlo_streaming``. Default is False.
+        keep_evaluations : bool, optional
+            If the model and feature evaluations should be stored in `data`
+            when `streaming` is True. Setting it to False reduces the memory
+            usage from growing with the number of samples. Default is True.
+        nr_bootstrap : int, optional
+            Number of bootstrap resamples used to calculate the 95% confidence
+            intervals of the Sobol indices. No confidence intervals are
+            calculated if 0, or if `streaming` is True. Default is 0.
 
         Returns
         -------
@@ -1428,7 +2511,8 @@ class UncertaintyCalculations(ParameterBase):
         -----
         The returned `data` should contain the following:
 
-            1. ``data["model/features"].evaluations``
+            1. ``data["model/features"].evaluations``, unless `keep_evaluations`
+               is False
             2. ``data["model/features"].time``
             3. ``data["model/features"].labels``
             4. ``data.model_name``
@@ -1443,6 +2527,8 @@ class UncertaintyCalculations(ParameterBase):
             13. ``data["model/features"].sobol_total``, if more than 1 parameter
             14. ``data["model/features"].sobol_first_average``, if more than 1 parameter
             15. ``data["model/features"].sobol_total_average``, if more than 1 parameter
+            16. ``data["model/features"].sobol_first_conf``, if more than 1 parameter and `nr_bootstrap` > 0
+            17. ``data["model/features"].sobol_total_conf``, if more than 1 parameter and `nr_bootstrap` > 0
 
 
         In the quasi-Monte Carlo method we quasi-randomly draw
@@ -1499,6 +2585,21 @@ class UncertaintyCalculations(ParameterBase):
 
         nodes = distribution.inv(dist_R.fwd(nodes_R.transpose()))
 
+        if streaming:
+            if nr_bootstrap > 0:
+                logger = get_logger(self)
+                logger.warning("Bootstrap confidence intervals require all evaluations, " +
+                               "and are not calculated when streaming=True.")
+
+            data = self.monte_carlo_streaming(nodes,
+                                              uncertain_parameters,
+                                              allow_incomplete=allow_incomplete,
+                                              keep_evaluations=keep_evaluations)
+
+            data.method = "monte carlo method. nr_samples={}".format(nr_samples)
+            data.seed = seed
+
+            return data
 
         data = self.runmodel.run(nodes, uncertain_parameters)
 
@@ -1532,14 +2633,15 @@ class UncertaintyCalculations(ParameterBase):
                     # Results cannot be removed when calculating the sensitivity.
                     # Instead NaN results are set to the mean.
                     # see https://github.com/SALib/SALib/issues/134
-                    _, mask = self.create_mask(data[feature].evaluations)
-                    masked_mean_evaluations = data[feature].evaluations
-
-                    # masked_mean_evaluations[~mask] = data[feature].mean
-                    indices = np.where(mask == 0)[0]
+                    masked_evaluations, mask = self.create_mask(data[feature].evaluations)
 
-                    for i in indices:
-                        masked_mean_evaluations[i] = data[feature].mean
+                    if np.all(mask):
+                        masked_mean_evaluations = masked_evaluations
+                    else:
+                        masked_mean_evaluations = np.empty((len(mask),) + np.shape(data[feature].mean))
+                        masked_mean_evaluations[~mask] = data[feature].mean
+                        if np.any(mask):
+                            masked_mean_evaluations[mask] = masked_evaluations
 
                     if not np.all(mask):
                         logger.warning("{}: only yields ".format(feature) +
@@ -1557,6 +2659,14 @@ class UncertaintyCalculations(ParameterBase):
                     data = self.average_sensitivity(data, sensitivity="sobol_first")
                     data = self.average_sensitivity(data, sensitivity="sobol_total")
 
+                    if nr_bootstrap > 0:
+                        sobol_first_conf, sobol_total_conf = self.mc_bootstrap_sobol(masked_mean_evaluations,
+                                                                                     len(uncertain_parameters),
+                                                                                     nr_sobol_samples,
+                                                                                     nr_bootstrap=nr_bootstrap)
+                        data[feature].sobol_first_conf = sobol_first_conf
+                        data[feature].sobol_total_conf = sobol_total_conf
+
             elif not allow_incomplete:
                 logger.warning("{}: not all parameter combinations give results.".format(feature) +
                                " No uncertainty quantification is performed since allow_incomplete=False")
@@ -1571,6 +2681,205 @@ class UncertaintyCalculations(ParameterBase):
         return data
 
 
+    def monte_carlo_streaming(self,
+                              nodes,
+                              uncertain_parameters,
+                              allow_incomplete=True,
+                              keep_evaluations=True):
+        """
+        Evaluate the model and features for the nodes created by Saltelli's
+        sampling scheme, and update the statistical metrics of the
+        quasi-Monte Carlo method as each model evaluation arrives.
+
+        Parameters
+        ----------
+        nodes : array
+            The nodes created by Saltelli's sampling scheme, in the order
+            created by ``SALib.sample.saltelli.sample``.
+        uncertain_parameters : list
+            A list of the names of all uncertain parameters.
+        allow_incomplete : bool, optional
+            If the uncertainty quantification should be performed for features
+            or models with incomplete evaluations.
+            Default is True.
+        keep_evaluations : bool, optional
+            If the model and feature evaluations should be stored in `data`.
+            Default is True.
+
+        Returns
+        -------
+        data : Data
+            A data object with the calculated statistical metrics, and the
+            model and feature evaluations if `keep_evaluations` is True.
+
+        Notes
+        -----
+        The mean and variance are calculated with Welford's algorithm, the
+        percentiles are estimated with the P-squared algorithm, and the Sobol
+        indices are accumulated for each sample block, so only the current
+        model evaluation needs to be kept in memory. The mean and variance are
+        equal to those calculated by ``monte_carlo`` with ``streaming=False``,
+        while the percentiles are approximations.
+
+        Contrary to ``monte_carlo`` with ``streaming=False``, sample blocks
+        with numpy.nan evaluations are not used when calculating the
+        Sobol indices, instead of setting the numpy.nan evaluations to the mean.
+
+        Model and features that are interpolated are interpolated at the time
+        points of the first evaluation, instead of the evaluation with the
+        greatest number of time points.
+
+        See also
+        --------
+        uncertainpy.core.streaming.MonteCarloStatistics
+        uncertainpy.core.RunModel.imap_nodes
+        """
+        logger = get_logger(self)
+
+        data = Data(logger_level=self._logger_level)
+        data.uncertain_parameters = uncertain_parameters
+        data.model_name = self.model.name
+        data.model_ignore = self.model.ignore
+
+        statistics = {}
+        interpolate = {}
+
+        # Failed results before the first result that did not fail
+        pending = []
+
+        for i, result in enumerate(self.runmodel.imap_nodes(nodes, uncertain_parameters)):
+            if self.runmodel.failed(result):
+                data.failed.append("Node {}: {}".format(i, result[self.model.name]["failed"]))
+
+            # Set up the model and features from the first result that did
+            # not fail
+            if not statistics:
+                if self.runmodel.failed(result) and i < len(nodes.T) - 1:
+                    pending.append(result)
+                    continue
+
+                for feature in result:
+                    data.add_features(feature)
+
+                    if feature == self.model.name:
+                        data[feature]["labels"] = self.model.labels
+                    elif feature in self.features.labels:
+                        data[feature]["labels"] = self.features.labels[feature]
+
+                    interpolate[feature] = False
+                    if feature in self.features.interpolate or \
+                            (feature == self.model.name and self.model.interpolate and not self.model.ignore):
+                        if np.ndim(result[feature]["values"]) >= 3:
+                            logger.error("{feature}:".format(feature=feature)
+                                         + " no support for >= 3D interpolation implemented")
+                        elif np.ndim(result[feature]["values"]) == 0:
+                            logger.warning("{feature}: ".format(feature=feature) +
+                                           "returns a 0D result. No interpolation is performed.")
+                        else:
+                            interpolate[feature] = True
+
+                    data[feature].time = result[feature]["time"]
+
+                    if keep_evaluations:
+                        data[feature].evaluations = []
+
+                    if feature == self.model.name and self.model.ignore:
+                        statistics[feature] = None
+                    else:
+                        statistics[feature] = MonteCarloStatistics(len(uncertain_parameters))
+
+            for evaluation in pending + [result]:
+                for feature in data:
+                    values = evaluation[feature]["values"]
+
+                    # Results evaluated on a common time grid are already regular
+                    if interpolate[feature] and "interpolation" in evaluation[feature]:
+                        interpolation = evaluation[feature]["interpolation"]
+
+                        if interpolation is None:
+                            values = np.nan
+
+                            if not self.runmodel.failed(evaluation):
+                                logger.error("{}: Unknown error while creating the interpolation".format(feature))
+
+                        elif isinstance(interpolation, six.string_types):
+                            values = np.nan
+                            logger.error(interpolation)
+
+                        else:
+                            values = interpolation(data[feature].time)
+
+                    if keep_evaluations:
+                        data[feature].evaluations.append(values)
+
+                    if statistics[feature] is not None:
+                        try:
+                            statistics[feature].update(values)
+                        except ValueError:
+                            statistics[feature] = None
+                            data.error.append(feature)
+
+                            if feature == self.model.name:
+                                msg = "{}: The number of points varies between evaluations. ".format(feature) + \
+                                      "Make sure {} returns the same number of points with different parameters, ".format(feature) + \
+                                      "implement Model.postprocess, or try to set interpolate=True."
+                            else:
+                                msg = "{}: The number of points varies between evaluations. ".format(feature) + \
+                                      "Make sure {} returns the same number of points, ".format(feature) + \
+                                      "or try add {} to interpolate=[].".format(feature)
+
+                            logger.error(msg)
+
+            pending = []
+
+        for feature in data:
+            if statistics[feature] is None:
+                continue
+
+            feature_statistics = statistics[feature]
+            complete = feature_statistics.nr_incomplete == 0
+
+            if (complete or allow_incomplete) and feature_statistics.statistics.count > 0:
+                data[feature].mean = feature_statistics.statistics.mean
+                data[feature].variance = feature_statistics.statistics.variance
+
+                data[feature].percentile_5 = feature_statistics.percentile_5.value
+                data[feature].percentile_95 = feature_statistics.percentile_95.value
+
+                if feature_statistics.sobol is not None and feature_statistics.sobol.count > 0:
+                    if feature_statistics.nr_incomplete_blocks > 0:
+                        nr_blocks = feature_statistics.sobol.count + feature_statistics.nr_incomplete_blocks
+                        logger.warning("{}: only yields ".format(feature) +
+                                       "results for {}/{} ".format(feature_statistics.sobol.count, nr_blocks) +
+                                       "sample blocks. " +
+                                       "Sample blocks with numpy.nan results are not used when calculating the Sobol indices. " +
+                                       "This might affect the Sobol indices.")
+
+                    sobol_first, sobol_total = feature_statistics.sobol.sobol()
+
+                    data[feature].sobol_first = sobol_first
+                    data[feature].sobol_total = sobol_total
+                    data = self.average_sensitivity(data, sensitivity="sobol_first")
+                    data = self.average_sensitivity(data, sensitivity="sobol_total")
+
+            elif not allow_incomplete:
+                logger.warning("{}: not all parameter combinations give results.".format(feature) +
+                               " No uncertainty quantification is performed since allow_incomplete=False")
+
+            else:
+                logger.warning("{}: not all parameter combinations give results.".format(feature))
+
+            if not complete:
+                data.incomplete.append(feature)
+
+        if data.failed:
+            logger.warning("{} of {} model evaluations failed, and the model and all features "
+                           "are set to numpy.nan for these evaluations. "
+                           "See data.failed.".format(len(data.failed), len(nodes.T)))
+
+        return data
+
+
     def separate_output_values(self, evaluations, nr_uncertain_parameters, nr_samples):
         """
         Notes
@@ -1595,26 +2904,30 @@ class UncertaintyCalculations(ParameterBase):
         B : array_like
             The B sample matrix from saltellie et. al. 2010.
         AB : array_like
-            The AB sample matrix from saltellie et. al. 2010.
+            The AB sample matrix from saltellie et. al. 2010, with shape
+            ``(nr_samples, nr_uncertain_parameters, ...)``.
 
         Notes
         -----
+        `A`, `B` and `AB` are views of `evaluations` if `evaluations` is a
+        contiguous numpy array, so no evaluations are copied.
+
         Adapted from SALib/analyze/sobol.py:
 
         https://github.com/SALib/SALib/blob/master/SALib/analyze/sobol.py
         """
 
-        evaluations = np.array(evaluations)
+        evaluations = np.asarray(evaluations)
 
-        shape = (nr_samples, nr_uncertain_parameters) + evaluations[0].shape
         step = nr_uncertain_parameters + 2
-        AB = np.zeros(shape)
 
-        A = evaluations[0:evaluations.shape[0]:step]
-        B = evaluations[(step - 1):evaluations.shape[0]:step]
+        # View the evaluations as (samples, step, time), where each row contains
+        # A, AB for each parameter and B. Reshaping does not copy the evaluations.
+        blocks = evaluations.reshape((nr_samples, step) + evaluations.shape[1:])
 
-        for i in range(nr_uncertain_parameters):
-            AB[:, i] = evaluations[(i + 1):evaluations.shape[0]:step]
+        A = blocks[:, 0]
+        B = blocks[:, step - 1]
+        AB = blocks[:, 1:step - 1]
 
         return A, B, AB
 
@@ -1640,18 +2953,151 @@ class UncertaintyCalculations(ParameterBase):
         sobol_total : list
             The total order Sobol indices for each uncertain parameter.
         """
-        sobol_first = [0]*nr_uncertain_parameters
-        sobol_total = [0]*nr_uncertain_parameters
-
         A, B, AB = self.separate_output_values(evaluations, nr_uncertain_parameters, nr_samples)
 
-        for i in range(nr_uncertain_parameters):
-            sobol_first[i] = first_order(A, AB[:, i], B)
-            sobol_total[i] = total_order(A, AB[:, i], B)
+        # A constant output has no variance, so all Sobol indices are zero
+        if np.ptp(np.concatenate([A, B])) == 0:
+            shape = (nr_uncertain_parameters,) + A.shape[1:]
+            return list(np.zeros(shape)), list(np.zeros(shape))
+
+        sobol_first, sobol_total = self.sobol_estimators(A, B, AB)
+
+        return list(sobol_first), list(sobol_total)
+
+
+    def sobol_estimators(self, A, B, AB, axis=0):
+        """
+        Calculate the first and total order Sobol indices for all uncertain
+        parameters at once.
+
+        Parameters
+        ----------
+        A : array_like
+            The A sample matrix from saltellie et. al. 2010.
+        B : array_like
+            The B sample matrix from saltellie et. al. 2010.
+        AB : array_like
+            The AB sample matrix from saltellie et. al. 2010, with the
+            uncertain parameters along the axis after `axis`.
+        axis : int, optional
+            The axis of the samples. Default is 0.
+
+        Returns
+        -------
+        sobol_first : array
+            The first order Sobol indices, with the uncertain parameters along
+            `axis`.
+        sobol_total : array
+            The total order Sobol indices, with the uncertain parameters along
+            `axis`.
+
+        Notes
+        -----
+        Uses the same estimators as ``SALib.analyze.sobol.first_order`` and
+        ``SALib.analyze.sobol.total_order``, vectorized over the uncertain
+        parameters.
+        """
+        A = np.expand_dims(A, axis + 1)
+        B = np.expand_dims(B, axis + 1)
+
+        variance = np.var(np.concatenate([A, B], axis=axis), axis=axis)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sobol_first = np.mean(B*(AB - A), axis=axis)/variance
+            sobol_total = 0.5*np.mean((A - AB)**2, axis=axis)/variance
 
         return sobol_first, sobol_total
 
 
+    def mc_bootstrap_sobol(self,
+                           evaluations,
+                           nr_uncertain_parameters,
+                           nr_samples,
+                           nr_bootstrap=100,
+                           confidence_level=0.95):
+        """
+        Calculate bootstrap confidence intervals of the Sobol indices.
+
+        Parameters
+        ----------
+        evaluations : array_like
+            The model evaluations, evaluated for the samples created by
+            SALIB.sample.saltelli.
+        nr_uncertain_parameters : int
+            Number of uncertain parameters.
+        nr_samples : int
+            Number of samples used in the Monte Carlo sampling.
+        nr_bootstrap : int, optional
+            Number of bootstrap resamples. Default is 100.
+        confidence_level : float, optional
+            The confidence level of the confidence intervals. Default is 0.95.
+
+        Returns
+        -------
+        sobol_first_conf : list
+            The confidence interval (half width) of the first order Sobol
+            indices for each uncertain parameter.
+        sobol_total_conf : list
+            The confidence interval (half width) of the total order Sobol
+            indices for each uncertain parameter.
+
+        Notes
+        -----
+        All bootstrap resamples are evaluated at once. Each resample is
+        represented by the number of times each sample is drawn, so the
+        estimators of all resamples are calculated as a single weighted sum
+        over the samples, without copying the resampled evaluations.
+        The confidence intervals are calculated as in ``SALib.analyze.sobol``,
+        from the standard deviation of the Sobol indices of the resamples.
+        """
+        A, B, AB = self.separate_output_values(evaluations, nr_uncertain_parameters, nr_samples)
+
+        if np.ptp(np.concatenate([A, B])) == 0:
+            shape = (nr_uncertain_parameters,) + A.shape[1:]
+            return list(np.zeros(shape)), list(np.zeros(shape))
+
+        z = scipy.stats.norm.ppf(0.5 + confidence_level/2.)
+
+        resamples = np.random.randint(nr_samples, size=(nr_bootstrap, nr_samples))
+
+        # The number of times each sample is drawn in each resample, so the
+        # mean over a resample is a weighted mean over the samples
+        offsets = nr_samples*np.arange(nr_bootstrap).reshape(-1, 1)
+        counts = np.bincount((resamples + offsets).ravel(), minlength=nr_bootstrap*nr_samples)
+        weights = counts.reshape(nr_bootstrap, nr_samples)/float(nr_samples)
+
+        shape = A.shape[1:]
+        A = A.reshape(nr_samples, 1, -1)
+        B = B.reshape(nr_samples, 1, -1)
+        AB = AB.reshape(nr_samples, nr_uncertain_parameters, -1)
+
+        # Center the evaluations to reduce round-off errors in the variance
+        center = np.mean(np.concatenate([A, B]), axis=0)
+        A_centered = (A - center)[:, 0]
+        B_centered = (B - center)[:, 0]
+
+        mean = weights.dot(A_centered + B_centered)/2.
+        mean_squared = weights.dot(A_centered**2 + B_centered**2)/2.
+        variance = (mean_squared - mean**2)[:, np.newaxis]
+
+        first = (B*(AB - A)).reshape(nr_samples, -1)
+        total = ((A - AB)**2).reshape(nr_samples, -1)
+
+        bootstrap_shape = (nr_bootstrap, nr_uncertain_parameters) + shape
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sobol_first = weights.dot(first).reshape(nr_bootstrap, nr_uncertain_parameters, -1)/variance
+            sobol_total = 0.5*weights.dot(total).reshape(nr_bootstrap, nr_uncertain_parameters, -1)/variance
+
+        sobol_first = sobol_first.reshape(bootstrap_shape)
+        sobol_total = sobol_total.reshape(bootstrap_shape)
+
+        sobol_first_conf = z*np.std(sobol_first, axis=0, ddof=1)
+        sobol_total_conf = z*np.std(sobol_total, axis=0, ddof=1)
+
+        return list(sobol_first_conf), list(sobol_total_conf)
+
+
     def average_sensitivity(self, data, sensitivity="sobol_first"):
         """
         Calculate the average of the sensitivities for the model and all
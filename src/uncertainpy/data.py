@@ -11,6 +11,186 @@ from .utils.logger import setup_module_logger, get_logger
 from ._version import __version__
 
 
+class LazyDataset(object):
+    """
+    A statistical metric stored in a HDF5 or Exdir file, that is only read
+    from the file when it is indexed or converted to an array.
+
+    Indexing is passed through to the file, so only the requested part of the
+    statistical metric is read.
+
+    Parameters
+    ----------
+    source : {h5py.Dataset, h5py.Group, exdir.core.Dataset, exdir.core.Group}
+        The dataset the statistical metric is stored in, or the group with
+        irregular evaluations stored with the ragged layout (a ``values``,
+        ``offsets`` and ``shapes`` dataset).
+
+    Attributes
+    ----------
+    source : {h5py.Dataset, h5py.Group, exdir.core.Dataset, exdir.core.Group}
+        The dataset or group the statistical metric is stored in.
+    ragged : bool
+        If the statistical metric is stored with the ragged layout.
+
+    See also
+    --------
+    uncertainpy.Data.save : The layout of the stored evaluations.
+    """
+    def __init__(self, source):
+        self.source = source
+        self.ragged = "layout" in source.attrs and source.attrs["layout"] == "ragged"
+
+        self._offsets = None
+        self._shapes = None
+
+
+    def _read_evaluation(self, index):
+        """
+        Read a single evaluation stored with the ragged layout.
+        """
+        if self._offsets is None:
+            self._offsets = self.source["offsets"][()]
+            self._shapes = self.source["shapes"][()]
+
+        if index < 0:
+            index += len(self)
+
+        if index < 0 or index >= len(self):
+            raise IndexError("index {} is out of bounds for {} evaluations".format(index, len(self)))
+
+        shape = tuple(int(size) for size in self._shapes[index] if size >= 0)
+        value = self.source["values"][self._offsets[index]:self._offsets[index + 1]].reshape(shape)
+
+        if value.ndim == 0:
+            value = value[()]
+
+        return value
+
+
+    def __getitem__(self, index):
+        """
+        Read part of the statistical metric from file.
+
+        Parameters
+        ----------
+        index : {int, slice, tuple}
+            Index of the part to read. Only integers and slices are
+            supported for the ragged layout.
+
+        Returns
+        -------
+        {array, list, float}
+            The requested part of the statistical metric. A list of
+            evaluations if a slice of evaluations stored with the ragged layout
+            is requested.
+        """
+        if not self.ragged:
+            return self.source[index]
+
+        if isinstance(index, slice):
+            return [self._read_evaluation(i) for i in range(*index.indices(len(self)))]
+
+        if index == ():
+            return self.read()
+
+        return self._read_evaluation(int(index))
+
+
+    def read(self):
+        """
+        Read the full statistical metric from file.
+
+        Returns
+        -------
+        {array, list, float}
+            The statistical metric. A list of evaluations for evaluations
+            stored with the ragged layout.
+        """
+        if not self.ragged:
+            return self.source[()]
+
+        flat_values = self.source["values"][()]
+        self._offsets = self.source["offsets"][()]
+        self._shapes = self.source["shapes"][()]
+
+        evaluations = []
+        for i in range(len(self)):
+            shape = tuple(int(size) for size in self._shapes[i] if size >= 0)
+            value = flat_values[self._offsets[i]:self._offsets[i + 1]].reshape(shape)
+
+            if value.ndim == 0:
+                value = value[()]
+
+            evaluations.append(value)
+
+        return evaluations
+
+
+    @property
+    def shape(self):
+        """
+        The shape of the statistical metric. For the ragged layout only
+        the number of evaluations is known.
+
+        Returns
+        -------
+        shape : tuple
+            The shape of the statistical metric.
+        """
+        if self.ragged:
+            return (self.source["offsets"].shape[0] - 1,)
+
+        return self.source.shape
+
+
+    @property
+    def ndim(self):
+        """
+        The number of dimensions of the statistical metric.
+
+        Returns
+        -------
+        ndim : int
+            The number of dimensions of the statistical metric.
+        """
+        return len(self.shape)
+
+
+    def __len__(self):
+        """
+        Get the length of the first dimension.
+
+        Returns
+        -------
+        int
+            The length of the first dimension.
+        """
+        return self.shape[0]
+
+
+    def __iter__(self):
+        """
+        Iterate over the first dimension, reading one element at the time.
+
+        Yields
+        ------
+        {array, float}
+            The next element along the first dimension.
+        """
+        for i in range(len(self)):
+            yield self[i]
+
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.read(), dtype=dtype)
+
+
+    def __repr__(self):
+        return "<LazyDataset with shape {}>".format(self.shape)
+
+
+
 class DataFeature(collections.MutableMapping):
     """
     Store the results of each statistical metric calculated from the uncertainty
@@ -57,6 +237,14 @@ class DataFeature(collections.MutableMapping):
         Average of the total effect sensitivity of
         the feature or model results.
         Default is None.
+    sobol_first_conf : {None, array_like}, optional.
+        Bootstrap confidence interval (half width) of the first order
+        sensitivity of the feature or model results.
+        Default is None.
+    sobol_total_conf : {None, array_like}, optional.
+        Bootstrap confidence interval (half width) of the total effect
+        sensitivity of the feature or model results.
+        Default is None.
     labels : list, optional.
         A list of labels for plotting, ``[x-axis, y-axis, z-axis]``
         Default is ``[]``.
@@ -85,11 +273,23 @@ class DataFeature(collections.MutableMapping):
         Total order Sobol indices (sensitivity) of the feature or model results.
     sobol_total_average : {None, array_like}
         Average of the total order Sobol indices of the feature or model results.
+    sobol_first_conf : {None, array_like}
+        Bootstrap confidence interval (half width) of the first order Sobol
+        indices of the feature or model results.
+    sobol_total_conf : {None, array_like}
+        Bootstrap confidence interval (half width) of the total order Sobol
+        indices of the feature or model results.
     labels : list
         A list of labels for plotting, ``[x-axis, y-axis, z-axis]``.
 
     Notes
     -----
+    A statistical metric can be set to a LazyDataset, for example when the
+    data is loaded lazily with ``Data.load``. The statistical metric is then
+    read from file the first time it is accessed, and kept in memory
+    afterwards. Use ``DataFeature.dataset`` to read only part of the
+    statistical metric.
+
     The statistical metrics calculated in Uncertainpy are:
 
         * ``evaluations`` - the results from the model/feature evaluations.
@@ -106,6 +306,10 @@ class DataFeature(collections.MutableMapping):
           of the model/feature.
         * ``sobol_total_average`` - the average of the total order Sobol
           indices (sensitivity) of the model/feature.
+        * ``sobol_first_conf`` - the bootstrap confidence interval of the
+          first order Sobol indices of the model/feature.
+        * ``sobol_total_conf`` - the bootstrap confidence interval of the
+          total order Sobol indices of the model/feature.
     """
     def __init__(self,
                  name,
@@ -119,6 +323,8 @@ class DataFeature(collections.MutableMapping):
                  sobol_first_average=None,
                  sobol_total=None,
                  sobol_total_average=None,
+                 sobol_first_conf=None,
+                 sobol_total_conf=None,
                  labels=[]):
 
         self.name = name
@@ -132,15 +338,49 @@ class DataFeature(collections.MutableMapping):
         self.sobol_first_average = sobol_first_average
         self.sobol_total = sobol_total
         self.sobol_total_average = sobol_total_average
+        self.sobol_first_conf = sobol_first_conf
+        self.sobol_total_conf = sobol_total_conf
         self.labels = labels
 
         self._statistical_metrics = ["evaluations", "time", "mean", "variance",
                                      "percentile_5", "percentile_95",
                                      "sobol_first", "sobol_first_average",
-                                     "sobol_total", "sobol_total_average"]
+                                     "sobol_total", "sobol_total_average",
+                                     "sobol_first_conf", "sobol_total_conf"]
 
         self._information = ["name", "labels"]
 
+
+    def __getattribute__(self, name):
+        value = object.__getattribute__(self, name)
+
+        # Read statistical metrics that are stored lazily on first access
+        if isinstance(value, LazyDataset):
+            value = value.read()
+            object.__setattr__(self, name, value)
+
+        return value
+
+
+    def dataset(self, statistical_metric):
+        """
+        Get the data for `statistical_metric` without reading it from file.
+
+        Parameters
+        ----------
+        statistical_metric: str
+            Name of the statistical metric.
+
+        Returns
+        -------
+        {LazyDataset, array_like, None}
+            A LazyDataset if the statistical metric has not yet been read from
+            file, which can be indexed to read only part of the
+            statistical metric. Otherwise the data for `statistical_metric`.
+        """
+        return object.__getattribute__(self, statistical_metric)
+
+
     def __getitem__(self, statistical_metric):
         """
         Get the data for `statistical_metric`.
@@ -170,8 +410,12 @@ class DataFeature(collections.MutableMapping):
         statistical_metrics = []
 
         for statistical_metric in dir(self):
-            if not statistical_metric.startswith('_') and not callable(self[statistical_metric]) \
-                and self[statistical_metric] is not None and statistical_metric not in self._information:
+            if statistical_metric.startswith('_'):
+                continue
+
+            value = self.dataset(statistical_metric)
+            if not callable(value) and value is not None \
+                and statistical_metric not in self._information:
                 statistical_metrics.append(statistical_metric)
 
         return statistical_metrics
@@ -243,7 +487,7 @@ class DataFeature(collections.MutableMapping):
         bool
             If `statistical_metric` exists and contains data (not None)
         """
-        if statistical_metric not in self.get_metrics() or self[statistical_metric] is None:
+        if statistical_metric not in self.get_metrics() or self.dataset(statistical_metric) is None:
             return False
         else:
             return True
@@ -283,8 +527,12 @@ class DataFeature(collections.MutableMapping):
             The number of dimensions of the data of the data type.
         """
 
-        if self.evaluations is not None:
-            for evaluation in self.evaluations:
+        # Read lazily stored evaluations one evaluation at the time
+        evaluations = self.dataset("evaluations")
+
+        if evaluations is not None:
+            for i in range(len(evaluations)):
+                evaluation = evaluations[i]
                 if not contains_nan(evaluation):
                     return np.ndim(evaluation)
 
@@ -317,6 +565,9 @@ class Data(collections.MutableMapping):
         Set the threshold for the logging level. Logging messages less severe
         than this level is ignored. If None, no logging to file is performed
         Default logger level is "info".
+    lazy : bool, optional
+        If True, the statistical metrics are not read from file before they
+        are accessed. Default is False.
 
     Attributes
     ----------
@@ -329,6 +580,10 @@ class Data(collections.MutableMapping):
     error : list
         List of all model/features that were irregular, but not set to be
         interpolated.
+    failed : list
+        List of the model evaluations that failed and were set to numpy.nan,
+        with the index of the node and a summary of the exception, on the form
+        ``"Node 3: ValueError: message"``.
     method : str
         A string that describes the method used to perform the uncertainty
         quantification.
@@ -357,6 +612,10 @@ class Data(collections.MutableMapping):
           of the model/feature.
         * ``sobol_total_average`` - the average of the total order Sobol
           indices (sensitivity) of the model/feature.
+        * ``sobol_first_conf`` - the bootstrap confidence interval of the
+          first order Sobol indices of the model/feature.
+        * ``sobol_total_conf`` - the bootstrap confidence interval of the
+          total order Sobol indices of the model/feature.
 
     Raises
     ------
@@ -370,11 +629,12 @@ class Data(collections.MutableMapping):
     def __init__(self,
                  filename=None,
                  backend="auto",
-                 logger_level="info"):
+                 logger_level="info",
+                 lazy=False):
 
         self.data_information = ["uncertain_parameters", "model_name",
                                  "incomplete", "method", "version", "seed",
-                                 "model_ignore", "error"]
+                                 "model_ignore", "error", "failed"]
 
 
         if backend not in ["auto", "hdf5", "exdir"]:
@@ -386,16 +646,18 @@ class Data(collections.MutableMapping):
         self.model_name = ""
         self.incomplete = []
         self.error = []
+        self.failed = []
         self.data = {}
         self.method = ""
         self.model_ignore = False
         self._seed = ""
         self.backend = backend
+        self._file = None
 
         self.version = __version__
 
         if filename is not None:
-            self.load(filename)
+            self.load(filename, lazy=lazy)
 
 
     @property
@@ -469,6 +731,7 @@ class Data(collections.MutableMapping):
         self.model_name = ""
         self.incomplete = []
         self.error = []
+        self.failed = []
         self.data = {}
         self.method = ""
         self._seed = ""
@@ -490,7 +753,16 @@ class Data(collections.MutableMapping):
         int, None
             The number of dimensions of the model/feature result. Returns None
             if the feature has no evaluations or only contains nan.
+
+        Notes
+        -----
+        If no evaluations are stored, for example with the Monte Carlo method
+        with ``streaming=True`` and ``keep_evaluations=False``, the number of
+        dimensions is taken from the mean.
         """
+        if self[feature].dataset("evaluations") is None and self[feature].mean is not None:
+            return np.ndim(self[feature].mean)
+
         return self[feature].ndim()
 
 
@@ -515,11 +787,12 @@ class Data(collections.MutableMapping):
         if self[feature].labels != []:
             return self[feature].labels
 
-        elif self[self.model_name].labels != [] and self[self.model_name].ndim() == self[feature].ndim():
+        elif self.model_name in self and self[self.model_name].labels != [] \
+                and self.ndim(self.model_name) == self.ndim(feature):
             return self[self.model_name].labels
 
         else:
-            return [""]*(self[feature].ndim() + 1)
+            return [""]*(self.ndim(feature) + 1)
 
 
 
@@ -617,7 +890,7 @@ class Data(collections.MutableMapping):
 
 
     # TODO expand the save function to also save parameters and model information
-    def save(self, filename):
+    def save(self, filename, compression=None, compression_opts=None):
         """
         Save data to a HDF5 or Exdir file with name `filename`.
 
@@ -625,6 +898,13 @@ class Data(collections.MutableMapping):
         ----------
         filename : str
             Name of the file to load data from.
+        compression : {None, "gzip", "lzf", "blosc"}, optional
+            Compression filter used for the model and feature evaluations
+            when saving as HDF5 files. "blosc" requires hdf5plugin. Ignored
+            for Exdir files. If None, no compression is used. Default is None.
+        compression_opts : {None, int}, optional
+            Options for the compression filter, the compression level
+            (0-9) for "gzip" and "blosc". Default is None.
 
         Raises
         ------
@@ -632,9 +912,27 @@ class Data(collections.MutableMapping):
             If h5py is not installed.
         ImportError
             If Exdir is not installed.
+        ImportError
+            If hdf5plugin is not installed and "blosc" compression is used.
+        ValueError
+            If unsupported compression is chosen.
+
+        Notes
+        -----
+        Regular evaluations are stored as a single chunked dataset with shape
+        ``(nr_evaluations, ...)``. Irregular evaluations are stored in a group
+        with a flat ``values`` dataset containing all evaluations, an
+        ``offsets`` dataset with the start of each evaluation in ``values``
+        (and the end of the last evaluation), and a ``shapes`` dataset with
+        the shape of each evaluation, padded with -1. Irregular evaluations
+        where the evaluations themselves are irregular are stored with one
+        dataset for each evaluation.
         """
         logger = get_logger(self)
 
+        if compression not in [None, "gzip", "lzf", "blosc"]:
+            raise ValueError("compression {} not supported. Supported compressions are: gzip, lzf, and blosc".format(compression))
+
         if self.backend == "auto":
             if filename.endswith(".h5"):
                 current_backend = "hdf5"
@@ -660,6 +958,69 @@ class Data(collections.MutableMapping):
                 raise ImportError("The Exdir backend requires: exdir")
 
 
+        compression_kwargs = {}
+        if current_backend == "hdf5" and compression is not None:
+            if compression == "blosc":
+                try:
+                    import hdf5plugin
+                except ImportError:
+                    raise ImportError("Blosc compression requires: hdf5plugin")
+
+                if compression_opts is None:
+                    compression_kwargs = hdf5plugin.Blosc()
+                else:
+                    compression_kwargs = hdf5plugin.Blosc(clevel=compression_opts)
+
+                compression_kwargs = dict(compression_kwargs)
+            else:
+                compression_kwargs = {"compression": compression,
+                                      "compression_opts": compression_opts}
+
+
+        def chunk_shape(values, chunk_size=2**20):
+            # Chunks contain whole evaluations (rows), with approximately
+            # chunk_size bytes in each chunk
+            row_size = max(values[0].nbytes, 1)
+            nr_rows = min(max(chunk_size//row_size, 1), values.shape[0])
+
+            return (nr_rows,) + values.shape[1:]
+
+
+        def create_array(group, name, values):
+            values = np.asarray(values)
+
+            if current_backend == "hdf5" and values.ndim > 0 and values.size > 0:
+                group.create_dataset(name,
+                                     data=values,
+                                     chunks=chunk_shape(values),
+                                     **compression_kwargs)
+            else:
+                group.create_dataset(name, data=values)
+
+
+        def add_ragged(group, values):
+            values = [np.asarray(value) for value in values]
+
+            lengths = [value.size for value in values]
+            ndims = [value.ndim for value in values]
+
+            offsets = np.zeros(len(values) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum(lengths)
+
+            shapes = -np.ones((len(values), max(ndims + [1])), dtype=np.int64)
+            for i, value in enumerate(values):
+                shapes[i, :value.ndim] = value.shape
+
+            if values:
+                flat_values = np.concatenate([value.ravel() for value in values])
+            else:
+                flat_values = np.array([], dtype=float)
+
+            group.attrs["layout"] = "ragged"
+            create_array(group, "values", flat_values)
+            create_array(group, "offsets", offsets)
+            create_array(group, "shapes", shapes)
+
 
         def add_group(group, values, name="evaluation"):
             iteration = 0
@@ -681,6 +1042,15 @@ class Data(collections.MutableMapping):
 
 
 
+        # Read lazily loaded data before the file is closed, in case it is
+        # the file that is overwritten
+        if self._file is not None:
+            for feature in self.data:
+                for statistical_metric in self[feature]:
+                    self[feature][statistical_metric]
+
+            self.close()
+
         # with backend.File(filename, "w") as f:
         f = backend.File(filename, "w")
 
@@ -688,6 +1058,12 @@ class Data(collections.MutableMapping):
         f.attrs["model name"] = self.model_name
         f.attrs["incomplete results"] =  [incomplete.encode("utf8") for incomplete in self.incomplete]
         f.attrs["error"] =  [irregular.encode("utf8") for irregular in self.error]
+
+        # Only added when there are failed evaluations, so files without
+        # failed evaluations are unchanged
+        if self.failed:
+            f.attrs["failed evaluations"] =  [failed.encode("utf8") for failed in self.failed]
+
         f.attrs["method"] = self.method
         f.attrs["version"] = self.version
         f.attrs["seed"] = self.seed
@@ -699,11 +1075,16 @@ class Data(collections.MutableMapping):
 
             for statistical_metric in self[feature]:
                 if statistical_metric in ["evaluations", "time"]:
-                    if is_regular(self[feature][statistical_metric]):
-                        group.create_dataset(statistical_metric, data=self[feature][statistical_metric])
+                    values = self[feature][statistical_metric]
+
+                    if is_regular(values):
+                        create_array(group, statistical_metric, values)
+                    elif all(is_regular(value) for value in values):
+                        evaluations_group = group.create_group(statistical_metric)
+                        add_ragged(evaluations_group, values)
                     else:
                         evaluations_group = group.create_group(statistical_metric)
-                        add_group(evaluations_group, self[feature][statistical_metric], name=statistical_metric)
+                        add_group(evaluations_group, values, name=statistical_metric)
                 else:
                     group.create_dataset(statistical_metric, data=self[feature][statistical_metric])
 
@@ -712,7 +1093,7 @@ class Data(collections.MutableMapping):
         f.close()
 
 
-    def load(self, filename):
+    def load(self, filename, lazy=False):
         """
         Load data from a HDF5 or Exdir file with name `filename`.
 
@@ -720,6 +1101,10 @@ class Data(collections.MutableMapping):
         ----------
         filename : str
             Name of the file to load data from.
+        lazy : bool, optional
+            If True, the statistical metrics are not read from file before they
+            are accessed, and the file is kept open until ``Data.close`` is
+            called. Default is False.
 
         Raises
         ------
@@ -727,6 +1112,18 @@ class Data(collections.MutableMapping):
             If h5py is not installed.
         ImportError
             If Exdir is not installed.
+
+        Notes
+        -----
+        When loading lazily, each statistical metric is stored as a
+        LazyDataset, and read from file the first time it is accessed.
+        Irregular evaluations stored with one dataset for each evaluation are
+        always read when loading.
+
+        See also
+        --------
+        uncertainpy.LazyDataset
+        uncertainpy.DataFeature.dataset : Read part of a statistical metric.
         """
         logger = get_logger(self)
 
@@ -759,6 +1156,7 @@ class Data(collections.MutableMapping):
         # TODO add this check when changing to python 3
         # if not os.path.isfile(self.filename):
         #     raise FileNotFoundError("{} file not found".format(self.filename))
+        self.close()
         self.clear()
 
         def append_evaluations(evaluations, group):
@@ -798,6 +1196,12 @@ class Data(collections.MutableMapping):
             except (UnicodeDecodeError, AttributeError):
                 self.error =  [irregular for irregular in f.attrs["error"]]
 
+        if "failed evaluations" in f.attrs:
+            try:
+                self.failed =  [failed.decode("utf8") for failed in f.attrs["failed evaluations"]]
+            except (UnicodeDecodeError, AttributeError):
+                self.failed =  [failed for failed in f.attrs["failed evaluations"]]
+
         if "method" in f.attrs:
             self.method = str(f.attrs["method"])
 
@@ -820,7 +1224,9 @@ class Data(collections.MutableMapping):
                     values = f[feature][statistical_metric]
 
                     if isinstance(values, backend.Dataset):
-                        evaluations = values[()]
+                        evaluations = LazyDataset(values) if lazy else values[()]
+                    elif "layout" in values.attrs and values.attrs["layout"] == "ragged":
+                        evaluations = LazyDataset(values) if lazy else LazyDataset(values).read()
                     else:
                         evaluations = []
 
@@ -835,10 +1241,25 @@ class Data(collections.MutableMapping):
                     self[feature][statistical_metric] = evaluations
                 elif statistical_metric == "labels":
                     self[feature][statistical_metric] = [label.decode("utf8") for label in f[feature][statistical_metric][()]]
+                elif lazy:
+                    self[feature][statistical_metric] = LazyDataset(f[feature][statistical_metric])
                 else:
                     self[feature][statistical_metric] = f[feature][statistical_metric][()]
 
-        f.close()
+        if lazy:
+            self._file = f
+        else:
+            f.close()
+
+
+    def close(self):
+        """
+        Close the file opened by lazily loading data. Statistical metrics that
+        have not yet been read from file can no longer be accessed.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
 
 
     def remove_only_invalid_features(self):
@@ -4,6 +4,7 @@ import numpy as np
 import six
 
 from ..utils.logger import setup_module_logger
+from ..utils.utility import none_to_nan, is_regular
 
 class Features(object):
     """
@@ -82,6 +83,7 @@ class Features(object):
         self.utility_methods = ["calculate_feature",
                                 "calculate_features",
                                 "calculate_all_features",
+                                "calculate_features_batch",
                                 "__init__",
                                 "implemented_features",
                                 "preprocess",
@@ -485,6 +487,60 @@ class Features(object):
         return results
 
 
+    def calculate_features_batch(self, time, values, *info):
+        """
+        Calculate all features in ``features_to_run`` for a batch of model
+        evaluations that share the same time values.
+
+        Parameters
+        ----------
+        time : array_like
+            The time values shared by all model evaluations.
+        values : array_like
+            The model results, with one row for each model evaluation.
+        *info
+            Any number of optional `info` values, shared by all model
+            evaluations.
+
+        Returns
+        -------
+        results : dictionary
+            A dictionary where the keys are the feature names
+            and the values are a dictionary with the time values `time` and
+            the feature results of all model evaluations on `values`, on the
+            form ``{"time": time, "values": values}``. `values` is an array
+            with one element for each model evaluation if the feature results
+            are regular, otherwise a list. Each instance of None is converted
+            to ``numpy.nan``.
+
+        Notes
+        -----
+        The features are calculated for one model evaluation at the time,
+        using ``calculate_features``. Subclasses may override this method to
+        calculate the features for all model evaluations at once.
+
+        See also
+        --------
+        uncertainpy.features.Features.calculate_features : Method for calculating all features of a single model evaluation.
+        """
+        results = {}
+        for feature in self.features_to_run:
+            results[feature] = {"time": np.nan, "values": []}
+
+        for model_values in values:
+            feature_results = self.calculate_features(time, model_values, *info)
+
+            for feature in feature_results:
+                results[feature]["time"] = none_to_nan(feature_results[feature]["time"])
+                results[feature]["values"].append(none_to_nan(feature_results[feature]["values"]))
+
+        for feature in results:
+            if is_regular(results[feature]["values"]):
+                results[feature]["values"] = np.array(results[feature]["values"])
+
+        return results
+
+
     def calculate_all_features(self, *model_results):
         """
         Calculate all implemented features.
@@ -116,6 +116,11 @@ class GeneralSpikingFeatures(Features):
     uncertainpy.features.Features.reference_feature : reference_feature showing the requirements of a feature function.
     uncertainpy.features.Spikes : Class for finding spikes in the model result.
     """
+    # Attributes that are set while calculating the features, and are ignored
+    # when identifying the features in the cache
+    _runtime_attributes = ["spikes", "values"]
+
+
     def __init__(self,
                  new_features=None,
                  features_to_run="all",
@@ -243,9 +243,23 @@ class Spikes:
         The time of the voltage trace.
     V : array_like
         The voltage trace.
+    starts : array
+        The index of the first point of each spike in the voltage trace.
+    ends : array
+        The index after the last point of each spike in the voltage trace.
+    global_indices : array
+        The index of the peak of each spike in the voltage trace.
+    time_spikes : array
+        The timing of the peak of each spike.
+    V_spikes : array
+        The voltage at the peak of each spike.
 
     Notes
     -----
+    The spikes are stored as arrays of indices into the voltage trace. The
+    Spike object for a spike is only created when the spike is indexed or
+    iterated over, and is then kept until new spikes are found.
+
     The spikes are found by finding where the voltage trace goes above the
     `threshold`, and then later falls below this `threshold` + `end_threshold`.
     The spike is considered to be everything within this interval.
@@ -272,7 +286,6 @@ class Spikes:
                  xlabel="",
                  ylabel=""):
 
-        self.spikes = []
         self.nr_spikes = 0
 
         self.xlabel = xlabel
@@ -281,6 +294,8 @@ class Spikes:
         self.V = None
         self.time = None
 
+        self.set_spikes()
+
         if time is not None and V is not None:
             self.find_spikes(time, V,
                              threshold=threshold,
@@ -292,6 +307,66 @@ class Spikes:
                              min_duration=min_duration)
 
 
+    def set_spikes(self,
+                   starts=None,
+                   ends=None,
+                   global_indices=None):
+        """
+        Set the spikes found in the voltage trace.
+
+        Parameters
+        ----------
+        starts : {None, array_like}, optional
+            The index of the first point of each spike in the voltage trace.
+            If None, there are no spikes. Default is None.
+        ends : {None, array_like}, optional
+            The index after the last point of each spike in the voltage trace.
+            Default is None.
+        global_indices : {None, array_like}, optional
+            The index of the peak of each spike in the voltage trace.
+            Default is None.
+        """
+        if starts is None:
+            starts = ends = global_indices = []
+
+        self.starts = np.asarray(starts, dtype=int)
+        self.ends = np.asarray(ends, dtype=int)
+        self.global_indices = np.asarray(global_indices, dtype=int)
+
+        if len(self.global_indices) > 0:
+            self.time_spikes = np.asarray(self.time)[self.global_indices]
+            self.V_spikes = np.asarray(self.V)[self.global_indices]
+        else:
+            self.time_spikes = np.array([])
+            self.V_spikes = np.array([])
+
+        self.nr_spikes = len(self.global_indices)
+        self._spike_objects = {}
+
+
+    @property
+    def spikes(self):
+        """
+        A list of all spikes.
+
+        Returns
+        -------
+        spikes : list
+            A list of Spike objects.
+        """
+        return [self[i] for i in range(self.nr_spikes)]
+
+
+    def __getstate__(self):
+        """
+        Get the state for pickling, without the created Spike objects.
+        """
+        state = self.__dict__.copy()
+        state["_spike_objects"] = {}
+
+        return state
+
+
     def __iter__(self):
         """
         Iterate over all spikes.
@@ -301,8 +376,8 @@ class Spikes:
         Spike object
             A spike object.
         """
-        for spike in self.spikes:
-            yield spike
+        for i in range(self.nr_spikes):
+            yield self[i]
 
 
     def __str__(self):
@@ -348,7 +423,26 @@ class Spikes:
         Spike object
             The spike object number `i`.
         """
-        return self.spikes[i]
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.nr_spikes))]
+
+        if i < 0:
+            i += self.nr_spikes
+
+        if i < 0 or i >= self.nr_spikes:
+            raise IndexError("spike index out of range")
+
+        if i not in self._spike_objects:
+            start = self.starts[i]
+            end = self.ends[i]
+
+            self._spike_objects[i] = Spike(self.time[start:end],
+                                           self.V[start:end],
+                                           self.time_spikes[i],
+                                           self.V_spikes[i],
+                                           self.global_indices[i])
+
+        return self._spike_objects[i]
 
 
     def find_spikes(self,
@@ -404,8 +498,8 @@ class Spikes:
 
         Notes
         -----
-        The spikes are added to ``self.spikes`` and ``self.nr_spikes`` is
-        updated.
+        The spikes are stored in ``self.starts``, ``self.ends`` and
+        ``self.global_indices``, and ``self.nr_spikes`` is updated.
 
         The spikes are found by finding where the voltage trace goes above the
         `threshold`, and then later falls below this `threshold` + `end_threshold`.
@@ -449,10 +543,24 @@ class Spikes:
         min_extent_from_peak = 1
         derivative_cutoff = 0.5
 
-        self.spikes = []
+        voltage = np.asarray(voltage)
+        V_array = np.asarray(V)
+        time_array = np.asarray(time)
 
-        spike_start = 0
-        start_flag = False
+        starts, ends = self.threshold_crossings(voltage, threshold, end_threshold)
+
+        # The spike covers the point before the voltage trace rise above the
+        # threshold, until and including the point it falls below the end
+        # threshold
+        spike_starts = np.where(starts > 0, starts - 1, starts)
+        spike_ends = ends + 1
+
+        global_indices = self.segment_argmax(V_array, spike_starts, spike_ends)
+
+        # Discard the first spike if the spike max is at the first
+        # point in the voltage trace, or the voltage trace starts above
+        # the threshold
+        discard = (global_indices == 0) | (spike_starts == 0)
 
         if extended_spikes:
             dVdt = np.gradient(voltage)
@@ -460,77 +568,290 @@ class Spikes:
             gt_derivative = np.where(dVdt >= derivative_cutoff)[0]
             lt_derivative = np.where(dVdt <= -derivative_cutoff)[0]
 
-        prev_spike_end = 0
+            # Each spike is extended from the end of the previous spike,
+            # so the spikes must be extended one by one
+            prev_spike_end = 0
+            for i in range(len(starts)):
+                if discard[i]:
+                    prev_spike_end = spike_ends[i]
+                    continue
 
-        for i in range(len(V)):
-            if voltage[i] > threshold and start_flag is False:
-                if i > 0:
-                    spike_start = i - 1
-                else:
-                    spike_start = i
+                global_index = global_indices[i]
 
-                start_flag = True
-                continue
+                first = np.searchsorted(gt_derivative, prev_spike_end, side="right")
+                candidates = gt_derivative[first:first + 1]
+                spike_starts[i] = candidates[candidates < global_index][0]
 
-            elif voltage[i] < (threshold + end_threshold) and start_flag is True:
-                start_flag = False
-                spike_end = i + 1
+                after_peak = np.searchsorted(lt_derivative, global_index, side="right")
+                spike_ends[i] = self.consecutive(lt_derivative[after_peak:])[-1] + 1
 
-                time_spike = time[spike_start:spike_end]
-                V_spike = V[spike_start:spike_end]
+                prev_spike_end = spike_ends[i]
 
-                spike_index = np.argmax(V_spike)
-                global_index = spike_index + spike_start
-                time_max = time[global_index]
-                V_max = V[global_index]
+        else:
+            # Check if the spike has the minimum required extent,
+            # if not extend the spike
+            # Should never be required with min_extent_from_peak = 1
+            spike_starts = np.where(global_indices - min_extent_from_peak < spike_starts,
+                                    global_indices - min_extent_from_peak,
+                                    spike_starts)
 
-                # Discard the first spike if the spike max is at the first
-                # point in the voltage trace, or the voltage trace starts above
-                # the threshold
-                if global_index == 0 or spike_start == 0:
-                    prev_spike_end = spike_end
-                    continue
+            spike_ends = np.maximum(spike_ends, global_indices + min_extent_from_peak + 1)
+
+        keep = ~discard
+
+        if not extended_spikes and trim:
+            spike_starts, spike_ends, trimmed = self.trim_segments(V_array,
+                                                                   spike_starts,
+                                                                   spike_ends,
+                                                                   global_indices,
+                                                                   rescaled_threshold,
+                                                                   min_extent_from_peak)
+            keep &= trimmed
+
+        # Do not add if the spike is empty or less than minimum height
+        # or less than minimum duration
+        spike_starts = spike_starts[keep]
+        spike_ends = spike_ends[keep]
+        global_indices = global_indices[keep]
+
+        V_min = self.segment_reduce(np.minimum, V_array, spike_starts, spike_ends)
+        V_max = V_array[global_indices]
+        duration = time_array[np.minimum(spike_ends, len(V_array)) - 1] - time_array[spike_starts]
+
+        valid = (abs(V_max - V_min) >= min_amplitude) & (duration >= min_duration)
+
+        self.set_spikes(starts=spike_starts[valid],
+                        ends=np.minimum(spike_ends[valid], len(V_array)),
+                        global_indices=global_indices[valid])
+
+
+    def threshold_crossings(self, voltage, threshold, end_threshold):
+        """
+        Find where the voltage trace rise above `threshold`, and where it
+        afterwards falls below `threshold` + `end_threshold`.
+
+        Parameters
+        ----------
+        voltage : array
+            The voltage trace.
+        threshold : {int, float}
+            The threshold for the start of a spike.
+        end_threshold : {int, float}
+            The end threshold for a spike relative to the threshold.
+
+        Returns
+        -------
+        starts : array
+            The index of the first point above `threshold` for each spike.
+        ends : array
+            The index of the first point below `threshold` + `end_threshold`
+            after the start of each spike. Spikes that do not end before the
+            voltage trace ends are not included.
+        """
+        above = voltage > threshold
+        below_indices = np.flatnonzero(voltage < threshold + end_threshold)
+
+        if end_threshold <= 0:
+            # A point can not both be above the threshold and below the
+            # end threshold. A rise above the threshold starts a new spike if
+            # the voltage trace has fallen below the end threshold since the
+            # previous rise.
+            rising = np.flatnonzero(above & ~np.concatenate([[False], above[:-1]]))
+            nr_below = np.searchsorted(below_indices, rising)
+            new_spike = np.ones(len(rising), dtype=bool)
+            new_spike[1:] = nr_below[1:] > nr_below[:-1]
+
+            starts = rising[new_spike]
 
+        else:
+            # A point can be both above the threshold and below the end
+            # threshold, so the spikes are found one at the time
+            above_indices = np.flatnonzero(above)
+
+            starts = []
+            index = 0
+            while index < len(above_indices):
+                start = above_indices[index]
+                starts.append(start)
+
+                end = np.searchsorted(below_indices, start, side="right")
+                if end >= len(below_indices):
+                    break
+
+                index = np.searchsorted(above_indices, below_indices[end], side="right")
+
+            starts = np.array(starts, dtype=int)
+
+        end_positions = np.searchsorted(below_indices, starts, side="right")
+        has_end = end_positions < len(below_indices)
+
+        starts = starts[has_end]
+        ends = below_indices[end_positions[has_end]]
+
+        return starts, ends
+
+
+    def segment_indices(self, starts, ends):
+        """
+        Get the indices of all points in each segment ``[start, end)``.
+
+        Parameters
+        ----------
+        starts : array
+            The first index of each segment.
+        ends : array
+            The index after the last point in each segment.
+
+        Returns
+        -------
+        indices : array
+            The indices of the points in all segments, segment after segment.
+        offsets : array
+            The position of the start of each segment in `indices`.
+        """
+        lengths = np.maximum(ends - starts, 0)
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(int)
+
+        segments = np.repeat(np.arange(len(starts)), lengths)
+        indices = starts[segments] + np.arange(np.sum(lengths)) - offsets[segments]
+
+        return indices, offsets
+
+
+    def segment_reduce(self, ufunc, values, starts, ends):
+        """
+        Reduce each segment ``values[start:end]`` with `ufunc`.
+        The segments can overlap, but must not be empty.
+
+        Parameters
+        ----------
+        ufunc : numpy.ufunc
+            The function used to reduce each segment, for example
+            numpy.minimum.
+        values : array
+            The values to reduce.
+        starts : array
+            The first index of each segment.
+        ends : array
+            The index after the last point in each segment.
+
+        Returns
+        -------
+        array
+            The reduced value of each segment.
+        """
+        if len(starts) == 0:
+            return np.array([], dtype=values.dtype)
 
-                if extended_spikes:
-                    spike_start = gt_derivative[(gt_derivative > prev_spike_end) & (gt_derivative < global_index)][0]
-                    spike_end = self.consecutive(lt_derivative[lt_derivative > global_index])[-1] + 1
+        ends = np.minimum(ends, len(values))
+        indices, offsets = self.segment_indices(starts, ends)
 
-                else:
-                    # Check if the spike has the minimum required extent,
-                    # if not extend the spike
-                    # Should never be required with min_extent_from_peak = 1
-                    if global_index > 0 and global_index - min_extent_from_peak < spike_start:
-                        spike_start = global_index - min_extent_from_peak
+        return ufunc.reduceat(values[indices], offsets)
 
-                    if global_index < len(self.V) and global_index + min_extent_from_peak + 1 > spike_end:
-                        spike_end = global_index + min_extent_from_peak + 1
 
-                time_spike = time[spike_start:spike_end]
-                V_spike = V[spike_start:spike_end]
+    def segment_argmax(self, values, starts, ends):
+        """
+        Find the index of the maximum of each segment ``values[start:end]``,
+        with the same rules as numpy.argmax: the first occurrence of the
+        maximum, and the first numpy.nan if the segment contains numpy.nan.
 
+        Parameters
+        ----------
+        values : array
+            The values.
+        starts : array
+            The first index of each segment.
+        ends : array
+            The index after the last point in each segment.
 
-                spike = Spike(time_spike, V_spike, time_max, V_max, global_index)
+        Returns
+        -------
+        array
+            The index of the maximum of each segment.
+        """
+        if len(starts) == 0:
+            return np.array([], dtype=int)
 
+        indices, offsets = self.segment_indices(starts, ends)
+        segment_values = values[indices]
 
-                if not extended_spikes and trim:
-                    spike.trim(threshold=rescaled_threshold,
-                               min_extent_from_peak=min_extent_from_peak)
+        maximum = np.maximum.reduceat(segment_values, offsets)
 
-                # Do not add if the spike is empty or less than minimum height
-                # or less than minimum duration
-                if spike.V is not None \
-                        and (abs(spike.V_spike - spike.V.min()) >= min_amplitude) \
-                        and ((spike.time[-1] - spike.time[0]) >= min_duration):
+        lengths = ends - starts
+        segment_maximum = np.repeat(maximum, lengths)
+        is_max = (segment_values == segment_maximum) \
+            | (np.isnan(segment_values) & np.isnan(segment_maximum))
 
-                    self.spikes.append(spike)
+        positions = np.flatnonzero(is_max)
+        first = positions[np.searchsorted(positions, offsets)]
 
+        return indices[first]
 
-                prev_spike_end = spike_end
 
+    def trim_segments(self,
+                      V,
+                      starts,
+                      ends,
+                      global_indices,
+                      threshold,
+                      min_extent_from_peak=1):
+        """
+        Trim each spike, as with ``Spike.trim``, but for all spikes at once.
 
-        self.nr_spikes = len(self.spikes)
+        Parameters
+        ----------
+        V : array
+            The voltage trace.
+        starts : array
+            The first index of each spike.
+        ends : array
+            The index after the last point of each spike.
+        global_indices : array
+            Index of each spike peak.
+        threshold : {float, int}
+            Remove all values from each side of the spike that is bellow this
+            value.
+        min_extent_from_peak : int, optional
+            Minimum extent of the spike in each direction from the peak.
+
+        Returns
+        -------
+        starts : array
+            The first index of each trimmed spike.
+        ends : array
+            The index after the last point of each trimmed spike.
+        trimmed : array
+            False for the spikes that are removed, because no values are above
+            the threshold.
+
+        See also
+        --------
+        uncertainpy.features.Spike.trim
+        """
+        ends = np.minimum(ends, len(V))
+
+        above_indices = np.flatnonzero(V > threshold)
+
+        first = np.searchsorted(above_indices, starts)
+        last = np.searchsorted(above_indices, ends) - 1
 
+        trimmed = last >= first
+
+        first_above = above_indices[np.minimum(first, len(above_indices) - 1)] if len(above_indices) else starts
+        last_above = above_indices[np.maximum(last, 0)] if len(above_indices) else starts
+
+        new_starts = np.where(first_above > starts, first_above - 1, first_above)
+        new_ends = last_above + 2
+
+        move_start = (new_starts > starts) & (new_starts > global_indices - min_extent_from_peak)
+        new_starts = np.where(move_start, global_indices - min_extent_from_peak, new_starts)
+
+        move_end = (new_ends < ends) & (new_ends < global_indices + min_extent_from_peak + 1)
+        new_ends = np.where(move_end, global_indices + min_extent_from_peak + 1, new_ends)
+
+        new_ends = np.minimum(new_ends, ends)
+
+        return np.where(trimmed, new_starts, starts), np.where(trimmed, new_ends, ends), trimmed
 
 
 
@@ -626,8 +947,8 @@ class Spikes:
 
         colors = get_current_colormap()
 
-        for spike in self.spikes:
-            ax.axvline(self.time[spike.global_index], color=colors[2])
+        for time_spike in self.time_spikes:
+            ax.axvline(time_spike, color=colors[2])
 
         if save_name is None:
             plt.show()
@@ -9,10 +9,12 @@ except ImportError:
     prerequisites = False
 
 import numpy as np
+import six
 
 from .general_spiking_features import GeneralSpikingFeatures
 from .spikes import Spikes
 from ..utils.logger import get_logger
+from ..utils.utility import none_to_nan, is_regular
 
 class SpikingFeatures(GeneralSpikingFeatures):
     """
@@ -587,3 +589,400 @@ class SpikingFeatures(GeneralSpikingFeatures):
             A += (ISIs[i] - ISIs[i-1])/(ISIs[i] + ISIs[i-1])
 
         return None, A/(N - k - 1)
+
+
+    def calculate_features_batch(self, time, values, info):
+        """
+        Calculate all features in ``features_to_run`` for a batch of model
+        evaluations that share the same time values.
+
+        The spikes are found in each voltage trace, and the implemented
+        features are then calculated for all voltage traces at once from the
+        indices of the spikes. Features added with `new_features` are
+        calculated for one voltage trace at the time.
+
+        Parameters
+        ----------
+        time : array_like
+            The time values shared by all model evaluations.
+        values : array_like
+            The voltage traces, with shape ``(nr_evaluations, len(time))``.
+        info : dictionary
+            If ``strict=True``, requires ``info["stimulus_start"]`` and
+            ``info['stimulus_end']`` set.
+
+        Returns
+        -------
+        results : dictionary
+            A dictionary where the keys are the feature names
+            and the values are a dictionary with the time values `time` and
+            the feature results of all model evaluations on `values`, on the
+            form ``{"time": time, "values": values}``. Each instance of None is
+            converted to ``numpy.nan``.
+
+        Raises
+        ------
+        ValueError
+            If `values` does not have the shape ``(nr_evaluations, len(time))``.
+
+        Notes
+        -----
+        Gives the same results as ``calculate_features`` for each model
+        evaluation, except that the roots in ``average_AP_width`` are found
+        exactly instead of with ``scipy.optimize.brentq`` for spikes that
+        cross the midpoint only once on each side of the peak.
+
+        See also
+        --------
+        uncertainpy.features.Features.calculate_features_batch
+        """
+        time = np.asarray(time)
+        values = np.asarray(values, dtype=float)
+
+        if values.ndim != 2 or values.shape[1] != len(time):
+            raise ValueError("values must have shape (nr_evaluations, len(time)), "
+                             "not {}".format(values.shape))
+
+        nr_evaluations, nr_time = values.shape
+
+        spikes_list = []
+        starts = []
+        ends = []
+        global_indices = []
+        for model_values in values:
+            spikes = self.calculate_spikes(time,
+                                           model_values,
+                                           threshold=self.threshold,
+                                           end_threshold=self.end_threshold,
+                                           extended_spikes=self.extended_spikes,
+                                           trim=self.trim,
+                                           normalize=self.normalize,
+                                           min_amplitude=self.min_amplitude,
+                                           min_duration=self.min_duration)
+
+            spikes_list.append(spikes)
+            starts.append(spikes.starts)
+            ends.append(spikes.ends)
+            global_indices.append(spikes.global_indices)
+
+        counts = np.array([spikes.nr_spikes for spikes in spikes_list], dtype=int)
+        rows = np.repeat(np.arange(nr_evaluations), counts)
+        offsets = rows*nr_time
+
+        # All spikes of all voltage traces, with indices into the flattened
+        # voltage traces
+        batch = {"values": values.ravel(),
+                 "counts": counts,
+                 "rows": rows,
+                 "first": np.cumsum(counts) - counts,
+                 "starts": np.concatenate([[]] + starts).astype(int) + offsets,
+                 "ends": np.concatenate([[]] + ends).astype(int) + offsets,
+                 "global_indices": np.concatenate([[]] + global_indices).astype(int) + offsets}
+
+        batch["time_spikes"] = np.tile(time, nr_evaluations)[batch["global_indices"]] \
+            if len(rows) > 0 else np.array([])
+        batch["V_spikes"] = batch["values"][batch["global_indices"]]
+        batch["time"] = np.tile(time, nr_evaluations) if len(rows) > 0 else time
+
+        # Position of each spike in its own voltage trace
+        batch["positions"] = np.arange(len(rows)) - batch["first"][rows]
+
+        results = {}
+        for feature in self.features_to_run:
+            if not self._vectorized(feature):
+                results[feature] = self._batch_per_evaluation(feature, time, values, spikes_list, info)
+                continue
+
+            try:
+                feature_values = getattr(self, "_batch_" + feature)(time, batch, info)
+            except Exception as error:
+                msg = "Error when calculating: {}".format(feature)
+                if not error.args:
+                    error.args = ("",)
+                error.args = error.args + (msg,)
+                raise
+
+            results[feature] = {"time": np.nan, "values": feature_values}
+
+        return results
+
+
+    def _vectorized(self, feature):
+        """
+        If `feature` is an implemented feature that has a vectorized
+        version, and has not been replaced by a new feature.
+        """
+        if not hasattr(self, "_batch_" + feature) or not hasattr(SpikingFeatures, feature):
+            return False
+
+        method = getattr(self, feature)
+
+        return getattr(method, "__func__", None) is six.get_unbound_function(getattr(SpikingFeatures, feature))
+
+
+    def _batch_per_evaluation(self, feature, time, values, spikes_list, info):
+        """
+        Calculate a feature for one voltage trace at the time, from the spikes
+        found by ``calculate_features_batch``.
+        """
+        feature_time = np.nan
+        feature_values = []
+        for model_values, spikes in zip(values, spikes_list):
+            self.values = model_values
+            self.spikes = spikes
+
+            result = self.calculate_feature(feature, time, spikes, info)
+
+            feature_time = none_to_nan(result[0])
+            feature_values.append(none_to_nan(result[1]))
+
+        if is_regular(feature_values):
+            feature_values = np.array(feature_values)
+
+        return {"time": feature_time, "values": feature_values}
+
+
+    def _stimulus_start(self, feature, time, info):
+        """
+        Get ``info["stimulus_start"]``, as the features do.
+        """
+        logger = get_logger(self)
+
+        if "stimulus_start" not in info:
+            if self.strict:
+                raise ValueError("{} require info['stimulus_start']. ".format(feature) +
+                                 "No 'stimulus_start' found in info, "
+                                 "Set 'stimulus_start', or set strict to "
+                                 "False to use initial time as stimulus start")
+            else:
+                info["stimulus_start"] = time[0]
+                logger.warning("{} features require info['stimulus_start']. ".format(feature) +
+                               "No 'stimulus_start' found in info, "
+                               "setting stimulus start as initial time")
+
+        return info["stimulus_start"]
+
+
+    def _stimulus_end(self, feature, time, info):
+        """
+        Get ``info["stimulus_end"]``, as the features do.
+        """
+        logger = get_logger(self)
+
+        if "stimulus_end" not in info:
+            if self.strict:
+                raise ValueError("{} require info['stimulus_end']. ".format(feature) +
+                                 "No 'stimulus_end' found in info, "
+                                 "Set 'stimulus_start', or set strict to "
+                                 "False to use end time as stimulus end")
+            else:
+                info["stimulus_end"] = time[-1]
+                logger.warning("{} require info['stimulus_start']. ".format(feature) +
+                               "No 'stimulus_end' found in info, "
+                               "setting stimulus end as end time")
+
+        if info["stimulus_start"] >= info["stimulus_end"]:
+            raise ValueError("stimulus_start >= stimulus_end.")
+
+        return info["stimulus_end"]
+
+
+    def _batch_mean(self, batch, spike_values, min_nr_spikes=1):
+        """
+        The sum of `spike_values` in each voltage trace, divided by the number
+        of spikes. numpy.nan for voltage traces with less than
+        `min_nr_spikes` spikes.
+        """
+        counts = batch["counts"]
+        sums = np.bincount(batch["rows"], weights=spike_values, minlength=len(counts))
+
+        mean = np.full(len(counts), np.nan)
+        has_spikes = counts >= min_nr_spikes
+        mean[has_spikes] = sums[has_spikes]/counts[has_spikes].astype(float)
+
+        return mean
+
+
+    def _batch_nr_spikes(self, time, batch, info):
+        """
+        ``nr_spikes`` for all voltage traces.
+        """
+        stimulus_start = self._stimulus_start("nr_spikes", time, info)
+        stimulus_end = self._stimulus_end("nr_spikes", time, info)
+
+        during_stimulus = (stimulus_start < batch["time_spikes"]) & (batch["time_spikes"] < stimulus_end)
+
+        return np.bincount(batch["rows"][during_stimulus], minlength=len(batch["counts"]))
+
+
+    def _batch_time_before_first_spike(self, time, batch, info):
+        """
+        ``time_before_first_spike`` for all voltage traces.
+        """
+        stimulus_start = self._stimulus_start("time_before_first_spike", time, info)
+
+        has_spikes = batch["counts"] > 0
+
+        time_before_first_spike = np.full(len(batch["counts"]), np.nan)
+        time_before_first_spike[has_spikes] = batch["time_spikes"][batch["first"][has_spikes]] - stimulus_start
+
+        return time_before_first_spike
+
+
+    def _batch_spike_rate(self, time, batch, info):
+        """
+        ``spike_rate`` for all voltage traces.
+        """
+        stimulus_start = self._stimulus_start("spike_rate", time, info)
+        stimulus_end = self._stimulus_end("spike_rate", time, info)
+
+        return batch["counts"]/float(stimulus_end - stimulus_start)
+
+
+    def _batch_average_AP_overshoot(self, time, batch, info):
+        """
+        ``average_AP_overshoot`` for all voltage traces.
+        """
+        return self._batch_mean(batch, batch["V_spikes"])
+
+
+    def _batch_average_AHP_depth(self, time, batch, info):
+        """
+        ``average_AHP_depth`` for all voltage traces.
+        """
+        # Spikes that are followed by another spike in the same voltage
+        # trace, for voltage traces with more than two spikes
+        counts = batch["counts"][batch["rows"]]
+        followed = (batch["positions"] < counts - 1) & (counts > 2)
+        first = np.flatnonzero(followed)
+
+        # There are no values between the peaks, as in average_AHP_depth
+        empty = batch["global_indices"][first + 1] <= batch["global_indices"][first]
+        if np.any(empty):
+            row = batch["rows"][first[empty][0]]
+            raise ValueError("Unable to calculate the AHP depth of voltage trace {}: ".format(row) +
+                             "two consecutive spikes have no values between their peaks")
+
+        AHP_depth = np.zeros(len(batch["rows"]))
+        AHP_depth[first] = Spikes().segment_reduce(np.minimum,
+                                                   batch["values"],
+                                                   batch["global_indices"][first],
+                                                   batch["global_indices"][first + 1])
+
+        return self._batch_mean(batch, AHP_depth, min_nr_spikes=3)
+
+
+    def _batch_average_AP_width(self, time, batch, info):
+        """
+        ``average_AP_width`` for all voltage traces.
+        """
+        logger = get_logger(self)
+
+        nr_evaluations = len(batch["counts"])
+        rows = batch["rows"]
+        flat_time = batch["time"]
+        flat_values = batch["values"]
+        starts = batch["starts"]
+        ends = batch["ends"]
+        peaks = batch["global_indices"]
+
+        has_width = ends - starts >= 3
+        nr_no_width = np.sum(~has_width)
+        if nr_no_width > 0:
+            logger.warning("{} spikes with no width found (only one or two time points in spike).".format(nr_no_width))
+
+        V_width = (batch["V_spikes"] + flat_values[starts])/2.
+
+        widths = np.zeros(len(rows))
+        failed = np.zeros(nr_evaluations, dtype=bool)
+
+        # The roots before and after the peak of each spike
+        roots = []
+        exact = has_width.copy()
+        for segment_starts, segment_ends in [(starts, peaks + 1), (peaks, ends)]:
+            root, single_root = self._batch_midpoint_roots(flat_time,
+                                                           flat_values,
+                                                           V_width,
+                                                           segment_starts,
+                                                           segment_ends,
+                                                           has_width)
+            roots.append(root)
+            exact &= single_root
+
+        # The root after the peak is not bracketed
+        segment_first = flat_values[peaks] - V_width
+        segment_last = flat_values[np.maximum(ends - 1, 0)] - V_width
+        not_bracketed = has_width & (segment_first*segment_last > 0)
+        failed[rows[not_bracketed]] = True
+
+        widths[exact] = abs(roots[1][exact] - roots[0][exact])
+
+        for i in np.flatnonzero(has_width & ~exact & ~not_bracketed):
+            if failed[rows[i]]:
+                continue
+
+            spike_time = flat_time[starts[i]:ends[i]]
+            V_interpolation = scipy.interpolate.interp1d(spike_time,
+                                                         flat_values[starts[i]:ends[i]] - V_width[i])
+
+            try:
+                root1 = scipy.optimize.brentq(V_interpolation, spike_time[0], flat_time[peaks[i]])
+                root2 = scipy.optimize.brentq(V_interpolation, flat_time[peaks[i]], spike_time[-1])
+
+            except ValueError:
+                failed[rows[i]] = True
+                continue
+
+            widths[i] = abs(root2 - root1)
+
+        average_AP_width = self._batch_mean(batch, widths)
+        average_AP_width[failed] = np.nan
+
+        return average_AP_width
+
+
+    def _batch_midpoint_roots(self, time, values, V_width, starts, ends, mask):
+        """
+        Find where each segment ``values[start:end]`` crosses `V_width`, for
+        segments that cross `V_width` exactly once. Returns the roots and
+        which segments have a single root.
+        """
+        nr_segments = len(starts)
+
+        roots = np.full(nr_segments, np.nan)
+        single_root = np.zeros(nr_segments, dtype=bool)
+
+        selected = np.flatnonzero(mask & (ends - starts >= 2))
+        if len(selected) == 0:
+            return roots, single_root
+
+        indices, offsets = Spikes().segment_indices(starts[selected], ends[selected])
+        lengths = ends[selected] - starts[selected]
+        segments = np.repeat(np.arange(len(selected)), lengths)
+
+        difference = values[indices] - V_width[selected][segments]
+        positive = difference > 0
+
+        # Sign changes between consecutive points in the same segment
+        change = (positive[1:] != positive[:-1]) & (segments[1:] == segments[:-1])
+        nr_changes = np.bincount(segments[1:][change], minlength=len(selected))
+        nr_zeros = np.bincount(segments[difference == 0], minlength=len(selected))
+
+        single = (nr_changes == 1) & (nr_zeros == 0)
+
+        # The root is on the line between the points before and after the
+        # sign change, as for a linear interpolation
+        before = np.flatnonzero(change)
+        after = before + 1
+        crossing_segments = segments[before]
+        keep = single[crossing_segments]
+        before = before[keep]
+        after = after[keep]
+
+        time_before = time[indices[before]]
+        slope = (difference[after] - difference[before])/(time[indices[after]] - time_before)
+
+        roots[selected[crossing_segments[keep]]] = time_before - difference[before]/slope
+        single_root[selected[single]] = True
+
+        return roots, single_root
@@ -1,10 +1,19 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import os
+import uuid
+import threading
+
 import six
 import numpy as np
 
 from ..utils.logger import setup_module_logger, get_logger
 
+
+# The results of setup_worker, for each process, thread and model instance
+_worker_states = {}
+
+
 class Model(object):
     """
     Class for storing the model to perform uncertainty quantification and
@@ -39,6 +48,19 @@ class Model(object):
         uncertainty is not calculated for the model. Default is False.
     suppress_graphics : bool, optional
         Suppress all graphics created by the model. Default is False.
+    vectorized : bool, optional
+        True if ``run`` is vectorized, meaning it takes arrays with the
+        parameter values for a batch of model evaluations, and returns the
+        stacked results of all the evaluations. See the ``run`` method for
+        the requirements of a vectorized ``run``. Default is False.
+    setup_worker : {None, callable}, optional
+        A function that performs the expensive one-time initialization of the
+        model in each worker. See the ``setup_worker`` method for requirements
+        of the function. Default is None.
+    teardown_worker : {None, callable}, optional
+        A function that cleans up what `setup_worker` created, when the worker
+        is stopped. See the ``teardown_worker`` method for requirements of the
+        function. Default is None.
     logger_level : {"info", "debug", "warning", "error", "critical", None}, optional
         Set the threshold for the logging level. Logging messages less severe
         than this level is ignored. If None, no logging to file is performed.
@@ -61,6 +83,9 @@ class Model(object):
         function set as run.
     suppress_graphics : bool
         Suppress all graphics created by the model.
+    vectorized : bool
+        True if ``run`` is vectorized and evaluates a batch of parameter sets
+        in one call.
     ignore : bool
         Ignore the model results when calculating uncertainties, which means the
         uncertainty is not calculated for the model. The model results are still
@@ -70,7 +95,14 @@ class Model(object):
     --------
     uncertainpy.models.Model.run
     uncertainpy.models.Model.postprocess
+    uncertainpy.models.Model.setup_worker
+    uncertainpy.models.Model.teardown_worker
     """
+    # Attributes that are set while running the model, and are ignored when
+    # identifying the model in the cache
+    _runtime_attributes = ["_worker_id"]
+
+
     def __init__(self,
                  run=None,
                  interpolate=False,
@@ -78,6 +110,9 @@ class Model(object):
                  postprocess=None,
                  ignore=False,
                  suppress_graphics=False,
+                 vectorized=False,
+                 setup_worker=None,
+                 teardown_worker=None,
                  logger_level="info",
                  **model_kwargs):
 
@@ -85,9 +120,14 @@ class Model(object):
         self.labels = labels
         self.ignore = ignore
         self.suppress_graphics = suppress_graphics
+        self.vectorized = vectorized
 
         self.model_kwargs = model_kwargs
 
+        # Identifies the worker states of this model, also when the model is
+        # pickled and sent to the worker processes
+        self._worker_id = uuid.uuid4().hex
+
         if run is not None:
             self.run = run
         else:
@@ -98,6 +138,12 @@ class Model(object):
         if postprocess is not None:
             self.postprocess = postprocess
 
+        if setup_worker is not None:
+            self.setup_worker = setup_worker
+
+        if teardown_worker is not None:
+            self.teardown_worker = teardown_worker
+
 
     @property
     def run(self):
@@ -187,6 +233,25 @@ class Model(object):
                Certain features require that specific keys are present in this
                dictionary.
 
+        If the model is ``vectorized``, ``run`` is called once for a batch of
+        model evaluations instead of once for each evaluation.
+        Each parameter is then given as an array with one value for each
+        evaluation in the batch, and ``run`` must return the results
+        stacked along the first axis:
+
+        * ``values`` must have one element for each evaluation, either as an
+          array with the evaluations along the first axis, or as a list if
+          the evaluations have a varying number of values.
+        * ``time`` is shared by all evaluations, unless it is a list with one
+          array for each evaluation, or an array with one row for each
+          evaluation.
+        * The ``info`` objects are shared by all evaluations.
+
+        If ``setup_worker`` returns anything other than None, the result is
+        passed to ``run`` as the keyword argument ``worker_state``, so
+        expensive structures can be created once in each worker instead of in
+        every model evaluation.
+
         The model does not need to be implemented in Python, you can use any
         model/simulator as long as you are able to set the model parameters of
         the model from the run method Python and return the results from the
@@ -250,10 +315,15 @@ class Model(object):
         See also
         --------
         uncertainpy.models.Model.run : Requirements for the model run function.
+        uncertainpy.models.Model.setup_worker : Set up the worker before the first evaluation.
         """
         all_parameters = self.model_kwargs.copy()
         all_parameters.update(parameters)
 
+        worker_state = self.start_worker()
+        if worker_state is not None:
+            all_parameters["worker_state"] = worker_state
+
         model_result = self.run(**all_parameters)
 
         self.validate_run(model_result)
@@ -356,6 +426,144 @@ class Model(object):
         self._postprocess = new_postprocess_function
 
 
+    @property
+    def setup_worker(self):
+        """
+        Perform the expensive one-time initialization of the model in a
+        worker, such as building a network, loading lookup tables or
+        compiling mechanisms, so it is not repeated in every model evaluation.
+
+        This method can either be implemented or set to a function.
+        No setup is performed by default.
+
+        Returns
+        -------
+        worker_state
+            Anything the model evaluations need, for example the created
+            network. If not None, `worker_state` is passed to ``run`` as the
+            keyword argument ``worker_state`` in each model evaluation.
+            It is also available as ``Model.worker_state``.
+
+        Notes
+        -----
+        ``setup_worker`` is called once in each worker process when the pool
+        of ``RunModel`` is started, and once in each thread if the model is
+        run with the "threads" executor.
+        In a serial run, and for executors that do not start the workers
+        through ``RunModel`` (such as "dask" or a given executor),
+        ``setup_worker`` is instead called before the first model evaluation
+        in each worker.
+        The setup is reused for all later model evaluations in the same
+        worker, until ``teardown_worker`` is called.
+
+        Note that a model evaluation can change the state, so ``run`` must
+        reset anything that depends on the parameters.
+
+        See also
+        --------
+        uncertainpy.models.Model.teardown_worker
+        uncertainpy.models.Model.worker_state
+        """
+        return self._setup_worker
+
+
+    def _setup_worker(self):
+        return None
+
+
+    @setup_worker.setter
+    def setup_worker(self, new_setup_worker):
+        if not callable(new_setup_worker):
+            raise TypeError("setup_worker function must be callable")
+
+        self._setup_worker = new_setup_worker
+
+
+    @property
+    def teardown_worker(self):
+        """
+        Clean up what ``setup_worker`` created in a worker.
+
+        This method can either be implemented or set to a function.
+        Nothing is done by default.
+
+        Parameters
+        ----------
+        worker_state
+            The result of ``setup_worker`` in the worker.
+
+        Notes
+        -----
+        ``teardown_worker`` is called when the worker processes of
+        ``RunModel`` exit, and when ``RunModel.close`` is called for the
+        setups done in the main process.
+        Workers that are not started by ``RunModel`` (such as "dask" workers)
+        are not torn down.
+
+        See also
+        --------
+        uncertainpy.models.Model.setup_worker
+        """
+        return self._teardown_worker
+
+
+    def _teardown_worker(self, worker_state):
+        pass
+
+
+    @teardown_worker.setter
+    def teardown_worker(self, new_teardown_worker):
+        if not callable(new_teardown_worker):
+            raise TypeError("teardown_worker function must be callable")
+
+        self._teardown_worker = new_teardown_worker
+
+
+    @property
+    def worker_state(self):
+        """
+        The result of ``setup_worker`` in the current worker. The worker is
+        set up if it has not been set up yet.
+
+        Returns
+        -------
+        worker_state
+            The result of ``setup_worker``.
+        """
+        return self.start_worker()
+
+
+    def start_worker(self):
+        """
+        Set up the current worker process (or thread) with ``setup_worker``,
+        if it has not been set up yet.
+
+        Returns
+        -------
+        worker_state
+            The result of ``setup_worker``.
+        """
+        key = (os.getpid(), threading.current_thread().ident, self._worker_id)
+
+        if key not in _worker_states:
+            _worker_states[key] = self.setup_worker()
+
+        return _worker_states[key]
+
+
+    def stop_worker(self):
+        """
+        Tear down all setups of the model in the current process with
+        ``teardown_worker``, so the next model evaluation sets up the worker
+        again.
+        """
+        pid = os.getpid()
+
+        for key in list(_worker_states.keys()):
+            if key[0] == pid and key[2] == self._worker_id:
+                self.teardown_worker(_worker_states.pop(key))
+
+
     def validate_run(self, model_result):
         """
         Validate the results from ``run``.
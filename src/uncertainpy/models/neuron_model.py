@@ -1,14 +1,26 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import os
+import re
 
 import numpy as np
 import importlib
+from six.moves import reload_module
 
 from .model import Model
 from ..utils.logger import setup_module_logger, get_logger
 
 
+# The NEURON simulations loaded by each process when ``persistent=True``,
+# with the process id, path and file as key
+_sessions = {}
+
+# The functions imported by ``load_python``, with the filename and name of
+# the function as key, and the function and the modification time of the
+# file as value
+_functions = {}
+
+
 class NeuronModel(Model):
     """
     Class for Neuron simulator models.
@@ -54,6 +66,9 @@ class NeuronModel(Model):
         Default is ``["Time (ms)", "Membrane potential (mv)"]``.
     suppress_graphics : bool, optional
         Suppress all graphics created by the Neuron model. Default is True.
+    persistent : bool, optional
+        Only load the ``.hoc`` file once in each process, and reuse the loaded
+        simulation for the following model evaluations. Default is False.
     logger_level : {"info", "debug", "warning", "error", "critical", None}, optional
         Set the threshold for the logging level. Logging messages less severe
         than this level is ignored. If None, no logging to file is performed
@@ -76,6 +91,8 @@ class NeuronModel(Model):
         an interpolation of the results is performed. Default is False.
     suppress_graphics : bool
         Suppress all graphics created by the model.
+    persistent : bool
+        Only load the ``.hoc`` file once in each process.
     ignore : bool
         Ignore the model results when calculating uncertainties, which means the
         uncertainty is not calculated for the model. The model results are still
@@ -89,7 +106,21 @@ class NeuronModel(Model):
     Notes
     -----
     Measures the voltage in the section with name ``soma``.
+
+    Without `persistent`, the ``.hoc`` file is loaded again before each model
+    evaluation. With `persistent`, each process loads the ``.hoc`` file the
+    first time the model is evaluated, and keeps the simulation, the
+    recordings and references to the parameters for the following
+    evaluations. The state of the simulation is reinitialized by
+    ``h.run()`` before each evaluation. This is only correct if the
+    uncertain parameters are used when the simulation is run, and not only
+    when the ``.hoc`` file is loaded, for example to create the morphology.
     """
+    # Attributes that are set while running the model, and are ignored when
+    # identifying the model in the cache
+    _runtime_attributes = ["_worker_id", "h", "time", "V"]
+
+
     def __init__(self,
                  file="mosinit.hoc",
                  path="",
@@ -102,6 +133,7 @@ class NeuronModel(Model):
                  record_from="soma",
                  labels=["Time (ms)", "Membrane potential (mV)"],
                  suppress_graphics=True,
+                 persistent=False,
                  logger_level="info",
                  info={},
                  **model_kwargs):
@@ -115,6 +147,7 @@ class NeuronModel(Model):
         self.file = file
         self.path = path
         self.info = info
+        self.persistent = persistent
 
         if stimulus_end:
             self.info["stimulus_end"] = stimulus_end
@@ -175,7 +208,7 @@ class NeuronModel(Model):
 
 
 
-    def load_python(self, path, file, name):
+    def load_python(self, path, file, name, reload=False):
         """
         Import a Python neuron simulation located in function in `path`/`file`
         with name `name`.
@@ -188,16 +221,37 @@ class NeuronModel(Model):
             Path to the Neuron model.
         name : str
             Name of the run function.
+        reload : bool, optional
+            Import the file again, even if the function has already been
+            imported and the file has not changed. Default is False.
 
         Returns
         -------
         model : a run function
             A python function imported from `path`/`file` with name `name`.
 
+        Notes
+        -----
+        The imported function is cached, so following calls with the same
+        `path`, `file` and `name` return the same function without importing
+        the file again. The file is imported again if it has been modified
+        since the function was imported.
+
         See also
         --------
         uncertainpy.models.Model.run : Requirements for the model run function.
         """
+        filename = os.path.abspath(os.path.join(path, file))
+        key = (filename, name)
+
+        try:
+            modified = os.path.getmtime(filename)
+        except OSError:
+            modified = None
+
+        if not reload and key in _functions and _functions[key][1] == modified:
+            return _functions[key][0]
+
         current_dir = os.getcwd()
 
         if path:
@@ -209,10 +263,17 @@ class NeuronModel(Model):
         module_name = module_path.replace(os.sep, ".")
 
         module = importlib.import_module(module_name)
+
+        # The file has changed since it was imported
+        if reload or key in _functions:
+            module = reload_module(module)
+
         model = getattr(module, name)
 
         os.chdir(current_dir)
 
+        _functions[key] = (model, modified)
+
         return model
 
 
@@ -383,13 +444,21 @@ class NeuronModel(Model):
         --------
         uncertainpy.models.Model.run : Requirements for the model run function.
         """
+        if self.persistent:
+            session = self.session()
 
-        self.h = self.load_neuron(self.path, self.file)
+            self.h = session["h"]
+            self.time = session["time"]
 
-        self.set_parameters(parameters)
+            self.set_parameters(parameters)
 
-        self._record_t()
-        self._record_v()
+        else:
+            self.h = self.load_neuron(self.path, self.file)
+
+            self.set_parameters(parameters)
+
+            self._record_t()
+            self._record_v()
 
         self.h.run()
 
@@ -400,6 +469,52 @@ class NeuronModel(Model):
 
 
 
+    def session(self):
+        """
+        Get the NEURON simulation loaded by this process, and load it from the
+        ``.hoc`` file the first time.
+
+        Returns
+        -------
+        session : dict
+            A dictionary with the Neuron h object (``"h"``), the recording of
+            the time (``"time"``), the section the voltage is recorded from
+            (``"rec_section"``), and the references to the parameters
+            (``"references"``).
+
+        Notes
+        -----
+        The simulation is shared between all NeuronModels in the process
+        with the same `path` and `file`. If the models record from different
+        sections, the voltage recording is moved to the section of the model
+        when it gets the simulation.
+        """
+        key = (os.getpid(), os.path.abspath(self.path), self.file)
+
+        if key not in _sessions:
+            self.h = self.load_neuron(self.path, self.file)
+
+            self.time = None
+            self._record_t()
+            self._record_v()
+
+            _sessions[key] = {"h": self.h,
+                              "time": self.time,
+                              "rec_section": self.rec_section,
+                              "references": {}}
+
+        # The voltage is recorded from the section of the model that used
+        # the simulation last
+        elif _sessions[key]["rec_section"] != self.rec_section:
+            self.h = _sessions[key]["h"]
+            self._record_v()
+
+            _sessions[key]["rec_section"] = self.rec_section
+
+        return _sessions[key]
+
+
+
     def run_python(self, **parameters):
         """
         Load and run a Python function that contains a Neuron simulation and
@@ -467,9 +582,36 @@ class NeuronModel(Model):
         parameters : dict
             A dictionary with parameter names as keys and the parameter value as
             value.
+
+        Notes
+        -----
+        With `persistent`, a reference to each parameter that is a hoc
+        variable is kept, and the parameter is set through the reference.
+        Other parameters, for example range variables of a section, are set
+        by executing ``parameter = value`` in hoc.
         """
+        if not self.persistent:
+            for parameter in parameters:
+                self.h(parameter + " = " + str(parameters[parameter]))
+
+            return
+
+        references = self.session()["references"]
+
         for parameter in parameters:
-            self.h(parameter + " = " + str(parameters[parameter]))
+            if parameter not in references:
+                references[parameter] = None
+
+                if re.match(r"^[A-Za-z_]\w*$", parameter):
+                    try:
+                        references[parameter] = getattr(self.h, "_ref_" + parameter)
+                    except (AttributeError, LookupError, TypeError):
+                        pass
+
+            if references[parameter] is None:
+                self.h(parameter + " = " + str(parameters[parameter]))
+            else:
+                references[parameter][0] = parameters[parameter]
 
 
     def postprocess(self, time, values, info):
@@ -5,6 +5,7 @@ import platform
 import numpy as np
 
 from .core.uncertainty_calculations import UncertaintyCalculations
+from .core.checkpoint import Checkpoint
 from .plotting.plot_uncertainty import PlotUncertainty
 from .utils.logger import get_logger, add_file_handler
 from .data import Data
@@ -70,6 +71,65 @@ class UncertaintyQuantification(ParameterBase):
         If unknown fileextension defaults to saving data as HDF5 files. "hdf5" saves
         and loads files from HDF5 files. "exdir" saves and loads files from
         Exdir files. Default is "auto".
+    cache : {None, str, EvaluationCache}, optional
+        Cache of model evaluations that is consulted before the model is
+        evaluated, so evaluations are reused between uncertainty
+        quantifications. If None, no cache is used. If a string, the
+        evaluations are cached on disk in the folder with that name.
+        Default is None.
+    memmap_folder : {None, str}, optional
+        Folder to store the regular model and feature evaluations in, as
+        memory-mapped numpy files, so the evaluations can be larger than the
+        available memory. If None, the evaluations are kept in memory.
+        Default is None.
+    interpolation_grid : {None, "pilot", array_like, dict}, optional
+        The common time grid the interpolated model/features are evaluated
+        on, so the worker processes return the resampled results instead of
+        the interpolations. If None, the time values of the evaluation with
+        the greatest number of time steps are used. If "pilot", the time
+        values of the evaluation of the first node are used. If array_like,
+        the array is used for all interpolated model/features. If dict, the
+        value is used for the model/feature with the name of the key.
+        Default is None.
+    worker_memmap : bool, optional
+        If True, and `memmap_folder` is given, the worker processes write the
+        regular model and feature evaluations directly to the memory-mapped
+        files, instead of sending them back to the main process.
+        Default is False.
+    executor : {None, "threads", "mpi", "dask", concurrent.futures.Executor}, optional
+        The executor that evaluates the model and features in parallel. If
+        None, a pool of `CPUs` worker processes from multiprocess is used. If
+        "threads", a pool of `CPUs` threads is used, for models that release
+        the GIL. If "mpi", a ``mpi4py.futures.MPIPoolExecutor`` is used, and if
+        "dask", a local dask-distributed cluster is used, both with `CPUs`
+        workers. Any other object with a ``map`` method, such as a
+        ``concurrent.futures.Executor``, is used as it is. Default is None.
+    timeout : {None, float}, optional
+        The maximum time in seconds a single model evaluation can take.
+        Evaluations that take longer are stopped, and the model and all
+        features are set to numpy.nan for that node. Only used with the pool
+        of worker processes from multiprocess. If None, there is no timeout.
+        Default is None.
+    speculative : bool, optional
+        If True, model evaluations that take much longer than the previous
+        evaluations are started again on idle worker processes, and the
+        first result is used. Only used with the pool of worker processes
+        from multiprocess. Default is False.
+    retries : int, optional
+        The number of times a model evaluation, with the postprocessing and
+        feature calculations, is tried again if it raises an exception.
+        Default is 0.
+    tolerant : bool, optional
+        If True, a model evaluation that still raises an exception after
+        `retries` new tries is stored as numpy.nan for the model and all
+        features, and a summary of the exception is stored in
+        ``data.failed``, instead of the exception being raised. The
+        uncertainty quantification is then performed on the remaining
+        evaluations if `allow_incomplete` is True. Default is False.
+    compression : {None, "gzip", "lzf", "blosc"}, optional
+        Compression filter used for the model and feature evaluations when
+        saving data as HDF5 files. "blosc" requires hdf5plugin. If None, no
+        compression is used. Default is None.
 
     Attributes
     ----------
@@ -112,7 +172,17 @@ class UncertaintyQuantification(ParameterBase):
                  CPUs="max",
                  logger_level="info",
                  logger_filename="uncertainpy.log",
-                 backend="auto"):
+                 backend="auto",
+                 cache=None,
+                 memmap_folder=None,
+                 interpolation_grid=None,
+                 worker_memmap=False,
+                 executor=None,
+                 timeout=None,
+                 speculative=False,
+                 retries=0,
+                 tolerant=False,
+                 compression=None):
 
 
         if backend not in ["auto", "hdf5", "exdir"]:
@@ -135,6 +205,15 @@ class UncertaintyQuantification(ParameterBase):
                 custom_uncertainty_quantification=custom_uncertainty_quantification,
                 CPUs=CPUs,
                 logger_level=logger_level,
+                cache=cache,
+                memmap_folder=memmap_folder,
+                interpolation_grid=interpolation_grid,
+                worker_memmap=worker_memmap,
+                executor=executor,
+                timeout=timeout,
+                speculative=speculative,
+                retries=retries,
+                tolerant=tolerant
             )
         else:
             self._uncertainty_calculations = uncertainty_calculations
@@ -147,6 +226,7 @@ class UncertaintyQuantification(ParameterBase):
 
         self.data = None
         self.backend = backend
+        self.compression = compression
 
         self.plotting = PlotUncertainty(folder=None,
                                         logger_level=logger_level)
@@ -228,6 +308,14 @@ class UncertaintyQuantification(ParameterBase):
                  save=True,
                  data_folder="data",
                  filename=None,
+                 checkpoint=False,
+                 resume=False,
+                 streaming=False,
+                 nr_bootstrap=0,
+                 adaptive=False,
+                 tolerance=1e-3,
+                 sparse=None,
+                 truncation=1,
                  **custom_kwargs):
         """
         Perform an uncertainty quantification and sensitivity analysis
@@ -315,6 +403,55 @@ class UncertaintyQuantification(ParameterBase):
         filename : {None, str}, optional
             Name of the data file. If None the model name is used.
             Default is None.
+        checkpoint : bool, optional
+            If the completed model evaluations should be stored in a checkpoint
+            file while the model is evaluated. The checkpoint file is named
+            ``filename + "_checkpoint"`` and stored in `data_folder`. It is
+            removed when the uncertainty quantification is completed. A
+            checkpoint set on ``RunModel`` is used if neither `checkpoint` nor
+            `resume` is given, and is not removed.
+            Default is False.
+        resume : bool, optional
+            Resume an interrupted uncertainty quantification by loading the
+            completed model evaluations from the checkpoint file, so only the
+            missing model evaluations are performed. Implies `checkpoint`.
+            Default is False.
+        streaming : bool, optional
+            Only used with the quasi-Monte Carlo method (``method="mc"``, and
+            not `single`). If True, the statistical metrics are updated as each
+            model evaluation arrives, and the model and feature evaluations are
+            not stored. This keeps the memory usage from growing with the
+            number of samples. Default is False.
+        nr_bootstrap : int, optional
+            Only used with the quasi-Monte Carlo method (``method="mc"``, and
+            not `single`). Number of bootstrap resamples used to calculate the
+            95% confidence intervals of the Sobol indices. No confidence
+            intervals are calculated if 0, or if `streaming` is True.
+            Default is 0.
+        adaptive : bool, optional
+            If a dimension-adaptive sparse grid should be used, if polynomial
+            chaos with pseudo-spectral projection is used. The adaptive sparse
+            grid is only refined in the directions that contribute to the
+            mean and variance, and uses at most
+            ``comb(quadrature_order + d, d)`` nodes, the number of polynomials
+            of total order `quadrature_order` in the ``d`` uncertain
+            parameters. Default is False.
+        tolerance : float, optional
+            The relative tolerance of the adaptive sparse grid, if `adaptive`.
+            Default is 1e-3.
+        sparse : {None, "omp", "lars"}, optional
+            Select only the most significant polynomials with sparse
+            regression and cross-validation, if polynomial chaos with point
+            collocation is used. "omp" is orthogonal matching pursuit and
+            "lars" is least-angle regression. This requires far fewer
+            collocation nodes when there are many uncertain parameters.
+            If None, all polynomials are used. Default is None.
+        truncation : float, optional
+            The norm of the hyperbolic truncation of the polynomials, if
+            polynomial chaos with point collocation is used. Lower values
+            remove more of the polynomials with interactions between the
+            uncertain parameters. 1 uses all polynomials up to
+            `polynomial_order`. Default is 1.
         **custom_kwargs
             Any number of arguments for either the custom polynomial chaos method,
             ``create_PCE_custom``, or the custom uncertainty quantification,
@@ -389,82 +526,119 @@ class UncertaintyQuantification(ParameterBase):
         uncertainpy.core.UncertaintyCalculations.monte_carlo : Uncertainty quantification using quasi-Monte Carlo methods
         uncertainpy.core.UncertaintyCalculations.create_PCE_custom : Requirements for create_PCE_custom
         uncertainpy.core.UncertaintyCalculations.custom_uncertainty_quantification : Requirements for custom_uncertainty_quantification
+        uncertainpy.core.Checkpoint
         """
         uncertain_parameters = self.uncertainty_calculations.convert_uncertain_parameters(uncertain_parameters)
 
-        if method.lower() == "pc":
-            if single:
-                data = self.polynomial_chaos_single(uncertain_parameters=uncertain_parameters,
-                                                    method=pc_method,
-                                                    rosenblatt=rosenblatt,
-                                                    polynomial_order=polynomial_order,
-                                                    nr_collocation_nodes=nr_collocation_nodes,
-                                                    quadrature_order=quadrature_order,
-                                                    nr_pc_mc_samples=nr_pc_mc_samples,
-                                                    allow_incomplete=allow_incomplete,
-                                                    seed=seed,
-                                                    plot=plot,
-                                                    figure_folder=figure_folder,
-                                                    figureformat=figureformat,
-                                                    save=save,
-                                                    data_folder=data_folder,
-                                                    filename=filename,
-                                                    **custom_kwargs)
+        # A checkpoint created here replaces any checkpoint set on RunModel
+        # while the uncertainty quantification is performed
+        runmodel = self.uncertainty_calculations.runmodel
+        previous_checkpoint = runmodel.checkpoint
+        created_checkpoint = None
 
+        if checkpoint or resume:
+            if filename is None:
+                checkpoint_filename = self.model.name
             else:
-                data = self.polynomial_chaos(uncertain_parameters=uncertain_parameters,
-                                             method=pc_method,
-                                             rosenblatt=rosenblatt,
-                                             polynomial_order=polynomial_order,
-                                             nr_collocation_nodes=nr_collocation_nodes,
-                                             quadrature_order=quadrature_order,
-                                             nr_pc_mc_samples=nr_pc_mc_samples,
-                                             allow_incomplete=allow_incomplete,
-                                             seed=seed,
-                                             plot=plot,
-                                             figure_folder=figure_folder,
-                                             figureformat=figureformat,
-                                             save=save,
-                                             data_folder=data_folder,
-                                             filename=filename,
-                                             **custom_kwargs)
-
-        elif method.lower() == "mc":
-            if single:
-                data = self.monte_carlo_single(uncertain_parameters=uncertain_parameters,
-                                               nr_samples=nr_mc_samples,
-                                               plot=plot,
-                                               figure_folder=figure_folder,
-                                               figureformat=figureformat,
-                                               save=save,
-                                               data_folder=data_folder,
-                                               filename=filename,
-                                               seed=seed)
-
+                checkpoint_filename = filename
+
+            created_checkpoint = self.create_checkpoint(checkpoint_filename, folder=data_folder)
+
+            if not resume:
+                created_checkpoint.remove()
+
+            runmodel.checkpoint = created_checkpoint
+
+        try:
+            if method.lower() == "pc":
+                if single:
+                    data = self.polynomial_chaos_single(uncertain_parameters=uncertain_parameters,
+                                                        method=pc_method,
+                                                        rosenblatt=rosenblatt,
+                                                        polynomial_order=polynomial_order,
+                                                        nr_collocation_nodes=nr_collocation_nodes,
+                                                        quadrature_order=quadrature_order,
+                                                        nr_pc_mc_samples=nr_pc_mc_samples,
+                                                        allow_incomplete=allow_incomplete,
+                                                        seed=seed,
+                                                        adaptive=adaptive,
+                                                        tolerance=tolerance,
+                                                        sparse=sparse,
+                                                        truncation=truncation,
+                                                        plot=plot,
+                                                        figure_folder=figure_folder,
+                                                        figureformat=figureformat,
+                                                        save=save,
+                                                        data_folder=data_folder,
+                                                        filename=filename,
+                                                        **custom_kwargs)
+
+                else:
+                    data = self.polynomial_chaos(uncertain_parameters=uncertain_parameters,
+                                                 method=pc_method,
+                                                 rosenblatt=rosenblatt,
+                                                 polynomial_order=polynomial_order,
+                                                 nr_collocation_nodes=nr_collocation_nodes,
+                                                 quadrature_order=quadrature_order,
+                                                 nr_pc_mc_samples=nr_pc_mc_samples,
+                                                 allow_incomplete=allow_incomplete,
+                                                 seed=seed,
+                                                 adaptive=adaptive,
+                                                 tolerance=tolerance,
+                                                 sparse=sparse,
+                                                 truncation=truncation,
+                                                 plot=plot,
+                                                 figure_folder=figure_folder,
+                                                 figureformat=figureformat,
+                                                 save=save,
+                                                 data_folder=data_folder,
+                                                 filename=filename,
+                                                 **custom_kwargs)
+
+            elif method.lower() == "mc":
+                if single:
+                    data = self.monte_carlo_single(uncertain_parameters=uncertain_parameters,
+                                                   nr_samples=nr_mc_samples,
+                                                   plot=plot,
+                                                   figure_folder=figure_folder,
+                                                   figureformat=figureformat,
+                                                   save=save,
+                                                   data_folder=data_folder,
+                                                   filename=filename,
+                                                   seed=seed)
+
+
+                else:
+                    data = self.monte_carlo(uncertain_parameters=uncertain_parameters,
+                                            nr_samples=nr_mc_samples,
+                                            plot=plot,
+                                            figure_folder=figure_folder,
+                                            figureformat=figureformat,
+                                            save=save,
+                                            data_folder=data_folder,
+                                            filename=filename,
+                                            seed=seed,
+                                            streaming=streaming,
+                                            nr_bootstrap=nr_bootstrap)
+
+
+            elif method.lower() == "custom":
+                data = self.custom_uncertainty_quantification(plot=plot,
+                                                              figure_folder=figure_folder,
+                                                              figureformat=figureformat,
+                                                              save=save,
+                                                              data_folder=data_folder,
+                                                              filename=filename,
+                                                              **custom_kwargs)
 
             else:
-                data = self.monte_carlo(uncertain_parameters=uncertain_parameters,
-                                        nr_samples=nr_mc_samples,
-                                        plot=plot,
-                                        figure_folder=figure_folder,
-                                        figureformat=figureformat,
-                                        save=save,
-                                        data_folder=data_folder,
-                                        filename=filename,
-                                        seed=seed)
-
-
-        elif method.lower() == "custom":
-            data = self.custom_uncertainty_quantification(plot=plot,
-                                                          figure_folder=figure_folder,
-                                                          figureformat=figureformat,
-                                                          save=save,
-                                                          data_folder=data_folder,
-                                                          filename=filename,
-                                                          **custom_kwargs)
+                raise ValueError("No method with name {}".format(method))
 
-        else:
-            raise ValueError("No method with name {}".format(method))
+        finally:
+            runmodel.checkpoint = previous_checkpoint
+
+        if created_checkpoint is not None:
+            created_checkpoint.remove()
 
         return data
 
@@ -567,6 +741,10 @@ class UncertaintyQuantification(ParameterBase):
                          save=True,
                          data_folder="data",
                          filename=None,
+                         adaptive=False,
+                         tolerance=1e-3,
+                         sparse=None,
+                         truncation=1,
                          **custom_kwargs):
         """
         Perform an uncertainty quantification and sensitivity analysis
@@ -638,6 +816,24 @@ class UncertaintyQuantification(ParameterBase):
         filename : {None, str}, optional
             Name of the data file. If None the model name is used.
             Default is None.
+        adaptive : bool, optional
+            If a dimension-adaptive sparse grid should be used, if
+            pseudo-spectral projection is used. The adaptive sparse grid uses
+            at most ``comb(quadrature_order + d, d)`` nodes, the number of
+            polynomials of total order `quadrature_order` in the ``d``
+            uncertain parameters. Default is False.
+        tolerance : float, optional
+            The relative tolerance of the adaptive sparse grid.
+            Default is 1e-3.
+        sparse : {None, "omp", "lars"}, optional
+            Select only the most significant polynomials with sparse
+            regression, if point collocation is used. "omp" is orthogonal
+            matching pursuit and "lars" is least-angle regression. If None,
+            all polynomials are used. Default is None.
+        truncation : float, optional
+            The norm of the hyperbolic truncation of the polynomials, if point
+            collocation is used. 1 uses all polynomials up to
+            `polynomial_order`. Default is 1.
         **custom_kwargs
             Any number of arguments for the custom polynomial chaos method,
             ``create_PCE_custom``.
@@ -709,6 +905,10 @@ class UncertaintyQuantification(ParameterBase):
             nr_pc_mc_samples=nr_pc_mc_samples,
             allow_incomplete=allow_incomplete,
             seed=seed,
+            adaptive=adaptive,
+            tolerance=tolerance,
+            sparse=sparse,
+            truncation=truncation,
             **custom_kwargs
             )
 
@@ -736,7 +936,9 @@ class UncertaintyQuantification(ParameterBase):
                     figureformat=".png",
                     save=True,
                     data_folder="data",
-                    filename=None):
+                    filename=None,
+                    streaming=False,
+                    nr_bootstrap=0):
         """
         Perform an uncertainty quantification using the quasi-Monte Carlo method.
 
@@ -780,6 +982,16 @@ class UncertaintyQuantification(ParameterBase):
         filename : {None, str}, optional
             Name of the data file. If None the model name is used.
             Default is None.
+        streaming : bool, optional
+            If True, the statistical metrics are updated as each model
+            evaluation arrives, and the model and feature evaluations are not
+            stored. This keeps the memory usage from growing with the number
+            of samples. Default is False.
+        nr_bootstrap : int, optional
+            Number of bootstrap resamples used to calculate the 95% confidence
+            intervals of the Sobol indices, stored as ``sobol_first_conf`` and
+            ``sobol_total_conf``. No confidence intervals are calculated if 0,
+            or if `streaming` is True. Default is 0.
 
         Returns
         -------
@@ -832,7 +1044,10 @@ class UncertaintyQuantification(ParameterBase):
 
         self.data = self.uncertainty_calculations.monte_carlo(uncertain_parameters=uncertain_parameters,
                                                               nr_samples=nr_samples,
-                                                              seed=seed)
+                                                              seed=seed,
+                                                              streaming=streaming,
+                                                              keep_evaluations=not streaming,
+                                                              nr_bootstrap=nr_bootstrap)
 
         self.data.backend = self.backend
 
@@ -864,7 +1079,11 @@ class UncertaintyQuantification(ParameterBase):
                                 figureformat=".png",
                                 save=True,
                                 data_folder="data",
-                                filename=None):
+                                filename=None,
+                                adaptive=False,
+                                tolerance=1e-3,
+                                sparse=None,
+                                truncation=1):
         """
         Perform an uncertainty quantification and sensitivity analysis for a
         single parameter at the time using polynomial chaos expansions.
@@ -935,6 +1154,24 @@ class UncertaintyQuantification(ParameterBase):
         filename : {None, str}, optional
             Name of the data file. If None the model name is used.
             Default is None.
+        adaptive : bool, optional
+            If a dimension-adaptive sparse grid should be used, if
+            pseudo-spectral projection is used. The adaptive sparse grid uses
+            at most ``comb(quadrature_order + d, d)`` nodes, the number of
+            polynomials of total order `quadrature_order` in the ``d``
+            uncertain parameters. Default is False.
+        tolerance : float, optional
+            The relative tolerance of the adaptive sparse grid.
+            Default is 1e-3.
+        sparse : {None, "omp", "lars"}, optional
+            Select only the most significant polynomials with sparse
+            regression, if point collocation is used. "omp" is orthogonal
+            matching pursuit and "lars" is least-angle regression. If None,
+            all polynomials are used. Default is None.
+        truncation : float, optional
+            The norm of the hyperbolic truncation of the polynomials, if point
+            collocation is used. 1 uses all polynomials up to
+            `polynomial_order`. Default is 1.
         **custom_kwargs
             Any number of arguments for the custom polynomial chaos method,
             ``create_PCE_custom``.
@@ -1017,6 +1254,10 @@ class UncertaintyQuantification(ParameterBase):
                 quadrature_order=quadrature_order,
                 nr_pc_mc_samples=nr_pc_mc_samples,
                 allow_incomplete=allow_incomplete,
+                adaptive=adaptive,
+                tolerance=tolerance,
+                sparse=sparse,
+                truncation=truncation
             )
 
             data.backend = self.backend
@@ -1171,6 +1412,69 @@ class UncertaintyQuantification(ParameterBase):
         return data_dict
 
 
+    def close(self):
+        """
+        Close the pool of worker processes used to evaluate the model.
+
+        A new pool is created the next time the model is evaluated in parallel.
+        ``UncertaintyQuantification`` can also be used as a context manager,
+        which closes the pool when exiting the ``with`` block:
+
+        .. code-block:: Python
+
+            with un.UncertaintyQuantification(model, parameters) as UQ:
+                data = UQ.quantify()
+
+        See also
+        --------
+        uncertainpy.core.RunModel.close
+        """
+        self.uncertainty_calculations.runmodel.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+    def create_checkpoint(self, filename, folder="data"):
+        """
+        Create a checkpoint for the model evaluations, using the same
+        fileformat as when saving the data.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the data file. The checkpoint file is named
+            ``filename + "_checkpoint"``.
+        folder : str, optional
+            The folder to store the checkpoint in. Default is "data".
+
+        Returns
+        -------
+        checkpoint : Checkpoint
+            The checkpoint for the model evaluations.
+
+        See also
+        --------
+        uncertainpy.core.Checkpoint
+        """
+        fileextension = ".h5"
+        if filename.endswith(".exdir") or self.backend == "exdir":
+            fileextension = ".exdir"
+
+        for extension in [".h5", ".exdir"]:
+            if filename.endswith(extension):
+                filename = filename[:-len(extension)]
+
+        checkpoint_path = os.path.join(folder, filename + "_checkpoint" + fileextension)
+
+        return Checkpoint(checkpoint_path)
+
+
     def save(self, filename, folder="data"):
         """
         Save ``data`` to disk.
@@ -1222,14 +1526,14 @@ class UncertaintyQuantification(ParameterBase):
 
                 logger.info("Saving data as: {}".format(save_path))
 
-                self.data[uncertain_parameter].save(save_path)
+                self.data[uncertain_parameter].save(save_path, compression=self.compression)
 
         else:
             save_path = os.path.join(folder, filename + fileextension)
 
             logger.info("Saving data as: {}".format(save_path))
 
-            self.data.save(save_path)
+            self.data.save(save_path, compression=self.compression)
 
 
 
@@ -87,14 +87,15 @@ testing_utils = [TestLogger, TestNoneToNan, TestLengths, TestContainsNoneOrNan,
 testing_models = [TestTestingModel0d, TestTestingModel1d, TestTestingModel2d,
                   TestModel, TestHodgkinHuxleyModel, TestCoffeeCupModel,
                   TestIzhikevichModel, TestNestModel, TestNeuronModel,
-                  TestRunModel, TestParallel]
+                  TestRunModel, TestParallel, TestEvaluationCache,
+                  TestCheckpoint, TestMemmapEvaluations]
 
 testing_parameters = [TestParameter, TestParameters]
 
 testing_exact = testing_spikes + [TestUncertainty, TestPlotUncertainpy]
 
 testing_all = testing_parameters + testing_models + testing_base\
-              + testing_features + testing_data + [TestUncertaintyCalculations, TestDistribution]\
+              + testing_features + testing_data + [TestUncertaintyCalculations, TestStreaming, TestDistribution]\
               + testing_utils
 
 testing_complete = testing_all + [TestExamples]
@@ -265,6 +266,26 @@ def run_model():
     run(TestRunModel)
 
 
+@cli.command()
+def evaluation_cache():
+    run(TestEvaluationCache)
+
+
+@cli.command()
+def checkpoint():
+    run(TestCheckpoint)
+
+
+@cli.command()
+def memmap_evaluations():
+    run(TestMemmapEvaluations)
+
+
+@cli.command()
+def streaming():
+    run(TestStreaming)
+
+
 @cli.command()
 def model():
     run(TestModel)
@@ -16,7 +16,11 @@ from .test_uncertainty import TestUncertainty
 from .test_data import TestData, TestDataFeature
 from .test_run_model import TestRunModel
 from .test_uncertainty_calculations import TestUncertaintyCalculations
+from .test_streaming import TestStreaming
 from .test_parallel import TestParallel
+from .test_evaluation_cache import TestEvaluationCache
+from .test_checkpoint import TestCheckpoint
+from .test_memmap_evaluations import TestMemmapEvaluations
 from .test_examples import TestExamples
 from .test_base import TestBase, TestParameterBase
 from .test_utility import TestLengths, TestNoneToNan, TestContainsNoneOrNan
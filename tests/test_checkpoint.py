@@ -0,0 +1,280 @@
+import unittest
+import os
+import shutil
+
+import numpy as np
+
+from uncertainpy import Parameters
+from uncertainpy.core import RunModel, Checkpoint
+
+from .testing_classes import TestingFeatures
+from .testing_classes import TestingModel1d, TestingModelAdaptive
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.output_test_dir = ".tests/"
+
+        if os.path.isdir(self.output_test_dir):
+            shutil.rmtree(self.output_test_dir)
+        os.makedirs(self.output_test_dir)
+
+        self.filename = os.path.join(self.output_test_dir, "checkpoint.h5")
+        self.checkpoint = Checkpoint(self.filename, logger_level="error")
+
+        self.nodes = np.array([[0, 1, 2], [1, 2, 3]])
+        self.uncertain_parameters = ["a", "b"]
+
+        self.result = {"TestingModel1d": {"values": np.arange(0, 10),
+                                          "time": np.arange(0, 10)},
+                       "feature0d": {"values": 1, "time": np.nan},
+                       "feature2d": {"values": np.ones((2, 3)), "time": np.arange(0, 3)}}
+
+        self.failed_result = {"TestingModel1d": {"values": np.nan,
+                                                 "time": np.nan,
+                                                 "failed": "ValueError: a can not be 2"},
+                              "feature0d": {"values": np.nan, "time": np.nan},
+                              "feature2d": {"values": np.nan, "time": np.nan}}
+
+
+    def tearDown(self):
+        self.checkpoint.close()
+
+        if os.path.isdir(self.output_test_dir):
+            shutil.rmtree(self.output_test_dir)
+
+
+    def test_init_backend_error(self):
+        with self.assertRaises(ValueError):
+            Checkpoint(self.filename, backend="not a backend")
+
+
+    def test_load_no_file(self):
+        self.assertEqual(self.checkpoint.load(self.nodes, self.uncertain_parameters), {})
+
+
+    def test_write_before_open(self):
+        with self.assertRaises(RuntimeError):
+            self.checkpoint.write(0, self.result)
+
+
+    def write_load(self, checkpoint):
+        checkpoint.open(self.nodes, self.uncertain_parameters)
+        checkpoint.write(2, self.result)
+        checkpoint.write(0, self.failed_result)
+        checkpoint.close()
+
+        results = checkpoint.load(self.nodes, self.uncertain_parameters)
+
+        # Failed evaluations are not loaded
+        self.assertEqual(set(results.keys()), set([2]))
+        self.assertTrue(np.array_equal(results[2]["TestingModel1d"]["values"], np.arange(0, 10)))
+        self.assertTrue(np.array_equal(results[2]["TestingModel1d"]["time"], np.arange(0, 10)))
+        self.assertEqual(results[2]["feature0d"]["values"], 1)
+        self.assertTrue(np.isnan(results[2]["feature0d"]["time"]))
+        self.assertTrue(np.array_equal(results[2]["feature2d"]["values"], np.ones((2, 3))))
+        self.assertNotIn("failed", results[2]["TestingModel1d"])
+
+        self.assertEqual(checkpoint.load(self.nodes + 1, self.uncertain_parameters), {})
+        self.assertEqual(checkpoint.load(self.nodes, ["b", "a"]), {})
+
+
+    def test_write_load_hdf5(self):
+        self.write_load(self.checkpoint)
+
+
+    def test_write_load_exdir(self):
+        checkpoint = Checkpoint(os.path.join(self.output_test_dir, "checkpoint.exdir"),
+                                logger_level="error")
+
+        self.write_load(checkpoint)
+
+
+    def test_write_append(self):
+        self.checkpoint.open(self.nodes, self.uncertain_parameters)
+        self.checkpoint.write(0, self.result)
+        self.checkpoint.close()
+
+        self.checkpoint.open(self.nodes, self.uncertain_parameters)
+        self.checkpoint.write(1, self.result)
+        self.checkpoint.write(1, self.result)
+        self.checkpoint.close()
+
+        results = self.checkpoint.load(self.nodes, self.uncertain_parameters)
+
+        self.assertEqual(set(results.keys()), set([0, 1]))
+
+
+    def test_layout(self):
+        import h5py
+
+        self.checkpoint.open(self.nodes, self.uncertain_parameters)
+        self.checkpoint.write(1, self.result)
+        self.checkpoint.close()
+
+        with h5py.File(self.filename, "r") as f:
+            group = f[self.checkpoint.group_name(self.nodes, self.uncertain_parameters)]
+
+            self.assertTrue(np.array_equal(group["done"][()], [False, True, False]))
+
+            values = group["results"]["feature2d"]["values"]
+            self.assertEqual(values.attrs["layout"], "checkpoint")
+            self.assertTrue(np.array_equal(values["values"][()], np.ones(6)))
+            self.assertTrue(np.array_equal(values["offsets"][()], [-1, 0, -1]))
+            self.assertTrue(np.array_equal(values["shapes"][()], [[-1, -1], [2, 3], [-1, -1]]))
+
+
+    def test_write_replace(self):
+        import h5py
+
+        self.checkpoint.open(self.nodes, self.uncertain_parameters)
+        self.checkpoint.write(1, self.result)
+        self.checkpoint.write(1, self.result)
+        self.checkpoint.write(1, self.failed_result)
+        self.checkpoint.close()
+
+        name = self.checkpoint.group_name(self.nodes, self.uncertain_parameters)
+
+        # Evaluations that fit are written where the previous evaluation was
+        with h5py.File(self.filename, "r") as f:
+            values = f[name]["results"]["feature2d"]["values"]
+            self.assertEqual(values["values"].shape, (6,))
+            self.assertTrue(np.array_equal(values["shapes"][1], [-1, -1]))
+
+        self.checkpoint.open(self.nodes, self.uncertain_parameters)
+        self.checkpoint.write(1, self.result)
+        self.checkpoint.close()
+
+        with h5py.File(self.filename, "r") as f:
+            values = f[name]["results"]["feature2d"]["values"]
+            self.assertEqual(values["values"].shape, (6,))
+
+        results = self.checkpoint.load(self.nodes, self.uncertain_parameters)
+        self.assertTrue(np.array_equal(results[1]["feature2d"]["values"], np.ones((2, 3))))
+
+        # Larger evaluations are appended
+        self.checkpoint.open(self.nodes, self.uncertain_parameters)
+        self.checkpoint.write(1, {"feature2d": {"values": np.zeros((3, 3)), "time": np.nan}})
+        self.checkpoint.close()
+
+        with h5py.File(self.filename, "r") as f:
+            values = f[name]["results"]["feature2d"]["values"]
+            self.assertEqual(values["values"].shape, (15,))
+            self.assertEqual(values["offsets"][1], 6)
+
+        results = self.checkpoint.load(self.nodes, self.uncertain_parameters)
+        self.assertTrue(np.array_equal(results[1]["feature2d"]["values"], np.zeros((3, 3))))
+
+
+    def test_write_not_numerical(self):
+        self.checkpoint.open(self.nodes, self.uncertain_parameters)
+        self.checkpoint.write(0, {"TestingModel1d": {"values": [np.arange(0, 2), np.arange(0, 3)],
+                                                     "time": np.nan}})
+        self.checkpoint.write(1, self.result)
+        self.checkpoint.close()
+
+        results = self.checkpoint.load(self.nodes, self.uncertain_parameters)
+
+        self.assertEqual(set(results.keys()), set([1]))
+
+
+    def test_remove(self):
+        self.checkpoint.open(self.nodes, self.uncertain_parameters)
+        self.checkpoint.write(0, self.result)
+
+        self.checkpoint.remove()
+
+        self.assertFalse(os.path.exists(self.filename))
+        self.assertEqual(self.checkpoint.load(self.nodes, self.uncertain_parameters), {})
+
+        self.checkpoint.remove()
+
+
+    def test_runmodel_resume(self):
+        parameters = Parameters([["a", 1, None], ["b", 2, None]])
+
+        runmodel = RunModel(model=TestingModel1d(),
+                            parameters=parameters,
+                            features=TestingFeatures(features_to_run=["feature0d", "feature1d"]),
+                            logger_level="error",
+                            CPUs=None,
+                            checkpoint=self.filename)
+
+        self.assertIsInstance(runmodel.checkpoint, Checkpoint)
+
+        self.checkpoint.open(self.nodes, self.uncertain_parameters)
+        self.checkpoint.write(1, {"TestingModel1d": {"values": np.arange(0, 10) - 100,
+                                                     "time": np.arange(0, 10)}})
+        self.checkpoint.close()
+
+        results = runmodel.evaluate_nodes(self.nodes, self.uncertain_parameters)
+
+        self.assertTrue(np.array_equal(results[0]["TestingModel1d"]["values"], np.arange(0, 10) + 1))
+        self.assertTrue(np.array_equal(results[1]["TestingModel1d"]["values"], np.arange(0, 10) - 100))
+        self.assertTrue(np.array_equal(results[2]["TestingModel1d"]["values"], np.arange(0, 10) + 5))
+
+        stored = self.checkpoint.load(self.nodes, self.uncertain_parameters)
+
+        self.assertEqual(set(stored.keys()), set([0, 1, 2]))
+        self.assertTrue(np.array_equal(stored[2]["feature1d"]["values"], np.arange(0, 10)))
+
+
+    def test_runmodel_resume_failed(self):
+        parameters = Parameters([["a", 1, None], ["b", 2, None]])
+
+        evaluated = []
+        fail = [True]
+
+        def model(a, b):
+            evaluated.append(a)
+
+            if a == 1 and fail[0]:
+                raise ValueError("a can not be 1")
+
+            return np.arange(0, 10), np.arange(0, 10) + a + b
+
+        runmodel = RunModel(model=model,
+                            parameters=parameters,
+                            logger_level="error",
+                            CPUs=None,
+                            tolerant=True,
+                            checkpoint=self.filename)
+
+        data = runmodel.run(self.nodes, self.uncertain_parameters)
+
+        self.assertEqual(data.failed, ["Node 1: ValueError: a can not be 1"])
+        self.assertEqual(evaluated, [0, 1, 2])
+
+        # Only the failed evaluation is evaluated again when resuming
+        fail[0] = False
+        data = runmodel.run(self.nodes, self.uncertain_parameters)
+
+        self.assertEqual(data.failed, [])
+        self.assertEqual(evaluated, [0, 1, 2, 1])
+        self.assertTrue(np.array_equal(data["model"].evaluations[1], np.arange(0, 10) + 3))
+
+        stored = self.checkpoint.load(self.nodes, self.uncertain_parameters)
+        self.assertEqual(set(stored.keys()), set([0, 1, 2]))
+
+
+    def test_runmodel_resume_interpolation(self):
+        parameters = Parameters([["a", 1, None], ["b", 2, None]])
+
+        runmodel = RunModel(model=TestingModelAdaptive(),
+                            parameters=parameters,
+                            logger_level="error",
+                            CPUs=None,
+                            checkpoint=self.filename)
+
+        data = runmodel.run(self.nodes, self.uncertain_parameters)
+
+        stored = self.checkpoint.load(self.nodes, self.uncertain_parameters)
+        self.assertTrue(stored[0]["TestingModelAdaptive"]["interpolated"])
+
+        # The interpolations are created again from the checkpoint
+        resumed = runmodel.run(self.nodes, self.uncertain_parameters)
+
+        self.assertTrue(np.array_equal(resumed["TestingModelAdaptive"].time,
+                                       data["TestingModelAdaptive"].time))
+        self.assertTrue(np.allclose(resumed["TestingModelAdaptive"].evaluations,
+                                    data["TestingModelAdaptive"].evaluations))
@@ -6,7 +6,7 @@ import subprocess
 import numpy as np
 
 from uncertainpy import Data
-from uncertainpy.data import DataFeature
+from uncertainpy.data import DataFeature, LazyDataset
 
 
 class TestDataFeature(unittest.TestCase):
@@ -24,7 +24,8 @@ class TestDataFeature(unittest.TestCase):
         self.statistical_metrics = ["evaluations", "time", "mean", "variance",
                                     "percentile_5", "percentile_95",
                                     "sobol_first", "sobol_first_average",
-                                    "sobol_total", "sobol_total_average"]
+                                    "sobol_total", "sobol_total_average",
+                                    "sobol_first_conf", "sobol_total_conf"]
 
 
     def tearDown(self):
@@ -125,6 +126,11 @@ class TestDataFeature(unittest.TestCase):
         self.assertIsNone(self.data_feature.ndim())
 
 
+    def test_ndim_mean(self):
+        self.data_feature.mean = np.arange(0, 10)
+        self.assertIsNone(self.data_feature.ndim())
+
+
     def test_contains(self):
         self.assertFalse("error" in self.data_feature)
 
@@ -308,6 +314,190 @@ class TestData(unittest.TestCase):
 
 
 
+    def test_save_load_ragged(self):
+        import h5py
+
+        evaluations = [[1., 2.], np.nan, [], [[1., 2.], [3., 4.]], 3., [3., 4., 5.]]
+
+        self.data.add_features("TestingModel1d")
+        self.data["TestingModel1d"].evaluations = evaluations
+        self.data["TestingModel1d"].time = evaluations
+
+        filename = os.path.join(self.output_test_dir, "test_save_ragged.h5")
+        self.data.save(filename)
+
+        with h5py.File(filename, "r") as f:
+            group = f["TestingModel1d"]["evaluations"]
+
+            self.assertEqual(group.attrs["layout"], "ragged")
+            self.assertEqual(sorted(group.keys()), ["offsets", "shapes", "values"])
+            self.assertTrue(np.array_equal(group["offsets"][()], [0, 2, 3, 3, 7, 8, 11]))
+
+        data = Data(filename, logger_level="error")
+
+        for statistical_metric in ["evaluations", "time"]:
+            loaded = data["TestingModel1d"][statistical_metric]
+
+            self.assertEqual(len(loaded), 6)
+            self.assertTrue(np.array_equal(loaded[0], [1., 2.]))
+            self.assertTrue(np.isnan(loaded[1]))
+            self.assertEqual(np.shape(loaded[1]), ())
+            self.assertTrue(np.array_equal(loaded[2], []))
+            self.assertTrue(np.array_equal(loaded[3], [[1., 2.], [3., 4.]]))
+            self.assertEqual(loaded[4], 3)
+            self.assertTrue(np.array_equal(loaded[5], [3., 4., 5.]))
+
+
+    def test_save_load_ragged_exdir(self):
+        evaluations = [[1., 2.], np.nan, [3., 4., 5.]]
+
+        data = Data(logger_level="error", backend="exdir")
+        data.add_features("TestingModel1d")
+        data["TestingModel1d"].evaluations = evaluations
+
+        filename = os.path.join(self.output_test_dir, "test_save_ragged")
+        data.save(filename, compression="gzip")
+
+        data = Data(filename, logger_level="error", backend="exdir")
+        loaded = data["TestingModel1d"].evaluations
+
+        self.assertEqual(len(loaded), 3)
+        self.assertTrue(np.array_equal(loaded[0], [1., 2.]))
+        self.assertTrue(np.isnan(loaded[1]))
+        self.assertTrue(np.array_equal(loaded[2], [3., 4., 5.]))
+
+
+    def test_save_compression(self):
+        import h5py
+
+        evaluations = np.random.uniform(size=(100, 50))
+
+        self.data.add_features("TestingModel1d")
+        self.data["TestingModel1d"].evaluations = evaluations
+        self.data["TestingModel1d"].time = np.arange(50)
+        self.data["TestingModel1d"].mean = np.mean(evaluations, 0)
+
+        for compression in ["gzip", "lzf"]:
+            filename = os.path.join(self.output_test_dir, "test_save_{}.h5".format(compression))
+            self.data.save(filename, compression=compression)
+
+            with h5py.File(filename, "r") as f:
+                dataset = f["TestingModel1d"]["evaluations"]
+
+                self.assertEqual(dataset.compression, compression)
+                self.assertEqual(dataset.chunks, (100, 50))
+
+            data = Data(filename, logger_level="error")
+
+            self.assertTrue(np.array_equal(data["TestingModel1d"].evaluations, evaluations))
+            self.assertTrue(np.array_equal(data["TestingModel1d"].time, np.arange(50)))
+            self.assertTrue(np.array_equal(data["TestingModel1d"].mean, np.mean(evaluations, 0)))
+
+
+    def test_save_compression_error(self):
+        with self.assertRaises(ValueError):
+            self.data.save(os.path.join(self.output_test_dir, "test.h5"), compression="zip")
+
+
+    def test_load_lazy(self):
+        folder = os.path.dirname(os.path.realpath(__file__))
+        compare_file = os.path.join(folder, "data/test_save_mock")
+
+        self.data.load(compare_file, lazy=True)
+
+        for statistical_metric in self.statistical_metrics:
+            self.assertIsInstance(self.data["feature1d"].dataset(statistical_metric), LazyDataset)
+
+        self.assertEqual(sorted(self.data["feature1d"].get_metrics()), sorted(self.statistical_metrics))
+        self.assertTrue("mean" in self.data["feature1d"])
+        self.assertIsInstance(self.data["feature1d"].dataset("mean"), LazyDataset)
+
+        self.assertEqual(self.data["TestingModel1d"].dataset("evaluations")[1], 4.)
+        self.assertEqual(self.data["TestingModel1d"].dataset("evaluations").shape, (2,))
+
+        for statistical_metric in self.statistical_metrics:
+            self.assertTrue(np.array_equal(self.data["feature1d"][statistical_metric], [1., 2.]))
+            self.assertTrue(np.array_equal(self.data["TestingModel1d"][statistical_metric], [3., 4.]))
+            self.assertIsInstance(self.data["feature1d"].dataset(statistical_metric), np.ndarray)
+
+        self.assertTrue(np.array_equal(self.data["TestingModel1d"]["labels"], ["xlabel", "ylabel"]))
+        self.assertEqual(self.data.model_name, "TestingModel1d")
+
+        self.data.close()
+
+        self.assertTrue(np.array_equal(self.data["feature1d"].mean, [1., 2.]))
+
+
+    def test_load_lazy_ragged(self):
+        evaluations = [[1., 2.], np.nan, [], [3., 4., 5.]]
+
+        self.data.add_features("TestingModel1d")
+        self.data["TestingModel1d"].evaluations = evaluations
+
+        filename = os.path.join(self.output_test_dir, "test_load_lazy_ragged.h5")
+        self.data.save(filename)
+
+        data = Data(filename, logger_level="error", lazy=True)
+
+        dataset = data["TestingModel1d"].dataset("evaluations")
+
+        self.assertIsInstance(dataset, LazyDataset)
+        self.assertTrue(dataset.ragged)
+        self.assertEqual(len(dataset), 4)
+        self.assertTrue(np.array_equal(dataset[-1], [3., 4., 5.]))
+        self.assertTrue(np.isnan(dataset[1]))
+        self.assertEqual(len(dataset[1:3]), 2)
+        self.assertTrue(np.array_equal(dataset[1:3][1], []))
+
+        with self.assertRaises(IndexError):
+            dataset[4]
+
+        self.assertEqual(data["TestingModel1d"].ndim(), 1)
+        self.assertIsInstance(data["TestingModel1d"].dataset("evaluations"), LazyDataset)
+
+        loaded = data["TestingModel1d"].evaluations
+        self.assertEqual(len(loaded), 4)
+        self.assertTrue(np.array_equal(loaded[0], [1., 2.]))
+        self.assertTrue(np.array_equal(loaded[3], [3., 4., 5.]))
+
+        data.close()
+
+
+    def test_load_lazy_exdir(self):
+        data = Data(logger_level="error", backend="exdir")
+        data.add_features("TestingModel1d")
+        data["TestingModel1d"].evaluations = np.arange(20).reshape(10, 2)
+
+        filename = os.path.join(self.output_test_dir, "test_load_lazy")
+        data.save(filename)
+
+        data = Data(filename, logger_level="error", backend="exdir", lazy=True)
+
+        dataset = data["TestingModel1d"].dataset("evaluations")
+        self.assertIsInstance(dataset, LazyDataset)
+        self.assertTrue(np.array_equal(dataset[2:4], [[4, 5], [6, 7]]))
+        self.assertTrue(np.array_equal(np.asarray(dataset), np.arange(20).reshape(10, 2)))
+
+        data.close()
+
+
+    def test_save_lazy(self):
+        self.data.add_features("TestingModel1d")
+        self.data["TestingModel1d"].evaluations = np.arange(20).reshape(10, 2)
+        self.data["TestingModel1d"].mean = np.arange(2)
+
+        filename = os.path.join(self.output_test_dir, "test_save_lazy.h5")
+        self.data.save(filename)
+
+        data = Data(filename, logger_level="error", lazy=True)
+        data.save(filename)
+
+        data = Data(filename, logger_level="error")
+
+        self.assertTrue(np.array_equal(data["TestingModel1d"].evaluations, np.arange(20).reshape(10, 2)))
+        self.assertTrue(np.array_equal(data["TestingModel1d"].mean, np.arange(2)))
+
+
     # # TODO add this check when changing to python 3
     # # def test_loadError(self):
     # #     compare_file = "this_file_should_not_exist"
@@ -363,6 +553,23 @@ class TestData(unittest.TestCase):
 
 
 
+    def test_save_load_failed(self):
+        self.setup_mock_data(self.data)
+        self.data.failed = ["Node 3: ValueError: message"]
+
+        filename = os.path.join(self.output_test_dir, "test_save_failed")
+        self.data.save(filename)
+
+        new_data = Data(filename)
+        self.assertEqual(new_data.failed, ["Node 3: ValueError: message"])
+
+        self.data.failed = []
+        self.data.save(filename)
+
+        new_data = Data(filename)
+        self.assertEqual(new_data.failed, [])
+
+
     def test_load_missing(self):
         folder = os.path.dirname(os.path.realpath(__file__))
         compare_file = os.path.join(folder, "data/test_save_mock_missing")
@@ -425,6 +632,17 @@ class TestData(unittest.TestCase):
         self.assertEqual(self.data.get_labels("feature"), ["x"])
 
 
+    def test_get_labels_no_model(self):
+        self.data.add_features(["feature"])
+        self.data["feature"].mean = [1, 2]
+
+        self.assertEqual(self.data.model_name, "")
+        self.assertEqual(self.data.get_labels("feature"), ["", ""])
+
+        self.data["feature"].labels = ["x", "y"]
+        self.assertEqual(self.data.get_labels("feature"), ["x", "y"])
+
+
 
     def test_getitem(self):
         self.data.data["test1"] = 1
@@ -569,4 +787,18 @@ class TestData(unittest.TestCase):
         self.assertEqual(self.data.ndim("feature1d"), 1)
         self.assertEqual(self.data.ndim("feature2d"), 2)
         self.assertIsNone(self.data.ndim("feature_invalid"))
-        self.assertIsNone(self.data.ndim("empty"))
\ No newline at end of file
+        self.assertIsNone(self.data.ndim("empty"))
+
+    def test_ndim_mean(self):
+        self.data.add_features(["feature1d", "feature_mean"])
+
+        self.data["feature1d"].evaluations = [np.arange(0, 10)]
+        self.data["feature1d"].mean = 1
+        self.data["feature_mean"].mean = np.arange(0, 10)
+
+        # The mean is only used when no evaluations are stored
+        self.assertEqual(self.data.ndim("feature1d"), 1)
+        self.assertEqual(self.data.ndim("feature_mean"), 1)
+
+        self.data["feature_mean"].mean = 1
+        self.assertEqual(self.data.ndim("feature_mean"), 0)
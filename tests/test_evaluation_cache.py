@@ -0,0 +1,311 @@
+import unittest
+import os
+import shutil
+import threading
+
+import numpy as np
+
+from uncertainpy import Parameters
+from uncertainpy.core import RunModel, EvaluationCache
+from uncertainpy.models import Model
+from uncertainpy.features import SpikingFeatures
+
+from .testing_classes import TestingFeatures
+from .testing_classes import TestingModel1d, TestingModel0d
+
+
+scale = 2
+
+def helper(a):
+    return scale*a
+
+def global_model_function(a):
+    return None, helper(a) + np.sin(a)
+
+
+class TestEvaluationCache(unittest.TestCase):
+    def setUp(self):
+        self.output_test_dir = ".tests/"
+
+        if os.path.isdir(self.output_test_dir):
+            shutil.rmtree(self.output_test_dir)
+        os.makedirs(self.output_test_dir)
+
+        self.folder = os.path.join(self.output_test_dir, "cache")
+
+        self.cache = EvaluationCache(folder=self.folder, logger_level="error")
+
+        self.result = {"TestingModel1d": {"values": np.arange(0, 10),
+                                          "time": np.arange(0, 10)}}
+
+
+    def tearDown(self):
+        if os.path.isdir(self.output_test_dir):
+            shutil.rmtree(self.output_test_dir)
+
+
+    def test_init(self):
+        cache = EvaluationCache(folder="test", max_size=10, max_entries=2)
+
+        self.assertEqual(cache.folder, "test")
+        self.assertEqual(cache.max_size, 10)
+        self.assertEqual(cache.max_entries, 2)
+
+
+    def test_set_get(self):
+        self.cache.set("key", self.result)
+
+        self.assertTrue(os.path.isfile(os.path.join(self.folder, "key.pickle")))
+        self.assertIn("key", self.cache)
+        self.assertEqual(len(self.cache), 1)
+
+        result = self.cache.get("key")
+
+        self.assertTrue(np.array_equal(result["TestingModel1d"]["values"], np.arange(0, 10)))
+        self.assertTrue(np.array_equal(result["TestingModel1d"]["time"], np.arange(0, 10)))
+
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get("key"))
+        self.assertNotIn("key", self.cache)
+        self.assertEqual(len(self.cache), 0)
+
+
+    def test_key(self):
+        identity = self.cache.identity(TestingModel1d(), TestingFeatures())
+
+        key = self.cache.key(identity, {"a": 1.0, "b": 2})
+
+        self.assertEqual(key, self.cache.key(identity, {"b": 2, "a": 1.0}))
+        self.assertNotEqual(key, self.cache.key(identity, {"a": 1.0 + 1e-15, "b": 2}))
+        self.assertNotEqual(key, self.cache.key(identity, {"a": 1.0, "b": 3}))
+
+
+    def test_identity(self):
+        identity = self.cache.identity(TestingModel1d(), TestingFeatures())
+
+        self.assertEqual(identity, self.cache.identity(TestingModel1d(), TestingFeatures()))
+        self.assertNotEqual(identity, self.cache.identity(TestingModel0d(), TestingFeatures()))
+        self.assertNotEqual(identity,
+                            self.cache.identity(TestingModel1d(),
+                                                TestingFeatures(features_to_run="feature0d")))
+
+
+    def test_identity_model_kwargs(self):
+        def model_function(a=1, b=2, c=3):
+            return None, a + b + c
+
+        identity = self.cache.identity(Model(model_function, c=3), None)
+
+        self.assertEqual(identity, self.cache.identity(Model(model_function, c=3), None))
+        self.assertNotEqual(identity, self.cache.identity(Model(model_function, c=4), None))
+
+
+    def test_identity_closure(self):
+        def make(scale, offset=0):
+            def model_function(a):
+                return None, scale*a + offset
+            return model_function
+
+        identity = self.cache.identity(Model(make(1)), None)
+
+        self.assertEqual(identity, self.cache.identity(Model(make(1)), None))
+        self.assertNotEqual(identity, self.cache.identity(Model(make(2)), None))
+        self.assertNotEqual(identity, self.cache.identity(Model(make(1, offset=1)), None))
+
+        def model_function(a, scale=1):
+            return None, scale*a
+
+        def other_model_function(a, scale=2):
+            return None, scale*a
+
+        other_model_function.__name__ = "model_function"
+        self.assertNotEqual(self.cache.identity(Model(model_function), None),
+                            self.cache.identity(Model(other_model_function), None))
+
+
+    def test_identity_globals(self):
+        global scale, helper
+
+        identity = self.cache.identity(Model(global_model_function), None)
+        self.assertEqual(identity, self.cache.identity(Model(global_model_function), None))
+
+        original_scale = scale
+        try:
+            scale = 3
+            self.assertNotEqual(identity, self.cache.identity(Model(global_model_function), None))
+        finally:
+            scale = original_scale
+
+        original_helper = helper
+        try:
+            def helper(a):
+                return scale*a + 1
+
+            self.assertNotEqual(identity, self.cache.identity(Model(global_model_function), None))
+        finally:
+            helper = original_helper
+
+        self.assertEqual(identity, self.cache.identity(Model(global_model_function), None))
+
+
+    def test_identity_array(self):
+        class TableModel(Model):
+            def __init__(self, table):
+                super(TableModel, self).__init__(logger_level="error")
+                self.table = table
+
+            def run(self, a):
+                return None, self.table*a
+
+        identity = self.cache.identity(TableModel(np.ones(3)), None)
+
+        self.assertEqual(identity, self.cache.identity(TableModel(np.ones(3)), None))
+        self.assertNotEqual(identity, self.cache.identity(TableModel(np.zeros(3)), None))
+        self.assertNotEqual(identity, self.cache.identity(TableModel(np.ones(4)), None))
+        self.assertNotEqual(identity, self.cache.identity(TableModel(np.ones(3, dtype=int)), None))
+
+
+    def test_identity_unknown(self):
+        class LockModel(Model):
+            def __init__(self):
+                super(LockModel, self).__init__(logger_level="error")
+                self.lock = threading.Lock()
+
+            def run(self, a):
+                return None, a
+
+        self.assertIsNone(self.cache.identity(LockModel(), None))
+
+        parameters = Parameters([["a", 1, None]])
+        runmodel = RunModel(model=LockModel(),
+                            parameters=parameters,
+                            logger_level="error",
+                            CPUs=None,
+                            cache=self.cache)
+
+        results = runmodel.evaluate_nodes(np.array([0, 1, 2]), ["a"])
+
+        # The model is evaluated, but not cached
+        self.assertEqual(results[2]["LockModel"]["values"], 2)
+        self.assertEqual(len(self.cache), 0)
+
+
+    def test_identity_runtime_attributes(self):
+        features = SpikingFeatures(logger_level="error")
+        identity = self.cache.identity(TestingModel1d(), features)
+
+        time = np.linspace(0, 100, 1000)
+        features.calculate_features(time, 50*np.sin(time), {"stimulus_start": 0,
+                                                            "stimulus_end": 100})
+
+        self.assertEqual(identity, self.cache.identity(TestingModel1d(), features))
+
+
+    def test_set_replace(self):
+        self.cache.set("key", self.result)
+        self.cache.set("key", {"TestingModel1d": {"values": 1, "time": None}})
+
+        self.assertEqual(self.cache.get("key")["TestingModel1d"]["values"], 1)
+        self.assertEqual(len(self.cache), 1)
+
+
+    def test_evict_max_entries(self):
+        self.cache.max_entries = 2
+
+        for i, key in enumerate(["key1", "key2", "key3"]):
+            self.cache.set(key, self.result)
+            os.utime(self.cache.path(key), (i, i))
+
+        # Mark key1 as recently used
+        self.cache.get("key1")
+
+        self.cache.evict()
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertIn("key1", self.cache)
+        self.assertNotIn("key2", self.cache)
+        self.assertIn("key3", self.cache)
+
+
+    def test_evict_max_size(self):
+        for i, key in enumerate(["key1", "key2", "key3"]):
+            self.cache.set(key, self.result)
+            os.utime(self.cache.path(key), (i, i))
+
+        self.cache.max_size = os.path.getsize(self.cache.path("key1"))
+        self.cache.evict()
+
+        self.assertEqual(len(self.cache), 1)
+        self.assertIn("key3", self.cache)
+
+
+    def test_evict_no_limit(self):
+        for key in ["key1", "key2", "key3"]:
+            self.cache.set(key, self.result)
+
+        self.cache.evict()
+
+        self.assertEqual(len(self.cache), 3)
+
+
+    def test_clear(self):
+        for key in ["key1", "key2", "key3"]:
+            self.cache.set(key, self.result)
+
+        self.cache.clear()
+
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.size(), 0)
+
+
+    def test_runmodel(self):
+        parameters = Parameters([["a", 1, None], ["b", 2, None]])
+        nodes = np.array([[0, 1, 2], [1, 2, 3]])
+
+        runmodel = RunModel(model=TestingModel1d(),
+                            parameters=parameters,
+                            features=TestingFeatures(features_to_run=["feature0d", "feature1d"]),
+                            logger_level="error",
+                            CPUs=None,
+                            cache=self.folder)
+
+        self.assertIsInstance(runmodel.cache, EvaluationCache)
+
+        results = runmodel.evaluate_nodes(nodes, ["a", "b"])
+
+        self.assertEqual(len(runmodel.cache), 3)
+
+        def fail(model_parameters):
+            raise RuntimeError("The model should not be evaluated")
+
+        runmodel._parallel.run = fail
+
+        cached_results = runmodel.evaluate_nodes(nodes, ["a", "b"])
+
+        self.assertEqual(len(cached_results), 3)
+        for result, cached_result in zip(results, cached_results):
+            self.assertTrue(np.array_equal(result["TestingModel1d"]["values"],
+                                           cached_result["TestingModel1d"]["values"]))
+            self.assertEqual(result["feature0d"]["values"],
+                             cached_result["feature0d"]["values"])
+
+
+    def test_runmodel_partial(self):
+        parameters = Parameters([["a", 1, None], ["b", 2, None]])
+
+        runmodel = RunModel(model=TestingModel1d(),
+                            parameters=parameters,
+                            logger_level="error",
+                            CPUs=None,
+                            cache=self.cache)
+
+        runmodel.evaluate_nodes(np.array([[0, 1], [1, 2]]), ["a", "b"])
+
+        results = runmodel.evaluate_nodes(np.array([[0, 1, 2], [1, 2, 4]]), ["a", "b"])
+
+        self.assertEqual(len(self.cache), 3)
+        self.assertTrue(np.array_equal(results[0]["TestingModel1d"]["values"],
+                                       np.arange(0, 10) + 1))
+        self.assertTrue(np.array_equal(results[2]["TestingModel1d"]["values"],
+                                       np.arange(0, 10) + 6))
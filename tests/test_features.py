@@ -107,6 +107,30 @@ class TestFeatures(unittest.TestCase):
         self.assertEqual(self.features.calculate_all_features(self.time, self.values), {})
 
 
+    def test_calculate_features_batch(self):
+        def mean(time, values):
+            return None, np.mean(values)
+
+        def positive(time, values):
+            return time, values[values > 4]
+
+        features = Features(new_features=[mean, positive], logger_level="error")
+
+        values = np.array([self.values, 2*self.values, -self.values])
+        results = features.calculate_features_batch(self.time, values)
+
+        self.assertEqual(set(results.keys()), set(["mean", "positive"]))
+
+        self.assertTrue(np.isnan(results["mean"]["time"]))
+        self.assertTrue(np.array_equal(results["mean"]["values"], [5.5, 11, -5.5]))
+
+        self.assertTrue(np.array_equal(results["positive"]["time"], self.time))
+        self.assertIsInstance(results["positive"]["values"], list)
+        self.assertTrue(np.array_equal(results["positive"]["values"][0], np.arange(5, 11)))
+        self.assertTrue(np.array_equal(results["positive"]["values"][1], 2*self.values[2:]))
+        self.assertEqual(len(results["positive"]["values"][2]), 0)
+
+
     # def test_calculate(self):
     #     self.assertEqual(self.features.calculate(self.time, self.values), {})
 
@@ -489,6 +513,117 @@ class TestSpikingFeatures(unittest.TestCase):
                          set(self.implemented_features))
 
 
+    def compare_batch(self, features, values):
+        results = features.calculate_features_batch(self.t, values, self.info.copy())
+
+        self.assertEqual(set(results.keys()), set(features.features_to_run))
+
+        for i, V in enumerate(values):
+            result = features.calculate_features(self.t, V, self.info.copy())
+
+            for feature in features.features_to_run:
+                expected = result[feature]["values"]
+                batch_value = results[feature]["values"][i]
+
+                if expected is None:
+                    self.assertTrue(np.isnan(batch_value))
+                else:
+                    self.assertAlmostEqual(batch_value, expected, places=10)
+
+
+    def test_calculate_features_batch(self):
+        np.random.seed(10)
+
+        values = [self.V,
+                  np.zeros(len(self.V)) - 70,
+                  self.V[::-1],
+                  self.V + 20]
+        values += [self.V*np.random.uniform(0.8, 1.2) + np.random.normal(0, 4, len(self.V))
+                   for i in range(10)]
+
+        self.info = {"stimulus_start": self.t[0] + 20, "stimulus_end": self.t[-1] - 20}
+
+        self.compare_batch(self.features, np.array(values))
+
+        features = SpikingFeatures(logger_level="error", extended_spikes=True)
+        self.compare_batch(features, np.array(values))
+
+        features = SpikingFeatures(logger_level="error", threshold=0.4,
+                                   end_threshold=-0.1, normalize=True)
+        self.compare_batch(features, np.array(values[:1] + values[2:]))
+
+
+    def test_calculate_features_batch_no_spikes(self):
+        values = np.zeros((3, len(self.t))) - 70
+
+        results = self.features.calculate_features_batch(self.t, values, self.info)
+
+        self.assertTrue(np.array_equal(results["nr_spikes"]["values"], [0, 0, 0]))
+        self.assertTrue(np.array_equal(results["spike_rate"]["values"], [0, 0, 0]))
+        self.assertTrue(np.all(np.isnan(results["average_AP_width"]["values"])))
+        self.assertTrue(np.all(np.isnan(results["accommodation_index"]["values"])))
+
+
+    def test_calculate_features_batch_new_feature(self):
+        def first_spike_end_time(time, spikes, info):
+            if spikes.nr_spikes == 0:
+                return None, None
+
+            return None, spikes[0].time[-1]
+
+        def nr_spikes(time, spikes, info):
+            return None, -1
+
+        features = SpikingFeatures(new_features=[first_spike_end_time, nr_spikes],
+                                   features_to_run=["first_spike_end_time",
+                                                    "nr_spikes",
+                                                    "spike_rate"],
+                                   logger_level="error")
+
+        values = np.array([self.V, np.zeros(len(self.V)) - 70])
+
+        results = features.calculate_features_batch(self.t, values, self.info)
+
+        self.assertEqual(results["first_spike_end_time"]["values"][0],
+                         self.spikes[0].time[-1])
+        self.assertTrue(np.isnan(results["first_spike_end_time"]["values"][1]))
+        self.assertTrue(np.array_equal(results["nr_spikes"]["values"], [-1, -1]))
+        self.assertAlmostEqual(results["spike_rate"]["values"][0],
+                               12/(self.t[-1] - self.t[0]))
+
+
+    def test_calculate_features_batch_error(self):
+        with self.assertRaises(ValueError):
+            self.features.calculate_features_batch(self.t, self.V, self.info)
+
+        with self.assertRaises(ValueError):
+            self.features.calculate_features_batch(self.t, np.array([self.V]), {})
+
+
+    def test_batch_average_AHP_depth_error(self):
+        # Three spikes in the second voltage trace, where the last two have
+        # the same peak
+        batch = {"values": np.arange(0, 20, dtype=float),
+                 "counts": np.array([0, 3]),
+                 "rows": np.array([1, 1, 1]),
+                 "positions": np.array([0, 1, 2]),
+                 "global_indices": np.array([12, 15, 15])}
+
+        with self.assertRaisesRegex(ValueError, "voltage trace 1"):
+            self.features._batch_average_AHP_depth(self.t, batch, self.info)
+
+
+    def test_calculate_features_batch_not_strict(self):
+        features = SpikingFeatures(logger_level="error", strict=False)
+
+        results = features.calculate_features_batch(self.t, np.array([self.V]), {})
+        expected = features.calculate_features(self.t, self.V, {})
+
+        for feature in features.features_to_run:
+            self.assertAlmostEqual(results[feature]["values"][0],
+                                   expected[feature]["values"])
+
+
     def test_reference_feature(self):
         time, values = self.features.reference_feature(1, 1, 1)
 
@@ -0,0 +1,328 @@
+import unittest
+import os
+import shutil
+
+import numpy as np
+
+from uncertainpy import Parameters
+from uncertainpy.core import RunModel, MemmapEvaluations
+from uncertainpy.core import parallel
+
+from .testing_classes import TestingFeatures
+from .testing_classes import TestingModel1d
+
+
+class TestMemmapEvaluations(unittest.TestCase):
+    def setUp(self):
+        self.output_test_dir = ".tests/"
+
+        if os.path.isdir(self.output_test_dir):
+            shutil.rmtree(self.output_test_dir)
+        os.makedirs(self.output_test_dir)
+
+        self.filename = os.path.join(self.output_test_dir, "memmap", "evaluations.npy")
+
+
+    def tearDown(self):
+        if os.path.isdir(self.output_test_dir):
+            shutil.rmtree(self.output_test_dir)
+
+
+    def test_init(self):
+        memmap = MemmapEvaluations(self.filename, 3)
+
+        self.assertEqual(memmap.filename, self.filename)
+        self.assertEqual(memmap.nr_evaluations, 3)
+        self.assertTrue(memmap.regular)
+        self.assertFalse(os.path.isfile(self.filename))
+
+
+    def test_append(self):
+        memmap = MemmapEvaluations(self.filename, 3)
+
+        for i in range(3):
+            memmap.append(np.arange(0, 10) + i)
+
+        evaluations = memmap.evaluations
+
+        self.assertIsInstance(evaluations, np.memmap)
+        self.assertEqual(evaluations.shape, (3, 10))
+        self.assertTrue(np.array_equal(evaluations[2], np.arange(0, 10) + 2))
+        self.assertTrue(os.path.isfile(self.filename))
+
+        self.assertTrue(np.array_equal(np.load(self.filename), evaluations))
+
+
+    def test_append_too_many(self):
+        memmap = MemmapEvaluations(self.filename, 1)
+        memmap.append(1)
+
+        with self.assertRaises(ValueError):
+            memmap.append(2)
+
+
+    def test_append_nan(self):
+        memmap = MemmapEvaluations(self.filename, 4)
+
+        memmap.append(np.nan)
+        memmap.append([1, np.nan])
+        memmap.append([1, 2])
+        memmap.append(np.nan)
+
+        evaluations = memmap.evaluations
+
+        self.assertTrue(memmap.regular)
+        self.assertEqual(evaluations.shape, (4, 2))
+        self.assertTrue(np.all(np.isnan(evaluations[0])))
+        np.testing.assert_array_equal(evaluations[1], [1, np.nan])
+        self.assertTrue(np.array_equal(evaluations[2], [1, 2]))
+        self.assertTrue(np.all(np.isnan(evaluations[3])))
+
+
+    def test_append_only_nan(self):
+        memmap = MemmapEvaluations(self.filename, 2)
+
+        memmap.append(np.nan)
+        memmap.append(np.nan)
+
+        self.assertTrue(np.all(np.isnan(memmap.evaluations)))
+        self.assertIsInstance(memmap.evaluations, list)
+        self.assertFalse(os.path.isfile(self.filename))
+
+
+    def test_append_irregular(self):
+        memmap = MemmapEvaluations(self.filename, 4)
+
+        memmap.append([1, 2])
+        memmap.append(np.nan)
+        memmap.append([1, 2, 3])
+        memmap.append([1])
+
+        self.assertFalse(memmap.regular)
+        self.assertFalse(os.path.isfile(self.filename))
+
+        evaluations = memmap.evaluations
+
+        self.assertIsInstance(evaluations, list)
+        self.assertEqual(len(evaluations), 4)
+        self.assertTrue(np.array_equal(evaluations[0], [1, 2]))
+        self.assertTrue(np.isnan(evaluations[1]))
+        self.assertEqual(evaluations[2], [1, 2, 3])
+        self.assertEqual(evaluations[3], [1])
+
+
+    def test_append_written(self):
+        memmap = MemmapEvaluations(self.filename, 3, shared=True)
+        memmap.allocate((2,))
+
+        self.assertTrue(os.path.isfile(self.filename))
+
+        memmap.append([1, 2])
+
+        written = np.lib.format.open_memmap(self.filename, mode="r+")
+        written[1] = [3, 4]
+        del written
+
+        memmap.append_written()
+        memmap.append([5, 6])
+
+        self.assertTrue(memmap.regular)
+        self.assertTrue(np.array_equal(memmap.evaluations, [[1, 2], [3, 4], [5, 6]]))
+
+        with self.assertRaises(ValueError):
+            memmap.append_written()
+
+
+    def test_append_written_not_allocated(self):
+        memmap = MemmapEvaluations(self.filename, 2, shared=True)
+
+        with self.assertRaises(RuntimeError):
+            memmap.append_written()
+
+
+    def test_append_written_irregular(self):
+        memmap = MemmapEvaluations(self.filename, 3, shared=True)
+        memmap.allocate((2,))
+
+        memmap.append([1])
+
+        written = np.lib.format.open_memmap(self.filename, mode="r+")
+        written[1] = [3, 4]
+        del written
+
+        memmap.append_written()
+
+        self.assertFalse(memmap.regular)
+        self.assertTrue(os.path.isfile(self.filename))
+
+        memmap.append([5, 6, 7])
+
+        evaluations = memmap.evaluations
+
+        self.assertIsInstance(evaluations, list)
+        self.assertEqual(evaluations[0], [1])
+        self.assertTrue(np.array_equal(evaluations[1], [3, 4]))
+        self.assertEqual(evaluations[2], [5, 6, 7])
+
+        memmap.remove()
+        self.assertFalse(os.path.isfile(self.filename))
+
+
+    def test_remove(self):
+        memmap = MemmapEvaluations(self.filename, 1)
+        memmap.append([1, 2])
+
+        self.assertTrue(os.path.isfile(self.filename))
+
+        memmap.remove()
+
+        self.assertFalse(os.path.isfile(self.filename))
+
+
+    def test_runmodel(self):
+        parameters = Parameters([["a", 1, None], ["b", 2, None]])
+        nodes = np.array([[0, 1, 2], [1, 2, 3]])
+        folder = os.path.join(self.output_test_dir, "memmap")
+
+        features = TestingFeatures(features_to_run=["feature0d",
+                                                    "feature1d",
+                                                    "feature2d",
+                                                    "feature_invalid",
+                                                    "feature_interpolate"])
+
+        runmodel = RunModel(model=TestingModel1d(),
+                            parameters=parameters,
+                            features=features,
+                            logger_level="error",
+                            CPUs=None,
+                            memmap_folder=folder)
+
+        data = runmodel.run(nodes, ["a", "b"])
+
+        runmodel.memmap_folder = None
+        data_memory = runmodel.run(nodes, ["a", "b"])
+
+        for feature in ["TestingModel1d", "feature0d", "feature1d", "feature2d"]:
+            self.assertIsInstance(data[feature].evaluations, np.memmap)
+
+            self.assertTrue(np.array_equal(data[feature].evaluations,
+                                           data_memory[feature].evaluations))
+            np.testing.assert_array_equal(data[feature].time, data_memory[feature].time)
+
+        for feature in ["feature_invalid", "feature_interpolate"]:
+            self.assertIsInstance(data[feature].evaluations, list)
+            np.testing.assert_array_equal(data[feature].evaluations,
+                                          data_memory[feature].evaluations)
+
+        self.assertEqual(len(os.listdir(folder)), 1)
+        self.assertEqual(data.uncertain_parameters, ["a", "b"])
+
+
+    def test_runmodel_worker_memmap(self):
+        parameters = Parameters([["a", 1, None], ["b", 2, None]])
+        nodes = np.array([[0, 1, 2], [1, 2, 3]])
+        folder = os.path.join(self.output_test_dir, "memmap")
+
+        features = TestingFeatures(features_to_run=["feature0d",
+                                                    "feature1d",
+                                                    "feature2d",
+                                                    "feature_invalid",
+                                                    "feature_interpolate"])
+
+        runmodel = RunModel(model=TestingModel1d(),
+                            parameters=parameters,
+                            features=features,
+                            logger_level="error",
+                            CPUs=None,
+                            memmap_folder=folder,
+                            worker_memmap=True)
+
+        results, evaluations = runmodel.evaluate_nodes_memmap(nodes, ["a", "b"])
+
+        for result in results:
+            for feature in ["TestingModel1d", "feature0d", "feature1d", "feature2d"]:
+                self.assertIsNone(result[feature]["values"])
+                self.assertNotIn("stored", result[feature])
+
+        self.assertEqual(runmodel._parallel.memmap_files, {})
+
+        runmodel.memmap_folder = None
+        data_memory = runmodel.run(nodes, ["a", "b"])
+
+        for feature in ["TestingModel1d", "feature0d", "feature1d", "feature2d"]:
+            self.assertIsInstance(evaluations[feature], np.memmap)
+
+            self.assertTrue(np.array_equal(evaluations[feature],
+                                           data_memory[feature].evaluations))
+
+            for result in results:
+                np.testing.assert_array_equal(result[feature]["time"], data_memory[feature].time)
+
+
+    def test_runmodel_worker_memmap_parallel(self):
+        parameters = Parameters([["a", 1, None], ["b", 2, None]])
+        nodes = np.array([[0, 1, 2, 3, 4], [1, 2, 3, 4, 5]])
+        folder = os.path.join(self.output_test_dir, "memmap")
+
+        features = TestingFeatures(features_to_run=["feature0d",
+                                                    "feature1d",
+                                                    "feature2d",
+                                                    "feature_invalid",
+                                                    "feature_interpolate"])
+
+        runmodel = RunModel(model=TestingModel1d(),
+                            parameters=parameters,
+                            features=features,
+                            logger_level="error",
+                            CPUs=2,
+                            memmap_folder=folder,
+                            worker_memmap=True)
+
+        data = runmodel.run(nodes, ["a", "b"])
+        runmodel.close()
+
+        runmodel.memmap_folder = None
+        runmodel.CPUs = None
+        data_memory = runmodel.run(nodes, ["a", "b"])
+
+        for feature in ["TestingModel1d", "feature0d", "feature1d", "feature2d"]:
+            self.assertIsInstance(data[feature].evaluations, np.memmap)
+
+            self.assertTrue(np.array_equal(data[feature].evaluations,
+                                           data_memory[feature].evaluations))
+            np.testing.assert_array_equal(data[feature].time, data_memory[feature].time)
+
+        for feature in ["feature_invalid", "feature_interpolate"]:
+            self.assertIsInstance(data[feature].evaluations, list)
+            np.testing.assert_array_equal(data[feature].evaluations,
+                                          data_memory[feature].evaluations)
+
+        self.assertEqual(len(os.listdir(folder)), 1)
+
+
+    def test_runmodel_worker_memmap_executor(self):
+        parameters = Parameters([["a", 1, None], ["b", 2, None]])
+        nodes = np.array([[0, 1, 2], [1, 2, 3]])
+        folder = os.path.join(self.output_test_dir, "memmap")
+
+        runmodel = RunModel(model=TestingModel1d(),
+                            parameters=parameters,
+                            logger_level="error",
+                            CPUs=None,
+                            executor=SerialExecutor(),
+                            memmap_folder=folder,
+                            worker_memmap=True)
+
+        results, evaluations = runmodel.evaluate_nodes_memmap(nodes, ["a", "b"])
+
+        # The evaluations are sent back instead of written by the workers
+        self.assertTrue(np.array_equal(evaluations["TestingModel1d"][2],
+                                       np.arange(0, 10) + 5))
+        self.assertEqual(len(parallel._memmaps), 0)
+
+
+
+class SerialExecutor(object):
+    def map(self, function, iterable, chunksize=1):
+        for item in iterable:
+            yield function(item)
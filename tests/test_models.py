@@ -81,6 +81,7 @@ class TestModel(unittest.TestCase):
         self.assertTrue(model.interpolate)
         self.assertEqual(model.name, "f")
         self.assertEqual(model.suppress_graphics, False)
+        self.assertEqual(model.vectorized, False)
         self.assertEqual(model.model_kwargs, {"test": 12})
 
 
@@ -190,6 +191,84 @@ class TestModel(unittest.TestCase):
         self.assertEqual(values, "values")
 
 
+    def test_setup_worker(self):
+        setups = []
+        teardowns = []
+
+        def setup_worker():
+            setups.append(np.arange(0, 10))
+            return setups[-1]
+
+        def teardown_worker(worker_state):
+            teardowns.append(worker_state)
+
+        def model(a, worker_state):
+            return None, worker_state + a
+
+        model = Model(run=model,
+                      setup_worker=setup_worker,
+                      teardown_worker=teardown_worker,
+                      logger_level="error")
+
+        time, values = model.evaluate(a=1)
+        self.assertTrue(np.array_equal(values, np.arange(0, 10) + 1))
+
+        time, values = model.evaluate(a=2)
+        self.assertTrue(np.array_equal(values, np.arange(0, 10) + 2))
+
+        self.assertEqual(len(setups), 1)
+        self.assertIs(model.worker_state, setups[0])
+        self.assertEqual(teardowns, [])
+
+        model.stop_worker()
+
+        self.assertEqual(len(teardowns), 1)
+        self.assertIs(teardowns[0], setups[0])
+
+        model.evaluate(a=1)
+        self.assertEqual(len(setups), 2)
+
+        model.stop_worker()
+
+
+    def test_setup_worker_same_name(self):
+        def model(a, worker_state):
+            return None, worker_state + a
+
+        model_1 = Model(run=model,
+                        setup_worker=lambda: 1,
+                        logger_level="error")
+        model_2 = Model(run=model,
+                        setup_worker=lambda: 2,
+                        logger_level="error")
+
+        self.assertEqual(model_1.name, model_2.name)
+        self.assertEqual(model_1.worker_state, 1)
+        self.assertEqual(model_2.worker_state, 2)
+
+        model_1.stop_worker()
+        self.assertEqual(model_2.worker_state, 2)
+
+        model_2.stop_worker()
+
+
+    def test_setup_worker_default(self):
+        model = Model(run=model_function, logger_level="error")
+
+        self.assertIsNone(model.worker_state)
+
+        time, values = model.evaluate(a=-1, b=-1)
+        self.assertTrue(np.array_equal(values, np.arange(0, 10) - 2))
+
+        model.stop_worker()
+
+        with self.assertRaises(TypeError):
+            model.setup_worker = 12
+
+        with self.assertRaises(TypeError):
+            model.teardown_worker = 12
+
+
 class TestHodgkinHuxleyModel(unittest.TestCase):
     def test_run(self):
         model = HodgkinHuxley()
@@ -382,6 +461,66 @@ class TestNeuronModel(unittest.TestCase):
 
 
 
+    def test_run_neuron_model_persistent(self):
+        path = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                            "models/interneuron_modelDB/")
+
+        model = NeuronModel(path=path,
+                            interpolate=True,
+                            logger_level="error")
+
+        persistent_model = NeuronModel(path=path,
+                                       interpolate=True,
+                                       persistent=True,
+                                       logger_level="error")
+
+        self.assertTrue(persistent_model.persistent)
+
+        for cap in [1, 1.1]:
+            uncertain_parameters = {"cap": cap, "Rm": 22000}
+
+            time, values, info = model.run_neuron(**uncertain_parameters)
+            persistent_time, persistent_values, info = \
+                persistent_model.run_neuron(**uncertain_parameters)
+
+            self.assertTrue(np.allclose(time, persistent_time))
+            self.assertTrue(np.allclose(values, persistent_values))
+
+        session = persistent_model.session()
+        self.assertIs(session["h"], persistent_model.h)
+        self.assertIn("cap", session["references"])
+
+
+    def test_run_neuron_model_persistent_record_from(self):
+        path = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                            "models/interneuron_modelDB/")
+
+        soma_model = NeuronModel(path=path,
+                                 interpolate=True,
+                                 persistent=True,
+                                 record_from="soma",
+                                 logger_level="error")
+
+        dend_model = NeuronModel(path=path,
+                                 interpolate=True,
+                                 persistent=True,
+                                 record_from="dend[50]",
+                                 logger_level="error")
+
+        uncertain_parameters = {"cap": 1, "Rm": 22000}
+
+        time, soma_values, info = soma_model.run_neuron(**uncertain_parameters)
+        time, dend_values, info = dend_model.run_neuron(**uncertain_parameters)
+
+        self.assertEqual(dend_model.session()["rec_section"], "dend[50]")
+        self.assertFalse(np.allclose(soma_values, dend_values))
+
+        time, values, info = soma_model.run_neuron(**uncertain_parameters)
+
+        self.assertEqual(soma_model.session()["rec_section"], "soma")
+        self.assertTrue(np.allclose(soma_values, values))
+
+
     def test_load_python(self):
         path = os.path.join("tests", "testing_classes")
         file="load_python_test.py"
@@ -398,6 +537,52 @@ class TestNeuronModel(unittest.TestCase):
 
 
 
+    def test_load_python_cached(self):
+        path = os.path.join("tests", "testing_classes")
+        file = "load_python_test.py"
+
+        model = NeuronModel(path=path,
+                            logger_level="error")
+
+        loaded_model = model.load_python(path=path, file=file, name="testing")
+
+        self.assertIs(model.load_python(path=path, file=file, name="testing"),
+                      loaded_model)
+        self.assertIsNot(model.load_python(path=path, file=file, name="testing_info"),
+                         loaded_model)
+
+
+    def test_load_python_modified(self):
+        path = os.path.join("tests", "testing_classes")
+        file = "load_python_modified_test.py"
+        filename = os.path.join(path, file)
+
+        model = NeuronModel(path=path,
+                            logger_level="error")
+
+        try:
+            with open(filename, "w") as f:
+                f.write("def testing(**parameters):\n    return 'time', 'values'\n")
+
+            loaded_model = model.load_python(path=path, file=file, name="testing")
+            self.assertEqual(loaded_model(), ("time", "values"))
+
+            with open(filename, "w") as f:
+                f.write("def testing(**parameters):\n    return 'time', 'modified values'\n")
+
+            modified = os.path.getmtime(filename) + 10
+            os.utime(filename, (modified, modified))
+
+            loaded_model = model.load_python(path=path, file=file, name="testing")
+            self.assertEqual(loaded_model(), ("time", "modified values"))
+
+            self.assertIsNot(model.load_python(path=path, file=file, name="testing", reload=True),
+                             loaded_model)
+        finally:
+            if os.path.isfile(filename):
+                os.remove(filename)
+
+
     def test_run_python_model(self):
         path = os.path.join("tests", "testing_classes")
 
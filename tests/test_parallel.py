@@ -1,12 +1,16 @@
 import unittest
 import os
+import sys
 import shutil
 import scipy.interpolate
 
 import numpy as np
 
+from six import StringIO
+
 from xvfbwrapper import Xvfb
 from uncertainpy.core import Parallel
+from uncertainpy.core import parallel as parallel_module
 from uncertainpy.models import Model
 from uncertainpy.features import Features
 
@@ -255,13 +259,63 @@ class TestParallel(unittest.TestCase):
 
     def test_create_interpolations_feature_2d(self):
         results = {"feature_interpolate": {"values": np.array([np.arange(0, 10),
-                                                       np.arange(0, 10)]),
+                                                       np.arange(0, 10) + 1]),
+                                        "time": np.arange(0, 10)}}
+
+        results = self.parallel.create_interpolations(results)
+
+        interpolation = results["feature_interpolate"]["interpolation"]
+        time = np.arange(0, 9, 0.5)
+
+        self.assertTrue(np.allclose(interpolation(time), [time, time + 1]))
+
+
+    def test_create_interpolations_feature_3d(self):
+        results = {"feature_interpolate": {"values": np.zeros((2, 2, 10)),
                                         "time": np.arange(0, 10)}}
 
         with self.assertRaises(NotImplementedError):
             self.parallel.create_interpolations(results)
 
 
+    def test_create_interpolations_grid(self):
+        grid = np.linspace(0, 9, 4)
+        self.parallel.interpolation_grid = {"feature_interpolate": grid,
+                                            "TestingModel1d": grid}
+        self.parallel.model.interpolate = True
+
+        results = {"feature_interpolate": {"values": np.array([np.arange(0, 10),
+                                                               np.arange(0, 10) + 1]),
+                                           "time": np.arange(0, 10)},
+                   "TestingModel1d": {"values": np.arange(0, 10) + 1,
+                                      "time": np.arange(0, 10)}}
+
+        results = self.parallel.create_interpolations(results)
+
+        self.assertNotIn("interpolation", results["feature_interpolate"])
+        self.assertNotIn("interpolation", results["TestingModel1d"])
+
+        self.assertTrue(np.array_equal(results["feature_interpolate"]["time"], grid))
+        self.assertTrue(np.allclose(results["feature_interpolate"]["values"], [grid, grid + 1]))
+        self.assertTrue(np.array_equal(results["TestingModel1d"]["time"], grid))
+        self.assertTrue(np.allclose(results["TestingModel1d"]["values"], grid + 1))
+
+
+    def test_interpolate_on_grid_none(self):
+        grid = np.linspace(0, 9, 4)
+        self.parallel.interpolation_grid = {"feature_interpolate": grid}
+
+        results = {"feature_interpolate": {"values": np.array([[np.nan, 1], [2, 3]]),
+                                           "time": np.arange(0, 2),
+                                           "interpolation": None}}
+
+        results = self.parallel.interpolate_on_grid(results, "feature_interpolate")
+
+        self.assertNotIn("interpolation", results["feature_interpolate"])
+        self.assertEqual(results["feature_interpolate"]["values"].shape, (2, 4))
+        self.assertTrue(np.all(np.isnan(results["feature_interpolate"]["values"])))
+
+
 
     def test_interpolation_1d(self):
         results = {"TestingModel1d": {"values": np.arange(0, 10) + 1,
@@ -378,10 +432,55 @@ class TestParallel(unittest.TestCase):
                                                           np.arange(0, 10)]),
                                       "time": np.arange(0, 10)}}
 
+        results = self.parallel.create_interpolations(results)
+
+        self.assertIsInstance(results["TestingModel1d"]["interpolation"],
+                              scipy.interpolate.BSpline)
+
+
+    def test_create_interpolations_model_3d(self):
+        self.parallel.model.interpolate = True
+        results = {"TestingModel1d": {"values": np.zeros((2, 2, 10)),
+                                      "time": np.arange(0, 10)}}
+
         with self.assertRaises(NotImplementedError):
             self.parallel.create_interpolations(results)
 
 
+    def test_interpolation_2d(self):
+        np.random.seed(10)
+
+        time = np.sort(np.random.uniform(0, 10, 20))
+        values = np.random.uniform(size=(3, 20))
+
+        results = {"feature2d": {"values": values,
+                                 "time": time}}
+
+        interpolation = self.parallel.interpolation_2d(results, "feature2d")
+
+        new_time = np.linspace(time[0], time[-1], 50)
+        interpolated = interpolation(new_time)
+
+        self.assertEqual(interpolated.shape, (3, 50))
+
+        for i in range(3):
+            expected = scipy.interpolate.InterpolatedUnivariateSpline(time, values[i], k=3)(new_time)
+            self.assertTrue(np.allclose(interpolated[i], expected))
+
+
+    def test_interpolation_2d_nan(self):
+        results = {"feature2d": {"values": np.array([[np.nan, 1, 2, 3], [1, 2, 3, 4]]),
+                                 "time": np.arange(0, 4)}}
+
+        self.assertIsNone(self.parallel.interpolation_2d(results, "feature2d"))
+
+        results = {"feature2d": {"values": np.arange(0, 10),
+                                 "time": np.arange(0, 10)}}
+
+        with self.assertRaises(ValueError):
+            self.parallel.interpolation_2d(results, "feature2d")
+
+
     def test_run(self):
         results = self.parallel.run(self.model_parameters)
 
@@ -421,6 +520,81 @@ class TestParallel(unittest.TestCase):
 
 
 
+    def test_process_model_result(self):
+        model_result = self.parallel.model.evaluate(**self.model_parameters)
+
+        results = self.parallel.process_model_result(model_result)
+        results_run = self.parallel.run(self.model_parameters)
+
+        self.assertEqual(set(results.keys()), set(results_run.keys()))
+        self.assertTrue(np.array_equal(results["TestingModel1d"]["values"], np.arange(0, 10) + 1))
+        self.assertTrue(np.array_equal(results["feature1d"]["values"], np.arange(0, 10)))
+        self.assertIsInstance(results["feature_interpolate"]["interpolation"],
+                              scipy.interpolate.fitpack2.UnivariateSpline)
+
+
+    def test_store_result(self):
+        filename = os.path.join(self.output_test_dir, "feature1d.npy")
+        evaluations = np.lib.format.open_memmap(filename, mode="w+", dtype=float, shape=(3, 10))
+        del evaluations
+
+        self.parallel.memmap_files = {"feature1d": (filename, self.t),
+                                      "feature_invalid": (filename, self.t)}
+
+        result = self.parallel.store_result(1, self.parallel.run(self.model_parameters))
+
+        self.assertIsNone(result["feature1d"]["values"])
+        self.assertIsNone(result["feature1d"]["time"])
+        self.assertTrue(result["feature1d"]["stored"])
+
+        self.assertTrue(np.isnan(result["feature_invalid"]["values"]))
+        self.assertNotIn("stored", result["feature_invalid"])
+
+        self.assertTrue(np.array_equal(result["TestingModel1d"]["values"], self.values))
+
+        evaluations = np.load(filename)
+        self.assertTrue(np.array_equal(evaluations[1], self.t))
+        self.assertTrue(np.array_equal(evaluations[0], np.zeros(10)))
+
+
+    def test_store_result_opened_once(self):
+        filename = os.path.join(self.output_test_dir, "model.npy")
+        evaluations = np.lib.format.open_memmap(filename, mode="w+", dtype=float, shape=(2, 10))
+        del evaluations
+
+        self.parallel.memmap_files = {"TestingModel1d": (filename, None)}
+
+        self.parallel.run_node((0, self.model_parameters))
+        evaluations = parallel_module._memmaps[filename]
+
+        self.parallel.run_node((1, self.model_parameters))
+        self.assertIs(parallel_module._memmaps[filename], evaluations)
+
+        self.parallel.close_memmaps()
+        self.assertNotIn(filename, parallel_module._memmaps)
+
+        self.assertTrue(np.array_equal(np.load(filename)[1], self.values))
+
+
+    def test_run_node(self):
+        filename = os.path.join(self.output_test_dir, "model.npy")
+        evaluations = np.lib.format.open_memmap(filename, mode="w+", dtype=float, shape=(2, 10))
+        del evaluations
+
+        self.parallel.memmap_files = {"TestingModel1d": (filename, None)}
+
+        result = self.parallel.run_node((1, self.model_parameters))
+
+        self.assertIsNone(result["TestingModel1d"]["values"])
+        self.assertTrue(np.array_equal(result["TestingModel1d"]["time"], self.t))
+        self.assertTrue(np.array_equal(np.load(filename)[1], self.values))
+
+        result = self.parallel.process_node((0, (self.t, self.values + 1)))
+
+        self.assertIsNone(result["TestingModel1d"]["values"])
+        self.assertTrue(np.array_equal(np.load(filename)[0], self.values + 1))
+
+
     def test_run_interpolate(self):
         parallel = Parallel(model=TestingModelAdaptive(),
                             features=TestingFeatures(features_to_run="feature_interpolate"))
@@ -515,3 +689,95 @@ class TestParallel(unittest.TestCase):
         self.parallel.features = feature_function
         with self.assertRaises(TypeError):
             self.parallel.run(self.model_parameters)
+
+
+    def test_nan_result(self):
+        result = self.parallel.nan_result()
+
+        self.assertEqual(set(result.keys()),
+                         set(["TestingModel1d", "feature0d", "feature1d",
+                              "feature2d", "feature_invalid", "feature_interpolate"]))
+
+        for feature in result:
+            self.assertTrue(np.isnan(result[feature]["values"]))
+            self.assertTrue(np.isnan(result[feature]["time"]))
+
+        self.assertIsNone(result["feature_interpolate"]["interpolation"])
+        self.assertNotIn("interpolation", result["feature1d"])
+
+
+    def test_nan_result_interpolation_grid(self):
+        self.parallel.interpolation_grid = {"feature_interpolate": np.linspace(0, 1, 5)}
+
+        result = self.parallel.nan_result()
+
+        self.assertNotIn("interpolation", result["feature_interpolate"])
+        self.assertTrue(np.array_equal(result["feature_interpolate"]["time"], np.linspace(0, 1, 5)))
+        self.assertEqual(result["feature_interpolate"]["values"].shape, (5,))
+        self.assertTrue(np.all(np.isnan(result["feature_interpolate"]["values"])))
+
+
+    def test_run_retries(self):
+        tries = []
+
+        def model_function(a, b):
+            tries.append(a)
+            if len(tries) < 3:
+                raise RuntimeError("Not yet")
+
+            return np.arange(0, 10), np.arange(0, 10) + a + b
+
+        self.parallel.model = model_function
+        self.parallel.retries = 2
+
+        result = self.parallel.run(self.model_parameters)
+
+        self.assertEqual(len(tries), 3)
+        self.assertTrue(np.array_equal(result["model_function"]["values"], np.arange(0, 10) + 1))
+        self.assertNotIn("failed", result["model_function"])
+
+
+    def test_run_tolerant(self):
+        def model_function(a, b):
+            raise RuntimeError("Always fails")
+
+        self.parallel.model = model_function
+        self.parallel.retries = 1
+
+        with self.assertRaises(RuntimeError):
+            self.parallel.run(self.model_parameters)
+
+        self.parallel.tolerant = True
+
+        result = self.parallel.run(self.model_parameters)
+
+        self.assertEqual(result["model_function"]["failed"], "RuntimeError: Always fails")
+
+        for feature in result:
+            self.assertTrue(np.isnan(result[feature]["values"]))
+
+
+    def test_run_report_exception(self):
+        def model_function(a, b):
+            raise RuntimeError("Always fails")
+
+        self.parallel.model = model_function
+        self.parallel.retries = 1
+        self.parallel.tolerant = True
+
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            self.parallel.run(self.model_parameters)
+            tolerated = sys.stdout.getvalue()
+
+            self.parallel.tolerant = False
+            with self.assertRaises(RuntimeError):
+                self.parallel.run(self.model_parameters)
+            raised = sys.stdout.getvalue()
+        finally:
+            sys.stdout = stdout
+
+        # Only the exception that is raised again is printed, once
+        self.assertEqual(tolerated, "")
+        self.assertEqual(raised.count("Caught exception when running model"), 1)
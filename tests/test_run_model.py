@@ -1,11 +1,18 @@
 import unittest
 import os
+import gc
+import time
 import shutil
+import contextlib
 import scipy.interpolate
 
 import numpy as np
 import multiprocess as mp
 
+from six import StringIO
+
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
 from uncertainpy import Parameters
 from uncertainpy.core import RunModel
 from uncertainpy.models import Model
@@ -13,7 +20,7 @@ from uncertainpy.features import Features, SpikingFeatures
 
 from .testing_classes import TestingFeatures, model_function
 from .testing_classes import TestingModel0d, TestingModel1d, TestingModel2d
-from .testing_classes import TestingModelAdaptive
+from .testing_classes import TestingModelAdaptive, TestingModelVectorized
 
 
 
@@ -44,6 +51,8 @@ class TestRunModel(unittest.TestCase):
 
 
     def tearDown(self):
+        self.runmodel.close()
+
         if os.path.isdir(self.output_test_dir):
             shutil.rmtree(self.output_test_dir)
 
@@ -292,6 +301,43 @@ class TestRunModel(unittest.TestCase):
                               "TestingModel0d", "feature_invalid"]))
 
 
+    def test_imap_nodes(self):
+        nodes = np.array([[0, 1, 2, 3], [1, 2, 3, 4]])
+
+        self.runmodel = RunModel(model=TestingModel1d(),
+                                 parameters=self.parameters,
+                                 CPUs=1,
+                                 logger_level="error")
+
+        results = self.runmodel.imap_nodes(nodes, ["a", "b"])
+
+        self.assertFalse(isinstance(results, list))
+
+        for i, result in enumerate(results):
+            self.assertTrue(np.array_equal(result["TestingModel1d"]["values"],
+                                           np.arange(0, 10) + nodes[0, i] + nodes[1, i]))
+
+        self.assertEqual(i, 3)
+
+
+    def test_imap_nodes_progress(self):
+        nodes = np.array([[0, 1, 2, 3], [1, 2, 3, 4]])
+
+        self.runmodel = RunModel(model=TestingModel1d(),
+                                 parameters=self.parameters,
+                                 CPUs=None,
+                                 logger_level="error")
+
+        output = StringIO()
+        with contextlib.redirect_stderr(output):
+            results = list(self.runmodel.imap_nodes(nodes, ["a", "b"]))
+
+        self.assertEqual(len(results), 4)
+
+        # The progress bar is closed after the last node
+        self.assertIn("4/4", output.getvalue())
+
+
     def test_evaluate_nodes_parallel_model_0d(self):
         nodes = np.array([[0, 1, 2], [1, 2, 3]])
 
@@ -412,6 +458,456 @@ class TestRunModel(unittest.TestCase):
 
 
 
+    def test_pool_reused(self):
+        nodes = np.array([[0, 1, 2], [1, 2, 3]])
+        self.runmodel.CPUs = 2
+
+        self.runmodel.evaluate_nodes(nodes, ["a", "b"])
+        pool = self.runmodel.pool
+
+        self.assertIsNotNone(pool)
+
+        self.runmodel.evaluate_nodes(nodes, ["a", "b"])
+
+        self.assertIs(self.runmodel.pool, pool)
+
+
+    def test_pool_no_multiprocess(self):
+        self.runmodel.CPUs = None
+
+        self.assertIsNone(self.runmodel.pool)
+
+
+    def test_change_cpus_closes_pool(self):
+        self.runmodel.CPUs = 2
+        pool = self.runmodel.pool
+
+        self.runmodel.CPUs = 2
+        self.assertIs(self.runmodel.pool, pool)
+
+        self.runmodel.CPUs = 1
+        self.assertIsNot(self.runmodel.pool, pool)
+
+
+    def test_change_model_closes_pool(self):
+        self.runmodel.CPUs = 2
+        pool = self.runmodel.pool
+
+        self.runmodel.model = TestingModel2d()
+        self.assertIsNone(self.runmodel._pool)
+
+        nodes = np.array([[0, 1, 2], [1, 2, 3]])
+        results = self.runmodel.evaluate_nodes(nodes, ["a", "b"])
+
+        self.assertIsNot(self.runmodel.pool, pool)
+        self.assertIn("TestingModel2d", results[0])
+
+
+    def test_close(self):
+        self.runmodel.CPUs = 2
+        self.runmodel.pool
+
+        self.runmodel.close()
+        self.assertIsNone(self.runmodel._pool)
+
+        self.runmodel.close()
+
+
+    def test_pool_shut_down_when_garbage_collected(self):
+        runmodel = RunModel(model=TestingModel1d(),
+                            parameters=self.parameters,
+                            CPUs=2,
+                            logger_level="error")
+        runmodel.pool
+
+        finalizer = runmodel._finalizer
+        self.assertTrue(finalizer.alive)
+
+        del runmodel
+        gc.collect()
+
+        self.assertFalse(finalizer.alive)
+
+
+    def test_setup_worker(self):
+        folder = os.path.abspath(self.output_test_dir)
+
+        def setup_worker():
+            open(os.path.join(folder, "setup_{}".format(os.getpid())), "w").close()
+            return os.getpid()
+
+        def teardown_worker(worker_state):
+            open(os.path.join(folder, "teardown_{}".format(worker_state)), "w").close()
+
+        def model(a, b, worker_state):
+            return None, np.array([a + b, worker_state])
+
+        self.runmodel.model = Model(run=model,
+                                    setup_worker=setup_worker,
+                                    teardown_worker=teardown_worker,
+                                    logger_level="error")
+        self.runmodel.features = None
+        self.runmodel.CPUs = 2
+
+        nodes = np.array([[0, 1, 2, 3, 4, 5], [1, 2, 3, 4, 5, 6]])
+        results = self.runmodel.evaluate_nodes(nodes, ["a", "b"])
+
+        pids = set([int(result["model"]["values"][1]) for result in results])
+        self.assertNotIn(os.getpid(), pids)
+
+        self.runmodel.close()
+
+        setups = sorted([name for name in os.listdir(folder) if name.startswith("setup")])
+        teardowns = sorted([name for name in os.listdir(folder) if name.startswith("teardown")])
+
+        # Both workers are set up once, also if only one of them evaluated the model
+        self.assertEqual(len(setups), 2)
+        for pid in pids:
+            self.assertIn("setup_{}".format(pid), setups)
+        self.assertEqual(teardowns, [name.replace("setup", "teardown") for name in setups])
+
+
+    def test_terminate(self):
+        self.runmodel.CPUs = 2
+        self.runmodel.pool
+
+        self.runmodel.terminate()
+        self.assertIsNone(self.runmodel._pool)
+
+        self.runmodel.terminate()
+
+
+    def test_timeout(self):
+        def model(a, b):
+            if a == 3:
+                time.sleep(100)
+
+            return np.arange(0, 10), np.arange(0, 10) + a + b
+
+        self.runmodel.model = model
+        self.runmodel.CPUs = 2
+        self.runmodel.timeout = 1
+
+        nodes = np.array([[0, 1, 2, 3, 4, 5], [1, 2, 3, 4, 5, 6]])
+
+        start_time = time.time()
+        results = self.runmodel.evaluate_nodes(nodes, ["a", "b"])
+
+        self.assertLess(time.time() - start_time, 50)
+
+        self.assertEqual(len(results), 6)
+
+        for i in [0, 1, 2, 4, 5]:
+            self.assertTrue(np.array_equal(results[i]["model"]["values"],
+                                           np.arange(0, 10) + nodes[0, i] + nodes[1, i]))
+            self.assertTrue(np.array_equal(results[i]["feature1d"]["values"],
+                                           np.arange(0, 10)))
+
+        for feature in ["model", "feature0d", "feature1d", "feature2d", "feature_invalid"]:
+            self.assertTrue(np.isnan(results[3][feature]["values"]))
+
+        self.assertIsNone(results[3]["feature_interpolate"]["interpolation"])
+
+
+    def test_speculative(self):
+        marker = os.path.join(os.path.abspath(self.output_test_dir), "started")
+
+        def model(a, b):
+            # Only the first evaluation of the node is slow
+            if a == 3 and not os.path.isfile(marker):
+                open(marker, "w").close()
+                time.sleep(100)
+
+            return np.arange(0, 10), np.arange(0, 10) + a + b
+
+        self.runmodel.model = model
+        self.runmodel.CPUs = 2
+        self.runmodel.speculative = True
+
+        nodes = np.array([[0, 1, 2, 3, 4, 5], [1, 2, 3, 4, 5, 6]])
+
+        start_time = time.time()
+        results = self.runmodel.evaluate_nodes(nodes, ["a", "b"])
+        self.runmodel.close()
+
+        self.assertLess(time.time() - start_time, 50)
+        self.assertTrue(os.path.isfile(marker))
+
+        for i in range(6):
+            self.assertTrue(np.array_equal(results[i]["model"]["values"],
+                                           np.arange(0, 10) + nodes[0, i] + nodes[1, i]))
+
+
+    def test_executor(self):
+        nodes = np.array([[0, 1, 2, 3, 4], [1, 2, 3, 4, 5]])
+
+        self.runmodel.CPUs = None
+        results_serial = self.runmodel.evaluate_nodes(nodes, ["a", "b"])
+
+        for executor in [ThreadPoolExecutor(max_workers=2),
+                         ProcessPoolExecutor(max_workers=2)]:
+            self.runmodel.CPUs = 2
+            self.runmodel.executor = executor
+
+            self.assertIs(self.runmodel.pool, executor)
+
+            results = self.runmodel.evaluate_nodes(nodes, ["a", "b"])
+
+            self.assertEqual(len(results), 5)
+            for result, result_serial in zip(results, results_serial):
+                for feature in ["TestingModel1d", "feature0d", "feature1d", "feature2d"]:
+                    self.assertTrue(np.array_equal(result[feature]["values"],
+                                                   result_serial[feature]["values"]))
+
+            # The executor is not shut down by RunModel
+            self.runmodel.close()
+            self.assertIs(self.runmodel.pool, executor)
+
+            self.runmodel.CPUs = None
+            results = self.runmodel.evaluate_nodes(nodes, ["a", "b"])
+            self.assertEqual(len(results), 5)
+
+            executor.shutdown()
+
+
+    def test_executor_threads(self):
+        nodes = np.array([[0, 1, 2, 3, 4], [1, 2, 3, 4, 5]])
+
+        self.runmodel.CPUs = None
+        results_serial = self.runmodel.evaluate_nodes(nodes, ["a", "b"])
+
+        self.runmodel.features.is_preprocess_run = False
+
+        self.runmodel.CPUs = 2
+        self.runmodel.executor = "threads"
+
+        self.assertIsInstance(self.runmodel.pool, ThreadPoolExecutor)
+
+        results = self.runmodel.evaluate_nodes(nodes, ["a", "b"])
+
+        self.assertEqual(len(results), 5)
+        for result, result_serial in zip(results, results_serial):
+            for feature in ["TestingModel1d", "feature0d", "feature1d", "feature2d"]:
+                self.assertTrue(np.array_equal(result[feature]["values"],
+                                               result_serial[feature]["values"]))
+
+        # Each thread uses a copy of the features
+        self.assertFalse(self.runmodel.features.is_preprocess_run)
+
+        self.runmodel.close()
+        self.assertIsNone(self.runmodel._pool)
+
+
+    def test_executor_threads_vectorized(self):
+        nodes = np.array([[0, 1, 2], [1, 2, 3]])
+
+        self.runmodel.model = TestingModelVectorized()
+        self.runmodel.CPUs = None
+        results_serial = self.runmodel.evaluate_nodes(nodes, ["a", "b"])
+
+        self.runmodel.CPUs = 2
+        self.runmodel.executor = "threads"
+        results = self.runmodel.evaluate_nodes(nodes, ["a", "b"])
+        self.runmodel.close()
+
+        for result, result_serial in zip(results, results_serial):
+            self.assertTrue(np.array_equal(result["TestingModelVectorized"]["values"],
+                                           result_serial["TestingModelVectorized"]["values"]))
+
+
+    def test_executor_error(self):
+        with self.assertRaises(ValueError):
+            self.runmodel.executor = "not_existing"
+
+        with self.assertRaises(ValueError):
+            self.runmodel.executor = 2
+
+
+    def test_executor_closes_pool(self):
+        self.runmodel.CPUs = 2
+        pool = self.runmodel.pool
+
+        self.runmodel.executor = ThreadPoolExecutor(max_workers=2)
+        self.assertIsNone(self.runmodel._pool)
+
+        self.runmodel.executor.shutdown()
+        self.runmodel.executor = None
+        self.assertIsNot(self.runmodel.pool, pool)
+
+
+    def test_executor_mpi(self):
+        try:
+            import mpi4py
+            prerequisites = True
+        except ImportError:
+            prerequisites = False
+
+        self.runmodel.CPUs = 2
+        self.runmodel.executor = "mpi"
+
+        if not prerequisites:
+            with self.assertRaises(ImportError):
+                self.runmodel.pool
+
+
+    def test_executor_dask(self):
+        try:
+            import distributed
+            prerequisites = True
+        except ImportError:
+            prerequisites = False
+
+        self.runmodel.CPUs = 2
+        self.runmodel.executor = "dask"
+
+        if prerequisites:
+            nodes = np.array([[0, 1, 2], [1, 2, 3]])
+
+            results = self.runmodel.evaluate_nodes(nodes, ["a", "b"])
+            self.runmodel.close()
+
+            self.assertTrue(np.array_equal(results[2]["TestingModel1d"]["values"],
+                                           np.arange(0, 10) + 2 + 3))
+        else:
+            with self.assertRaises(ImportError):
+                self.runmodel.pool
+
+
+    def test_chunksize(self):
+        self.runmodel.CPUs = 2
+
+        self.assertEqual(self.runmodel.chunksize(100), 1)
+
+        self.runmodel._evaluation_time = 0.001
+        self.assertEqual(self.runmodel.chunksize(100), 13)
+        self.assertEqual(self.runmodel.chunksize(10000), 200)
+
+        self.runmodel._evaluation_time = 1
+        self.assertEqual(self.runmodel.chunksize(100), 1)
+
+        self.runmodel._evaluation_time = 0
+        self.assertEqual(self.runmodel.chunksize(100), 13)
+
+        self.runmodel.CPUs = None
+        self.assertEqual(self.runmodel.chunksize(100), 1)
+
+
+    def test_evaluation_time(self):
+        nodes = np.array([[0, 1, 2, 3, 4], [1, 2, 3, 4, 5]])
+        self.runmodel.CPUs = 2
+
+        self.assertIsNone(self.runmodel._evaluation_time)
+
+        results = self.runmodel.evaluate_nodes(nodes, ["a", "b"])
+
+        self.assertIsNotNone(self.runmodel._evaluation_time)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(np.array_equal(results[4]["TestingModel1d"]["values"],
+                                       np.arange(0, 10) + 4 + 5))
+
+        self.runmodel.model = TestingModel1d()
+        self.assertIsNone(self.runmodel._evaluation_time)
+
+
+    def test_evaluate_nodes_vectorized(self):
+        nodes = np.array([[0, 1, 2], [1, 2, 3]])
+
+        self.runmodel.CPUs = None
+        results = self.runmodel.evaluate_nodes(nodes, ["a", "b"])
+
+        self.runmodel.model = TestingModelVectorized()
+        results_vectorized = self.runmodel.evaluate_nodes(nodes, ["a", "b"])
+
+        self.assertEqual(len(results_vectorized), 3)
+
+        for result, result_vectorized in zip(results, results_vectorized):
+            self.assertTrue(np.array_equal(result["TestingModel1d"]["values"],
+                                           result_vectorized["TestingModelVectorized"]["values"]))
+            self.assertTrue(np.array_equal(result["TestingModel1d"]["time"],
+                                           result_vectorized["TestingModelVectorized"]["time"]))
+            self.assertTrue(np.array_equal(result["feature1d"]["values"],
+                                           result_vectorized["feature1d"]["values"]))
+            self.assertEqual(result["feature0d"]["values"],
+                             result_vectorized["feature0d"]["values"])
+
+
+    def test_evaluate_nodes_vectorized_parallel(self):
+        nodes = np.array([[0, 1, 2], [1, 2, 3]])
+
+        self.runmodel.model = TestingModelVectorized()
+        self.runmodel.CPUs = 2
+
+        results = self.runmodel.evaluate_nodes(nodes, ["a", "b"])
+
+        self.assertEqual(len(results), 3)
+        self.assertTrue(np.array_equal(results[2]["TestingModelVectorized"]["values"],
+                                       np.arange(0, 10) + 5))
+
+
+    def test_create_vectorized_parameters(self):
+        nodes = np.array([[0, 1, 2], [1, 2, 3]])
+
+        model_parameters = self.runmodel.create_vectorized_parameters(nodes, ["a", "b"])
+
+        self.assertEqual(set(model_parameters.keys()), set(["a", "b"]))
+        self.assertTrue(np.array_equal(model_parameters["a"], [0, 1, 2]))
+        self.assertTrue(np.array_equal(model_parameters["b"], [1, 2, 3]))
+
+
+    def test_create_vectorized_parameters_one(self):
+        nodes = np.array([0, 1, 2])
+
+        model_parameters = self.runmodel.create_vectorized_parameters(nodes, ["a"])
+
+        self.assertTrue(np.array_equal(model_parameters["a"], [0, 1, 2]))
+        self.assertTrue(np.array_equal(model_parameters["b"], [2, 2, 2]))
+
+
+    def test_split_vectorized_result(self):
+        time = np.arange(0, 10)
+        values = np.array([np.arange(0, 10), np.arange(0, 10) + 1])
+        info = {"info": 1}
+
+        model_results = self.runmodel.split_vectorized_result((time, values, info), 2)
+
+        self.assertEqual(len(model_results), 2)
+        self.assertEqual(len(model_results[1]), 3)
+        self.assertTrue(np.array_equal(model_results[1][0], time))
+        self.assertTrue(np.array_equal(model_results[1][1], np.arange(0, 10) + 1))
+        self.assertEqual(model_results[1][2], info)
+
+
+    def test_split_vectorized_result_time(self):
+        time = [np.arange(0, 10), np.arange(0, 11)]
+        values = [np.arange(0, 10), np.arange(0, 11)]
+
+        model_results = self.runmodel.split_vectorized_result((time, values), 2)
+
+        self.assertTrue(np.array_equal(model_results[0][0], np.arange(0, 10)))
+        self.assertTrue(np.array_equal(model_results[1][0], np.arange(0, 11)))
+        self.assertTrue(np.array_equal(model_results[1][1], np.arange(0, 11)))
+
+
+    def test_split_vectorized_result_0d(self):
+        model_results = self.runmodel.split_vectorized_result((None, np.array([1, 2, 3])), 3)
+
+        self.assertEqual(model_results, [(None, 1), (None, 2), (None, 3)])
+
+
+    def test_split_vectorized_result_error(self):
+        with self.assertRaises(ValueError):
+            self.runmodel.split_vectorized_result((None, np.array([1, 2, 3])), 2)
+
+        with self.assertRaises(ValueError):
+            self.runmodel.split_vectorized_result((None, 1), 2)
+
+        with self.assertRaises(ValueError):
+            self.runmodel.split_vectorized_result((None, np.array(1)), 2)
+
+        with self.assertRaises(ValueError):
+            self.runmodel.split_vectorized_result((None, [np.arange(0, 2), np.arange(0, 3)]), 3)
+
+
     def test_evaluate_nodes_not_supress_graphics(self):
         nodes = np.array([[0, 1, 2], [1, 2, 3]])
         self.runmodel.model.suppress_graphics = False
@@ -1045,6 +1541,243 @@ class TestRunModel(unittest.TestCase):
         self.assert_feature_2d(data)
 
 
+    def test_interpolation_grid(self):
+        self.runmodel.interpolation_grid = [0, 1.5, 3]
+        self.assertTrue(np.array_equal(self.runmodel.interpolation_grid, [0, 1.5, 3]))
+
+        self.runmodel.interpolation_grid = {"feature": [0, 1]}
+        self.assertTrue(np.array_equal(self.runmodel.interpolation_grid["feature"], [0, 1]))
+
+        self.runmodel.interpolation_grid = "pilot"
+        self.assertEqual(self.runmodel.interpolation_grid, "pilot")
+
+        with self.assertRaises(ValueError):
+            self.runmodel.interpolation_grid = "unknown"
+
+        with self.assertRaises(ValueError):
+            self.runmodel.interpolation_grid = [[0, 1], [2, 3]]
+
+
+    def test_run_interpolation_grid(self):
+        nodes = np.array([[0, 1, 2], [1, 2, 3]])
+        grid = np.linspace(0, 9, 19)
+
+        for CPUs in [None, 1]:
+            self.runmodel = RunModel(model=TestingModelAdaptive(),
+                                     parameters=self.parameters,
+                                     CPUs=CPUs,
+                                     interpolation_grid=grid,
+                                     logger_level="error")
+
+            data = self.runmodel.run(nodes, ["a", "b"])
+
+            self.assertTrue(np.array_equal(data["TestingModelAdaptive"].time, grid))
+            self.assertEqual(np.shape(data["TestingModelAdaptive"].evaluations), (3, 19))
+
+            for i in range(3):
+                a, b = nodes[:, i]
+                self.assertTrue(np.allclose(data["TestingModelAdaptive"].evaluations[i],
+                                            grid + a + b))
+
+
+    def test_run_interpolation_grid_pilot(self):
+        nodes = np.array([[1, 0, 2], [2, 1, 3]])
+
+        self.runmodel = RunModel(model=TestingModelAdaptive(),
+                                 parameters=self.parameters,
+                                 CPUs=1,
+                                 interpolation_grid="pilot",
+                                 logger_level="error")
+
+        results = self.runmodel.evaluate_nodes(nodes, ["a", "b"])
+
+        for result in results:
+            self.assertNotIn("interpolation", result["TestingModelAdaptive"])
+            self.assertTrue(np.array_equal(result["TestingModelAdaptive"]["time"],
+                                           np.arange(0, 13)))
+
+        self.assertTrue(np.allclose(results[1]["TestingModelAdaptive"]["values"],
+                                    np.arange(0, 13) + 1))
+        self.assertTrue(np.allclose(results[2]["TestingModelAdaptive"]["values"],
+                                    np.arange(0, 13) + 5))
+
+
+    def test_run_interpolation_grid_feature(self):
+        nodes = np.array([[0, 1, 2], [1, 2, 3]])
+        grid = np.linspace(0, 5, 11)
+
+        self.runmodel = RunModel(model=TestingModel1d(),
+                                 parameters=self.parameters,
+                                 features=self.features,
+                                 CPUs=None,
+                                 interpolation_grid={"feature_interpolate": grid},
+                                 logger_level="error")
+
+        data = self.runmodel.run(nodes, ["a", "b"])
+
+        self.assertTrue(np.array_equal(data["feature_interpolate"].time, grid))
+        self.assertTrue(np.allclose(data["feature_interpolate"].evaluations,
+                                    [grid + 1, grid + 3, grid + 5]))
+
+        self.assert_testingmodel1d(data)
+
+
+    def test_run_interpolation_grid_cache(self):
+        nodes = np.array([[0, 1, 2], [1, 2, 3]])
+        cache = os.path.join(self.output_test_dir, "cache")
+
+        self.runmodel = RunModel(model=TestingModelAdaptive(),
+                                 parameters=self.parameters,
+                                 CPUs=None,
+                                 cache=cache,
+                                 logger_level="error")
+
+        self.runmodel.run(nodes, ["a", "b"])
+
+        # Cached interpolations are evaluated on the new grid
+        grid = np.linspace(0, 9, 10)
+        self.runmodel.interpolation_grid = grid
+
+        data = self.runmodel.run(nodes, ["a", "b"])
+        self.assertTrue(np.allclose(data["TestingModelAdaptive"].evaluations,
+                                    [grid + 1, grid + 3, grid + 5]))
+
+        # Evaluations cached on another grid are evaluated again
+        grid = np.linspace(0, 9, 4)
+        self.runmodel.interpolation_grid = grid
+
+        data = self.runmodel.run(nodes, ["a", "b"])
+        self.assertTrue(np.allclose(data["TestingModelAdaptive"].evaluations,
+                                    [grid + 1, grid + 3, grid + 5]))
+
+        self.runmodel.interpolation_grid = None
+
+        data = self.runmodel.run(nodes, ["a", "b"])
+        self.assertTrue(np.array_equal(data["TestingModelAdaptive"].time, np.arange(0, 15)))
+
+
+    def test_run_tolerant(self):
+        def model(a, b):
+            if a == 2:
+                raise ValueError("a can not be 2")
+
+            return np.arange(0, 10), np.arange(0, 10) + a + b
+
+        nodes = np.array([[0, 1, 2, 3], [1, 2, 3, 4]])
+        cache = os.path.join(self.output_test_dir, "cache")
+
+        self.runmodel = RunModel(model=model,
+                                 parameters=self.parameters,
+                                 features=self.features,
+                                 CPUs=2,
+                                 cache=cache,
+                                 retries=1,
+                                 tolerant=True,
+                                 logger_level="error")
+
+        data = self.runmodel.run(nodes, ["a", "b"])
+
+        self.assertEqual(data.failed, ["Node 2: ValueError: a can not be 2"])
+
+        self.assertTrue(np.array_equal(data["model"].evaluations[1], np.arange(0, 10) + 3))
+        self.assertTrue(np.all(np.isnan(data["model"].evaluations[2])))
+        self.assertTrue(np.isnan(data["feature0d"].evaluations[2]))
+
+        # Failed evaluations have the same shape as the successful evaluations
+        self.assertEqual(np.shape(data["model"].evaluations), (4, 10))
+        self.assertEqual(np.shape(data["feature1d"].evaluations), (4, 10))
+        self.assertEqual(np.shape(data["feature2d"].evaluations), (4, 2, 10))
+        self.assertTrue(np.all(np.isnan(data["feature2d"].evaluations[2])))
+
+        # Failed evaluations are not cached
+        self.assertEqual(len(self.runmodel.cache), 3)
+
+        self.runmodel.tolerant = False
+        with self.assertRaises(ValueError):
+            self.runmodel.run(nodes, ["a", "b"])
+
+
+    def test_run_tolerant_first_node_fails(self):
+        def model(a, b):
+            if a == 0:
+                raise ValueError("a can not be 0")
+
+            time = np.arange(0, 10 + a)
+            return time, time + b
+
+        nodes = np.array([[0, 1, 2, 0], [1, 2, 3, 4]])
+
+        for interpolation_grid in [None, "pilot"]:
+            self.runmodel = RunModel(model=Model(run=model, interpolate=True),
+                                     parameters=self.parameters,
+                                     features=self.features,
+                                     CPUs=None,
+                                     tolerant=True,
+                                     interpolation_grid=interpolation_grid,
+                                     logger_level="error")
+
+            data = self.runmodel.run(nodes, ["a", "b"])
+
+            self.assertEqual(len(data.failed), 2)
+            self.assertNotIn("model", data.error)
+
+            # The time and shape are found from the first node that did not fail
+            if interpolation_grid is None:
+                time = np.arange(0, 12)
+            else:
+                time = np.arange(0, 11)
+
+            self.assertTrue(np.array_equal(data["model"].time, time))
+            self.assertTrue(np.allclose(data["model"].evaluations[1], time + 2))
+            self.assertTrue(np.all(np.isnan(data["model"].evaluations[0])))
+            self.assertTrue(np.all(np.isnan(data["model"].evaluations[3])))
+
+            self.assertTrue(np.array_equal(data["feature1d"].time, np.arange(0, 10)))
+
+
+    def test_run_tolerant_vectorized(self):
+        tries = []
+
+        def model(a, b):
+            tries.append(a)
+            raise ValueError("batch failed")
+
+        nodes = np.array([[0, 1, 2], [1, 2, 3]])
+
+        self.runmodel = RunModel(model=Model(run=model, vectorized=True),
+                                 parameters=self.parameters,
+                                 features=self.features,
+                                 CPUs=None,
+                                 retries=1,
+                                 tolerant=True,
+                                 logger_level="error")
+
+        data = self.runmodel.run(nodes, ["a", "b"])
+
+        self.assertEqual(len(tries), 2)
+        self.assertEqual(data.failed, ["Node 0: ValueError: batch failed",
+                                       "Node 1: ValueError: batch failed",
+                                       "Node 2: ValueError: batch failed"])
+
+        self.runmodel.tolerant = False
+        with self.assertRaises(ValueError):
+            self.runmodel.run(nodes, ["a", "b"])
+
+
+    def test_retries(self):
+        self.assertEqual(self.runmodel.retries, 0)
+        self.assertFalse(self.runmodel.tolerant)
+
+        self.runmodel.retries = 2
+        self.runmodel.tolerant = True
+
+        self.assertEqual(self.runmodel._parallel.retries, 2)
+        self.assertTrue(self.runmodel._parallel.tolerant)
+
+        with self.assertRaises(ValueError):
+            self.runmodel.retries = -1
+
+
     def test_run_one_uncertain_parameter(self):
         nodes = np.array([0, 1, 2])
         self.runmodel = RunModel(model=TestingModel1d(),
@@ -1,4 +1,5 @@
 import os
+import pickle
 import unittest
 import shutil
 import subprocess
@@ -152,6 +153,133 @@ class TestSpikes(TestCasePlot):
         self.plot_exists("spikes_extended")
 
 
+    def test_threshold_crossings(self):
+        spikes = Spikes()
+
+        voltage = np.array([0, 5, 2, 5, -5, 5, 5, -5, 5])
+
+        starts, ends = spikes.threshold_crossings(voltage, threshold=1, end_threshold=-2)
+
+        self.assertTrue(np.array_equal(starts, [1, 5]))
+        self.assertTrue(np.array_equal(ends, [4, 7]))
+
+        starts, ends = spikes.threshold_crossings(voltage, threshold=1, end_threshold=2)
+
+        self.assertTrue(np.array_equal(starts, [1, 3, 5]))
+        self.assertTrue(np.array_equal(ends, [2, 4, 7]))
+
+        starts, ends = spikes.threshold_crossings(np.array([-5, -5]), threshold=1, end_threshold=-2)
+
+        self.assertEqual(len(starts), 0)
+        self.assertEqual(len(ends), 0)
+
+
+    def test_segment_argmax(self):
+        spikes = Spikes()
+
+        values = np.array([1, 3, 2, 3, 0, np.nan, 4, 1])
+
+        result = spikes.segment_argmax(values, np.array([0, 2, 4, 6]), np.array([4, 5, 7, 8]))
+
+        self.assertTrue(np.array_equal(result, [1, 3, 5, 6]))
+
+
+    def test_segment_reduce(self):
+        spikes = Spikes()
+
+        values = np.array([1, 3, 2, 3, 0, 5])
+
+        result = spikes.segment_reduce(np.minimum, values, np.array([1, 3, 4]), np.array([4, 5, 10]))
+
+        self.assertTrue(np.array_equal(result, [2, 0, 0]))
+
+
+    def test_find_spikes_edges(self):
+        time = np.arange(12)
+        values = np.array([10, -50, 20, 30, -50, -50, 10, 40, 10, -50, 20, 30])
+
+        spikes = Spikes(time, values, threshold=0, end_threshold=-10)
+
+        # The spike at the end is not finished
+        self.assertEqual(spikes.nr_spikes, 2)
+
+        self.assertEqual(spikes[0].global_index, 3)
+        self.assertTrue(np.array_equal(spikes[0].time, [1, 2, 3, 4]))
+        self.assertEqual(spikes[1].global_index, 7)
+        self.assertTrue(np.array_equal(spikes[1].V, [-50, 10, 40, 10, -50]))
+        self.assertEqual(spikes[1].V_spike, 40)
+        self.assertEqual(spikes[1].time_spike, 7)
+
+        # The voltage trace starts above the threshold
+        spikes = Spikes(time[2:], values[2:], threshold=0, end_threshold=-10)
+
+        self.assertEqual(spikes.nr_spikes, 1)
+        self.assertEqual(spikes[0].global_index, 5)
+
+
+    def test_arrays(self):
+        self.spikes = Spikes(self.time, self.values)
+
+        self.assertEqual(len(self.spikes.starts), 12)
+        self.assertEqual(len(self.spikes.ends), 12)
+        self.assertEqual(len(self.spikes.global_indices), 12)
+
+        for i, spike in enumerate(self.spikes):
+            self.assertEqual(spike.global_index, self.spikes.global_indices[i])
+            self.assertEqual(spike.time_spike, self.spikes.time_spikes[i])
+            self.assertEqual(spike.V_spike, self.spikes.V_spikes[i])
+            self.assertTrue(np.array_equal(spike.V, self.values[self.spikes.starts[i]:self.spikes.ends[i]]))
+
+
+    def test_lazy_spikes(self):
+        self.spikes = Spikes(self.time, self.values)
+
+        self.assertEqual(self.spikes._spike_objects, {})
+
+        spike = self.spikes[3]
+
+        self.assertEqual(list(self.spikes._spike_objects.keys()), [3])
+        self.assertIs(self.spikes[3], spike)
+        self.assertIs(self.spikes[-9], spike)
+        self.assertIs(self.spikes.spikes[3], spike)
+        self.assertEqual(len(self.spikes[2:5]), 3)
+        self.assertIs(self.spikes[2:5][1], spike)
+
+        with self.assertRaises(IndexError):
+            self.spikes[12]
+
+
+    def test_pickle(self):
+        self.spikes = Spikes(self.time, self.values)
+        size = len(pickle.dumps(self.spikes))
+
+        self.spikes.spikes
+        self.assertEqual(len(pickle.dumps(self.spikes)), size)
+
+        spikes = pickle.loads(pickle.dumps(self.spikes))
+
+        self.assertEqual(spikes.nr_spikes, 12)
+        self.assertTrue(np.array_equal(spikes.global_indices, self.spikes.global_indices))
+        self.assertTrue(np.array_equal(spikes[0].V, self.spikes[0].V))
+
+
+    def test_set_spikes(self):
+        self.spikes = Spikes()
+        self.spikes.time = np.arange(10)
+        self.spikes.V = np.arange(10)*2
+
+        self.spikes.set_spikes(starts=[1, 5], ends=[4, 9], global_indices=[3, 8])
+
+        self.assertEqual(self.spikes.nr_spikes, 2)
+        self.assertTrue(np.array_equal(self.spikes.V_spikes, [6, 16]))
+        self.assertTrue(np.array_equal(self.spikes[1].time, [5, 6, 7, 8]))
+
+        self.spikes.set_spikes()
+
+        self.assertEqual(self.spikes.nr_spikes, 0)
+        self.assertEqual(self.spikes.spikes, [])
+
+
     def plot_exists(self, name):
         plot_file = os.path.join(self.output_test_dir, name + ".png")
         self.assertTrue(os.path.isfile(plot_file))
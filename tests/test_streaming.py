@@ -0,0 +1,193 @@
+import unittest
+
+import numpy as np
+
+from SALib.analyze.sobol import first_order, total_order
+
+from uncertainpy.core import RunningStatistics, P2Quantile, SobolAccumulator
+from uncertainpy.core import MonteCarloStatistics
+
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(10)
+
+        self.evaluations = np.random.normal(3, 2, size=(1000, 4))
+
+
+    def test_running_statistics(self):
+        statistics = RunningStatistics()
+
+        self.assertEqual(statistics.count, 0)
+        self.assertIsNone(statistics.mean)
+        self.assertIsNone(statistics.variance)
+
+        for evaluation in self.evaluations:
+            statistics.update(evaluation)
+
+        self.assertEqual(statistics.count, 1000)
+        self.assertTrue(np.allclose(statistics.mean, np.mean(self.evaluations, 0)))
+        self.assertTrue(np.allclose(statistics.variance, np.var(self.evaluations, 0)))
+
+
+    def test_running_statistics_0d(self):
+        statistics = RunningStatistics()
+
+        for evaluation in self.evaluations[:, 0]:
+            statistics.update(evaluation)
+
+        self.assertTrue(np.allclose(statistics.mean, np.mean(self.evaluations[:, 0])))
+        self.assertTrue(np.allclose(statistics.variance, np.var(self.evaluations[:, 0])))
+
+
+    def test_running_statistics_shape(self):
+        statistics = RunningStatistics()
+        statistics.update([1, 2, 3])
+
+        with self.assertRaises(ValueError):
+            statistics.update([1, 2])
+
+
+    def test_p2_quantile(self):
+        percentile_5 = P2Quantile(0.05)
+        percentile_95 = P2Quantile(0.95)
+
+        for evaluation in self.evaluations:
+            percentile_5.update(evaluation)
+            percentile_95.update(evaluation)
+
+        self.assertEqual(percentile_5.count, 1000)
+        self.assertTrue(np.allclose(percentile_5.value,
+                                    np.percentile(self.evaluations, 5, 0),
+                                    atol=0.2))
+        self.assertTrue(np.allclose(percentile_95.value,
+                                    np.percentile(self.evaluations, 95, 0),
+                                    atol=0.2))
+
+
+    def test_p2_quantile_few(self):
+        quantile = P2Quantile(0.5)
+
+        self.assertIsNone(quantile.value)
+
+        for evaluation in self.evaluations[:3]:
+            quantile.update(evaluation)
+
+        self.assertTrue(np.allclose(quantile.value, np.median(self.evaluations[:3], 0)))
+
+
+    def test_p2_quantile_error(self):
+        with self.assertRaises(ValueError):
+            P2Quantile(1.5)
+
+        quantile = P2Quantile(0.5)
+        quantile.update([1, 2, 3])
+
+        with self.assertRaises(ValueError):
+            quantile.update(1)
+
+
+    def test_sobol_accumulator(self):
+        nr_samples = 200
+        A = np.random.uniform(size=(nr_samples, 5))
+        B = np.random.uniform(size=(nr_samples, 5))
+        AB = np.random.uniform(size=(nr_samples, 2, 5))
+
+        sobol = SobolAccumulator(2)
+
+        for i in range(nr_samples):
+            sobol.update(A[i], AB[i], B[i])
+
+        self.assertEqual(sobol.count, nr_samples)
+
+        sobol_first, sobol_total = sobol.sobol()
+
+        for i in range(2):
+            self.assertTrue(np.allclose(sobol_first[i], first_order(A, AB[:, i], B)))
+            self.assertTrue(np.allclose(sobol_total[i], total_order(A, AB[:, i], B)))
+
+
+    def test_sobol_accumulator_constant(self):
+        sobol = SobolAccumulator(2)
+
+        self.assertEqual(sobol.sobol(), (None, None))
+
+        for i in range(10):
+            sobol.update(1, [1, 1], 1)
+
+        sobol_first, sobol_total = sobol.sobol()
+
+        self.assertEqual(np.shape(sobol_first), (2,))
+        self.assertTrue(np.array_equal(sobol_first, [0, 0]))
+        self.assertTrue(np.array_equal(sobol_total, [0, 0]))
+
+        sobol = SobolAccumulator(2)
+
+        for i in range(10):
+            sobol.update(np.ones(3), np.ones((2, 3)), np.ones(3))
+
+        sobol_first, sobol_total = sobol.sobol()
+
+        self.assertEqual(np.shape(sobol_first), (2, 3))
+        self.assertEqual(np.shape(sobol_total), (2, 3))
+        self.assertTrue(np.array_equal(sobol_first, np.zeros((2, 3))))
+
+
+    def test_monte_carlo_statistics(self):
+        statistics = MonteCarloStatistics(2)
+
+        # A, AB_1, AB_2, B
+        block = [np.array([1., 2.]), np.array([2., 3.]), np.array([3., 4.]), np.array([4., 5.])]
+
+        for i in range(10):
+            for values in block:
+                statistics.update(values + i)
+
+        self.assertEqual(statistics.nr_evaluations, 40)
+        self.assertEqual(statistics.nr_incomplete, 0)
+        self.assertEqual(statistics.statistics.count, 20)
+        self.assertEqual(statistics.sobol.count, 10)
+
+        A_B = [block[0] + i for i in range(10)] + [block[-1] + i for i in range(10)]
+        self.assertTrue(np.allclose(statistics.statistics.mean, np.mean(A_B, 0)))
+        self.assertTrue(np.allclose(statistics.statistics.variance, np.var(A_B, 0)))
+
+
+    def test_monte_carlo_statistics_incomplete(self):
+        statistics = MonteCarloStatistics(2)
+
+        statistics.update([1, 2])
+        statistics.update([np.nan, 2])
+        statistics.update([1, 2])
+        statistics.update([1, 2])
+
+        statistics.update([np.nan, 2])
+        statistics.update([1, 2])
+        statistics.update([1, 2])
+        statistics.update([2, 3])
+
+        self.assertEqual(statistics.nr_incomplete, 1)
+        self.assertEqual(statistics.nr_incomplete_blocks, 2)
+        self.assertEqual(statistics.statistics.count, 3)
+        self.assertEqual(statistics.sobol.count, 0)
+
+
+    def test_monte_carlo_statistics_one_parameter(self):
+        statistics = MonteCarloStatistics(1)
+
+        self.assertIsNone(statistics.sobol)
+
+        for i in range(6):
+            statistics.update(i)
+
+        self.assertEqual(statistics.statistics.count, 4)
+        self.assertTrue(np.allclose(statistics.statistics.mean, np.mean([0, 2, 3, 5])))
+
+
+    def test_monte_carlo_statistics_irregular(self):
+        statistics = MonteCarloStatistics(2)
+        statistics.update([1, 2])
+        statistics.update(np.nan)
+
+        with self.assertRaises(ValueError):
+            statistics.update([1, 2, 3])
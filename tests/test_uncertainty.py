@@ -84,6 +84,19 @@ class TestUncertainty(TestCasePlot):
         self.assertEqual(uncertainty.uncertainty_calculations.runmodel.CPUs, 34)
 
 
+    def test_close(self):
+        with UncertaintyQuantification(model=self.model,
+                                       parameters=self.parameters,
+                                       logger_level="error",
+                                       logger_filename=None,
+                                       CPUs=2) as uncertainty:
+            runmodel = uncertainty.uncertainty_calculations.runmodel
+
+            self.assertIsNotNone(runmodel.pool)
+
+        self.assertIsNone(runmodel._pool)
+
+
     def test_init_parameter_list(self):
         uncertainty = UncertaintyQuantification(self.model,
                                                 self.parameter_list,
@@ -600,6 +613,26 @@ class TestUncertainty(TestCasePlot):
         self.assertEqual(result, 0)
 
 
+    def test_monte_carlo_nr_bootstrap(self):
+        data = self.uncertainty.quantify(method="mc",
+                                         plot=None,
+                                         save=False,
+                                         seed=self.seed,
+                                         nr_mc_samples=self.nr_mc_samples,
+                                         nr_bootstrap=20)
+
+        self.assertEqual(np.shape(data["feature0d_var"].sobol_first_conf), (2,))
+        self.assertEqual(np.shape(data["feature0d_var"].sobol_total_conf), (2,))
+        self.assertEqual(np.shape(data["feature1d_var"].sobol_first_conf), (2, 10))
+
+        data = self.uncertainty.monte_carlo(plot=None,
+                                            save=False,
+                                            seed=self.seed,
+                                            nr_samples=self.nr_mc_samples)
+
+        self.assertIsNone(data["feature0d_var"].sobol_first_conf)
+
+
     def test_load(self):
         folder = os.path.dirname(os.path.realpath(__file__))
         self.uncertainty.load(os.path.join(folder, "data", "test_save_mock"))
@@ -851,6 +884,36 @@ class TestUncertainty(TestCasePlot):
         self.assertEqual(data.arguments["nr_pc_mc_samples"],10**3)
         self.assertEqual(data.arguments["allow_incomplete"], False)
         self.assertEqual(data.arguments["seed"], self.seed)
+        self.assertEqual(data.arguments["adaptive"], False)
+
+
+    def test_quantifyPC_adaptive(self):
+        self.set_up_test_calculations()
+
+        data = self.uncertainty.quantify(method="pc",
+                                         pc_method="spectral",
+                                         data_folder=self.output_test_dir,
+                                         figure_folder=self.output_test_dir,
+                                         adaptive=True,
+                                         tolerance=1e-4)
+
+        self.assertEqual(data.arguments["method"], "spectral")
+        self.assertEqual(data.arguments["adaptive"], True)
+        self.assertEqual(data.arguments["tolerance"], 1e-4)
+
+
+    def test_quantifyPC_sparse(self):
+        self.set_up_test_calculations()
+
+        data = self.uncertainty.quantify(method="pc",
+                                         data_folder=self.output_test_dir,
+                                         figure_folder=self.output_test_dir,
+                                         sparse="omp",
+                                         truncation=0.75)
+
+        self.assertEqual(data.arguments["method"], "collocation")
+        self.assertEqual(data.arguments["sparse"], "omp")
+        self.assertEqual(data.arguments["truncation"], 0.75)
 
 
 
@@ -1461,12 +1524,14 @@ class TestUncertainty(TestCasePlot):
                                          nr_mc_samples=self.nr_mc_samples,
                                          data_folder=self.output_test_dir,
                                          figure_folder=self.output_test_dir,
-                                         seed=self.seed)
+                                         seed=self.seed,
+                                         nr_bootstrap=10)
 
         self.assertEqual(self.uncertainty.data.arguments["function"], "MC")
         self.assertEqual(self.uncertainty.data.arguments["uncertain_parameters"], ["a", "b"])
         self.assertEqual(self.uncertainty.data.arguments["seed"], self.seed)
         self.assertEqual(self.uncertainty.data.arguments["nr_samples"], self.nr_mc_samples)
+        self.assertEqual(self.uncertainty.data.arguments["nr_bootstrap"], 10)
 
         self.assertEqual(data.arguments["function"], "MC")
         self.assertEqual(data.arguments["uncertain_parameters"], ["a", "b"])
@@ -1474,6 +1539,106 @@ class TestUncertainty(TestCasePlot):
         self.assertEqual(data.arguments["nr_samples"], self.nr_mc_samples)
 
 
+    def test_quantify_checkpoint_resume(self):
+        state = {"calls": 0, "fail": True}
+
+        def model_function(a=1, b=2):
+            state["calls"] += 1
+            if state["fail"] and state["calls"] > 5:
+                raise RuntimeError("Interrupted")
+
+            return None, a + b
+
+        uncertainty = UncertaintyQuantification(model_function,
+                                                parameters=self.parameters,
+                                                CPUs=None,
+                                                logger_level="error",
+                                                logger_filename=None)
+
+        checkpoint_file = os.path.join(self.output_test_dir, "model_function_checkpoint.h5")
+
+        with self.assertRaises(RuntimeError):
+            uncertainty.quantify(method="mc",
+                                 nr_mc_samples=self.nr_mc_samples,
+                                 checkpoint=True,
+                                 plot=None,
+                                 data_folder=self.output_test_dir,
+                                 seed=self.seed)
+
+        self.assertTrue(os.path.isfile(checkpoint_file))
+
+        state["calls"] = 0
+        state["fail"] = False
+
+        data = uncertainty.quantify(method="mc",
+                                    nr_mc_samples=self.nr_mc_samples,
+                                    resume=True,
+                                    plot=None,
+                                    data_folder=self.output_test_dir,
+                                    seed=self.seed)
+
+        nr_nodes = len(data["model_function"].evaluations)
+
+        self.assertEqual(state["calls"], nr_nodes - 5)
+        self.assertFalse(os.path.isfile(checkpoint_file))
+        self.assertIsNone(uncertainty.uncertainty_calculations.runmodel.checkpoint)
+
+        state["calls"] = 0
+        uncertainty.quantify(method="mc",
+                             nr_mc_samples=self.nr_mc_samples,
+                             plot=None,
+                             data_folder=self.output_test_dir,
+                             seed=self.seed)
+
+        self.assertEqual(state["calls"], nr_nodes)
+
+
+    def test_quantify_runmodel_checkpoint(self):
+        uncertainty = UncertaintyQuantification(model_function,
+                                                parameters=self.parameters,
+                                                CPUs=None,
+                                                logger_level="error",
+                                                logger_filename=None)
+
+        checkpoint_file = os.path.join(self.output_test_dir, "user_checkpoint.h5")
+        runmodel = uncertainty.uncertainty_calculations.runmodel
+        runmodel.checkpoint = checkpoint_file
+        user_checkpoint = runmodel.checkpoint
+
+        uncertainty.quantify(method="mc",
+                             nr_mc_samples=self.nr_mc_samples,
+                             plot=None,
+                             data_folder=self.output_test_dir,
+                             seed=self.seed)
+
+        # A checkpoint set by the user is used and kept
+        self.assertIs(runmodel.checkpoint, user_checkpoint)
+        self.assertTrue(os.path.isfile(checkpoint_file))
+
+        uncertainty.quantify(method="mc",
+                             nr_mc_samples=self.nr_mc_samples,
+                             checkpoint=True,
+                             plot=None,
+                             data_folder=self.output_test_dir,
+                             seed=self.seed)
+
+        self.assertIs(runmodel.checkpoint, user_checkpoint)
+        self.assertTrue(os.path.isfile(checkpoint_file))
+        self.assertFalse(os.path.isfile(os.path.join(self.output_test_dir, "model_function_checkpoint.h5")))
+
+
+    def test_create_checkpoint(self):
+        checkpoint = self.uncertainty.create_checkpoint("test", folder="data")
+        self.assertEqual(checkpoint.filename, os.path.join("data", "test_checkpoint.h5"))
+
+        checkpoint = self.uncertainty.create_checkpoint("test.exdir", folder="data")
+        self.assertEqual(checkpoint.filename, os.path.join("data", "test_checkpoint.exdir"))
+
+        self.uncertainty.backend = "exdir"
+        checkpoint = self.uncertainty.create_checkpoint("test", folder="data")
+        self.assertEqual(checkpoint.filename, os.path.join("data", "test_checkpoint.exdir"))
+
+
     def test_quantify_custom(self):
         self.set_up_test_calculations()
 
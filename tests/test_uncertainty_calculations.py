@@ -5,6 +5,7 @@ import shutil
 import subprocess
 import time
 import logging
+import warnings
 import numpy as np
 import chaospy as cp
 import numpoly
@@ -18,7 +19,7 @@ from uncertainpy import Data
 from uncertainpy.models import Model
 from uncertainpy import SpikingFeatures
 
-from SALib.analyze.sobol import separate_output_values
+from SALib.analyze.sobol import separate_output_values, first_order, total_order
 
 
 from .testing_classes import TestingFeatures
@@ -296,6 +297,22 @@ class TestUncertaintyCalculations(unittest.TestCase):
         self.assertTrue(np.all(mask))
 
 
+    def test_create_mask_array(self):
+        evaluations = np.array([[1., 2.], [np.nan, 2.], [3., 4.]])
+
+        masked_evaluations, mask = self.uncertainty_calculations.create_mask(evaluations)
+
+        self.assertTrue(np.array_equal(mask, [True, False, True]))
+        self.assertTrue(np.array_equal(masked_evaluations, [[1., 2.], [3., 4.]]))
+
+        evaluations = np.array([[1., 2.], [3., 4.]])
+
+        masked_evaluations, mask = self.uncertainty_calculations.create_mask(evaluations)
+
+        self.assertTrue(np.all(mask))
+        self.assertIs(masked_evaluations, evaluations)
+
+
     def test_create_masked_evaluations(self):
         nodes = np.array([[0, 1, 2], [1, 2, 3]])
         uncertain_parameters = ["a", "b"]
@@ -851,6 +868,108 @@ class TestUncertaintyCalculations(unittest.TestCase):
 
 
 
+    def test_sparse_regression(self):
+        distribution = cp.Iid(cp.Uniform(-1, 1), 6)
+        polynomials = cp.orth_ttr(3, distribution)
+
+        nodes = distribution.sample(60, "H")
+        evaluations = 1 + nodes[0] + 2*nodes[1]**2 + nodes[0]*nodes[2]
+
+        U_hat, nr_terms = self.uncertainty_calculations.sparse_regression(polynomials,
+                                                                          nodes,
+                                                                          evaluations)
+
+        self.assertLess(nr_terms, 10)
+
+        samples = distribution.sample(100, "R")
+        exact = 1 + samples[0] + 2*samples[1]**2 + samples[0]*samples[2]
+
+        self.assertTrue(np.allclose(U_hat(*samples), exact))
+
+
+    def test_sparse_regression_array(self):
+        distribution = cp.Iid(cp.Uniform(-1, 1), 4)
+        polynomials = cp.orth_ttr(2, distribution)
+
+        nodes = distribution.sample(30, "H")
+        evaluations = np.array([nodes[0]*t + nodes[1]**2 for t in np.arange(5)]).T
+
+        U_hat, nr_terms = self.uncertainty_calculations.sparse_regression(polynomials,
+                                                                          nodes,
+                                                                          evaluations)
+
+        self.assertEqual(U_hat.shape, (5,))
+        self.assertLess(nr_terms, len(polynomials))
+        self.assertTrue(np.allclose(U_hat(*nodes).T, evaluations))
+
+
+    def test_sparse_regression_error(self):
+        distribution = cp.Iid(cp.Uniform(-1, 1), 2)
+        polynomials = cp.orth_ttr(2, distribution)
+        nodes = distribution.sample(10, "H")
+
+        with self.assertRaises(ValueError):
+            self.uncertainty_calculations.sparse_regression(polynomials,
+                                                            nodes,
+                                                            nodes[0],
+                                                            method="not_existing")
+
+
+    def test_sparse_regression_lars(self):
+        try:
+            import sklearn
+            prerequisites = True
+        except ImportError:
+            prerequisites = False
+
+        distribution = cp.Iid(cp.Uniform(-1, 1), 6)
+        polynomials = cp.orth_ttr(3, distribution)
+
+        nodes = distribution.sample(60, "H")
+        evaluations = 1 + nodes[0] + 2*nodes[1]**2 + nodes[0]*nodes[2]
+
+        if prerequisites:
+            U_hat, nr_terms = self.uncertainty_calculations.sparse_regression(polynomials,
+                                                                              nodes,
+                                                                              evaluations,
+                                                                              method="lars")
+
+            self.assertTrue(np.allclose(U_hat(*nodes), evaluations))
+        else:
+            with self.assertRaises(ImportError):
+                self.uncertainty_calculations.sparse_regression(polynomials,
+                                                                nodes,
+                                                                evaluations,
+                                                                method="lars")
+
+
+    def test_create_PCE_collocation_sparse(self):
+        U_hat, distribution, data = \
+            self.uncertainty_calculations.create_PCE_collocation(sparse="omp",
+                                                                 truncation=0.5)
+
+        self.assertEqual(data.uncertain_parameters, ["a", "b"])
+        self.assertLessEqual(len(data["TestingModel1d"].evaluations), 30)
+        self.assertIn("sparse=omp, truncation=0.5", data.method)
+        self.assertIsInstance(U_hat["feature0d"], numpoly.ndpoly)
+        self.assertIsInstance(U_hat["feature1d"], numpoly.ndpoly)
+        self.assertIsInstance(U_hat["feature2d"], numpoly.ndpoly)
+        self.assertIsInstance(U_hat["TestingModel1d"], numpoly.ndpoly)
+
+
+    def test_create_PCE_collocation_sparse_error(self):
+        with self.assertRaises(ValueError):
+            self.uncertainty_calculations.create_PCE_collocation(sparse="not_existing")
+
+
+    def test_create_PCE_collocation_rosenblatt_sparse(self):
+        U_hat, distribution, data = \
+            self.uncertainty_calculations.create_PCE_collocation_rosenblatt(sparse="omp")
+
+        self.assertIn("sparse point collocation and the Rosenblatt", data.method)
+        self.assertIsInstance(U_hat["TestingModel1d"], numpoly.ndpoly)
+
+
     def test_create_PCE_collocation_rosenblatt_all(self):
 
         U_hat, distribution, data = \
@@ -954,6 +1073,165 @@ class TestUncertaintyCalculations(unittest.TestCase):
         self.assertIsInstance(U_hat["TestingModel1d"], numpoly.ndpoly)
 
 
+    def create_adaptive_uncertainty_calculations(self):
+        def model(a, b, c):
+            return None, np.exp(a)*np.sin(b)**2 + 0*c
+
+        parameter_list = [["a", None, cp.Uniform(0, 1)],
+                          ["b", None, cp.Uniform(0, 2)],
+                          ["c", None, cp.Uniform(0, 1)]]
+
+        return UncertaintyCalculations(model=Model(model),
+                                       parameters=Parameters(parameter_list),
+                                       logger_level="error")
+
+
+    def test_adaptive_sparse_grid(self):
+        uncertainty_calculations = self.create_adaptive_uncertainty_calculations()
+        distribution = uncertainty_calculations.create_distribution()
+
+        nodes, weights, data, combination = \
+            uncertainty_calculations.adaptive_sparse_grid(distribution,
+                                                          ["a", "b", "c"],
+                                                          tolerance=1e-4)
+
+        self.assertEqual(data.uncertain_parameters, ["a", "b", "c"])
+        self.assertEqual(nodes.shape, (3, len(weights)))
+        self.assertEqual(len(data["model"].evaluations), len(weights))
+        self.assertAlmostEqual(np.sum(weights), 1)
+
+        # The model does not depend on c, so c is not refined beyond the
+        # first level, which is always refined
+        self.assertLessEqual(len(np.unique(nodes[2])), 5)
+        self.assertTrue(np.all([index[2] <= 2 for coefficient, index, rows, index_weights in combination]))
+        self.assertGreater(len(np.unique(nodes[1])), 5)
+
+        mean = np.sum(weights*np.array(data["model"].evaluations))
+        self.assertAlmostEqual(mean, 0.5*(np.e - 1)*(1 - np.sin(4)/4), places=3)
+
+
+    def test_adaptive_sparse_grid_zero_at_centre(self):
+        def model(a, b, c):
+            return None, a + 2*b*c + a**3
+
+        parameter_list = [["a", None, cp.Uniform(-1, 1)],
+                          ["b", None, cp.Uniform(-1, 1)],
+                          ["c", None, cp.Uniform(-1, 1)]]
+
+        uncertainty_calculations = UncertaintyCalculations(model=Model(model),
+                                                           parameters=Parameters(parameter_list),
+                                                           logger_level="error")
+        distribution = uncertainty_calculations.create_distribution()
+
+        nodes, weights, data, combination = \
+            uncertainty_calculations.adaptive_sparse_grid(distribution,
+                                                          ["a", "b", "c"],
+                                                          tolerance=1e-3)
+
+        evaluations = np.array(data["model"].evaluations)
+        mean = np.sum(weights*evaluations)
+        variance = np.sum(weights*evaluations**2) - mean**2
+
+        # Var(a + a**3) + Var(2*b*c) = 1/3 + 2/5 + 1/7 + 4/9
+        self.assertGreater(len(weights), 1)
+        self.assertAlmostEqual(mean, 0)
+        self.assertAlmostEqual(variance, 1/3. + 2/5. + 1/7. + 4/9.)
+
+
+    def test_adaptive_sparse_grid_max_evaluations(self):
+        uncertainty_calculations = self.create_adaptive_uncertainty_calculations()
+        distribution = uncertainty_calculations.create_distribution()
+
+        nodes, weights, data, combination = \
+            uncertainty_calculations.adaptive_sparse_grid(distribution,
+                                                          ["a", "b", "c"],
+                                                          tolerance=0,
+                                                          max_evaluations=20)
+
+        self.assertLessEqual(len(weights), 20)
+        self.assertEqual(len(data["model"].evaluations), len(weights))
+
+
+    def test_sparse_grid_projection(self):
+        distribution = cp.J(cp.Uniform(0, 1), cp.Uniform(0, 1))
+        polynomials = cp.generate_expansion(2, distribution)
+
+        # A single tensor product quadrature that is only refined along the
+        # first dimension, so it only integrates polynomials in the first
+        # dimension exactly
+        nodes, weights = cp.generate_quadrature((2, 0), distribution, rule="gaussian")
+        evaluations = nodes[0]**2 + nodes[1]
+
+        mask = np.ones(len(weights), dtype=bool)
+        combination = [(1, np.array([2, 0]), np.arange(len(weights)), weights)]
+
+        U_hat = self.uncertainty_calculations.sparse_grid_projection(polynomials,
+                                                                     nodes,
+                                                                     evaluations,
+                                                                     mask,
+                                                                     combination)
+
+        exponents, coefficients, shape = self.uncertainty_calculations.PCE_coefficients(U_hat, 2)
+        used = exponents[np.any(np.abs(coefficients) > 1e-10, axis=1)]
+
+        self.assertTrue(np.any(used[:, 0] == 2))
+        self.assertTrue(np.all(used[:, 1] == 0))
+
+
+    def test_PCE_coefficients_dimensions(self):
+        q = numpoly.variable(12)
+        U_hat = numpoly.polynomial([2*q[2] + 3*q[10]**2])
+
+        exponents, coefficients, shape = self.uncertainty_calculations.PCE_coefficients(U_hat, 12)
+
+        self.assertEqual(exponents.shape, (2, 12))
+        self.assertEqual(shape, (1,))
+
+        terms = {tuple(np.nonzero(exponent)[0]): coefficient[0]
+                 for exponent, coefficient in zip(exponents, coefficients)}
+
+        self.assertEqual(terms, {(2,): 2, (10,): 3})
+        self.assertEqual(exponents[:, 10].max(), 2)
+
+
+    def test_create_PCE_spectral_adaptive(self):
+        uncertainty_calculations = self.create_adaptive_uncertainty_calculations()
+
+        U_hat, distribution, data = \
+            uncertainty_calculations.create_PCE_spectral(polynomial_order=6,
+                                                         quadrature_order=8,
+                                                         adaptive=True,
+                                                         tolerance=1e-4)
+
+        nr_nodes = len(data["model"].evaluations)
+
+        self.assertLess(nr_nodes, 165)
+        self.assertIn("adaptive pseudo-spectral", data.method)
+        self.assertIn("nr_nodes={}".format(nr_nodes), data.method)
+
+        np.random.seed(10)
+        samples = np.array([np.random.uniform(0, 1, 1000),
+                            np.random.uniform(0, 2, 1000),
+                            np.random.uniform(0, 1, 1000)])
+
+        exact = np.exp(samples[0])*np.sin(samples[1])**2
+
+        self.assertTrue(np.allclose(U_hat["model"](*samples), exact, atol=0.05))
+
+
+    def test_create_PCE_spectral_rosenblatt_adaptive(self):
+        uncertainty_calculations = self.create_adaptive_uncertainty_calculations()
+
+        U_hat, distribution, data = \
+            uncertainty_calculations.create_PCE_spectral_rosenblatt(polynomial_order=4,
+                                                                    adaptive=True,
+                                                                    tolerance=1e-2)
+
+        self.assertEqual(data.uncertain_parameters, ["a", "b", "c"])
+        self.assertIsInstance(U_hat["model"], numpoly.ndpoly)
+        self.assertIn("adaptive pseudo-spectral method and the Rosenblatt", data.method)
+
+
 
     def test_calculate_sobol_first_average(self):
         data = Data(logger_level="error")
@@ -1080,6 +1358,98 @@ class TestUncertaintyCalculations(unittest.TestCase):
 
 
 
+    def test_analyse_PCE_values(self):
+        data = Data(logger_level="error")
+        data.uncertain_parameters = ["a", "b"]
+        data.add_features(["TestingModel1d", "feature0d"])
+
+        q0, q1 = cp.variable(2)
+        distribution = cp.J(cp.Uniform(0, 1), cp.Uniform(0, 2))
+
+        U_hat = {}
+        U_hat["TestingModel1d"] = numpoly.polynomial([q0, 2*q1, q0 + q1])
+        U_hat["feature0d"] = 3 + 0*q0
+
+        data = self.uncertainty_calculations.analyse_PCE(U_hat, distribution, data)
+
+        self.assertTrue(np.allclose(data["TestingModel1d"].mean, [0.5, 2, 1.5]))
+        self.assertTrue(np.allclose(data["TestingModel1d"].variance, [1/12., 4/3., 5/12.]))
+        self.assertTrue(np.allclose(data["TestingModel1d"].sobol_first, [[1, 0, 0.2], [0, 1, 0.8]]))
+        self.assertTrue(np.allclose(data["TestingModel1d"].sobol_total, [[1, 0, 0.2], [0, 1, 0.8]]))
+        self.assertTrue(np.allclose(data["TestingModel1d"].sobol_first_average, [0.4, 0.6]))
+        self.assertTrue(np.allclose(data["TestingModel1d"].percentile_5, [0.05, 0.2, np.sqrt(0.2)], atol=0.01))
+        self.assertTrue(np.allclose(data["TestingModel1d"].percentile_95, [0.95, 3.8, 3 - np.sqrt(0.2)], atol=0.01))
+
+        self.assertTrue(np.allclose(data["feature0d"].mean, 3))
+        self.assertTrue(np.allclose(data["feature0d"].variance, 0))
+        self.assertTrue(np.allclose(data["feature0d"].sobol_first, [0, 0]))
+        self.assertTrue(np.allclose(data["feature0d"].percentile_5, 3))
+
+
+    def test_PCE_terms(self):
+        np.random.seed(self.seed)
+
+        exponents = np.array([[0, 0, 0], [1, 0, 2], [0, 3, 0], [2, 1, 1]])
+        samples = np.random.uniform(size=(3, 20))
+
+        terms = self.uncertainty_calculations.PCE_terms(exponents, samples)
+
+        self.assertEqual(terms.shape, (4, 20))
+        self.assertTrue(np.allclose(terms[0], 1))
+        self.assertTrue(np.allclose(terms[1], samples[0]*samples[2]**2))
+        self.assertTrue(np.allclose(terms[2], samples[1]**3))
+        self.assertTrue(np.allclose(terms[3], samples[0]**2*samples[1]*samples[2]))
+
+
+    def test_PCE_statistics(self):
+        q0, q1 = cp.variable(2)
+        distribution = cp.J(cp.Uniform(0, 1), cp.Normal(0.5, 2))
+
+        U_hat = numpoly.polynomial([q0 + q1*q0 + q1**2, q0**3*q1])
+
+        mean, variance, sobol_first, sobol_total = \
+            self.uncertainty_calculations.PCE_statistics(U_hat, distribution)
+
+        self.assertEqual(mean.shape, (2,))
+        self.assertEqual(sobol_first.shape, (2, 2))
+
+        np.random.seed(self.seed)
+        nr_samples = 10**5
+        A = distribution.sample(nr_samples, "R")
+        B = distribution.sample(nr_samples, "R")
+
+        evaluations_A = U_hat(*A)
+        evaluations_B = U_hat(*B)
+
+        self.assertTrue(np.allclose(mean, np.mean(evaluations_A, -1), rtol=0.05))
+        self.assertTrue(np.allclose(variance, np.var(evaluations_A, -1), rtol=0.05))
+
+        total_variance = np.var(np.concatenate([evaluations_A, evaluations_B], -1), -1)
+        for i in range(2):
+            AB = A.copy()
+            AB[i] = B[i]
+            evaluations_AB = U_hat(*AB)
+
+            first = np.mean(evaluations_B*(evaluations_AB - evaluations_A), -1)/total_variance
+            total = 0.5*np.mean((evaluations_A - evaluations_AB)**2, -1)/total_variance
+
+            self.assertTrue(np.allclose(sobol_first[i], first, atol=0.03))
+            self.assertTrue(np.allclose(sobol_total[i], total, atol=0.03))
+
+
+    def test_PCE_statistics_no_sensitivity(self):
+        q0 = cp.variable(1)
+        distribution = cp.Normal(1, 2)
+
+        mean, variance, sobol_first, sobol_total = \
+            self.uncertainty_calculations.PCE_statistics(q0**2, distribution, sensitivity=False)
+
+        self.assertTrue(np.allclose(mean, 5))
+        self.assertTrue(np.allclose(variance, 2*4**2 + 4*1*4))
+        self.assertIsNone(sobol_first)
+        self.assertIsNone(sobol_total)
+
+
     def test_polynomial_chaos_collocation(self):
         features = TestingFeatures(features_to_run=["feature0d_var",
                                                     "feature1d_var",
@@ -1742,6 +2112,193 @@ class TestUncertaintyCalculations(unittest.TestCase):
 
 
 
+    def test_monte_carlo_tolerant(self):
+        def model(a, b):
+            if a > 1.2:
+                raise ValueError("a can not be larger than 1.2")
+
+            return np.arange(0, 10), np.arange(0, 10) + a + b
+
+        parameter_list = [["a", 1, None],
+                          ["b", 2, None]]
+
+        parameters = Parameters(parameter_list)
+        parameters.set_all_distributions(uniform(0.5))
+
+        features = TestingFeatures(features_to_run=["feature0d", "feature1d", "feature2d"])
+
+        self.uncertainty_calculations = UncertaintyCalculations(model,
+                                                                parameters=parameters,
+                                                                features=features,
+                                                                tolerant=True,
+                                                                logger_level="error")
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", np.VisibleDeprecationWarning)
+
+            data = self.uncertainty_calculations.monte_carlo(nr_samples=self.nr_mc_samples,
+                                                             seed=10)
+
+        self.assertGreater(len(data.failed), 0)
+
+        failed = [int(message.split(":")[0].split()[1]) for message in data.failed]
+
+        # Failed evaluations have the same shape as the successful evaluations
+        self.assertEqual(np.shape(data["model"].evaluations)[1:], (10,))
+        self.assertEqual(np.shape(data["feature2d"].evaluations)[1:], (2, 10))
+        self.assertTrue(np.all(np.isnan(np.asarray(data["model"].evaluations)[failed])))
+        self.assertTrue(np.all(np.isnan(np.asarray(data["feature2d"].evaluations)[failed])))
+
+        self.assertEqual(np.shape(data["model"].mean), (10,))
+        self.assertEqual(np.shape(data["feature2d"].mean), (2, 10))
+        self.assertFalse(np.any(np.isnan(data["model"].mean)))
+        self.assertTrue(np.allclose(data["model"].mean, np.arange(0, 10) + 2.9, atol=0.2))
+
+
+
+    def test_monte_carlo_streaming(self):
+        parameter_list = [["a", 1, None],
+                          ["b", 2, None]]
+
+        parameters = Parameters(parameter_list)
+        parameters.set_all_distributions(uniform(0.5))
+
+        model = TestingModel1d()
+
+        features = TestingFeatures(features_to_run=["feature0d_var",
+                                                    "feature1d_var",
+                                                    "feature2d_var",
+                                                    "feature_interpolate"])
+
+        self.uncertainty_calculations = UncertaintyCalculations(model,
+                                                                parameters=parameters,
+                                                                features=features,
+                                                                logger_level="error",
+                                                                CPUs=None)
+
+        data = self.uncertainty_calculations.monte_carlo(nr_samples=100, seed=10)
+        data_streaming = self.uncertainty_calculations.monte_carlo(nr_samples=100,
+                                                                   seed=10,
+                                                                   streaming=True)
+
+        self.assertEqual(data_streaming.method, data.method)
+        self.assertEqual(data_streaming.incomplete, [])
+        self.assertEqual(data_streaming.error, [])
+
+        for feature in data:
+            self.assertEqual(data_streaming[feature].labels, data[feature].labels)
+            np.testing.assert_array_equal(data_streaming[feature].time, data[feature].time)
+            self.assertTrue(np.allclose(data_streaming[feature].evaluations,
+                                        data[feature].evaluations))
+
+            self.assertTrue(np.allclose(data_streaming[feature].mean, data[feature].mean))
+            self.assertTrue(np.allclose(data_streaming[feature].variance, data[feature].variance))
+            self.assertTrue(np.allclose(data_streaming[feature].sobol_first,
+                                        data[feature].sobol_first))
+            self.assertTrue(np.allclose(data_streaming[feature].sobol_total,
+                                        data[feature].sobol_total))
+            self.assertTrue(np.allclose(data_streaming[feature].sobol_first_average,
+                                        data[feature].sobol_first_average))
+
+            # The percentiles are estimated
+            self.assertTrue(np.allclose(data_streaming[feature].percentile_5,
+                                        data[feature].percentile_5, atol=0.05))
+            self.assertTrue(np.allclose(data_streaming[feature].percentile_95,
+                                        data[feature].percentile_95, atol=0.05))
+
+
+    def test_monte_carlo_interpolate_2d(self):
+        parameter_list = [["a", 1, None],
+                          ["b", 2, None]]
+
+        parameters = Parameters(parameter_list)
+        parameters.set_all_distributions(uniform(0.5))
+
+        def feature2d_adaptive(time, values):
+            return time, np.array([values, 2*values])
+
+        features = Features(new_features=feature2d_adaptive,
+                            interpolate="feature2d_adaptive",
+                            logger_level="error")
+
+        for interpolation_grid in [None, np.linspace(0, 10, 21)]:
+            self.uncertainty_calculations = UncertaintyCalculations(TestingModelAdaptive(),
+                                                                    parameters=parameters,
+                                                                    features=features,
+                                                                    logger_level="error",
+                                                                    CPUs=None,
+                                                                    interpolation_grid=interpolation_grid)
+
+            data = self.uncertainty_calculations.monte_carlo(nr_samples=20, seed=10)
+
+            self.assertEqual(data.error, [])
+            self.assertEqual(np.ndim(data["feature2d_adaptive"].evaluations), 3)
+            self.assertEqual(np.shape(data["feature2d_adaptive"].mean),
+                             np.shape(data["feature2d_adaptive"].evaluations)[1:])
+
+        # With a common time grid streaming gives the same results
+        data_streaming = self.uncertainty_calculations.monte_carlo(nr_samples=20,
+                                                                   seed=10,
+                                                                   streaming=True)
+
+        self.assertEqual(data_streaming.error, [])
+
+        for feature in data:
+            np.testing.assert_array_equal(data_streaming[feature].time, data[feature].time)
+            self.assertTrue(np.allclose(data_streaming[feature].evaluations,
+                                        data[feature].evaluations))
+            self.assertTrue(np.allclose(data_streaming[feature].mean, data[feature].mean))
+
+        self.assertEqual(np.shape(data["feature2d_adaptive"].evaluations)[1:], (2, 21))
+        self.assertTrue(np.allclose(np.array(data["feature2d_adaptive"].evaluations)[:, 1],
+                                    2*np.array(data["TestingModelAdaptive"].evaluations)))
+
+
+    def test_monte_carlo_streaming_discard_evaluations(self):
+        data = self.uncertainty_calculations.monte_carlo(nr_samples=self.nr_mc_samples,
+                                                         seed=10,
+                                                         streaming=True,
+                                                         keep_evaluations=False)
+
+        for feature in data:
+            self.assertIsNone(data[feature].evaluations)
+            self.assertIsNotNone(data[feature].mean)
+
+        self.assertEqual(data.ndim("TestingModel1d"), 1)
+        self.assertEqual(data.ndim("feature0d"), 0)
+        self.assertEqual(data.ndim("feature2d"), 2)
+
+
+    def test_monte_carlo_streaming_incomplete(self):
+        parameter_list = [["a", 1, None],
+                          ["b", 2, None]]
+
+        parameters = Parameters(parameter_list)
+        parameters.set_all_distributions(uniform(0.5))
+
+        model = TestingModelIncomplete()
+
+        features = TestingFeatures(features_to_run=None)
+
+        self.uncertainty_calculations = UncertaintyCalculations(model,
+                                                                parameters=parameters,
+                                                                features=features,
+                                                                logger_level="error")
+
+        data = self.uncertainty_calculations.monte_carlo(nr_samples=self.nr_mc_samples,
+                                                         allow_incomplete=False,
+                                                         seed=10,
+                                                         streaming=True)
+
+        self.assertEqual(data.incomplete, ["TestingModelIncomplete"])
+        self.assertIsNone(data["TestingModelIncomplete"].mean)
+        self.assertIsNone(data["TestingModelIncomplete"].variance)
+        self.assertIsNone(data["TestingModelIncomplete"].percentile_5)
+        self.assertIsNone(data["TestingModelIncomplete"].percentile_95)
+        self.assertIsNone(data["TestingModelIncomplete"].sobol_first)
+        self.assertIsNone(data["TestingModelIncomplete"].sobol_total)
+
+
     def test_create_PCE_collocation_incomplete(self):
         np.random.seed(self.seed)
 
@@ -2074,6 +2631,132 @@ class TestUncertaintyCalculations(unittest.TestCase):
             self.mc_calculate_sobol_use_case(test_array)
 
 
+    def test_mc_calculate_sobol_salib(self):
+        np.random.seed(self.seed)
+
+        nr_uncertain_parameters = 3
+        nr_samples = 20
+
+        evaluations = np.random.random((nr_samples*(nr_uncertain_parameters + 2), 5))
+
+        sobol_first, sobol_total = self.uncertainty_calculations.mc_calculate_sobol(evaluations=evaluations,
+                                                                                    nr_uncertain_parameters=nr_uncertain_parameters,
+                                                                                    nr_samples=nr_samples)
+
+        step = nr_uncertain_parameters + 2
+        A = evaluations[0::step]
+        B = evaluations[step - 1::step]
+
+        for i in range(nr_uncertain_parameters):
+            AB = evaluations[i + 1::step]
+
+            self.assertTrue(np.allclose(sobol_first[i], first_order(A, AB, B)))
+            self.assertTrue(np.allclose(sobol_total[i], total_order(A, AB, B)))
+
+
+    def test_mc_calculate_sobol_constant(self):
+        evaluations = np.ones(8)
+
+        sobol_first, sobol_total = self.uncertainty_calculations.mc_calculate_sobol(evaluations=evaluations,
+                                                                                    nr_uncertain_parameters=2,
+                                                                                    nr_samples=2)
+
+        self.assertEqual(np.shape(sobol_first), (2,))
+        self.assertEqual(np.shape(sobol_total), (2,))
+        self.assertTrue(np.array_equal(sobol_first, [0, 0]))
+        self.assertTrue(np.array_equal(sobol_total, [0, 0]))
+
+        evaluations = np.ones((8, 3))
+
+        sobol_first, sobol_total = self.uncertainty_calculations.mc_calculate_sobol(evaluations=evaluations,
+                                                                                    nr_uncertain_parameters=2,
+                                                                                    nr_samples=2)
+
+        self.assertEqual(np.shape(sobol_first), (2, 3))
+        self.assertEqual(np.shape(sobol_total), (2, 3))
+        self.assertTrue(np.array_equal(sobol_first, np.zeros((2, 3))))
+        self.assertTrue(np.array_equal(sobol_total, np.zeros((2, 3))))
+
+
+    def test_mc_bootstrap_sobol_constant(self):
+        evaluations = np.ones(8)
+
+        sobol_first_conf, sobol_total_conf = self.uncertainty_calculations.mc_bootstrap_sobol(evaluations, 2, 2)
+
+        self.assertEqual(np.shape(sobol_first_conf), (2,))
+        self.assertEqual(np.shape(sobol_total_conf), (2,))
+
+        evaluations = np.ones((8, 3))
+
+        sobol_first_conf, sobol_total_conf = self.uncertainty_calculations.mc_bootstrap_sobol(evaluations, 2, 2)
+
+        self.assertEqual(np.shape(sobol_first_conf), (2, 3))
+        self.assertEqual(np.shape(sobol_total_conf), (2, 3))
+        self.assertTrue(np.array_equal(sobol_first_conf, np.zeros((2, 3))))
+        self.assertTrue(np.array_equal(sobol_total_conf, np.zeros((2, 3))))
+
+
+    def test_sobol_estimators(self):
+        A = np.random.random((10, 3))
+        B = np.random.random((10, 3))
+        AB = np.random.random((10, 2, 3))
+
+        sobol_first, sobol_total = self.uncertainty_calculations.sobol_estimators(A, B, AB)
+
+        self.assertEqual(sobol_first.shape, (2, 3))
+        self.assertEqual(sobol_total.shape, (2, 3))
+
+        for i in range(2):
+            self.assertTrue(np.allclose(sobol_first[i], first_order(A, AB[:, i], B)))
+            self.assertTrue(np.allclose(sobol_total[i], total_order(A, AB[:, i], B)))
+
+
+    def test_mc_bootstrap_sobol(self):
+        nr_uncertain_parameters = 2
+        nr_samples = 50
+        nr_bootstrap = 20
+
+        evaluations = np.random.random((nr_samples*(nr_uncertain_parameters + 2), 4))
+
+        np.random.seed(self.seed)
+        sobol_first_conf, sobol_total_conf = self.uncertainty_calculations.mc_bootstrap_sobol(evaluations,
+                                                                                              nr_uncertain_parameters,
+                                                                                              nr_samples,
+                                                                                              nr_bootstrap=nr_bootstrap)
+
+        # Compare with resampling one resample at the time
+        np.random.seed(self.seed)
+        resamples = np.random.randint(nr_samples, size=(nr_bootstrap, nr_samples))
+
+        A, B, AB = self.uncertainty_calculations.separate_output_values(evaluations,
+                                                                        nr_uncertain_parameters,
+                                                                        nr_samples)
+
+        z = 1.959963984540054
+        for i in range(nr_uncertain_parameters):
+            first = [first_order(A[r], AB[r, i], B[r]) for r in resamples]
+            total = [total_order(A[r], AB[r, i], B[r]) for r in resamples]
+
+            self.assertTrue(np.allclose(sobol_first_conf[i], z*np.std(first, axis=0, ddof=1)))
+            self.assertTrue(np.allclose(sobol_total_conf[i], z*np.std(total, axis=0, ddof=1)))
+
+
+    def test_monte_carlo_bootstrap(self):
+        data = self.uncertainty_calculations.monte_carlo(nr_samples=self.nr_mc_samples,
+                                                         seed=self.seed,
+                                                         nr_bootstrap=10)
+
+        self.assertEqual(np.shape(data["TestingModel1d"].sobol_first_conf), (2, 10))
+        self.assertEqual(np.shape(data["TestingModel1d"].sobol_total_conf), (2, 10))
+        self.assertEqual(np.shape(data["feature2d"].sobol_first_conf), (2, 2, 10))
+        self.assertEqual(np.shape(data["feature0d"].sobol_first_conf), (2,))
+
+        data = self.uncertainty_calculations.monte_carlo(nr_samples=self.nr_mc_samples,
+                                                         seed=self.seed)
+
+        self.assertIsNone(data["TestingModel1d"].sobol_first_conf)
+
+
     def test_dependent(self):
         a = cp.Uniform(1, 2)
         b = cp.Uniform(1, 2) + a
@@ -1,7 +1,7 @@
 from .testing_models import TestingModel0d, TestingModel1d, TestingModel2d
 from .testing_models import TestingModelNoTime, TestingModelNoTimeU
 from .testing_models import TestingModelAdaptive, TestingModelConstant
-from .testing_models import TestingModelIncomplete
+from .testing_models import TestingModelIncomplete, TestingModelVectorized
 from .testing_models import PostprocessErrorNumpy, PostprocessErrorValue, PostprocessErrorOne
 from .testing_models import model_function
 
@@ -38,6 +38,20 @@ class TestingModel1d(Model):
 
 
 
+class TestingModelVectorized(Model):
+    def __init__(self):
+        super(TestingModelVectorized, self).__init__(labels=["x", "y"],
+                                                     vectorized=True,
+                                                     logger_level=None)
+
+    def run(self, a=1, b=2):
+        time = np.arange(0, 10)
+        values = np.arange(0, 10) + np.asarray(a)[:, None] + np.asarray(b)[:, None]
+
+        return time, values
+
+
+
 class TestingModel2d(Model):
     def __init__(self):
         super(TestingModel2d, self).__init__(labels=["x", "y", "z"], logger_level=None)
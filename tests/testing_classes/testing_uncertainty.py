@@ -12,7 +12,11 @@ class TestingUncertaintyCalculations(UncertaintyCalculations):
                          quadrature_order=4,
                          nr_pc_mc_samples=10**4,
                          allow_incomplete=False,
-                         seed=None):
+                         seed=None,
+                         adaptive=False,
+                         tolerance=1e-3,
+                         sparse=None,
+                         truncation=1):
 
         arguments = {}
 
@@ -26,6 +30,10 @@ class TestingUncertaintyCalculations(UncertaintyCalculations):
         arguments["nr_pc_mc_samples"] = nr_pc_mc_samples
         arguments["seed"] = seed
         arguments["allow_incomplete"] = allow_incomplete
+        arguments["adaptive"] = adaptive
+        arguments["tolerance"] = tolerance
+        arguments["sparse"] = sparse
+        arguments["truncation"] = truncation
 
 
         data = Data(logger_level=None)
@@ -37,13 +45,17 @@ class TestingUncertaintyCalculations(UncertaintyCalculations):
     def monte_carlo(self,
                     uncertain_parameters=None,
                     nr_samples=10**3,
-                    seed=None):
+                    seed=None,
+                    streaming=False,
+                    keep_evaluations=True,
+                    nr_bootstrap=0):
         arguments = {}
 
         arguments["function"] = "MC"
         arguments["uncertain_parameters"] = uncertain_parameters
         arguments["seed"] = seed
         arguments["nr_samples"] = nr_samples
+        arguments["nr_bootstrap"] = nr_bootstrap
 
         data = Data(logger_level=None)
         data.arguments = arguments